@@ -1,6 +1,7 @@
 import os
-from flask import Flask, render_template, request, jsonify, send_from_directory
-from pymongo import MongoClient
+import threading
+from flask import Flask, Response, render_template, request, jsonify, send_file, send_from_directory, stream_with_context
+from werkzeug.security import safe_join
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -8,198 +9,245 @@ load_dotenv()
 
 app = Flask(__name__)
 
-# Replace with your MongoDB connection details if needed
-MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/")
-MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME", "gacetas_db")
-
-client = MongoClient(MONGO_URI)
-db = client[MONGO_DB_NAME]
+# MongoDB: shared pooled client (MONGO_URI / MONGO_DB_NAME, see src/adapters/mongodb_client.py)
+from src.api.v1.database import get_db
 
 # Register API v1 endpoints
 from src.api.v1.routes import api_v1_bp
+from src.services.api_service import query_personas_mongo, next_cursor
+from src.adapters.mongodb_read_model import bump_data_version
+from src.api.v1.cache import cached_search, invalidate as invalidate_response_cache
+from src.api.v1.planner import plan_search
+from src.utils.cursors import InvalidCursor
+from src.adapters.mongodb_name_index import get_name_index
+from src.adapters.mongodb_cedula_index import get_cedula_index
+from src.adapters.mongodb_indexes import apply_indexes
+from src.constants.config import DOWNLOADS_DIR, MONGO_READ_MODEL_COLLECTION, PDF_CACHE_MAX_AGE_SECONDS, PROGRESS_FILE
+from src.services.pdf_service import MIMETYPES, PAGE_FORMATS, page_file
+from src.utils.progress import iter_progress_events, read_progress, write_progress
+from src.services.mining_jobs import MINING_MODES, MiningJobManager
+from src.adapters.mongodb_jobs import clear_mining_watermark
 app.register_blueprint(api_v1_bp)
 
+def _apply_indexes():
+    try:
+        for warning in apply_indexes(get_db()):
+            print(f"⚠️  Índices: {warning}")
+    except Exception as e:
+        print(f"⚠️  No se pudieron crear los índices: {e}")
+
+def _warm_up():
+    """Prepara en segundo plano (al importar la app, también bajo gunicorn) lo que las búsquedas
+    necesitan, para no hacerlo dentro de la primera petición: crea los índices de MongoDB que
+    usan los endpoints (idempotente, como `python -m src --ensure-indexes`) y carga el índice
+    de nombres."""
+    threading.Thread(target=_apply_indexes, name="apply-indexes", daemon=True).start()
+    try:
+        get_name_index(get_db()).warm()
+    except Exception as e:
+        print(f"⚠️  No se pudo iniciar la carga del índice de nombres: {e}")
+
+_warm_up()
+
+def _write_progress(data):
+    try:
+        write_progress(PROGRESS_FILE, data)
+    except OSError:
+        pass
+
+def _job_started(job):
+    _write_progress({"percentage": 0, "message": "Iniciando extracción...", "status": "processing", "job_id": job["_id"]})
+
+def _job_finished(job):
+    # La CLI deja el progreso en "idle" al completar; si se canceló o falló, lo hace esta función
+    if job.get("estado") != "completado":
+        _write_progress({"percentage": 0, "message": job.get("mensaje", ""), "status": "idle", "job_id": job.get("_id")})
+    # Índice de cédulas con los datos nuevos (los demás workers cargan la misma instantánea)
+    try:
+        get_cedula_index(get_db()).refresh()
+    except Exception as e:
+        print(f"⚠️  No se pudo actualizar el índice de cédulas: {e}")
+
+# Extracciones lanzadas desde la web: una a la vez (ver src/services/mining_jobs.py)
+mining_jobs = MiningJobManager(get_db, on_start=_job_started, on_finish=_job_finished)
+
+def _format_job(job):
+    """Registro de una extracción para la API (fechas en ISO 8601)."""
+    datos = {key: value for key, value in job.items() if key not in ("_id", "activo", "latido")}
+    for key in ("creado", "inicio", "fin"):
+        if datos.get(key) is not None:
+            datos[key] = datos[key].isoformat()
+    datos["id"] = job["_id"]
+    datos["activo"] = bool(job.get("activo"))
+    return datos
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/api/search')
+@cached_search(get_db, bypass=("exact",))
 def api_search():
     query = request.args.get('q', '').strip()
-    page = int(request.args.get('page', 1))
-    limit = int(request.args.get('limit', 15))
-    skip = (page - 1) * limit
+    page = max(1, int(request.args.get('page', 1)))
+    limit = max(0, int(request.args.get('limit', 15)))
     letter = request.args.get('letter', '').strip().upper()
     range_filter = request.args.get('range', '').strip()
     sort_by = request.args.get('sort', 'newest')
+    # Cursor de la página siguiente (campo "next" de la respuesta anterior); `page` se conserva
+    after = request.args.get('after', '').strip()
+    exact = request.args.get('exact', '').strip().lower() in ('1', 'true')
+    # count=0: sin total (null) si habría que contarlo; limit=0: solo el total
+    count = request.args.get('count', '').strip().lower() not in ('0', 'false')
 
-    and_conditions = []
-    
-    if query:
-        and_conditions.append({
-            "$or": [
-                {"cedula": {"$regex": query, "$options": "i"}},
-                {"nombre": {"$regex": query, "$options": "i"}}
-            ]
-        })
-        
-    if letter:
-        and_conditions.append({"cedula": {"$regex": f"^{letter}-", "$options": "i"}})
-        
-    if range_filter == "0-10":
-        and_conditions.append({"cedula": {"$regex": r"^[A-Za-z]-\d{1,7}$"}})
-    elif range_filter == "10-20":
-        and_conditions.append({"cedula": {"$regex": r"^[A-Za-z]-1\d{7}$"}})
-    elif range_filter == "20-30":
-        and_conditions.append({"cedula": {"$regex": r"^[A-Za-z]-2\d{7}$"}})
-    elif range_filter == "30+":
-        and_conditions.append({"cedula": {"$regex": r"^[A-Za-z]-([3-9]\d{7}|\d{9,})$"}})
-
-    pipeline = []
-    if and_conditions:
-        if len(and_conditions) == 1:
-            pipeline.append({"$match": and_conditions[0]})
-        else:
-            pipeline.append({"$match": {"$and": and_conditions}})
-
-    if sort_by == 'apariciones':
-        pipeline.extend([
-            {"$lookup": {
-                "from": "persona_gaceta",
-                "localField": "_id",
-                "foreignField": "persona_id",
-                "as": "_pg_tmp"
-            }},
-            {"$addFields": {
-                "temp_count": {"$size": "$_pg_tmp"}
-            }},
-            {"$sort": {"temp_count": -1, "_id": -1}}
-        ])
-
-    facet_data = []
-    if sort_by != 'apariciones':
-        facet_data.append({"$sort": {"_id": -1}})
-        
-    facet_data.extend([
-        {"$skip": skip},
-        {"$limit": limit},
-        {"$lookup": {
-            "from": "persona_gaceta",
-            "localField": "_id",
-            "foreignField": "persona_id",
-            "as": "relationships"
-        }},
-        {"$unwind": {"path": "$relationships", "preserveNullAndEmptyArrays": True}},
-        {"$lookup": {
-            "from": "gaceta",
-            "localField": "relationships.gaceta_id",
-            "foreignField": "_id",
-            "as": "gaceta_info"
-        }},
-        {"$unwind": {"path": "$gaceta_info", "preserveNullAndEmptyArrays": True}},
-        {"$sort": {"gaceta_info.numero_gaceta": -1}}, 
-        {"$group": {
-            "_id": "$_id",
-            "cedula": {"$first": "$cedula"},
-            "nombre": {"$first": "$nombre"},
-            "apariciones": {
-                "$push": {
-                    "numero_gaceta": "$gaceta_info.numero_gaceta",
-                    "filename": "$gaceta_info.filename",
-                    "fecha": "$gaceta_info.fecha",
-                    "pagina": "$relationships.pagina"
-                }
-            }
-        }},
-        {"$project": {
-            "_id": 0,
-            "cedula": 1,
-            "nombre": 1,
-            "apariciones": {
-                "$filter": {
-                    "input": "$apariciones",
-                    "as": "ap",
-                    "cond": {"$ne": ["$$ap.numero_gaceta", None]}
-                }
-            }
-        }},
-        {"$addFields": {
-            "total_apariciones": {"$size": "$apariciones"}
-        }},
-        {"$sort": {"total_apariciones": -1} if sort_by == 'apariciones' else {"cedula": -1}}
-    ])
-    
-    pipeline.append({
-        "$facet": {
-            "metadata": [{"$count": "total"}],
-            "data": facet_data
-        }
-    })
-    
-    result = list(db.persona.aggregate(pipeline))
-    if result and result[0]['metadata']:
-        total = result[0]['metadata'][0]['total']
-        data = result[0]['data']
-    else:
-        total = 0
-        data = []
+    db = get_db()
+    try:
+        plan = plan_search(
+            query=query, letter=letter, range_filter=range_filter, page=page, limit=limit,
+            sort=sort_by, after=after or None, count=count, name_index=get_name_index(db),
+        )
+        data, total = query_personas_mongo(db, plan, exact_count=exact)
+    except InvalidCursor:
+        return jsonify({"error": "Cursor 'after' inválido"}), 400
+    next_token = next_cursor(data, sort_by, limit)
+    for doc in data:
+        doc.pop("_id", None)
 
     return jsonify({
         "data": data,
         "total": total,
         "page": page,
         "limit": limit,
-        "total_pages": (total + limit - 1) // limit if limit > 0 else 0
+        "total_pages": None if total is None else (total + limit - 1) // limit if limit > 0 else 0,
+        "next": next_token
     })
 
 @app.route('/api/mine', methods=['POST'])
 def api_mine():
-    import subprocess
-    import sys
-    import json
-    
-    # Reset progress file
-    progress_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "progress.json")
+    """
+    Inicia una extracción en segundo plano, o se une a la que ya está en curso (nunca corren
+    dos a la vez). `modo` (JSON, formulario o query): "incremental" (default; solo gacetas
+    nuevas desde la última extracción completa) o "completo" (todo el archivo otra vez).
+    Con la base de datos vacía una extracción incremental se hace completa. El modo usado
+    se devuelve en `modo`.
+    """
+    payload = request.get_json(silent=True) or {}
+    modo = (payload.get("modo") or request.values.get("modo") or "incremental").strip().lower()
+    if modo not in MINING_MODES:
+        return jsonify({"status": "error", "message": "Modo inválido: use 'incremental' o 'completo'."}), 400
     try:
-        with open(progress_file, "w", encoding="utf-8") as f:
-            json.dump({"percentage": 0, "message": "Iniciando extracción...", "status": "processing"}, f)
-    except:
-        pass
+        if modo == "incremental" and get_db()[MONGO_READ_MODEL_COLLECTION].find_one({}, {"_id": 1}) is None:
+            modo = "completo"
+        job, attached = mining_jobs.start(modo)
+    except Exception as e:
+        return jsonify({"status": "error", "message": f"No se pudo iniciar la extracción: {e}"}), 500
 
-    # Runs the CLI script in the background as a module so 'src' imports work properly
-    subprocess.Popen([sys.executable, "-m", "src.cli"])
-    return jsonify({"status": "success", "message": "Extracción iniciada en segundo plano. Esto puede tardar varios minutos dependiendo de la cantidad de gacetas."})
+    if attached:
+        message = "Ya hay una extracción en curso; se muestra su progreso."
+    else:
+        message = "Extracción iniciada en segundo plano. Esto puede tardar varios minutos dependiendo de la cantidad de gacetas."
+    return jsonify({"status": "success", "message": message, "job_id": job["_id"], "modo": job.get("modo", modo), "attached": attached, "job": _format_job(job)})
+
+@app.route('/api/jobs', methods=['GET'])
+def api_jobs():
+    """Historial de extracciones (más recientes primero), con duración y gacetas por segundo."""
+    limit = max(1, min(100, int(request.args.get('limit', 20))))
+    return jsonify({"jobs": [_format_job(job) for job in mining_jobs.history(limit)]})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def api_job(job_id):
+    job = mining_jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Extracción no encontrada."}), 404
+    return jsonify(_format_job(job))
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def api_job_cancel(job_id):
+    job = mining_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "La extracción no existe o ya terminó."}), 409
+    return jsonify({"status": "success", "message": "Cancelación solicitada; la extracción se detendrá en unos segundos.", "job": _format_job(job)})
 
 @app.route('/api/progress', methods=['GET'])
 def api_progress():
-    import json
-    progress_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "progress.json")
-    if os.path.exists(progress_file):
-        try:
-            with open(progress_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return jsonify(data)
-        except:
-            return jsonify({"percentage": 0, "message": "Leyendo estado...", "status": "processing"})
-    return jsonify({"percentage": 0, "message": "No hay tarea en progreso", "status": "idle"})
+    return jsonify(read_progress(PROGRESS_FILE))
+
+@app.route('/api/progress/stream', methods=['GET'])
+def api_progress_stream():
+    """
+    Progreso de la extracción como Server-Sent Events: se envía al conectar y cada vez que
+    cambia, sin que el navegador tenga que consultar /api/progress periódicamente.
+    """
+    return Response(
+        stream_with_context(iter_progress_events(PROGRESS_FILE)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.route('/api/clear', methods=['POST'])
 def api_clear():
     # Delete all documents in the related collections
     try:
+        db = get_db()
         db.persona.delete_many({})
         db.gaceta.delete_many({})
         db.persona_gaceta.delete_many({})
+        db[MONGO_READ_MODEL_COLLECTION].delete_many({})
+        # Sin la marca de agua, la próxima extracción incremental recorre todo el archivo
+        clear_mining_watermark(db)
+        bump_data_version(db)
+        invalidate_response_cache()
+        get_cedula_index(db).refresh()
         return jsonify({"status": "success", "message": "Base de datos limpiada con éxito."})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def _immutable(response):
+    # Una gaceta publicada no cambia: el navegador puede guardarla sin revalidar
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 @app.route('/pdf/<filename>')
 def serve_pdf(filename):
-    # Serve PDFs directly from the downloads folder
-    downloads_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads')
-    return send_from_directory(downloads_dir, filename)
+    # Serve PDFs directly from the downloads folder. Supports Range requests (the browser's PDF
+    # viewer fetches only the parts it shows) and If-None-Match/If-Modified-Since
+    return _immutable(send_from_directory(DOWNLOADS_DIR, filename, max_age=PDF_CACHE_MAX_AGE_SECONDS))
+
+@app.route('/pdf/<filename>/pagina/<int:pagina>')
+def serve_pdf_page(filename, pagina):
+    """
+    Una sola página de la gaceta, en vez del PDF completo.
+    `formato`: "pdf" (default; PDF de una página), "png" o "webp" (vista previa).
+    `ancho`: ancho en píxeles de la vista previa (100 a 2000, default 800).
+    Se generan la primera vez que se piden y luego se sirven desde la caché en disco.
+    """
+    formato = request.args.get('formato', 'pdf').strip().lower()
+    if formato not in PAGE_FORMATS:
+        return jsonify({"error": "formato debe ser pdf, png o webp"}), 400
+    ancho = request.args.get('ancho', '').strip()
+    if ancho and not ancho.isdigit():
+        return jsonify({"error": "ancho debe ser un número de píxeles"}), 400
+
+    pdf_path = safe_join(DOWNLOADS_DIR, filename)
+    if pdf_path is None or not os.path.isfile(pdf_path):
+        return jsonify({"error": "PDF no encontrado"}), 404
+    try:
+        path = page_file(pdf_path, pagina, formato, int(ancho) if ancho else None)
+    except RuntimeError as e:
+        return jsonify({"error": f"No se pudo generar la página: {e}"}), 503
+    if path is None:
+        return jsonify({"error": "La gaceta no tiene esa página"}), 404
+    download_name = f"{os.path.splitext(filename)[0]}-p{pagina}.{formato}"
+    response = send_file(path, mimetype=MIMETYPES[formato], download_name=download_name, max_age=PDF_CACHE_MAX_AGE_SECONDS)
+    return _immutable(response)
 
 if __name__ == '__main__':
+    # Cargar el índice de cédulas antes de la primera consulta
+    try:
+        print(f"Índice de cédulas: {len(get_cedula_index(get_db()).get())} cédulas")
+    except Exception as e:
+        print(f"⚠️  No se pudo cargar el índice de cédulas: {e}")
+
     # Start the Flask development server
     app.run(debug=True, port=5000)
@@ -0,0 +1,7 @@
+"""
+Benchmarks for the extraction code (src/utils/text_matchers.py, src/utils/name_extractor.py)
+and load tests of the search API over a large synthetic database.
+Run from project root:  python -m benchmarks.bench_extraction
+                        python -m benchmarks.dataset --db gacetas_bench
+                        python -m benchmarks.load_test --url http://localhost:5000
+"""
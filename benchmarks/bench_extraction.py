@@ -0,0 +1,242 @@
+"""
+Speed and accuracy benchmark for text_matchers (cédulas + names) and name_extractor (CSV split).
+Run from project root:
+
+    python -m benchmarks.bench_extraction                      # synthetic corpus + golden corpus
+    python -m benchmarks.bench_extraction --save-baseline b.json
+    python -m benchmarks.bench_extraction --baseline b.json    # exit 1 if slower / less accurate
+
+Quality floors (recall, precision, name accuracy) and a conservative throughput floor live in
+benchmarks/thresholds.json; throughput is machine dependent, so compare against a baseline
+saved on the same machine before and after a change to the matchers.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from benchmarks.synthetic import LabelledHit, SyntheticPage, generate_corpus
+from src.utils.name_extractor import extract_nombres_apellidos
+from src.utils.text_matchers import find_cedulas_with_context, scan_cedulas
+
+BENCH_DIR = Path(__file__).resolve().parent
+GOLDEN_CORPUS = BENCH_DIR / "golden" / "corpus.json"
+THRESHOLDS = BENCH_DIR / "thresholds.json"
+
+# Metrics where higher is better; a baseline comparison fails when any of them drops
+_SPEED_METRICS = ("pages_per_sec", "hits_per_sec", "names_per_sec")
+_QUALITY_METRICS = ("recall", "precision", "name_accuracy", "split_recall")
+
+
+def load_golden(path: Path = GOLDEN_CORPUS) -> list[SyntheticPage]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return [
+        SyntheticPage(page["text"], [LabelledHit(**hit) for hit in page["hits"]])
+        for page in data["pages"]
+    ]
+
+
+def _same_name(found: str, expected: str) -> bool:
+    return " ".join(found.split()) == " ".join(expected.split())
+
+
+def evaluate(pages: Iterable[SyntheticPage]) -> dict[str, Any]:
+    """
+    Precision/recall of the cédulas found, accuracy of the names attached to them, and
+    precision/recall of the nombres/apellidos split done for the CSV export.
+    A found cédula is a true positive when the page has an unmatched label with that value.
+    """
+    tp = fp = fn = 0
+    names_checked = names_ok = 0
+    split_expected = split_given = split_ok = 0
+    missed_by_kind: dict[str, int] = defaultdict(int)
+
+    for page in pages:
+        pending: dict[str, list[LabelledHit]] = defaultdict(list)
+        for label in page.hits:
+            pending[label.cedula].append(label)
+            if label.nombres is not None:
+                split_expected += 1
+
+        for hit in find_cedulas_with_context(page.text):
+            labels = pending.get(hit["cedula"])
+            if not labels:
+                fp += 1
+                continue
+            label = labels.pop(0)
+            tp += 1
+            if label.nombre is not None:
+                names_checked += 1
+                names_ok += _same_name(hit["name"], label.nombre)
+            nombres, apellidos = extract_nombres_apellidos(hit["context_before"], hit["context_after"])
+            if nombres or apellidos:
+                split_given += 1
+                if label.nombres is not None and (nombres, apellidos) == (label.nombres, label.apellidos):
+                    split_ok += 1
+
+        for labels in pending.values():
+            for label in labels:
+                fn += 1
+                missed_by_kind[label.kind] += 1
+
+    return {
+        "true_positives": tp,
+        "false_positives": fp,
+        "false_negatives": fn,
+        "missed_by_kind": dict(missed_by_kind),
+        "precision": tp / (tp + fp) if tp + fp else 1.0,
+        "recall": tp / (tp + fn) if tp + fn else 1.0,
+        "name_accuracy": names_ok / names_checked if names_checked else 1.0,
+        "split_precision": split_ok / split_given if split_given else 1.0,
+        "split_recall": split_ok / split_expected if split_expected else 1.0,
+    }
+
+
+def _best_time(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure_speed(texts: list[str], repeat: int) -> dict[str, Any]:
+    """Best-of-`repeat` wall time of each extraction entry point over the whole corpus."""
+    hits = [hit for text in texts for hit in find_cedulas_with_context(text)]
+    contexts = [(hit["context_before"], hit["context_after"]) for hit in hits]
+    total_chars = sum(len(text) for text in texts)
+
+    find_time = _best_time(lambda: [find_cedulas_with_context(text) for text in texts], repeat)
+    scan_time = _best_time(lambda: [list(scan_cedulas(text)) for text in texts], repeat)
+    split_time = _best_time(lambda: [extract_nombres_apellidos(b, a) for b, a in contexts], repeat)
+
+    return {
+        "pages": len(texts),
+        "hits": len(hits),
+        "pages_per_sec": len(texts) / scan_time,
+        "hits_per_sec": len(hits) / scan_time,
+        "mb_per_sec": total_chars / scan_time / 1e6,
+        "find_pages_per_sec": len(texts) / find_time,
+        "names_per_sec": len(contexts) / split_time if split_time else float("inf"),
+    }
+
+
+def measure_memory(texts: list[str]) -> dict[str, Any]:
+    """Peak traced allocation while extracting the corpus and keeping the offset-only hits."""
+    tracemalloc.start()
+    try:
+        kept = [list(scan_cedulas(text)) for text in texts]
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return {"peak_kb": peak / 1024}
+
+
+def run(pages: int, seed: int, noise: float, repeat: int) -> dict[str, Any]:
+    corpus = generate_corpus(pages, seed=seed, noise=noise)
+    texts = [page.text for page in corpus]
+    return {
+        "config": {"pages": pages, "seed": seed, "noise": noise},
+        "speed": measure_speed(texts, repeat),
+        "memory": measure_memory(texts),
+        "synthetic": evaluate(corpus),
+        "golden": evaluate(load_golden()),
+    }
+
+
+def check(results: dict[str, Any], thresholds: dict[str, Any], baseline: dict[str, Any] | None,
+          max_slowdown: float, max_quality_drop: float) -> list[str]:
+    """Return one message per regression (empty list = pass)."""
+    failures = []
+    for corpus in ("synthetic", "golden"):
+        for metric, floor in thresholds.get(corpus, {}).items():
+            value = results[corpus][metric]
+            if value < floor:
+                failures.append(f"{corpus}.{metric} = {value:.4f} < {floor}")
+    for metric, floor in thresholds.get("speed", {}).items():
+        value = results["speed"][metric]
+        if value < floor:
+            failures.append(f"speed.{metric} = {value:.1f} < {floor}")
+
+    if baseline:
+        for metric in _SPEED_METRICS:
+            old, new = baseline["speed"][metric], results["speed"][metric]
+            if new < old * (1 - max_slowdown):
+                failures.append(f"speed.{metric}: {new:.1f} vs baseline {old:.1f} (>{max_slowdown:.0%} slower)")
+        for corpus in ("synthetic", "golden"):
+            for metric in _QUALITY_METRICS:
+                old, new = baseline[corpus][metric], results[corpus][metric]
+                if new < old - max_quality_drop:
+                    failures.append(f"{corpus}.{metric}: {new:.4f} vs baseline {old:.4f}")
+    return failures
+
+
+def _print_report(results: dict[str, Any]) -> None:
+    speed, memory = results["speed"], results["memory"]
+    print(f"Corpus sintético: {speed['pages']} páginas, {speed['hits']} cédulas "
+          f"(seed={results['config']['seed']}, ruido={results['config']['noise']})")
+    print(f"  scan_cedulas:              {speed['pages_per_sec']:10.1f} páginas/s "
+          f"{speed['hits_per_sec']:10.1f} cédulas/s {speed['mb_per_sec']:6.2f} MB/s")
+    print(f"  find_cedulas_with_context: {speed['find_pages_per_sec']:10.1f} páginas/s")
+    print(f"  extract_nombres_apellidos: {speed['names_per_sec']:10.1f} llamadas/s")
+    print(f"  memoria pico:              {memory['peak_kb']:10.1f} KB")
+    for corpus in ("synthetic", "golden"):
+        q = results[corpus]
+        print(f"Calidad ({corpus}): precision={q['precision']:.4f} recall={q['recall']:.4f} "
+              f"nombres={q['name_accuracy']:.4f} split_precision={q['split_precision']:.4f} "
+              f"split_recall={q['split_recall']:.4f} (FP={q['false_positives']} FN={q['false_negatives']} "
+              f"{q['missed_by_kind']})")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de extracción de cédulas y nombres.")
+    parser.add_argument("--pages", type=int, default=300, help="Páginas sintéticas (default: 300)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=0.3, help="Probabilidad de ruido OCR (0-1)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones; se toma el mejor tiempo")
+    parser.add_argument("--thresholds", type=Path, default=THRESHOLDS)
+    parser.add_argument("--baseline", type=Path, default=None, help="Resultados previos (JSON) a comparar")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Guardar resultados como baseline")
+    parser.add_argument("--max-slowdown", type=float, default=0.15,
+                        help="Pérdida de velocidad tolerada frente al baseline (default: 0.15)")
+    parser.add_argument("--max-quality-drop", type=float, default=0.0,
+                        help="Caída tolerada de recall/precision frente al baseline (default: 0)")
+    args = parser.parse_args(argv)
+
+    results = run(args.pages, args.seed, args.noise, args.repeat)
+    _print_report(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline guardado en {args.save_baseline}")
+
+    thresholds = {}
+    if args.thresholds and args.thresholds.exists():
+        with open(args.thresholds, "r", encoding="utf-8") as f:
+            thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != results["config"]:
+            print("⚠️  El baseline se generó con otra configuración de corpus", file=sys.stderr)
+
+    failures = check(results, thresholds, baseline, args.max_slowdown, args.max_quality_drop)
+    for failure in failures:
+        print(f"❌ {failure}", file=sys.stderr)
+    if failures:
+        return 1
+    print("✅ Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Synthetic large-scale database for load tests (benchmarks/load_test.py).
+Fills a scratch MongoDB database with the collections the app reads: gacetas (OCR documents,
+page text from benchmarks/synthetic.py), persona, gaceta, persona_gaceta and the persona read
+model (written through MongoRelationshipWriter, the extraction write path), and optionally
+the full-text page index. The shape follows the real archive:
+- cédula letters V/E/J/G in realistic proportions, numbers in the bands each letter uses;
+- appearances per persona Zipf-like (most people appear once, a few hundreds of times),
+  clustered around the period each persona was active;
+- gacetas numbered by date, ORDINARIA and EXTRAORDINARIA, with several pages each.
+Same seed -> same data. The page text does not mention the generated personas.
+Run from project root:
+    python -m benchmarks.dataset --db gacetas_bench --personas 1000000 --relaciones 10000000
+"""
+import argparse
+import itertools
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterator, Optional
+
+from benchmarks.synthetic import COMPANY_WORDS, FIRST_NAMES, SURNAMES, generate_corpus
+
+UNKNOWN_NAME = "Desconocido"
+# (letter, share of personas, [(low, high, share of that letter)]): V and E cover the living
+# population's cédulas (E also the 80M+ series of naturalized foreigners), J/G are RIFs
+CEDULA_BANDS = (
+    ("V", 0.86, ((1_000_000, 10_000_000, 0.22), (10_000_000, 20_000_000, 0.38), (20_000_000, 33_000_000, 0.40))),
+    ("E", 0.07, ((80_000_000, 86_000_000, 0.65), (1_000_000, 30_000_000, 0.35))),
+    ("J", 0.05, ((1_000_000, 50_000_000, 0.70), (100_000_000, 500_000_000, 0.30))),
+    ("G", 0.02, ((20_000_000, 20_100_000, 1.0),)),
+)
+# Share of personas stored without a name (the extractor found none next to the cédula)
+UNKNOWN_NAME_SHARE = 0.04
+EXTRAORDINARIA_SHARE = 0.15
+# Spread of a persona's appearances around its active period, as a share of the archive
+ACTIVITY_SPREAD = 0.03
+_PAGE_POOL = 400
+_GACETA_BATCH = 100
+
+
+@dataclass
+class DatasetConfig:
+    personas: int = 100_000
+    relaciones: int = 1_000_000
+    gacetas: int = 20_000
+    first_year: int = 2000
+    last_year: int = 2025
+    min_pages: int = 4
+    max_pages: int = 48
+    max_apariciones: int = 2_000
+    seed: int = 0
+
+
+def zipf_exponent(mean: float, cap: int) -> float:
+    """Exponent s of P(k) ~ k^-s over k = 1..cap whose mean is `mean` (bisection)."""
+    mean = min(max(mean, 1.0), (cap + 1) / 2)
+    low, high = 0.0, 20.0
+    for _ in range(60):
+        s = (low + high) / 2
+        weights = [k ** -s for k in range(1, cap + 1)]
+        if sum(k * w for k, w in enumerate(weights, 1)) / sum(weights) > mean:
+            low = s
+        else:
+            high = s
+    return (low + high) / 2
+
+
+def appearance_counts(rng: random.Random, personas: int, mean: float, cap: int) -> list[int]:
+    """Appearances of each persona: Zipf-like with the requested mean, at most `cap`."""
+    s = zipf_exponent(mean, cap)
+    cum_weights = list(itertools.accumulate(k ** -s for k in range(1, cap + 1)))
+    return rng.choices(range(1, cap + 1), cum_weights=cum_weights, k=personas)
+
+
+def generate_personas(rng: random.Random, count: int) -> Iterator[tuple[str, str]]:
+    """(cédula, nombre) pairs with distinct cédulas."""
+    letter_weights = [share for _, share, _ in CEDULA_BANDS]
+    used: set[str] = set()
+    while len(used) < count:
+        letter, _, ranges = rng.choices(CEDULA_BANDS, weights=letter_weights)[0]
+        low, high, _ = rng.choices(ranges, weights=[share for _, _, share in ranges])[0]
+        cedula = f"{letter}-{rng.randrange(low, high)}"
+        if cedula in used:
+            continue
+        used.add(cedula)
+        yield cedula, _nombre(rng, letter)
+
+
+def _nombre(rng: random.Random, letter: str) -> str:
+    if rng.random() < UNKNOWN_NAME_SHARE:
+        return UNKNOWN_NAME
+    if letter in ("J", "G"):
+        return " ".join(rng.sample(COMPANY_WORDS, rng.randint(2, 3))) + rng.choice((" C.A.", " S.A.", ""))
+    nombres = rng.sample(FIRST_NAMES, rng.choice((1, 2, 2)))
+    apellidos = rng.sample(SURNAMES, rng.choice((1, 2, 2, 2)))
+    return " ".join(nombres + apellidos)
+
+
+def generate_gacetas(rng: random.Random, config: DatasetConfig) -> Iterator[dict[str, Any]]:
+    """OCR documents of the `gacetas` collection, oldest first (same fields as ocr_processor)."""
+    pool = [page.text for page in generate_corpus(_PAGE_POOL, seed=config.seed)]
+    start = date(config.first_year, 1, 1)
+    days = (date(config.last_year, 12, 31) - start).days
+    numeros = {"ORDINARIA": 37_000, "EXTRAORDINARIA": 5_000}
+    for i in range(config.gacetas):
+        day = start + timedelta(days=days * i // max(config.gacetas - 1, 1))
+        tipo = "EXTRAORDINARIA" if rng.random() < EXTRAORDINARIA_SHARE else "ORDINARIA"
+        numeros[tipo] += 1
+        numero = str(numeros[tipo])
+        pages = [
+            {"page_number": n, "text": rng.choice(pool)}
+            for n in range(1, rng.randint(config.min_pages, config.max_pages) + 1)
+        ]
+        yield {
+            "filename": f"{numero}-{day.year}-{day.month:02d}-{day.day:02d}-{tipo}.pdf",
+            "numero_gaceta": numero,
+            "fecha": day.strftime("%d/%m/%Y"),
+            "tipo": tipo,
+            "year": day.year,
+            "month": day.month,
+            "day": day.day,
+            "total_pages": len(pages),
+            "pages": pages,
+            "full_text": "\n\n".join(page["text"] for page in pages),
+            "processed_at": datetime.now(timezone.utc),
+            "file_path": f"downloads/{numero}-{day.year}-{day.month:02d}-{day.day:02d}-{tipo}.pdf",
+        }
+
+
+def generate_hits(
+    rng: random.Random,
+    personas: Iterator[tuple[str, str]],
+    counts: list[int],
+    gacetas: list[tuple[str, str, str, int]],
+) -> Iterator[tuple[str, str, str, str, str, int]]:
+    """
+    Hits (cedula, nombre, numero_gaceta, filename, fecha, pagina) as the extractor reports them.
+    `gacetas` holds (numero_gaceta, filename, fecha, total_pages) in date order.
+    """
+    last = len(gacetas) - 1
+    spread = max(1.0, len(gacetas) * ACTIVITY_SPREAD)
+    for (cedula, nombre), count in zip(personas, counts):
+        center = rng.randint(0, last)
+        for _ in range(count):
+            numero, filename, fecha, total_pages = gacetas[min(max(round(rng.gauss(center, spread)), 0), last)]
+            yield cedula, nombre, numero, filename, fecha, rng.randint(1, total_pages)
+
+
+def populate(db, config: DatasetConfig, batch_size: Optional[int] = None, page_index: bool = False) -> dict[str, Any]:
+    """Write the whole dataset into `db` (expected empty). Returns counts and timings."""
+    from src.adapters.mongodb_indexes import apply_indexes
+    from src.adapters.mongodb_pages import rebuild_page_index
+    from src.adapters.mongodb_read_model import mark_read_model_current
+    from src.adapters.mongodb_writer import MongoRelationshipWriter
+    from src.constants.config import MONGO_COLLECTION_NAME
+
+    rng = random.Random(config.seed)
+    stats: dict[str, Any] = {"config": config.__dict__}
+
+    started = time.perf_counter()
+    gacetas: list[tuple[str, str, str, int]] = []
+    batch: list[dict[str, Any]] = []
+    for doc in generate_gacetas(rng, config):
+        gacetas.append((doc["numero_gaceta"], doc["filename"], doc["fecha"], doc["total_pages"]))
+        batch.append(doc)
+        if len(batch) >= _GACETA_BATCH:
+            db[MONGO_COLLECTION_NAME].insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        db[MONGO_COLLECTION_NAME].insert_many(batch, ordered=False)
+    stats["gacetas"] = len(gacetas)
+    stats["gacetas_s"] = round(time.perf_counter() - started, 1)
+    print(f"  {len(gacetas)} gacetas OCR en {stats['gacetas_s']} s")
+
+    started = time.perf_counter()
+    counts = appearance_counts(rng, config.personas, config.relaciones / max(config.personas, 1), config.max_apariciones)
+    mark_read_model_current(db)
+    hits = generate_hits(rng, generate_personas(rng, config.personas), counts, gacetas)
+    with MongoRelationshipWriter(db, batch_size=batch_size) as writer:
+        for i, hit in enumerate(hits, 1):
+            writer.add(*hit)
+            if i % 1_000_000 == 0:
+                print(f"  {i} apariciones escritas...")
+    mark_read_model_current(db, rebuilt=True)
+    stats["personas"] = config.personas
+    stats["apariciones"] = sum(counts)
+    # Repeated (persona, gaceta, página) hits collapse into one row, as in a real extraction
+    stats["persona_gaceta"] = db["persona_gaceta"].estimated_document_count()
+    stats["relaciones_s"] = round(time.perf_counter() - started, 1)
+    print(f"  {config.personas} personas, {stats['apariciones']} apariciones en {stats['relaciones_s']} s")
+
+    apply_indexes(db)
+    if page_index:
+        started = time.perf_counter()
+        stats["paginas"] = rebuild_page_index(db)
+        stats["paginas_s"] = round(time.perf_counter() - started, 1)
+        print(f"  {stats['paginas']} páginas indexadas en {stats['paginas_s']} s")
+    return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    defaults = DatasetConfig()
+    parser = argparse.ArgumentParser(description="Genera una base de datos sintética para pruebas de carga.")
+    parser.add_argument("--uri", default=None, help="MongoDB URI (default: MONGO_URI o servidor local)")
+    parser.add_argument("--db", default="gacetas_bench", help="Base de datos de destino (default: gacetas_bench)")
+    parser.add_argument("--drop", action="store_true", help="Borrar la base de datos de destino antes de generar")
+    parser.add_argument("--personas", type=int, default=defaults.personas)
+    parser.add_argument("--relaciones", type=int, default=defaults.relaciones,
+                        help="Apariciones (persona, gaceta, página) a generar, aproximadas")
+    parser.add_argument("--gacetas", type=int, default=defaults.gacetas)
+    parser.add_argument("--max-apariciones", type=int, default=defaults.max_apariciones,
+                        help="Máximo de apariciones de una persona")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--batch-size", type=int, default=None, help="Apariciones por escritura (default: MONGO_BULK_SIZE)")
+    parser.add_argument("--paginas", action="store_true", help="Construir también el índice de texto de páginas")
+    args = parser.parse_args(argv)
+
+    from src.adapters.mongodb_client import get_database
+
+    db = get_database(args.db, args.uri)
+    if args.drop:
+        db.client.drop_database(args.db)
+    elif db.list_collection_names():
+        print(f"❌ La base de datos '{args.db}' no está vacía (use --drop para reemplazarla)", file=sys.stderr)
+        return 1
+
+    config = DatasetConfig(
+        personas=args.personas,
+        relaciones=args.relaciones,
+        gacetas=args.gacetas,
+        max_apariciones=args.max_apariciones,
+        seed=args.seed,
+    )
+    print(f"Generando '{args.db}' (seed={config.seed})...")
+    stats = populate(db, config, args.batch_size, args.paginas)
+    print(f"✅ Listo: {stats['personas']} personas, {stats['persona_gaceta']} relaciones, {stats['gacetas']} gacetas")
+    print(f"   Pruebas de carga: MONGO_DB_NAME={args.db} python app.py  y  python -m benchmarks.load_test")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
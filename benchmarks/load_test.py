@@ -0,0 +1,316 @@
+"""
+Load test of the search API: replays a weighted mix of query shapes with N concurrent clients
+and reports latency percentiles (p50/p95/p99) and throughput per shape.
+Against a running server (--url) or in-process through Flask's test client (--en-proceso,
+no HTTP overhead). Cédulas and names for the queries are sampled from the API itself, so
+any database works; benchmarks/dataset.py generates a large one.
+Run from project root:
+    python -m benchmarks.load_test --url http://localhost:5000 --duracion 60 --concurrencia 16
+    python -m benchmarks.load_test --en-proceso --db gacetas_bench --save-baseline carga.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+# (method, path, query params, JSON body) -> (HTTP status, response headers, parsed JSON or None)
+Send = Callable[[str, str, dict[str, Any], Any], tuple[int, dict[str, str], Any]]
+
+_UI_RANGES = ("0-10", "10-20", "20-30", "30+")
+_LETTERS = ("V", "E", "J", "G")
+_PAGE_TERMS = ("decreto", "designa", "resolución", "ministerio", "\"consultor jurídico\"", "inversiones -constructora")
+_SAMPLE_PAGES = 20
+_SAMPLE_LIMIT = 100
+_BATCH_SIZE = 100
+
+
+@dataclass
+class Sample:
+    """Known values to build realistic queries from."""
+    cedulas: list[str] = field(default_factory=list)
+    tokens: list[str] = field(default_factory=list)
+
+
+def _name_fragment(rng: random.Random, sample: Sample) -> str:
+    token = rng.choice(sample.tokens)
+    if len(token) <= 4 or rng.random() < 0.5:
+        return token
+    size = rng.randint(4, len(token))
+    start = rng.randint(0, len(token) - size)
+    return token[start:start + size]
+
+
+def _cedula_prefix(rng: random.Random, sample: Sample) -> str:
+    digits = rng.choice(sample.cedulas).split("-", 1)[-1]
+    return digits[:rng.randint(min(4, len(digits)), len(digits))]
+
+
+# Query shape -> (weight in the mix, builder of (method, path, params, body))
+SHAPES: dict[str, tuple[float, Callable[[random.Random, Sample], tuple[str, str, dict[str, Any], Any]]]] = {
+    "search_vacia": (10, lambda rng, s: ("GET", "/api/search", {}, None)),
+    "search_letra": (8, lambda rng, s: ("GET", "/api/search", {"letter": rng.choice(_LETTERS)}, None)),
+    "search_rango": (8, lambda rng, s: ("GET", "/api/search", {"range": rng.choice(_UI_RANGES)}, None)),
+    "search_letra_rango": (6, lambda rng, s: (
+        "GET", "/api/search", {"letter": rng.choice(_LETTERS), "range": rng.choice(_UI_RANGES)}, None)),
+    "search_nombre": (14, lambda rng, s: ("GET", "/api/search", {"q": _name_fragment(rng, s)}, None)),
+    "search_cedula": (14, lambda rng, s: ("GET", "/api/search", {"q": _cedula_prefix(rng, s)}, None)),
+    "search_apariciones": (6, lambda rng, s: ("GET", "/api/search", {"sort": "apariciones"}, None)),
+    "search_pagina_profunda": (4, lambda rng, s: ("GET", "/api/search", {"page": rng.randint(200, 2000)}, None)),
+    "v1_cedula": (12, lambda rng, s: ("GET", "/api/v1/personas", {"cedula": rng.choice(s.cedulas)}, None)),
+    "v1_nombre": (8, lambda rng, s: (
+        "GET", "/api/v1/personas", {"nombre": f"{_name_fragment(rng, s)} {_name_fragment(rng, s)}"}, None)),
+    "v1_batch": (2, lambda rng, s: (
+        "POST", "/api/v1/personas/batch", {}, {"cedulas": rng.choices(s.cedulas, k=_BATCH_SIZE)})),
+    "v1_paginas": (8, lambda rng, s: ("GET", "/api/v1/paginas", {"q": rng.choice(_PAGE_TERMS)}, None)),
+}
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100) of an ascending list; 0 when empty."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: list[float], errors: int, cache_hits: int, seconds: float) -> dict[str, Any]:
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": errors,
+        "cache_hit_ratio": round(cache_hits / count, 4) if count else 0.0,
+        "req_per_sec": round(count / seconds, 2) if seconds else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 2) if count else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+def collect_sample(send: Send, rng: random.Random) -> Sample:
+    """Cédulas and name words of personas returned by /api/search (first and random pages)."""
+    sample = Sample()
+    pages = [1] + [rng.randint(2, 200) for _ in range(_SAMPLE_PAGES - 1)]
+    for page in pages:
+        status, _, body = send("GET", "/api/search", {"page": page, "limit": _SAMPLE_LIMIT}, None)
+        if status != 200 or not body:
+            continue
+        for persona in body.get("data", []):
+            sample.cedulas.append(persona["cedula"])
+            sample.tokens.extend(word for word in (persona.get("nombre") or "").split() if len(word) >= 3)
+    if not sample.cedulas:
+        raise RuntimeError("The API returned no personas to sample queries from (empty database?)")
+    sample.tokens = sorted(set(sample.tokens) - {"Desconocido", "C.A.", "S.A."}) or ["PEREZ"]
+    return sample
+
+
+def run(
+    send: Send,
+    shapes: dict[str, tuple[float, Callable]],
+    sample: Sample,
+    concurrency: int,
+    duration: Optional[float] = None,
+    requests: Optional[int] = None,
+    seed: int = 0,
+    bypass_cache: bool = False,
+) -> dict[str, Any]:
+    """Replay the mix until `duration` seconds pass or `requests` are sent (whichever is set)."""
+    if duration is None and requests is None:
+        raise ValueError("duration or requests is required")
+    names = list(shapes)
+    weights = [shapes[name][0] for name in names]
+    results: dict[str, dict[str, Any]] = {name: {"latencies": [], "errors": 0, "cache_hits": 0} for name in names}
+    lock = threading.Lock()
+    sent = 0
+    deadline = None if duration is None else time.perf_counter() + duration
+
+    def next_slot() -> bool:
+        nonlocal sent
+        with lock:
+            if requests is not None and sent >= requests:
+                return False
+            sent += 1
+        return deadline is None or time.perf_counter() < deadline
+
+    def client(worker: int) -> None:
+        rng = random.Random(seed * 1000 + worker)
+        while next_slot():
+            name = rng.choices(names, weights=weights)[0]
+            method, path, params, body = shapes[name][1](rng, sample)
+            if bypass_cache:
+                params = {**params, "_nocache": rng.getrandbits(64)}
+            started = time.perf_counter()
+            try:
+                status, headers, _ = send(method, path, params, body)
+            except Exception:
+                status, headers = 0, {}
+            elapsed = time.perf_counter() - started
+            with lock:
+                entry = results[name]
+                entry["latencies"].append(elapsed)
+                entry["errors"] += status >= 400 or status == 0
+                entry["cache_hits"] += headers.get("X-Cache") == "HIT"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(client, range(concurrency)))
+    seconds = time.perf_counter() - started
+
+    per_shape = {
+        name: summarize(entry["latencies"], entry["errors"], entry["cache_hits"], seconds)
+        for name, entry in results.items()
+        if entry["latencies"]
+    }
+    everything = [latency for entry in results.values() for latency in entry["latencies"]]
+    total = summarize(
+        everything,
+        sum(entry["errors"] for entry in results.values()),
+        sum(entry["cache_hits"] for entry in results.values()),
+        seconds,
+    )
+    return {"seconds": round(seconds, 2), "total": total, "shapes": per_shape}
+
+
+def http_sender(base_url: str, timeout: float = 30.0) -> Send:
+    """Keep-alive HTTP client (one requests.Session per thread)."""
+    try:
+        import requests
+    except ImportError as e:
+        raise RuntimeError("requests not installed. pip install requests") from e
+    local = threading.local()
+    base_url = base_url.rstrip("/")
+
+    def send(method, path, params, body):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        response = session.request(method, base_url + path, params=params, json=body, timeout=timeout)
+        return response.status_code, response.headers, _json(response.content)
+
+    return send
+
+
+def in_process_sender() -> Send:
+    """Flask test client of app.py (one per thread): measures the app without the HTTP server."""
+    from app import app
+
+    local = threading.local()
+
+    def send(method, path, params, body):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        response = client.open(path, method=method, query_string=params, json=body)
+        return response.status_code, response.headers, _json(response.get_data())
+
+    return send
+
+
+def _json(content: bytes) -> Any:
+    try:
+        return json.loads(content)
+    except ValueError:
+        return None
+
+
+def check(results: dict[str, Any], baseline: dict[str, Any], max_slowdown: float) -> list[str]:
+    """One message per shape whose p95 latency grew more than `max_slowdown` (empty list = pass)."""
+    failures = []
+    for name, old in baseline.get("shapes", {}).items():
+        new = results["shapes"].get(name)
+        if new is None:
+            continue
+        if new["p95_ms"] > old["p95_ms"] * (1 + max_slowdown):
+            failures.append(f"{name}.p95: {new['p95_ms']:.1f} ms vs baseline {old['p95_ms']:.1f} ms (>{max_slowdown:.0%} más lento)")
+    return failures
+
+
+def _print_report(results: dict[str, Any]) -> None:
+    print(f"{'forma':<24}{'req':>8}{'err':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'máx ms':>9}{'caché':>7}")
+    rows = sorted(results["shapes"].items()) + [("TOTAL", results["total"])]
+    for name, s in rows:
+        print(f"{name:<24}{s['requests']:>8}{s['errors']:>6}{s['req_per_sec']:>9.1f}{s['p50_ms']:>9.1f}"
+              f"{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}{s['cache_hit_ratio']:>7.0%}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga de /api/search y /api/v1.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default="http://localhost:5000", help="Servidor a probar (default: http://localhost:5000)")
+    target.add_argument("--en-proceso", action="store_true", help="Usar el cliente de pruebas de Flask, sin servidor")
+    parser.add_argument("--db", default=None, help="Con --en-proceso: base de datos (MONGO_DB_NAME)")
+    parser.add_argument("--concurrencia", type=int, default=8, help="Clientes simultáneos (default: 8)")
+    parser.add_argument("--duracion", type=float, default=30.0, help="Segundos de prueba (default: 30)")
+    parser.add_argument("--peticiones", type=int, default=None, help="Número de peticiones (en lugar de --duracion)")
+    parser.add_argument("--formas", default=None, help=f"Formas de consulta separadas por comas (default: todas: {','.join(SHAPES)})")
+    parser.add_argument("--sin-cache", action="store_true", help="Evitar la caché de respuestas (parámetro aleatorio)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=None, help="Resultados previos (JSON) a comparar")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Guardar resultados como baseline")
+    parser.add_argument("--max-slowdown", type=float, default=0.20,
+                        help="Aumento tolerado del p95 frente al baseline (default: 0.20)")
+    args = parser.parse_args(argv)
+
+    shapes = SHAPES
+    if args.formas:
+        unknown = set(args.formas.split(",")) - set(SHAPES)
+        if unknown:
+            parser.error(f"formas desconocidas: {', '.join(sorted(unknown))}")
+        shapes = {name: SHAPES[name] for name in args.formas.split(",")}
+
+    if args.en_proceso:
+        if args.db:
+            os.environ["MONGO_DB_NAME"] = args.db
+        send = in_process_sender()
+    else:
+        send = http_sender(args.url)
+
+    sample = collect_sample(send, random.Random(args.seed))
+    print(f"Muestra: {len(sample.cedulas)} cédulas, {len(sample.tokens)} palabras de nombres")
+    results = run(
+        send, shapes, sample, args.concurrencia,
+        duration=None if args.peticiones else args.duracion,
+        requests=args.peticiones,
+        seed=args.seed,
+        bypass_cache=args.sin_cache,
+    )
+    results["config"] = {
+        "target": "en-proceso" if args.en_proceso else args.url,
+        "concurrency": args.concurrencia,
+        "shapes": list(shapes),
+        "bypass_cache": args.sin_cache,
+        "seed": args.seed,
+    }
+    _print_report(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline guardado en {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config", {}).get("concurrency") != args.concurrencia:
+            print("⚠️  El baseline se midió con otra concurrencia", file=sys.stderr)
+        failures = check(results, baseline, args.max_slowdown)
+        for failure in failures:
+            print(f"❌ {failure}", file=sys.stderr)
+        if failures:
+            return 1
+        print("✅ Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Reproducible synthetic gaceta pages with known answers.
+Each page mixes the layouts the extractor meets in real gacetas (designations in prose,
+dense appointee lists, company and state entity blocks with J-/G- RIFs, numbered
+references that are not cédulas) and OCR noise (lost accents, broken "N°", stray spaces, line wraps). Every
+cédula/RIF written to a page is recorded as a LabelledHit, so recall and precision can
+be computed exactly. Same seed -> same corpus.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Word lists shared with benchmarks.dataset (persona names, company names)
+FIRST_NAMES = (
+    "JUAN", "JOSÉ", "LUIS", "CARLOS", "PEDRO", "MIGUEL", "RAFAEL", "JESÚS", "ANDRÉS", "DANIEL",
+    "MARÍA", "ANA", "CARMEN", "ROSA", "LUISA", "GABRIELA", "ANDREÍNA", "YELITZA", "ELENA", "SOFÍA",
+)
+SURNAMES = (
+    "PÉREZ", "GONZÁLEZ", "RODRÍGUEZ", "HERNÁNDEZ", "GARCÍA", "MARTÍNEZ", "LÓPEZ", "RAMÍREZ",
+    "TORRES", "ROJAS", "MEDINA", "CASTILLO", "BRICEÑO", "USECHE", "VILLEGAS", "MARCANO",
+    "SALAZAR", "QUINTERO", "FIGUEROA", "ARAUJO",
+)
+_CARGOS = (
+    "DIRECTOR GENERAL", "DIRECTORA DE LÍNEA", "COORDINADOR REGIONAL", "JEFE DE DIVISIÓN",
+    "CONSULTOR JURÍDICO", "AUDITORA INTERNA", "GERENTE DE ADMINISTRACIÓN",
+)
+_ORGANOS = (
+    "MINISTERIO DEL PODER POPULAR PARA LA SALUD",
+    "MINISTERIO DEL PODER POPULAR PARA LA DEFENSA",
+    "MINISTERIO DEL PODER POPULAR PARA LA EDUCACIÓN",
+    "SERVICIO AUTÓNOMO DE REGISTROS Y NOTARÍAS",
+)
+COMPANY_WORDS = (
+    "INVERSIONES", "CONSTRUCTORA", "DISTRIBUIDORA", "SERVICIOS", "COMERCIALIZADORA",
+    "ANDES", "ORINOCO", "CARIBE", "AVILA", "GUAYANA", "LLANOS", "DEL SUR",
+)
+
+_ACCENTS = str.maketrans("ÁÉÍÓÚáéíóú", "AEIOUaeiou")
+
+
+@dataclass
+class LabelledHit:
+    """A cédula/RIF written on a synthetic page, with the answers the extractors should give."""
+    cedula: str
+    kind: str  # "persona" or "rif"
+    nombre: Optional[str] = None
+    # Split the CSV export should produce; only set when the name sits alone next to the cédula
+    nombres: Optional[str] = None
+    apellidos: Optional[str] = None
+
+
+@dataclass
+class SyntheticPage:
+    text: str
+    hits: list[LabelledHit] = field(default_factory=list)
+
+
+class _PageBuilder:
+    def __init__(self, rng: random.Random, noise: float) -> None:
+        self.rng = rng
+        self.noise = noise
+        self.parts: list[str] = []
+        self.hits: list[LabelledHit] = []
+
+    def noisy(self, probability: float = 1.0) -> bool:
+        return self.rng.random() < self.noise * probability
+
+    def ocr(self, text: str) -> str:
+        """OCR damage that keeps the text readable: accents dropped, doubled spaces."""
+        if self.noisy():
+            text = text.translate(_ACCENTS)
+        if self.noisy(0.5):
+            text = text.replace(" ", "  ", 1)
+        return text
+
+    def numero_label(self) -> str:
+        return self.rng.choice(("N°", "N°", "Nº", "N*", "No", "N"))
+
+    def person(self) -> tuple[str, str]:
+        rng = self.rng
+        nombres = " ".join(rng.sample(FIRST_NAMES, rng.choice((1, 1, 2))))
+        apellidos = " ".join(rng.sample(SURNAMES, rng.choice((1, 2, 2))))
+        if self.noisy():
+            nombres, apellidos = nombres.translate(_ACCENTS), apellidos.translate(_ACCENTS)
+        return nombres, apellidos
+
+    def cedula(self, letter: str, digits: str) -> tuple[str, str]:
+        """(printed form, homologated form). Noise may split the number, which is a real miss."""
+        rng = self.rng
+        if rng.random() < 0.6:
+            groups = []
+            rest = digits
+            while len(rest) > 3:
+                groups.insert(0, rest[-3:])
+                rest = rest[:-3]
+            groups.insert(0, rest)
+            sep = "," if self.noisy(0.3) else "."
+            number = sep.join(groups)
+            if self.noisy(0.05):
+                number = number.replace(sep, sep + " ", 1)
+        else:
+            number = digits
+        prefix = rng.choice(("-", "-", "-", ".", ". ", " ", "", ".-"))
+        return f"{letter}{prefix}{number}", f"{letter}-{digits}"
+
+    def digits(self, low: int = 3_000_000, high: int = 32_000_000) -> str:
+        return str(self.rng.randint(low, high))
+
+    def add(self, text: str) -> None:
+        self.parts.append(text)
+
+    # --- layouts ---
+    def header(self) -> None:
+        rng = self.rng
+        self.add(self.ocr(
+            "GACETA OFICIAL DE LA REPÚBLICA BOLIVARIANA DE VENEZUELA\n"
+            f"AÑO CL - MES {rng.choice(('I', 'III', 'V', 'VI', 'IX', 'XI'))}   Caracas, "
+            f"{rng.randint(1, 28)} de marzo de {rng.randint(2005, 2024)}   "
+            f"Número {rng.randint(38, 43)}.{rng.randint(100, 999)}\n\n"
+        ))
+
+    def references(self) -> None:
+        """Numbered references near keywords: good precision traps, none of them is a cédula."""
+        rng = self.rng
+        self.add(self.ocr(
+            f"{rng.choice(_ORGANOS)}\nRESOLUCIÓN {self.numero_label()} {rng.randint(1, 999):03d}\n"
+            f"Caracas, {rng.randint(1, 28)} de abril de {rng.randint(2005, 2024)}\n"
+            f"En ejercicio de las atribuciones conferidas en el artículo {rng.randint(1, 90)} del "
+            f"Decreto {self.numero_label()} {rng.randint(1, 9)}.{rng.randint(100, 999)}, publicado en la "
+            f"Gaceta Oficial {self.numero_label()} {rng.randint(38, 43)}.{rng.randint(100, 999)}, "
+            f"visto el Punto de Cuenta {self.numero_label()} P-{rng.randint(1, 9999):04d} presentado por el "
+            f"Director General y el Oficio E-{rng.randint(1000, 9999)}-{rng.randint(2005, 2024)} de la "
+            "Consultoría Jurídica, este Despacho,\n\nRESUELVE\n\n"
+        ))
+
+    def state_entity(self) -> None:
+        """Government entities carry a G- RIF, which the pipeline stores like any other RIF."""
+        rng = self.rng
+        rif_digits = str(rng.randint(20_000_000, 20_099_999))
+        self.add(
+            f"Se ordena la transferencia a la {self.ocr('Fundación')} {rng.choice(COMPANY_WORDS).title()}, "
+            f"{self.ocr('inscrita')} bajo el {self.ocr('RIF')} G-{rif_digits}-{rng.randint(0, 9)}, de los "
+            f"recursos aprobados para el ejercicio fiscal {rng.randint(2005, 2024)}.\n\n"
+        )
+        self.hits.append(LabelledHit(f"G-{rif_digits}", "rif"))
+
+    def designation(self) -> None:
+        rng = self.rng
+        nombres, apellidos = self.person()
+        nombre = f"{nombres} {apellidos}"
+        letter = "E" if rng.random() < 0.1 else "V"
+        printed, cedula = self.cedula(letter, self.digits())
+        articulo = rng.choice(("a la ciudadana", "al ciudadano"))
+        cedula_word = self.ocr(rng.choice(("cédula de identidad", "Cédula de Identidad", "C.I.")))
+        self.add(
+            f"Artículo {rng.randint(1, 9)}. Se designa {articulo} {nombre}, titular de la "
+            f"{cedula_word} {self.numero_label()} {printed}, como {rng.choice(_CARGOS)}, "
+            f"adscrito a la {self.ocr('Oficina de Gestión Humana')} de este organismo.\n\n"
+        )
+        self.hits.append(LabelledHit(cedula, "persona", nombre))
+
+    def appointee_list(self) -> None:
+        rng = self.rng
+        self.add(self.ocr(
+            "Artículo 1. Se otorga el ascenso a los ciudadanos que se mencionan a continuación:\n\n"
+        ))
+        own_line = rng.random() < 0.5
+        for _ in range(rng.randint(5, 40)):
+            nombres, apellidos = self.person()
+            nombre = f"{nombres} {apellidos}"
+            printed, cedula = self.cedula("V", self.digits(8_000_000, 30_000_000))
+            if own_line:
+                self.add(f"{nombre}\nC.I. {self.numero_label()} {printed}\n")
+            else:
+                self.add(f"{nombre}    {printed}\n")
+            self.hits.append(LabelledHit(cedula, "persona", nombre, nombres, apellidos))
+        self.add("\n")
+
+    def company(self) -> None:
+        rng = self.rng
+        company = " ".join(rng.sample(COMPANY_WORDS, 2))
+        rif_digits = self.digits(29_000_000, 50_000_000).zfill(8)
+        rif_printed = f"J-{rif_digits}-{rng.randint(0, 9)}"
+        nombres, apellidos = self.person()
+        nombre = f"{nombres} {apellidos}"
+        printed, cedula = self.cedula("V", self.digits())
+        self.add(
+            f"Se autoriza a la sociedad mercantil {company}, C.A., {self.ocr('inscrita en el Registro Mercantil')} "
+            f"Segundo de la Circunscripción Judicial del Distrito Capital, bajo el {self.numero_label()} "
+            f"{rng.randint(1, 99)}, Tomo {rng.randint(1, 300)}-A, con {self.ocr('RIF')} {rif_printed}, "
+            f"representada por su {self.ocr('Presidente')} {nombre}, venezolano, mayor de edad, "
+            f"titular de la {self.ocr('cédula de identidad')} {self.numero_label()} {printed}.\n\n"
+        )
+        self.hits.append(LabelledHit(f"J-{rif_digits}", "rif"))
+        self.hits.append(LabelledHit(cedula, "persona", nombre))
+
+    def filler(self) -> None:
+        self.add(self.ocr(
+            "Comuníquese y publíquese. Por el Ejecutivo Nacional, "
+            f"{self.rng.choice(_ORGANOS).title()}.\n\n"
+        ))
+
+    def wrap(self, text: str) -> str:
+        """Break lines at ~60-90 columns like OCR output of a printed column."""
+        out = []
+        column = 0
+        width = self.rng.randint(60, 90)
+        for word in text.split(" "):
+            if column and column + len(word) > width:
+                out.append("\n")
+                column = 0
+            elif column:
+                out.append(" ")
+                column += 1
+            out.append(word)
+            column = column + len(word) if "\n" not in word else len(word) - word.rfind("\n") - 1
+        return "".join(out)
+
+
+def generate_page(rng: random.Random, noise: float = 0.3) -> SyntheticPage:
+    """One page: header, then a random sequence of the layouts above."""
+    builder = _PageBuilder(rng, noise)
+    builder.header()
+    layouts = (
+        builder.references, builder.designation, builder.designation,
+        builder.appointee_list, builder.company, builder.state_entity, builder.filler,
+    )
+    for _ in range(rng.randint(2, 6)):
+        rng.choice(layouts)()
+    text = "".join(builder.parts)
+    if rng.random() < noise:
+        text = builder.wrap(text)
+    return SyntheticPage(text, builder.hits)
+
+
+def generate_corpus(pages: int, seed: int = 0, noise: float = 0.3) -> list[SyntheticPage]:
+    rng = random.Random(seed)
+    return [generate_page(rng, noise) for _ in range(pages)]
@@ -11,6 +11,12 @@ import concurrent.futures
 # Load environment variables
 load_dotenv()
 
+from src.adapters.mongodb_client import get_client
+from src.adapters.mongodb_indexes import apply_indexes
+from src.adapters.mongodb_pages import index_gaceta_pages
+from src.adapters.page_store import PageStoreWriter
+from src.constants.config import MONGO_PAGES_COLLECTION
+
 # Configuration
 DOWNLOADS_DIR = "downloads"
 MONGO_URI = os.getenv("MONGO_URI")
@@ -74,14 +80,16 @@ def connect_to_mongodb():
         return None
     
     try:
-        from pymongo import MongoClient
-        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+        client = get_client(MONGO_URI)
         db = client[MONGO_DB_NAME]
         collection = db[MONGO_COLLECTION_NAME]
         
         # Test connection
         client.server_info()
         print(f"✓ Connected to MongoDB: {MONGO_DB_NAME}")
+        # filename lookup (already processed check) and the full-text page index
+        for warning in apply_indexes(db, collections=(MONGO_COLLECTION_NAME, MONGO_PAGES_COLLECTION)):
+            print(f"⚠️  Index: {warning}")
         return collection
     except ImportError:
         print(f"⚠️  pymongo not installed. Install with: pip install pymongo")
@@ -171,9 +179,10 @@ def extract_text_from_pdf(pdf_path):
         print(f"\n  ✗ Error extracting text: {e}")
         return None
 
-def process_gaceta(pdf_path, collection):
+def process_gaceta(pdf_path, collection, page_store=None):
     """
     Process a single gaceta PDF: extract text and save to MongoDB
+    (and to `page_store`, the run's PageStoreWriter, if given)
     """
     filename = os.path.basename(pdf_path)
     
@@ -217,11 +226,24 @@ def process_gaceta(pdf_path, collection):
     try:
         result = collection.insert_one(document)
         print(f"  ✓ Saved to MongoDB (ID: {result.inserted_id})")
-        return True
     except Exception as e:
         print(f"  ✗ Error saving to MongoDB: {e}")
         return False
 
+    # Make the pages searchable (python -m src --rebuild-page-index catches up if this fails)
+    try:
+        index_gaceta_pages(collection.database, document)
+    except Exception as e:
+        print(f"  ⚠️  Pages not added to the text index: {e}")
+
+    # And to the memory-mapped page store read by extraction (python -m src --build-page-store catches up)
+    if page_store is not None:
+        try:
+            page_store.add(document)
+        except Exception as e:
+            print(f"  ⚠️  Pages not added to the page store: {e}")
+    return True
+
 def process_all_gacetas():
     """
     Process all PDF files in the downloads directory
@@ -277,6 +299,13 @@ def process_all_gacetas():
     processed = 0
     failed = 0
     skipped = 0
+
+    # One writer for the whole run: it reads the page store index once
+    try:
+        page_store = PageStoreWriter()
+    except Exception as e:
+        print(f"⚠️  Page store not available, pages will not be added to it: {e}")
+        page_store = None
     
     for i, pdf_path in enumerate(pdf_files, 1):
         print(f"[{i}/{total_files}] Processing: {pdf_path.name}")
@@ -288,7 +317,7 @@ def process_all_gacetas():
             skipped += 1
             continue
         
-        success = process_gaceta(pdf_path, collection)
+        success = process_gaceta(pdf_path, collection, page_store)
         if success:
             processed += 1
         else:
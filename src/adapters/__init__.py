@@ -1,3 +1,5 @@
 from src.adapters.mongodb import MongoGacetaRepository
+from src.adapters.mongodb_writer import MongoRelationshipWriter
+from src.adapters.sqlite import SqliteGacetaRepository, SqliteRelationshipWriter
 
-__all__ = ["MongoGacetaRepository"]
+__all__ = ["MongoGacetaRepository", "MongoRelationshipWriter", "SqliteGacetaRepository", "SqliteRelationshipWriter"]
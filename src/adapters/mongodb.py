@@ -2,10 +2,107 @@
 Adapter: MongoDB implementation of GacetaRepository.
 Reads from the same collection used by ocr_processor.
 """
-from typing import Iterator, Optional
+from datetime import date
+from typing import Any, Iterator, Optional
 
-from src.constants.config import MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTION_NAME
-from src.ports.repository import GacetaDocument, GacetaPage
+from src.constants.config import (
+    MONGO_URI,
+    MONGO_DB_NAME,
+    MONGO_COLLECTION_NAME,
+    MONGO_BATCH_SIZE,
+    MONGO_READ_MODEL_COLLECTION,
+)
+from src.ports.repository import GacetaDocument, GacetaFilter, GacetaPage, IdRange, split_ranges
+from src.adapters.mongodb_client import get_client
+from src.adapters.mongodb_writer import MongoRelationshipWriter
+from src.adapters.mongodb_read_model import mark_read_model_current, read_model_is_current, rebuild_read_model
+from src.adapters.mongodb_indexes import apply_indexes, verify_indexes
+from src.adapters.mongodb_pages import rebuild_page_index
+from src.adapters.mongodb_export import ExportFilter, iter_export_personas
+from src.adapters.mongodb_jobs import MongoJobStore, mining_watermark, set_mining_watermark
+from src.adapters.parquet_snapshot import ParquetSnapshot, gaceta_metadata, snapshot_from_mongo
+
+# Only what extraction reads. full_text duplicates the pages, so it is sent only for gacetas
+# stored without per-page text (expression projections need MongoDB >= 4.4).
+_GACETA_PROJECTION = {
+    "filename": 1,
+    "numero_gaceta": 1,
+    "fecha": 1,
+    "year": 1,
+    "tipo": 1,
+    "pages.page_number": 1,
+    "pages.text": 1,
+    "full_text": {
+        "$cond": [
+            {"$gt": [{"$size": {"$ifNull": ["$pages", []]}}, 0]},
+            "$$REMOVE",
+            "$full_text",
+        ]
+    },
+}
+
+
+def _date_bound(day: date, strict: str, inclusive: str) -> dict[str, Any]:
+    """Compare the stored (year, month, day) fields with `day`, lexicographically."""
+    return {
+        "$or": [
+            {"year": {strict: day.year}},
+            {"year": day.year, "month": {strict: day.month}},
+            {"year": day.year, "month": day.month, "day": {inclusive: day.day}},
+        ]
+    }
+
+
+def build_gaceta_query(filters: Optional[GacetaFilter] = None, id_range: Optional[IdRange] = None) -> dict[str, Any]:
+    """Server-side query for a GacetaFilter (and optional id slice)."""
+    conditions: list[dict[str, Any]] = []
+    if filters is not None:
+        if filters.year is not None:
+            conditions.append({"year": filters.year})
+        if filters.tipo:
+            conditions.append({"tipo": filters.tipo.upper()})
+        if filters.date_from is not None or filters.date_to is not None:
+            # Plain range on year first so an index on year can narrow the scan
+            year_range = {}
+            if filters.date_from is not None:
+                year_range["$gte"] = filters.date_from.year
+            if filters.date_to is not None:
+                year_range["$lte"] = filters.date_to.year
+            conditions.append({"year": year_range})
+            if filters.date_from is not None:
+                conditions.append(_date_bound(filters.date_from, "$gt", "$gte"))
+            if filters.date_to is not None:
+                conditions.append(_date_bound(filters.date_to, "$lt", "$lte"))
+        id_bounds = {}
+        if filters.id_min is not None:
+            id_bounds["$gte"] = filters.id_min
+        if filters.id_max is not None:
+            id_bounds["$lte"] = filters.id_max
+        if id_bounds:
+            conditions.append({"_id": id_bounds})
+    if id_range is not None:
+        conditions.append({"_id": {"$gte": id_range[0], "$lte": id_range[1]}})
+    if not conditions:
+        return {}
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+class _LazyPages:
+    """Pages of a raw BSON document; each page's text is decoded only when iterated."""
+
+    __slots__ = ("_raw",)
+
+    def __init__(self, raw_pages) -> None:
+        self._raw = raw_pages
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __iter__(self) -> Iterator[GacetaPage]:
+        for page in self._raw:
+            yield GacetaPage(page_number=page.get("page_number"), text=page.get("text") or "")
 
 
 class MongoGacetaRepository:
@@ -16,10 +113,13 @@ class MongoGacetaRepository:
         uri: Optional[str] = None,
         db_name: Optional[str] = None,
         collection_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
     ) -> None:
         self._uri = uri or MONGO_URI
         self._db_name = db_name or MONGO_DB_NAME
         self._collection_name = collection_name or MONGO_COLLECTION_NAME
+        # Gaceta documents are large (full OCR text): fetch a few per round trip
+        self._batch_size = batch_size or MONGO_BATCH_SIZE
         self._client = None
         self._collection = None
 
@@ -29,81 +129,137 @@ class MongoGacetaRepository:
         if not self._uri:
             raise RuntimeError("MONGO_URI not set")
         try:
-            from pymongo import MongoClient
-            self._client = MongoClient(self._uri, serverSelectionTimeoutMS=5000)
-            db = self._client[self._db_name]
-            self._collection = db[self._collection_name]
+            self._client = get_client(self._uri)
             self._client.server_info()
+            self._collection = self._client[self._db_name][self._collection_name]
         except ImportError as e:
             raise RuntimeError("pymongo not installed. pip install pymongo") from e
         except Exception as e:
             raise RuntimeError(f"Cannot connect to MongoDB: {e}") from e
 
-    def count(self) -> int:
+    def count(self, filters: Optional[GacetaFilter] = None) -> int:
         self._ensure_connected()
-        return self._collection.count_documents({})
+        return self._collection.count_documents(build_gaceta_query(filters))
 
-    def iter_gacetas(self, limit: Optional[int] = None) -> Iterator[GacetaDocument]:
+    def iter_gacetas(
+        self,
+        limit: Optional[int] = None,
+        id_range: Optional[IdRange] = None,
+        filters: Optional[GacetaFilter] = None,
+    ) -> Iterator[GacetaDocument]:
         self._ensure_connected()
-        cursor = self._collection.find(
-            {},
-            {"filename": 1, "numero_gaceta": 1, "fecha": 1, "year": 1, "pages": 1, "full_text": 1},
+        from bson.codec_options import CodecOptions
+        from bson.raw_bson import RawBSONDocument
+
+        # Raw documents: top-level fields are decoded on first access, page texts one by one.
+        collection = self._collection.with_options(
+            codec_options=CodecOptions(document_class=RawBSONDocument)
         )
+        # Ordered by _id (served by the default index) so serial and partitioned scans agree.
+        cursor = collection.find(
+            build_gaceta_query(filters, id_range),
+            _GACETA_PROJECTION,
+        ).sort("_id", 1).batch_size(self._batch_size)
         if limit is not None:
             cursor = cursor.limit(limit)
         for doc in cursor:
-            pages = doc.get("pages") or []
             yield GacetaDocument(
                 filename=doc.get("filename", ""),
                 numero_gaceta=doc.get("numero_gaceta", ""),
                 fecha=doc.get("fecha", ""),
                 year=doc.get("year"),
-                pages=[
-                    GacetaPage(
-                        page_number=p.get("page_number"),
-                        text=(p.get("text") or ""),
-                    )
-                    for p in pages
-                ],
+                pages=_LazyPages(doc.get("pages") or []),
                 full_text=doc.get("full_text") or "",
+                tipo=doc.get("tipo", ""),
             )
 
-    def save_relationship(self, cedula: str, nombre: str, numero_gaceta: str, filename: str, fecha: str, pagina: Optional[int]):
-        """Saves the relationship in MongoDB collections: persona, gaceta, persona_gaceta."""
+    def partition(
+        self,
+        parts: int,
+        limit: Optional[int] = None,
+        filters: Optional[GacetaFilter] = None,
+    ) -> list[IdRange]:
+        self._ensure_connected()
+        cursor = self._collection.find(build_gaceta_query(filters), {"_id": 1}).sort("_id", 1)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return split_ranges([doc["_id"] for doc in cursor], parts)
+
+    def relationship_writer(
+        self,
+        batch_size: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+    ) -> MongoRelationshipWriter:
+        """Batched alternative to save_relationship for saving many hits (see MongoRelationshipWriter)."""
         self._ensure_connected()
         db = self._client[self._db_name]
-        
-        # 1. Save or get Persona
-        persona_coll = db["persona"]
-        persona_doc = persona_coll.find_one({"cedula": cedula})
-        if not persona_doc:
-            res = persona_coll.insert_one({"cedula": cedula, "nombre": nombre})
-            persona_id = res.inserted_id
-        else:
-            persona_id = persona_doc["_id"]
-            if persona_doc.get("nombre") == "Desconocido" and nombre != "Desconocido":
-                persona_coll.update_one({"_id": persona_id}, {"$set": {"nombre": nombre}})
-                
-        # 2. Save or get Gaceta metadata
-        gaceta_coll = db["gaceta"]
-        gaceta_doc = gaceta_coll.find_one({"numero_gaceta": numero_gaceta})
-        if not gaceta_doc:
-            res = gaceta_coll.insert_one({"numero_gaceta": numero_gaceta, "filename": filename, "fecha": fecha})
-            gaceta_id = res.inserted_id
-        else:
-            gaceta_id = gaceta_doc["_id"]
-            update_fields = {}
-            if "filename" not in gaceta_doc:
-                update_fields["filename"] = filename
-            if "fecha" not in gaceta_doc:
-                update_fields["fecha"] = fecha
-            if update_fields:
-                gaceta_coll.update_one({"_id": gaceta_id}, {"$set": update_fields})
-            
-        # 3. Create Persona-Gaceta Relationship
-        rel_coll = db["persona_gaceta"]
-        rel_coll.insert_one({
-            "persona_id": persona_id,
-            "gaceta_id": gaceta_id,
-            "pagina": pagina
-        })
+        # The writer only appends to the read model: build it first if this store predates it
+        # (or predates the current read model layout)
+        if db["persona"].estimated_document_count() == 0:
+            mark_read_model_current(db)
+        elif db[MONGO_READ_MODEL_COLLECTION].estimated_document_count() == 0 or not read_model_is_current(db):
+            rebuild_read_model(db)
+        return MongoRelationshipWriter(db, batch_size, flush_seconds)
+
+    def rebuild_read_model(self) -> int:
+        """Regenerate the persona read model from persona / persona_gaceta / gaceta."""
+        self._ensure_connected()
+        return rebuild_read_model(self._client[self._db_name])
+
+    def rebuild_page_index(self) -> int:
+        """Add every gaceta's pages to the full-text page index (idempotent); returns the page count."""
+        self._ensure_connected()
+        return rebuild_page_index(self._client[self._db_name])
+
+    def iter_export_personas(self, filters: Optional[ExportFilter] = None) -> Iterator[dict[str, Any]]:
+        """Read-model personas for a bulk export, streamed (see mongodb_export)."""
+        self._ensure_connected()
+        return iter_export_personas(self._client[self._db_name], filters)
+
+    def last_gaceta_id(self) -> Any:
+        """_id of the newest gaceta in scan order (None if the store is empty)."""
+        self._ensure_connected()
+        doc = self._collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        return doc["_id"] if doc else None
+
+    def mining_watermark(self) -> Any:
+        """_id of the last gaceta covered by a complete extraction run (None if never)."""
+        self._ensure_connected()
+        return mining_watermark(self._client[self._db_name])
+
+    def set_mining_watermark(self, last_id: Any) -> None:
+        self._ensure_connected()
+        set_mining_watermark(self._client[self._db_name], last_id)
+
+    def record_job_stats(self, job_id: str, stats: dict[str, Any]) -> None:
+        """Counters of a run started as a mining job (see src/services/mining_jobs.py)."""
+        self._ensure_connected()
+        MongoJobStore(self._client[self._db_name]).update(job_id, stats)
+
+    def gaceta_metadata(self) -> dict[str, dict[str, Any]]:
+        """filename -> numero_gaceta, fecha, year, tipo, total_pages of every gaceta (no text)."""
+        self._ensure_connected()
+        return gaceta_metadata(self._client[self._db_name])
+
+    def write_snapshot(self, snapshot: ParquetSnapshot) -> tuple[int, int]:
+        """Append the gacetas missing from a Parquet snapshot; returns (hits, gacetas) written."""
+        self._ensure_connected()
+        return snapshot_from_mongo(self._client[self._db_name], snapshot)
+
+    def ensure_indexes(self) -> list[str]:
+        """Create every declared index (idempotent); returns warnings (see apply_indexes)."""
+        self._ensure_connected()
+        return apply_indexes(self._client[self._db_name])
+
+    def verify_indexes(self) -> list[str]:
+        """Explain every API query shape on a seeded scratch database; returns COLLSCAN failures."""
+        self._ensure_connected()
+        return verify_indexes(self._client, self._db_name)
+
+    def save_relationship(self, cedula: str, nombre: str, numero_gaceta: str, filename: str, fecha: str, pagina: Optional[int]):
+        """
+        Saves one relationship in persona, gaceta and persona_gaceta, through the writer: it also
+        updates the read model and the data version, and skips a repeated (persona, gaceta, pagina).
+        """
+        with self.relationship_writer(batch_size=1) as writer:
+            writer.add(cedula, nombre, numero_gaceta, filename, fecha, pagina)
@@ -0,0 +1,143 @@
+"""
+Adapter: the in-memory cédula existence index (src/utils/cedula_set.py) of a database, built
+from the persona read model. One per database per process, like the name index.
+The data version (see mongodb_read_model) is checked at most every CEDULA_INDEX_CHECK_SECONDS.
+When it changed, the index is memory-mapped from the snapshot in CEDULA_INDEX_DIR if another
+process already wrote one for that version; otherwise it is rebuilt from MongoDB and a new
+snapshot is written, but no more often than every CEDULA_INDEX_REBUILD_SECONDS (a running
+extraction bumps the version on every batch). refresh() starts a rebuild right away: the web
+app calls it when a mining job finishes. Rebuilds run in the background (see MongoCedulaIndex).
+"""
+import os
+import threading
+import time
+from typing import Iterator, Optional
+
+from src.constants.config import (
+    CEDULA_INDEX_CHECK_SECONDS,
+    CEDULA_INDEX_DIR,
+    CEDULA_INDEX_REBUILD_SECONDS,
+    MONGO_READ_MODEL_COLLECTION,
+)
+from src.adapters.mongodb_read_model import data_version
+from src.utils.cedula_set import CedulaSet
+from src.utils.normalization import cedula_digits
+
+_LOAD_BATCH = 10000
+
+
+def iter_cedula_rows(db) -> Iterator[tuple[str, int, int, int]]:
+    """
+    (cedula_letra, cedula_numero, digits written, total_apariciones) of every persona in the
+    read model; the digit count keeps "V-012345678" apart from "V-12345678".
+    """
+    cursor = db[MONGO_READ_MODEL_COLLECTION].find(
+        {}, {"_id": 0, "cedula": 1, "cedula_letra": 1, "cedula_numero": 1, "total_apariciones": 1}
+    ).batch_size(_LOAD_BATCH)
+    for doc in cursor:
+        digits = len(cedula_digits(doc.get("cedula")))
+        yield doc.get("cedula_letra"), doc.get("cedula_numero"), digits, doc.get("total_apariciones", 0)
+
+
+class MongoCedulaIndex:
+    """
+    Thread-safe: Flask serves requests from several threads. Rebuilds run in a background
+    thread and replace the set when done; until then requests get the current one. Only the
+    first request of a process without a snapshot waits for a build.
+    """
+
+    def __init__(self, db, directory: Optional[str] = None) -> None:
+        self._db = db
+        self._directory = directory or os.path.join(CEDULA_INDEX_DIR, db.name)
+        self._lock = threading.Lock()
+        self._set: Optional[CedulaSet] = None
+        self._checked = 0.0
+        self._rebuilt = 0.0
+        self._building = False
+        # Set when a rebuild was asked for while one was running: the data changed after it began
+        self._again = False
+        # Set once no build is running (cleared while one is)
+        self._built = threading.Event()
+        self._built.set()
+        self._error: Optional[Exception] = None
+
+    def get(self) -> CedulaSet:
+        with self._lock:
+            self._sync()
+            cedulas = self._set
+        if cedulas is None:
+            self._built.wait()
+            with self._lock:
+                if self._set is None:
+                    raise RuntimeError(f"Cédula index not available: {self._error}")
+                cedulas = self._set
+        return cedulas
+
+    def refresh(self) -> None:
+        """Rebuild from MongoDB in the background and share the snapshot with the other workers."""
+        with self._lock:
+            self._start_rebuild()
+
+    def _sync(self) -> None:
+        # Caller holds the lock
+        now = time.monotonic()
+        if self._set is not None and now - self._checked < CEDULA_INDEX_CHECK_SECONDS:
+            return
+        self._checked = now
+        version = data_version(self._db)
+        if self._set is not None and self._set.version == version:
+            return
+        if CedulaSet.snapshot_version(self._directory) == version:
+            snapshot = CedulaSet.load(self._directory)
+            if snapshot is not None:
+                self._set = snapshot
+                return
+        if (self._set is None and not self._building) or now - self._rebuilt >= CEDULA_INDEX_REBUILD_SECONDS:
+            self._start_rebuild()
+
+    def _start_rebuild(self) -> None:
+        # Caller holds the lock
+        if self._building:
+            self._again = True
+            return
+        self._building = True
+        self._rebuilt = time.monotonic()
+        self._built.clear()
+        threading.Thread(target=self._rebuild, name="cedula-index-build", daemon=True).start()
+
+    def _rebuild(self) -> None:
+        while True:
+            try:
+                cedulas = CedulaSet.build(iter_cedula_rows(self._db), data_version(self._db))
+                try:
+                    cedulas.save(self._directory)
+                except OSError:
+                    pass  # Not shared, still usable by this process
+                with self._lock:
+                    # Unless a newer snapshot from another worker was loaded meanwhile
+                    if self._set is None or self._set.version <= cedulas.version:
+                        self._set = cedulas
+                    self._error = None
+            except Exception as e:
+                self._error = e
+            with self._lock:
+                if not self._again:
+                    self._building = False
+                    self._rebuilt = time.monotonic()
+                    break
+                self._again = False
+        self._built.set()
+
+
+_indexes: dict[tuple[str, str], MongoCedulaIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_cedula_index(db) -> MongoCedulaIndex:
+    """One index per database per process, keyed like get_name_index."""
+    key = (repr(db.client), db.name)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = MongoCedulaIndex(db)
+        return index
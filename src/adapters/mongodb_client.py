@@ -0,0 +1,80 @@
+"""
+Adapter: the process-wide MongoDB client. MongoClient is thread-safe and keeps its own
+connection pool, so every entry point (web app, API v1, CLI, ocr_processor) shares one per
+URI instead of paying for a new pool, handshake and server discovery each time. A forked child
+(worker processes) gets its own client on first use: pools must not cross a fork.
+The clients are closed at interpreter exit (atexit), which ends their server sessions cleanly.
+"""
+import atexit
+import os
+import threading
+from typing import Any, Optional
+
+from src.constants.config import (
+    MONGO_APP_NAME,
+    MONGO_COMPRESSORS,
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_DB_NAME,
+    MONGO_DEFAULT_URI,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS,
+    MONGO_URI,
+)
+
+_clients: dict[str, Any] = {}
+_pid = os.getpid()
+_lock = threading.Lock()
+
+
+def client_options() -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "appname": MONGO_APP_NAME,
+    }
+    if MONGO_CONNECT_TIMEOUT_MS:
+        options["connectTimeoutMS"] = int(MONGO_CONNECT_TIMEOUT_MS)
+    if MONGO_SOCKET_TIMEOUT_MS:
+        options["socketTimeoutMS"] = int(MONGO_SOCKET_TIMEOUT_MS)
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return options
+
+
+def get_client(uri: Optional[str] = None):
+    """Shared client for `uri` (default: MONGO_URI, else a local server)."""
+    global _pid
+    uri = uri or MONGO_URI or MONGO_DEFAULT_URI
+    with _lock:
+        if os.getpid() != _pid:
+            # Inherited through fork: the parent's sockets and monitor threads are unusable here
+            _clients.clear()
+            _pid = os.getpid()
+        client = _clients.get(uri)
+        if client is None:
+            from pymongo import MongoClient
+
+            client = _clients[uri] = MongoClient(uri, **client_options())
+        return client
+
+
+def get_database(name: Optional[str] = None, uri: Optional[str] = None):
+    return get_client(uri)[name or MONGO_DB_NAME]
+
+
+def close_clients() -> None:
+    """Close every shared client (at exit, tests)."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        if os.getpid() != _pid:
+            # The parent's clients: closing them here would talk over the parent's sockets
+            return
+    for client in clients:
+        client.close()
+
+
+atexit.register(close_clients)
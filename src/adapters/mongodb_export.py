@@ -0,0 +1,95 @@
+"""
+Adapter: read-model cursor for bulk exports (CSV / NDJSON). Personas are read in natural
+order through one server cursor, MONGO_EXPORT_BATCH_SIZE documents per round trip, so a full
+export holds a single batch in memory. Appearance dates are stored as DD/MM/YYYY strings:
+MongoDB only narrows by year and the exact date range is checked here, per appearance.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Iterator, Optional
+
+from src.constants.config import MONGO_EXPORT_BATCH_SIZE, MONGO_READ_MODEL_COLLECTION
+
+_EXPORT_PROJECTION = {"cedula": 1, "nombre": 1, "total_apariciones": 1, "apariciones": 1}
+
+
+@dataclass(frozen=True, slots=True)
+class ExportFilter:
+    letra: Optional[str] = None
+    year: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+    def filters_apariciones(self) -> bool:
+        return self.year is not None or self.date_from is not None or self.date_to is not None
+
+
+def parse_fecha(fecha: Any) -> Optional[date]:
+    """DD/MM/YYYY (as written by ocr_processor) to a date; None if missing or malformed."""
+    try:
+        day, month, year = str(fecha).split("/")
+        return date(int(year), int(month), int(day))
+    except (TypeError, ValueError):
+        return None
+
+
+def _export_years(filters: ExportFilter) -> Optional[list[int]]:
+    """Years an appearance may fall in, or None when the range is open-ended."""
+    if filters.year is not None:
+        return [filters.year]
+    if filters.date_from is not None and filters.date_to is not None:
+        return list(range(filters.date_from.year, filters.date_to.year + 1))
+    return None
+
+
+def build_export_query(filters: Optional[ExportFilter] = None) -> dict[str, Any]:
+    if filters is None:
+        return {}
+    conditions: list[dict[str, Any]] = []
+    if filters.letra:
+        conditions.append({"cedula_letra": filters.letra.upper()})
+    years = _export_years(filters)
+    if years is not None:
+        # Only personas with at least one appearance in those years cross the wire
+        alternatives = "|".join(str(year) for year in years) or "-"
+        conditions.append({"apariciones.fecha": {"$regex": f"/({alternatives})$"}})
+    if not conditions:
+        return {}
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def aparicion_matches(aparicion: dict[str, Any], filters: ExportFilter) -> bool:
+    fecha = parse_fecha(aparicion.get("fecha"))
+    if fecha is None:
+        return False
+    if filters.year is not None and fecha.year != filters.year:
+        return False
+    if filters.date_from is not None and fecha < filters.date_from:
+        return False
+    if filters.date_to is not None and fecha > filters.date_to:
+        return False
+    return True
+
+
+def filter_persona(persona: dict[str, Any], filters: Optional[ExportFilter]) -> Optional[dict[str, Any]]:
+    """The persona with only the appearances inside the date filters (None if none are left)."""
+    if filters is None or not filters.filters_apariciones():
+        return persona
+    apariciones = [ap for ap in persona.get("apariciones", []) if aparicion_matches(ap, filters)]
+    if not apariciones:
+        return None
+    return {**persona, "apariciones": apariciones, "total_apariciones": len(apariciones)}
+
+
+def iter_export_personas(db, filters: Optional[ExportFilter] = None, batch_size: int = MONGO_EXPORT_BATCH_SIZE) -> Iterator[dict[str, Any]]:
+    cursor = db[MONGO_READ_MODEL_COLLECTION].find(build_export_query(filters), _EXPORT_PROJECTION, batch_size=batch_size)
+    try:
+        for persona in cursor:
+            persona = filter_persona(persona, filters)
+            if persona is not None:
+                yield persona
+    finally:
+        # A client that disconnects mid-download must not leave the server cursor open
+        cursor.close()
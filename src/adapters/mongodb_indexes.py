@@ -0,0 +1,287 @@
+"""
+Adapter: MongoDB index management.
+REQUIRED_INDEXES declares every index the hot paths need (extraction scan, relationship
+writer, read model, search endpoints, ocr_processor's "already processed" check);
+apply_indexes() creates them idempotently. verify_query_plans() runs explain() on every
+query shape the API builds and reports the ones that fall back to a collection scan;
+verify_indexes() does that against a scratch database seeded with synthetic data.
+"""
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from src.constants.config import (
+    MONGO_COLLECTION_NAME,
+    MONGO_JOBS_COLLECTION,
+    MONGO_PAGES_COLLECTION,
+    MONGO_READ_MODEL_COLLECTION,
+    MONGO_RESPONSE_CACHE_COLLECTION,
+    MONGO_TEXT_LANGUAGE,
+)
+
+# MongoDB error codes
+_DUPLICATE_KEY = 11000
+_INDEX_OPTIONS_CONFLICT = 85
+_INDEX_KEY_SPECS_CONFLICT = 86
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    collection: str
+    # Direction is 1 / -1, or "text" for a text index
+    keys: tuple[tuple[str, Any], ...]
+    unique: bool = False
+    default_language: Optional[str] = None
+    # TTL index: documents are deleted this many seconds after the indexed date
+    expire_after_seconds: Optional[int] = None
+    # Partial index: only documents matching these (field, value) equalities are indexed
+    partial_filter: Optional[tuple[tuple[str, Any], ...]] = None
+
+    @property
+    def options(self) -> dict[str, Any]:
+        options: dict[str, Any] = {}
+        if self.partial_filter:
+            options["partialFilterExpression"] = dict(self.partial_filter)
+        if self.default_language:
+            options["default_language"] = self.default_language
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        return options
+
+    @property
+    def name(self) -> str:
+        return "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+
+REQUIRED_INDEXES: tuple[IndexSpec, ...] = (
+    # Scanned gacetas (OCR output): ocr_processor skip check, extraction filters
+    IndexSpec(MONGO_COLLECTION_NAME, (("filename", 1),), unique=True),
+    IndexSpec(MONGO_COLLECTION_NAME, (("year", 1), ("month", 1), ("day", 1))),
+    IndexSpec(MONGO_COLLECTION_NAME, (("tipo", 1),)),
+    # Normalized relationship collections (writer upsert keys, read model rebuild $lookups)
+    IndexSpec("persona", (("cedula", 1),), unique=True),
+    IndexSpec("persona", (("nombre", 1),)),
+    IndexSpec("gaceta", (("numero_gaceta", 1),), unique=True),
+    IndexSpec("persona_gaceta", (("persona_id", 1), ("gaceta_id", 1), ("pagina", 1)), unique=True),
+    IndexSpec("persona_gaceta", (("gaceta_id", 1),)),
+    # Read model behind /api/search and /api/v1/personas
+    IndexSpec(MONGO_READ_MODEL_COLLECTION, (("total_apariciones", -1), ("_id", -1))),
+    # Derived search keys (src.utils.normalization): letter equality, number ranges, name prefixes
+    IndexSpec(MONGO_READ_MODEL_COLLECTION, (("cedula_letra", 1), ("cedula_numero", 1))),
+    IndexSpec(MONGO_READ_MODEL_COLLECTION, (("cedula_numero", 1),)),
+    IndexSpec(MONGO_READ_MODEL_COLLECTION, (("nombre_tokens", 1),)),
+    # Incremental refresh of the in-memory trigram name index (mongodb_name_index)
+    IndexSpec(MONGO_READ_MODEL_COLLECTION, (("nombre_actualizado", 1),)),
+    # Full-text search over OCR'd pages (mongodb_pages); the unique key makes re-indexing idempotent
+    IndexSpec(MONGO_PAGES_COLLECTION, (("text", "text"),), default_language=MONGO_TEXT_LANGUAGE),
+    IndexSpec(MONGO_PAGES_COLLECTION, (("gaceta_id", 1), ("page_number", 1)), unique=True),
+    # Shared API response cache (mongodb_response_cache): entries vanish at `expira`
+    IndexSpec(MONGO_RESPONSE_CACHE_COLLECTION, (("expira", 1),), expire_after_seconds=0),
+    # Mining jobs: at most one active job (single-flight lease), history newest first
+    IndexSpec(MONGO_JOBS_COLLECTION, (("activo", 1),), unique=True, partial_filter=(("activo", True),)),
+    IndexSpec(MONGO_JOBS_COLLECTION, (("creado", -1),)),
+)
+
+
+def apply_indexes(
+    db,
+    specs: Iterable[IndexSpec] = REQUIRED_INDEXES,
+    collections: Optional[Iterable[str]] = None,
+) -> list[str]:
+    """
+    Create the declared indexes (only those of `collections`, if given). Safe to run any
+    number of times. A unique index that existing duplicates prevent is created as a plain
+    index instead; an index that already exists with other options is left alone. Returns
+    one warning per such case.
+    """
+    from pymongo.errors import OperationFailure
+
+    wanted = set(collections) if collections is not None else None
+    warnings = []
+    for spec in specs:
+        if wanted is not None and spec.collection not in wanted:
+            continue
+        coll = db[spec.collection]
+        try:
+            coll.create_index(list(spec.keys), name=spec.name, unique=spec.unique, **spec.options)
+        except OperationFailure as e:
+            if e.code == _DUPLICATE_KEY and spec.unique:
+                coll.create_index(list(spec.keys), name=spec.name, **spec.options)
+                warnings.append(f"{spec.collection}.{spec.name}: duplicate keys, created as non-unique")
+            elif e.code in (_INDEX_OPTIONS_CONFLICT, _INDEX_KEY_SPECS_CONFLICT):
+                warnings.append(f"{spec.collection}.{spec.name}: exists with different options, kept")
+            else:
+                raise
+    return warnings
+
+
+# --- query plan verification ---
+
+@dataclass(frozen=True)
+class QueryShape:
+    name: str
+    collection: str
+    filter: dict[str, Any]
+    sort: Optional[tuple[tuple[str, int], ...]] = None
+
+
+def query_shapes() -> list[QueryShape]:
+    """Every filter/sort combination the API and the writers send, built by the real builders."""
+    from src.api.v1.planner import plan_search
+    from src.adapters.mongodb import build_gaceta_query
+    from src.adapters.mongodb_pages import build_page_query
+    from src.api.v1.utils import keyset_condition
+    from src.utils.cursors import encode_cursor
+    from bson import ObjectId
+    from src.ports.repository import GacetaFilter
+    from datetime import date
+
+    read_model = MONGO_READ_MODEL_COLLECTION
+    sorts = {"newest": (("_id", -1),), "apariciones": (("total_apariciones", -1), ("_id", -1))}
+    shapes = []
+
+    v1_params = {
+        "q": {"query": "perez"},
+        "q cedula": {"query": "12345"},
+        "q cedula exacta": {"query": "V-12345678"},
+        "q mixta": {"query": "perez 1234"},
+        "cedula": {"cedula": "V-1234"},
+        "cedula exacta": {"cedula": "V-12.345.678"},
+        "nombre": {"nombre": "maría"},
+        "cedula+nombre": {"cedula": "V-1234", "nombre": "maria"},
+        "all": {},
+    }
+    for label, params in v1_params.items():
+        plan = plan_search(**params)
+        shapes.append(QueryShape(f"v1 personas [{label}]", read_model, plan.filter, sorts["newest"]))
+        if plan.fallback is not None:
+            shapes.append(QueryShape(f"v1 personas [{label}, no exact match]", read_model, plan.fallback, sorts["newest"]))
+
+    ui_params = {
+        "q": ("perez", "", ""),
+        "letter": ("", "V", ""),
+        "range": ("", "", "10-20"),
+        "q+letter+range": ("juan", "E", "30+"),
+        "all": ("", "", ""),
+    }
+    for label, (query, letter, range_filter) in ui_params.items():
+        for sort_name, sort in sorts.items():
+            plan = plan_search(query=query, letter=letter, range_filter=range_filter, sort=sort_name)
+            shapes.append(QueryShape(f"api/search [{label}, {sort_name}]", read_model, plan.filter, sort))
+
+    # Keyset pages (after=...): the cursor condition alone, as on an unfiltered listing
+    last = {"_id": ObjectId("65a000000000000000000000"), "total_apariciones": 3}
+    for sort_name, sort in sorts.items():
+        keyset = keyset_condition(sort_name, encode_cursor(sort_name, last))
+        shapes.append(QueryShape(f"api/search [after, {sort_name}]", read_model, keyset, sort))
+
+    shapes.extend([
+        QueryShape("v1 personas batch", read_model, {"cedula_numero": {"$in": [1234, 5678901]}}),
+        QueryShape("active mining job", MONGO_JOBS_COLLECTION, {"activo": True}),
+        QueryShape("mining job history", MONGO_JOBS_COLLECTION, {}, (("creado", -1),)),
+        QueryShape("writer persona by cedula", "persona", {"cedula": {"$in": ["V-1234"]}}),
+        QueryShape("writer gaceta by numero", "gaceta", {"numero_gaceta": {"$in": ["41648"]}}),
+        QueryShape("relationships of persona", "persona_gaceta", {"persona_id": 1}),
+        QueryShape("relationships of gaceta", "persona_gaceta", {"gaceta_id": 1}),
+        QueryShape("ocr already processed", MONGO_COLLECTION_NAME, {"filename": "41648-2019-03-12-ORDINARIA.pdf"}),
+        QueryShape(
+            "scan filtered by year",
+            MONGO_COLLECTION_NAME,
+            build_gaceta_query(GacetaFilter(year=2025)),
+            (("_id", 1),),
+        ),
+        QueryShape(
+            "scan filtered by date range",
+            MONGO_COLLECTION_NAME,
+            build_gaceta_query(GacetaFilter(date_from=date(2024, 3, 1), date_to=date(2025, 2, 28))),
+            (("_id", 1),),
+        ),
+        QueryShape("scan filtered by tipo", MONGO_COLLECTION_NAME, build_gaceta_query(GacetaFilter(tipo="ordinaria"))),
+        QueryShape("page text search", MONGO_PAGES_COLLECTION, build_page_query("decreto presidente")),
+        QueryShape("page text search filtered", MONGO_PAGES_COLLECTION, build_page_query("decreto", year=2020, tipo="ordinaria")),
+    ])
+    return shapes
+
+
+def plan_has_collscan(plan: Any) -> bool:
+    """True if any stage of an explain() plan (classic or SBE format) is a COLLSCAN."""
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(plan_has_collscan(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(plan_has_collscan(item) for item in plan)
+    return False
+
+
+def verify_query_plans(db, shapes: Optional[Iterable[QueryShape]] = None) -> list[str]:
+    """explain() every shape; return the names of those whose winning plan scans a collection."""
+    failures = []
+    for shape in shapes if shapes is not None else query_shapes():
+        cursor = db[shape.collection].find(shape.filter)
+        if shape.sort:
+            cursor = cursor.sort(list(shape.sort))
+        winning = cursor.limit(15).explain().get("queryPlanner", {}).get("winningPlan", {})
+        if plan_has_collscan(winning):
+            failures.append(f"{shape.name}: COLLSCAN on '{shape.collection}' for {shape.filter}")
+    return failures
+
+
+def seed_explain_dataset(db, personas: int = 500) -> None:
+    """Synthetic documents in every collection so the planner has data and fields to plan on."""
+    from src.utils.normalization import persona_search_fields
+    from src.adapters.mongodb_pages import page_documents
+
+    gacetas = [
+        {
+            "filename": f"{40000 + i}-{2015 + i % 11}-{1 + i % 12:02d}-{1 + i % 28:02d}-ORDINARIA.pdf",
+            "numero_gaceta": str(40000 + i),
+            "tipo": "ORDINARIA" if i % 3 else "EXTRAORDINARIA",
+            "year": 2015 + i % 11,
+            "month": 1 + i % 12,
+            "day": 1 + i % 28,
+            "pages": [{"page_number": 1, "text": "ciudadano JUAN PEREZ C.I. V-12345678"}],
+        }
+        for i in range(50)
+    ]
+    db[MONGO_COLLECTION_NAME].insert_many(gacetas)
+    db[MONGO_PAGES_COLLECTION].insert_many([page for g in gacetas for page in page_documents(g)])
+    gaceta_ids = db["gaceta"].insert_many(
+        [{"numero_gaceta": g["numero_gaceta"], "filename": g["filename"], "fecha": "01/01/2020"} for g in gacetas]
+    ).inserted_ids
+    persona_docs = []
+    for i in range(personas):
+        cedula, nombre = f"{'VE'[i % 2]}-{1_000_000 + i * 7919}", f"PERSONA {i} PÉREZ"
+        persona_docs.append({"cedula": cedula, "nombre": nombre, **persona_search_fields(cedula, nombre)})
+    persona_ids = db["persona"].insert_many(persona_docs).inserted_ids
+    db["persona_gaceta"].insert_many(
+        [{"persona_id": pid, "gaceta_id": gaceta_ids[i % len(gaceta_ids)], "pagina": 1} for i, pid in enumerate(persona_ids)]
+    )
+    db[MONGO_READ_MODEL_COLLECTION].insert_many([
+        {
+            **doc,
+            "_id": pid,
+            "apariciones": [],
+            "total_apariciones": i % 5,
+        }
+        for i, (pid, doc) in enumerate(zip(persona_ids, persona_docs))
+    ])
+    db[MONGO_JOBS_COLLECTION].insert_many(
+        [{"_id": f"job{i}", "modo": "incremental", "estado": "completado", "creado": i} for i in range(20)]
+        + [{"_id": "job-activo", "modo": "completo", "estado": "ejecutando", "activo": True, "creado": 20}]
+    )
+
+
+def verify_indexes(client, db_name: str) -> list[str]:
+    """
+    Seed a scratch database next to `db_name`, apply REQUIRED_INDEXES and explain every query
+    shape. The scratch database is dropped afterwards. Returns the failures (empty = OK).
+    """
+    scratch = f"{db_name}_index_check"
+    client.drop_database(scratch)
+    try:
+        db = client[scratch]
+        seed_explain_dataset(db)
+        apply_indexes(db)
+        return verify_query_plans(db)
+    finally:
+        client.drop_database(scratch)
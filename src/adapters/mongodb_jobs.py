@@ -0,0 +1,116 @@
+"""
+Adapter: mining job records and the incremental-mining watermark.
+Each job is a document in MONGO_JOBS_COLLECTION (id, mode, state, timings, counters). While a
+job is queued or running it carries `activo: true`, and a unique partial index on that field
+lets only one such document exist: inserting a job is the single-flight lease, shared by every
+web worker process. The supervisor renews `latido` (heartbeat); a job whose heartbeat is older
+than the lease is considered dead (server restarted mid-run) and can be replaced.
+The watermark is the _id of the last gaceta covered by a complete run, in the metadata
+collection; incremental runs scan only gacetas inserted after it. Clearing the database
+removes it, so the next incremental run starts from the beginning.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from src.constants.config import MONGO_JOBS_COLLECTION, MONGO_METADATA_COLLECTION
+from src.adapters.mongodb_indexes import apply_indexes
+
+# Job states; the first two are active (hold the lease)
+QUEUED, RUNNING = "en_cola", "ejecutando"
+COMPLETED, FAILED, CANCELLED, ABANDONED = "completado", "fallido", "cancelado", "abandonado"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(moment: Optional[datetime]) -> Optional[datetime]:
+    # PyMongo returns naive UTC datetimes unless the client is tz_aware
+    return moment.replace(tzinfo=timezone.utc) if moment is not None and moment.tzinfo is None else moment
+
+
+class MongoJobStore:
+    def __init__(self, db) -> None:
+        self._db = db
+        self._jobs = db[MONGO_JOBS_COLLECTION]
+
+    def claim(self, job: dict[str, Any], lease_seconds: float) -> tuple[dict[str, Any], bool]:
+        """
+        Insert `job` as the active job. If another one is active, return it instead
+        (attach); a dead one (no heartbeat within `lease_seconds`) is marked abandoned first.
+        Returns (active job, True if `job` was inserted).
+        """
+        from pymongo.errors import DuplicateKeyError
+
+        # The lease is the unique partial index: make sure it exists before relying on it
+        apply_indexes(self._db, collections=(MONGO_JOBS_COLLECTION,))
+        now = _now()
+        job = {**job, "estado": QUEUED, "activo": True, "creado": now, "latido": now, "cancelar": False}
+        for _ in range(3):
+            try:
+                self._jobs.insert_one(job)
+                return job, True
+            except DuplicateKeyError:
+                active = self._jobs.find_one({"activo": True})
+                if active is None:
+                    continue  # finished in between: try again
+                latido = _aware(active.get("latido"))
+                if latido is None or now - latido <= timedelta(seconds=lease_seconds):
+                    return active, False
+                self.finish(active["_id"], {"estado": ABANDONED, "mensaje": "Sin latido: el proceso que la ejecutaba terminó."})
+        raise RuntimeError("Could not acquire the mining job lease")
+
+    def mark_running(self, job_id: str, pid: int) -> None:
+        now = _now()
+        self.update(job_id, {"estado": RUNNING, "pid": pid, "inicio": now, "latido": now})
+
+    def heartbeat(self, job_id: str) -> Optional[dict[str, Any]]:
+        """Renew the lease; returns the job, to read its `cancelar` flag."""
+        from pymongo import ReturnDocument
+
+        return self._jobs.find_one_and_update(
+            {"_id": job_id, "activo": True},
+            {"$set": {"latido": _now()}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def update(self, job_id: str, fields: dict[str, Any]) -> None:
+        self._jobs.update_one({"_id": job_id}, {"$set": fields})
+
+    def finish(self, job_id: str, fields: dict[str, Any]) -> None:
+        """Final state: the job stops being active and releases the lease."""
+        self._jobs.update_one({"_id": job_id}, {"$set": {**fields, "fin": _now()}, "$unset": {"activo": ""}})
+
+    def request_cancel(self, job_id: str) -> Optional[dict[str, Any]]:
+        """Flag an active job for cancellation (its supervisor stops it on the next heartbeat)."""
+        from pymongo import ReturnDocument
+
+        return self._jobs.find_one_and_update(
+            {"_id": job_id, "activo": True},
+            {"$set": {"cancelar": True}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        return self._jobs.find_one({"_id": job_id})
+
+    def active(self) -> Optional[dict[str, Any]]:
+        return self._jobs.find_one({"activo": True})
+
+    def history(self, limit: int = 20) -> list[dict[str, Any]]:
+        return list(self._jobs.find({}).sort("creado", -1).limit(limit))
+
+
+def mining_watermark(db) -> Any:
+    meta = db[MONGO_METADATA_COLLECTION].find_one({"_id": "mining"}, {"ultimo_id": 1})
+    return (meta or {}).get("ultimo_id")
+
+
+def set_mining_watermark(db, last_id: Any) -> None:
+    db[MONGO_METADATA_COLLECTION].update_one(
+        {"_id": "mining"}, {"$set": {"ultimo_id": last_id, "actualizado": _now()}}, upsert=True
+    )
+
+
+def clear_mining_watermark(db) -> None:
+    db[MONGO_METADATA_COLLECTION].delete_one({"_id": "mining"})
@@ -0,0 +1,122 @@
+"""
+Adapter: process-wide trigram name index (src.utils.trigram_index) fed from the persona read
+model. The full load runs in a background thread, started by warm() (the web app calls it at
+startup); a search that arrives before it finishes waits for it. Afterwards, whenever the data
+version changes (see bump_data_version), only documents whose nombre_actualizado is recent are
+re-read (the writer stamps it on insert and rename). A rebuilt or emptied read model triggers
+a full reload, again in the background: the current index keeps answering until it is swapped.
+"""
+import threading
+from datetime import timedelta
+from typing import Any, Optional
+
+from src.constants.config import MONGO_READ_MODEL_COLLECTION
+from src.adapters.mongodb_read_model import data_version, read_model_rebuilt_at
+from src.utils.trigram_index import TrigramIndex
+
+# Re-read this much before the newest stamp seen: a bulk write stamps its documents a little
+# before they become visible
+_VISIBILITY_MARGIN = timedelta(seconds=60)
+_LOAD_BATCH = 10000
+
+
+class MongoNameIndex:
+    """Thread-safe: Flask serves requests from several threads."""
+
+    def __init__(self, db) -> None:
+        self._collection = db[MONGO_READ_MODEL_COLLECTION]
+        self._db = db
+        self._lock = threading.Lock()
+        self._index: Optional[TrigramIndex] = None
+        self._rebuilt_at: Any = None
+        self._newest: Any = None
+        self._version: Any = None
+        self._loading = False
+        # Set once a first full load has finished (successfully or not)
+        self._loaded = threading.Event()
+        self._error: Optional[Exception] = None
+
+    def warm(self) -> None:
+        """Start the first full load in a background thread (no-op if loaded or loading)."""
+        with self._lock:
+            if self._index is not None or self._loading:
+                return
+            self._loaded.clear()
+            self._start_full_load()
+
+    def search(self, term: str) -> Optional[list[Any]]:
+        """Persona _ids whose name contains every word of `term` (see TrigramIndex.search)."""
+        self.warm()
+        self._loaded.wait()
+        with self._lock:
+            if self._index is None:
+                raise RuntimeError(f"Name index not available: {self._error}")
+            self._sync()
+            return self._index.search(term)
+
+    def _start_full_load(self) -> None:
+        # Caller holds the lock
+        self._loading = True
+        threading.Thread(target=self._full_load, name="name-index-load", daemon=True).start()
+
+    def _full_load(self) -> None:
+        try:
+            # Read before scanning: changes made during the scan are caught by the next _sync
+            version = data_version(self._db)
+            rebuilt_at = read_model_rebuilt_at(self._db)
+            index = TrigramIndex()
+            newest = self._load(index, {}, None)
+            with self._lock:
+                self._index, self._newest = index, newest
+                self._version, self._rebuilt_at = version, rebuilt_at
+                self._error = None
+        except Exception as e:
+            self._error = e
+        finally:
+            with self._lock:
+                self._loading = False
+            self._loaded.set()
+
+    def _sync(self) -> None:
+        # Caller holds the lock and self._index is loaded
+        version = data_version(self._db)
+        if version == self._version:
+            return
+        rebuilt_at = read_model_rebuilt_at(self._db)
+        if rebuilt_at != self._rebuilt_at or self._collection.estimated_document_count() < len(self._index):
+            if not self._loading:
+                self._start_full_load()
+            return
+        if self._newest is not None:
+            query = {"nombre_actualizado": {"$gte": self._newest - _VISIBILITY_MARGIN}}
+        else:
+            query = {"nombre_actualizado": {"$exists": True}}
+        self._newest = self._load(self._index, query, self._newest)
+        self._version = version
+
+    def _load(self, index: TrigramIndex, query: dict[str, Any], newest: Any) -> Any:
+        """Add the matching read-model names to `index`; returns the newest nombre_actualizado seen."""
+        cursor = self._collection.find(query, {"nombre": 1, "nombre_actualizado": 1}).batch_size(_LOAD_BATCH)
+        for doc in cursor:
+            index.add(doc["_id"], doc.get("nombre") or "")
+            stamp = doc.get("nombre_actualizado")
+            if stamp is not None and (newest is None or stamp > newest):
+                newest = stamp
+        return newest
+
+
+_indexes: dict[tuple[str, str], MongoNameIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_name_index(db) -> MongoNameIndex:
+    """
+    One index per database per process (cheap until warmed or searched). Keyed by the client's
+    configuration, not the client object, since callers may open a client per request.
+    """
+    key = (repr(db.client), db.name)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = MongoNameIndex(db)
+        return index
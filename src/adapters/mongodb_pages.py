@@ -0,0 +1,118 @@
+"""
+Adapter: full-text page index.
+One document per OCR'd page (gaceta_id, page_number, text plus the gaceta's numero_gaceta,
+filename, fecha, tipo and year) in a collection with a MongoDB text index, which folds
+accents and applies Spanish stemming and stop words. ocr_processor indexes each gaceta as it
+is inserted; rebuild_page_index() indexes the whole gacetas collection server side.
+"""
+from typing import Any, Optional
+
+from src.constants.config import MONGO_COLLECTION_NAME, MONGO_PAGES_COLLECTION
+from src.adapters.mongodb_indexes import apply_indexes
+
+_GACETA_FIELDS = ("numero_gaceta", "filename", "fecha", "tipo", "year")
+# page_number of a gaceta stored without pages (its full_text); $merge keys cannot be null
+WHOLE_DOCUMENT_PAGE = 0
+# Returned by search_pages (the text is only needed to build the snippets)
+_RESULT_PROJECTION = {
+    "_id": 0,
+    **{field: 1 for field in _GACETA_FIELDS},
+    "page_number": 1,
+    "text": 1,
+    "score": {"$meta": "textScore"},
+}
+
+
+def page_documents(gaceta: dict[str, Any]) -> list[dict[str, Any]]:
+    """Page index documents of one stored gaceta (its full_text as one page if it has no pages)."""
+    header = {"gaceta_id": gaceta["_id"], **{field: gaceta.get(field) for field in _GACETA_FIELDS}}
+    pages = gaceta.get("pages") or []
+    if not pages and gaceta.get("full_text"):
+        pages = [{"page_number": WHOLE_DOCUMENT_PAGE, "text": gaceta["full_text"]}]
+    return [
+        {**header, "page_number": page.get("page_number"), "text": page.get("text", "")}
+        for page in pages
+    ]
+
+
+def index_gaceta_pages(db, gaceta: dict[str, Any]) -> int:
+    """Add (or refresh) the pages of one gaceta in the page index. Returns the pages written."""
+    from pymongo import ReplaceOne
+
+    ops = [
+        ReplaceOne({"gaceta_id": doc["gaceta_id"], "page_number": doc["page_number"]}, doc, upsert=True)
+        for doc in page_documents(gaceta)
+    ]
+    if not ops:
+        return 0
+    db[MONGO_PAGES_COLLECTION].bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+def rebuild_page_index(db) -> int:
+    """
+    Index every gaceta's pages with one server-side aggregation ($merge on the unique
+    (gaceta_id, page_number) key, so it can be re-run at any time). Returns the page count.
+    """
+    apply_indexes(db, collections=(MONGO_PAGES_COLLECTION,))
+    pipeline = [
+        {"$project": {
+            **{field: 1 for field in _GACETA_FIELDS},
+            "pages": {"$cond": [
+                {"$gt": [{"$size": {"$ifNull": ["$pages", []]}}, 0]},
+                "$pages",
+                {"$cond": [
+                    {"$gt": [{"$strLenCP": {"$ifNull": ["$full_text", ""]}}, 0]},
+                    [{"page_number": WHOLE_DOCUMENT_PAGE, "text": "$full_text"}],
+                    [],
+                ]},
+            ]},
+        }},
+        {"$unwind": "$pages"},
+        {"$project": {
+            "_id": 0,
+            "gaceta_id": "$_id",
+            **{field: f"${field}" for field in _GACETA_FIELDS},
+            "page_number": "$pages.page_number",
+            "text": {"$ifNull": ["$pages.text", ""]},
+        }},
+        {"$merge": {
+            "into": MONGO_PAGES_COLLECTION,
+            "on": ["gaceta_id", "page_number"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert",
+        }},
+    ]
+    db[MONGO_COLLECTION_NAME].aggregate(pipeline, allowDiskUse=True)
+    return db[MONGO_PAGES_COLLECTION].estimated_document_count()
+
+
+def build_page_query(text: str, year: Optional[int] = None, tipo: Optional[str] = None) -> dict[str, Any]:
+    """$text query (MongoDB syntax: "quoted phrases", -excluded words) with optional filters."""
+    query: dict[str, Any] = {"$text": {"$search": text}}
+    if year is not None:
+        query["year"] = year
+    if tipo:
+        query["tipo"] = tipo.upper()
+    return query
+
+
+def search_pages(
+    db,
+    text: str,
+    skip: int = 0,
+    limit: int = 15,
+    year: Optional[int] = None,
+    tipo: Optional[str] = None,
+) -> tuple[list[dict[str, Any]], int]:
+    """Pages matching `text`, best text score first. Returns (page documents, total matches)."""
+    coll = db[MONGO_PAGES_COLLECTION]
+    query = build_page_query(text, year, tipo)
+    cursor = (
+        coll.find(query, _RESULT_PROJECTION)
+        .sort([("score", {"$meta": "textScore"}), ("gaceta_id", -1)])
+        .skip(skip)
+        .limit(limit)
+    )
+    docs = list(cursor)
+    return docs, coll.count_documents(query)
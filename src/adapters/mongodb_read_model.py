@@ -0,0 +1,163 @@
+"""
+Adapter: denormalized persona read model (one document per persona).
+Each document mirrors a persona (same _id, cedula, nombre) and embeds its appearances
+(numero_gaceta, filename, fecha, pagina, newest gaceta first) plus total_apariciones and the
+derived search keys of src.utils.normalization, so the
+search endpoints page through it with a plain indexed find instead of $lookup pipelines.
+It is kept up to date by MongoRelationshipWriter and can be rebuilt from persona,
+persona_gaceta and gaceta at any time with rebuild_read_model().
+"""
+from datetime import datetime, timezone
+from typing import Any
+
+from src.constants.config import MONGO_METADATA_COLLECTION, MONGO_READ_MODEL_COLLECTION
+from src.adapters.mongodb_indexes import apply_indexes
+from src.utils.normalization import name_search_fields, persona_search_fields
+
+# Newest gaceta first, like the aggregation the endpoints used to run
+APARICIONES_SORT = {"numero_gaceta": -1}
+# Bumped when the document layout changes; older read models are rebuilt by the writer
+READ_MODEL_VERSION = 2
+_SEARCH_FIELDS = ("cedula_letra", "cedula_numero", "nombre_normalizado", "nombre_tokens")
+_BACKFILL_BATCH = 1000
+
+
+def aparicion(numero_gaceta: str, filename: str, fecha: str, pagina: Any) -> dict[str, Any]:
+    return {"numero_gaceta": numero_gaceta, "filename": filename, "fecha": fecha, "pagina": pagina}
+
+
+def add_apariciones_op(persona_id: Any, cedula: str, nombre: str, apariciones: list[dict[str, Any]]):
+    """Upsert that appends new appearances to a persona's document and bumps its counter."""
+    from pymongo import UpdateOne
+
+    return UpdateOne(
+        {"_id": persona_id},
+        {
+            "$setOnInsert": {
+                "cedula": cedula,
+                "nombre": nombre,
+                **persona_search_fields(cedula, nombre),
+                "nombre_actualizado": datetime.now(timezone.utc),
+            },
+            "$push": {"apariciones": {"$each": apariciones, "$sort": APARICIONES_SORT}},
+            "$inc": {"total_apariciones": len(apariciones)},
+        },
+        upsert=True,
+    )
+
+
+def rename_op(persona_id: Any, nombre: str, unknown_name: str):
+    """Same rule as the persona collection: only an unknown name is replaced."""
+    from pymongo import UpdateOne
+
+    return UpdateOne(
+        {"_id": persona_id, "nombre": unknown_name},
+        {"$set": {"nombre": nombre, **name_search_fields(nombre), "nombre_actualizado": datetime.now(timezone.utc)}},
+    )
+
+
+def read_model_is_current(db) -> bool:
+    meta = db[MONGO_METADATA_COLLECTION].find_one({"_id": "read_model"})
+    return bool(meta) and meta.get("version", 0) >= READ_MODEL_VERSION
+
+
+def mark_read_model_current(db, rebuilt: bool = False) -> None:
+    """Record the layout version (and, after a rebuild, when it happened: see mongodb_name_index)."""
+    fields: dict[str, Any] = {"version": READ_MODEL_VERSION}
+    if rebuilt:
+        fields["rebuilt_at"] = datetime.now(timezone.utc)
+    db[MONGO_METADATA_COLLECTION].update_one({"_id": "read_model"}, {"$set": fields}, upsert=True)
+
+
+def data_version(db) -> int:
+    """Bumped on every change to the searchable data (cached counts are keyed by it)."""
+    meta = db[MONGO_METADATA_COLLECTION].find_one({"_id": "read_model"}, {"data_version": 1})
+    return (meta or {}).get("data_version", 0)
+
+
+def bump_data_version(db) -> None:
+    db[MONGO_METADATA_COLLECTION].update_one({"_id": "read_model"}, {"$inc": {"data_version": 1}}, upsert=True)
+
+
+def read_model_rebuilt_at(db):
+    meta = db[MONGO_METADATA_COLLECTION].find_one({"_id": "read_model"}, {"rebuilt_at": 1})
+    return (meta or {}).get("rebuilt_at")
+
+
+def backfill_search_fields(db) -> int:
+    """Add the derived search keys to persona documents written before they existed."""
+    from pymongo import UpdateOne
+
+    coll = db["persona"]
+    updated = 0
+    ops = []
+    cursor = coll.find({"nombre_tokens": {"$exists": False}}, {"cedula": 1, "nombre": 1})
+    for doc in cursor:
+        fields = persona_search_fields(doc.get("cedula", ""), doc.get("nombre", ""))
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+        if len(ops) >= _BACKFILL_BATCH:
+            updated += coll.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += coll.bulk_write(ops, ordered=False).modified_count
+    return updated
+
+
+def rebuild_read_model(db) -> int:
+    """
+    Regenerate the whole read model from the normalized collections (server side, with $out).
+    Persona documents missing the derived search keys get them first. Returns the number of
+    persona documents written.
+    """
+    backfill_search_fields(db)
+    pipeline = [
+        {"$lookup": {
+            "from": "persona_gaceta",
+            "localField": "_id",
+            "foreignField": "persona_id",
+            "as": "relationships"
+        }},
+        {"$unwind": {"path": "$relationships", "preserveNullAndEmptyArrays": True}},
+        {"$lookup": {
+            "from": "gaceta",
+            "localField": "relationships.gaceta_id",
+            "foreignField": "_id",
+            "as": "gaceta_info"
+        }},
+        {"$unwind": {"path": "$gaceta_info", "preserveNullAndEmptyArrays": True}},
+        {"$sort": {"_id": 1, "gaceta_info.numero_gaceta": -1}},
+        {"$group": {
+            "_id": "$_id",
+            "cedula": {"$first": "$cedula"},
+            "nombre": {"$first": "$nombre"},
+            **{field: {"$first": f"${field}"} for field in _SEARCH_FIELDS},
+            "apariciones": {
+                "$push": {
+                    "numero_gaceta": "$gaceta_info.numero_gaceta",
+                    "filename": "$gaceta_info.filename",
+                    "fecha": "$gaceta_info.fecha",
+                    "pagina": "$relationships.pagina"
+                }
+            }
+        }},
+        {"$project": {
+            "cedula": 1,
+            "nombre": 1,
+            **{field: 1 for field in _SEARCH_FIELDS},
+            "apariciones": {
+                "$filter": {
+                    "input": "$apariciones",
+                    "as": "ap",
+                    "cond": {"$ne": ["$$ap.numero_gaceta", None]}
+                }
+            }
+        }},
+        {"$addFields": {"total_apariciones": {"$size": "$apariciones"}}},
+        # $out swaps the collection atomically and keeps its indexes
+        {"$out": MONGO_READ_MODEL_COLLECTION},
+    ]
+    db.persona.aggregate(pipeline, allowDiskUse=True)
+    apply_indexes(db, collections=(MONGO_READ_MODEL_COLLECTION,))
+    mark_read_model_current(db, rebuilt=True)
+    bump_data_version(db)
+    return db[MONGO_READ_MODEL_COLLECTION].estimated_document_count()
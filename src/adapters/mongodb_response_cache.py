@@ -0,0 +1,39 @@
+"""
+Adapter: response cache shared by every worker process, in a MongoDB collection. Entries
+expire through a TTL index on `expira` (see mongodb_indexes.REQUIRED_INDEXES).
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Hashable, Optional
+
+from src.constants.config import MONGO_RESPONSE_CACHE_COLLECTION
+from src.utils.response_cache import CachedResponse
+
+
+def _doc_id(key: Hashable) -> str:
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+
+class MongoResponseCache:
+    def __init__(self, db, ttl_seconds: float) -> None:
+        self._collection = db[MONGO_RESPONSE_CACHE_COLLECTION]
+        self._ttl = timedelta(seconds=ttl_seconds)
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        doc = self._collection.find_one({"_id": _doc_id(key)})
+        # The TTL monitor runs once a minute: expired entries may still be there
+        if doc is None or doc["expira"].replace(tzinfo=timezone.utc) <= datetime.now(timezone.utc):
+            return None
+        return CachedResponse(body=bytes(doc["body"]), mimetype=doc["mimetype"], etag=doc["etag"])
+
+    def put(self, key: Hashable, response: CachedResponse) -> None:
+        self._collection.replace_one(
+            {"_id": _doc_id(key)},
+            {
+                "body": response.body,
+                "mimetype": response.mimetype,
+                "etag": response.etag,
+                "expira": datetime.now(timezone.utc) + self._ttl,
+            },
+            upsert=True,
+        )
@@ -0,0 +1,248 @@
+"""
+Adapter: batched writer for the persona / gaceta / persona_gaceta collections.
+Hits are buffered and written with a few unordered bulk operations per batch; cédula ->
+persona _id and numero_gaceta -> gaceta _id are cached so known keys cost nothing after the
+first batch. MongoGacetaRepository.save_relationship is this writer with one hit per batch.
+New relationships are also appended to the persona read model (see mongodb_read_model).
+"""
+import time
+from collections import defaultdict
+from typing import Any, Optional
+
+from src.constants.config import MONGO_BULK_SIZE, MONGO_BULK_FLUSH_SECONDS, MONGO_READ_MODEL_COLLECTION
+from src.adapters.mongodb_indexes import apply_indexes
+from src.adapters.mongodb_read_model import add_apariciones_op, aparicion, bump_data_version, rename_op
+from src.utils.normalization import name_search_fields, persona_search_fields
+
+UNKNOWN_NAME = "Desconocido"
+# MongoDB duplicate key error: another upsert created the same key first
+_DUPLICATE_KEY = 11000
+
+
+class MongoRelationshipWriter:
+    """
+    Buffers (cédula, nombre, gaceta, página) hits and flushes them when `batch_size` hits are
+    pending or `flush_seconds` have passed since the last flush. Use as a context manager (or
+    call close()) so the last batch is written. A batch whose write fails stays pending and is
+    written again by the next flush (the upserts are idempotent); read-model updates that
+    fail are kept and retried the same way.
+    """
+
+    def __init__(
+        self,
+        db,
+        batch_size: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+    ) -> None:
+        self._db = db
+        self._batch_size = batch_size or MONGO_BULK_SIZE
+        self._flush_seconds = MONGO_BULK_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self._persona_ids: dict[str, Any] = {}
+        # Cédulas whose stored persona already has a real name (no update can change it)
+        self._named: set[str] = set()
+        self._gaceta_ids: dict[str, Any] = {}
+        # numero_gaceta -> (filename, fecha) as stored, for the read model
+        self._gaceta_info: dict[str, tuple[str, str]] = {}
+        # Per flush: name resolved for each cédula, and real names replacing "Desconocido"
+        self._names: dict[str, str] = {}
+        self._renamed: dict[str, str] = {}
+        self._pending: list[tuple[str, str, str, str, str, Optional[int]]] = []
+        # Read-model updates for relationships already stored, not written yet
+        self._read_ops: list = []
+        self._last_flush = time.monotonic()
+        self.saved = 0
+        # Unique keys the upserts rely on (see mongodb_indexes.REQUIRED_INDEXES)
+        apply_indexes(db, collections=("persona", "gaceta", "persona_gaceta", MONGO_READ_MODEL_COLLECTION))
+
+    def __enter__(self) -> "MongoRelationshipWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def add(self, cedula: str, nombre: str, numero_gaceta: str, filename: str, fecha: str, pagina: Optional[int]) -> bool:
+        """Queue one hit (same arguments as save_relationship). Returns True if a flush happened."""
+        self._pending.append((cedula, nombre, numero_gaceta, filename, fecha, pagina))
+        if len(self._pending) >= self._batch_size or time.monotonic() - self._last_flush >= self._flush_seconds:
+            self.flush()
+            return True
+        return False
+
+    def close(self) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        pending = self._pending
+        if pending:
+            self._renamed = {}
+            named = self._write_personas(pending)
+            self._write_gacetas(pending)
+            self._read_ops.extend(self._write_relationships(pending))
+            # Stored: only now are the hits dropped (and the renames remembered)
+            self._named |= named
+            self._pending = []
+            self.saved += len(pending)
+        self._write_read_model()
+
+    # --- persona ---
+    def _write_personas(self, pending) -> set[str]:
+        """Returns the cédulas given a real name (remembered once the whole batch is stored)."""
+        from pymongo import UpdateOne
+
+        # Same outcome as the sequential find_one/insert/update: a new persona keeps the first
+        # real name seen, and a stored "Desconocido" is replaced by the first real name.
+        names: dict[str, str] = {}
+        for cedula, nombre, *_ in pending:
+            current = names.get(cedula)
+            if current is None or (current == UNKNOWN_NAME and nombre != UNKNOWN_NAME):
+                names[cedula] = nombre
+        self._names = names
+
+        ops = []
+        # cédula of each upsert, by op index (upserted_ids is keyed by op index)
+        upsert_keys: dict[int, str] = {}
+        new_cedulas = []
+        named = set()
+        for cedula, nombre in names.items():
+            if cedula not in self._persona_ids:
+                new_cedulas.append(cedula)
+                upsert_keys[len(ops)] = cedula
+                ops.append(UpdateOne(
+                    {"cedula": cedula},
+                    {"$setOnInsert": {"cedula": cedula, "nombre": nombre, **persona_search_fields(cedula, nombre)}},
+                    upsert=True,
+                ))
+            elif cedula in self._named or nombre == UNKNOWN_NAME:
+                continue
+            if nombre != UNKNOWN_NAME:
+                ops.append(UpdateOne(
+                    {"cedula": cedula, "nombre": UNKNOWN_NAME},
+                    {"$set": {"nombre": nombre, **name_search_fields(nombre)}},
+                ))
+                named.add(cedula)
+                self._renamed[cedula] = nombre
+
+        upserted = self._bulk_write("persona", ops)
+        for op_index, persona_id in upserted.items():
+            self._persona_ids[upsert_keys[op_index]] = persona_id
+        self._resolve_ids("persona", "cedula", new_cedulas, self._persona_ids)
+        return named
+
+    # --- gaceta ---
+    def _write_gacetas(self, pending) -> None:
+        from pymongo import UpdateOne
+
+        ops = []
+        upsert_keys: dict[int, str] = {}
+        new_numeros = []
+        seen = set()
+        for _, _, numero_gaceta, filename, fecha, _ in pending:
+            if numero_gaceta in self._gaceta_ids or numero_gaceta in seen:
+                continue
+            seen.add(numero_gaceta)
+            new_numeros.append(numero_gaceta)
+            upsert_keys[len(ops)] = numero_gaceta
+            self._gaceta_info[numero_gaceta] = (filename, fecha)
+            ops.append(UpdateOne(
+                {"numero_gaceta": numero_gaceta},
+                {"$setOnInsert": {"numero_gaceta": numero_gaceta, "filename": filename, "fecha": fecha}},
+                upsert=True,
+            ))
+            # Existing gacetas only get the fields they are missing
+            for field, value in (("filename", filename), ("fecha", fecha)):
+                ops.append(UpdateOne(
+                    {"numero_gaceta": numero_gaceta, field: {"$exists": False}},
+                    {"$set": {field: value}},
+                ))
+
+        upserted = self._bulk_write("gaceta", ops)
+        for op_index, gaceta_id in upserted.items():
+            self._gaceta_ids[upsert_keys[op_index]] = gaceta_id
+        existing = self._resolve_ids("gaceta", "numero_gaceta", new_numeros, self._gaceta_ids, ("filename", "fecha"))
+        for doc in existing:
+            # Stored values win; missing ones were just filled with this batch's values
+            filename, fecha = self._gaceta_info[doc["numero_gaceta"]]
+            self._gaceta_info[doc["numero_gaceta"]] = (doc.get("filename", filename), doc.get("fecha", fecha))
+
+    # --- persona_gaceta + read model ---
+    def _write_relationships(self, pending) -> list:
+        """Write the persona_gaceta rows; returns the read-model updates for the new ones."""
+        from pymongo import UpdateOne
+
+        # One row per (persona, gaceta, página), in first-seen order
+        rows = dict.fromkeys(
+            (cedula, numero_gaceta, pagina)
+            for cedula, _, numero_gaceta, _, _, pagina in pending
+        )
+        keys = list(rows)
+        ops = []
+        for cedula, numero_gaceta, pagina in keys:
+            row = {
+                "persona_id": self._persona_ids[cedula],
+                "gaceta_id": self._gaceta_ids[numero_gaceta],
+                "pagina": pagina,
+            }
+            ops.append(UpdateOne(row, {"$setOnInsert": row}, upsert=True))
+        inserted = self._bulk_write("persona_gaceta", ops)
+
+        # Only rows that did not exist yet are new appearances
+        apariciones: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for op_index in sorted(inserted):
+            cedula, numero_gaceta, pagina = keys[op_index]
+            filename, fecha = self._gaceta_info[numero_gaceta]
+            apariciones[cedula].append(aparicion(numero_gaceta, filename, fecha, pagina))
+        read_ops = [
+            add_apariciones_op(self._persona_ids[cedula], cedula, self._names.get(cedula, UNKNOWN_NAME), items)
+            for cedula, items in apariciones.items()
+        ]
+        read_ops.extend(
+            rename_op(self._persona_ids[cedula], nombre, UNKNOWN_NAME)
+            for cedula, nombre in self._renamed.items()
+        )
+        return read_ops
+
+    def _write_read_model(self) -> None:
+        if not self._read_ops:
+            return
+        # A retry after a partly applied failure can repeat appearances; --rebuild-read-model
+        # regenerates the read model from persona_gaceta
+        self._bulk_write(MONGO_READ_MODEL_COLLECTION, self._read_ops)
+        self._read_ops = []
+        bump_data_version(self._db)
+
+    # --- helpers ---
+    def _bulk_write(self, collection: str, ops: list) -> dict[int, Any]:
+        """Unordered bulk write; returns {op index: upserted _id}. Lost upsert races are ignored."""
+        if not ops:
+            return {}
+        from pymongo.errors import BulkWriteError
+
+        try:
+            return self._db[collection].bulk_write(ops, ordered=False).upserted_ids
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(err.get("code") != _DUPLICATE_KEY for err in errors):
+                raise RuntimeError(f"Bulk write to '{collection}' failed: {errors[:3]}") from e
+            return {u["index"]: u["_id"] for u in e.details.get("upserted", [])}
+
+    def _resolve_ids(
+        self,
+        collection: str,
+        key: str,
+        values: list[str],
+        cache: dict[str, Any],
+        fields: tuple[str, ...] = (),
+    ) -> list[dict[str, Any]]:
+        """
+        Fetch the _id of keys that already existed (upserts only report the ones they created).
+        Returns those documents, with `fields` included.
+        """
+        missing = [value for value in values if value not in cache]
+        if not missing:
+            return []
+        projection = {field: 1 for field in (key, *fields)}
+        docs = list(self._db[collection].find({key: {"$in": missing}}, projection))
+        for doc in docs:
+            cache[doc[key]] = doc["_id"]
+        return docs
@@ -0,0 +1,345 @@
+"""
+Adapter: append-only page-text store read through mmap, for extraction scans without database
+round trips. Page text never changes after OCR, so it is kept as plain UTF-8 in segment files
+next to an offset index:
+
+    segments/000001.seg   page texts back to back (a new segment past PAGE_STORE_SEGMENT_BYTES)
+    index.jsonl           one line per gaceta: metadata, segment and (page, offset, length) list
+    watermark.json        last gaceta id covered by a complete extraction over this store
+
+Writes append the text (fsync) and then the index line, which is the commit record: a crash
+in between leaves unreferenced bytes at the end of a segment, never a broken gaceta. Writers
+(ocr_processor, `python -m src --build-page-store`) hold an exclusive lock on `lock` while they
+append; under it they read the index lines other writers added and take the next gaceta id
+from the last one, so ids follow append order.
+SegmentGacetaRepository memory-maps the segments read-only and decodes each page only when it
+is iterated. Worker processes map the same files, so they share one copy in the page cache.
+It implements the scan side of GacetaRepository; relationships and job stats go to the
+repository it wraps (`backing`).
+"""
+import json
+import mmap
+import os
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Optional
+
+from src.constants.config import PAGE_STORE_DIR, PAGE_STORE_SEGMENT_BYTES
+from src.adapters.mongodb_export import parse_fecha
+from src.ports.repository import GacetaDocument, GacetaFilter, GacetaPage, IdRange, split_ranges
+
+_INDEX = "index.jsonl"
+_SEGMENTS = "segments"
+_WATERMARK = "watermark.json"
+_LOCK = "lock"
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _segment_path(directory: str, segment: int) -> str:
+    return os.path.join(directory, _SEGMENTS, f"{segment:06d}.seg")
+
+
+def _read_index(directory: str, offset: int = 0) -> tuple[list[dict[str, Any]], int]:
+    """Index entries from byte `offset` on, and the offset just past the last complete line."""
+    entries = []
+    try:
+        with open(os.path.join(directory, _INDEX), "rb") as f:
+            f.seek(offset)
+            for line in f:
+                # A torn last line (crash while appending) is not committed
+                if not line.endswith(b"\n"):
+                    break
+                entries.append(json.loads(line))
+                offset += len(line)
+    except FileNotFoundError:
+        pass
+    return entries, offset
+
+
+@contextmanager
+def _exclusive(directory: str) -> Iterator[None]:
+    """Exclusive lock on the store, shared with writers in other processes."""
+    with open(os.path.join(directory, _LOCK), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _append_durably(path: str, data: bytes) -> int:
+    """Append `data` to `path` and fsync; returns the offset it was written at."""
+    with open(path, "ab") as f:
+        offset = f.tell()
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return offset
+
+
+def gaceta_record(doc: GacetaDocument) -> dict[str, Any]:
+    """A repository's GacetaDocument in the layout PageStoreWriter.add takes (date parts from fecha)."""
+    parsed = parse_fecha(doc.fecha)
+    return {
+        "filename": doc.filename,
+        "numero_gaceta": doc.numero_gaceta,
+        "fecha": doc.fecha,
+        "tipo": doc.tipo,
+        "year": doc.year if doc.year is not None else (parsed.year if parsed else None),
+        "month": parsed.month if parsed else None,
+        "day": parsed.day if parsed else None,
+        "pages": [{"page_number": page.page_number, "text": page.text} for page in doc.pages],
+        "full_text": doc.full_text,
+    }
+
+
+class PageStoreWriter:
+    """
+    Appends OCR gaceta documents (the MongoDB `gacetas` layout) to the store at `directory`.
+    Open one per run: it reads the index once and then only the lines appended since.
+    """
+
+    def __init__(self, directory: Optional[str] = None, segment_bytes: Optional[int] = None) -> None:
+        self._directory = directory or PAGE_STORE_DIR
+        self._segment_bytes = segment_bytes or PAGE_STORE_SEGMENT_BYTES
+        os.makedirs(os.path.join(self._directory, _SEGMENTS), exist_ok=True)
+        self._filenames: set[str] = set()
+        self._last_id = 0
+        self._segment = 1
+        self._index_offset = 0
+        self._catch_up()
+
+    def _catch_up(self) -> None:
+        """Take in the index lines appended since the last read (by this or another writer)."""
+        entries, self._index_offset = _read_index(self._directory, self._index_offset)
+        for entry in entries:
+            self._filenames.add(entry["filename"])
+            self._last_id = max(self._last_id, entry["id"])
+            self._segment = max(self._segment, entry["segmento"])
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._filenames
+
+    def add(self, doc: dict[str, Any]) -> bool:
+        """Append one gaceta; False (nothing written) if its filename is already stored."""
+        with _exclusive(self._directory):
+            self._catch_up()
+            if doc["filename"] in self._filenames:
+                return False
+            self._append(doc)
+            return True
+
+    def _append(self, doc: dict[str, Any]) -> None:
+        # Caller holds the store lock and has caught up with the index
+        filename = doc["filename"]
+        pages = doc.get("pages") or []
+        # Text of a gaceta without pages is stored as one page with no number (its full_text)
+        texts = [(page.get("page_number"), page.get("text") or "") for page in pages]
+        completo = not pages and bool(doc.get("full_text"))
+        if completo:
+            texts = [(None, doc["full_text"])]
+        encoded = [text.encode("utf-8") for _, text in texts]
+        blob = b"".join(encoded)
+
+        path = _segment_path(self._directory, self._segment)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size and size + len(blob) > self._segment_bytes:
+            self._segment += 1
+            path = _segment_path(self._directory, self._segment)
+        offset = _append_durably(path, blob)
+
+        paginas = []
+        for (page_number, _), data in zip(texts, encoded):
+            paginas.append([page_number, offset, len(data)])
+            offset += len(data)
+        entry = {
+            "id": self._last_id + 1,
+            **{field: doc.get(field) for field in ("filename", "numero_gaceta", "fecha", "tipo", "year", "month", "day")},
+            "segmento": self._segment,
+            "paginas": paginas,
+            "completo": completo,
+        }
+        index_path = os.path.join(self._directory, _INDEX)
+        if os.path.exists(index_path) and os.path.getsize(index_path) > self._index_offset:
+            # A torn line left by a crashed writer: drop it before appending after it
+            os.truncate(index_path, self._index_offset)
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        self._index_offset = _append_durably(index_path, line) + len(line)
+        self._filenames.add(filename)
+        self._last_id = entry["id"]
+
+    def add_many(self, docs: Iterable[dict[str, Any]]) -> int:
+        """Append the gacetas not stored yet; returns how many were written."""
+        return sum(1 for doc in docs if self.add(doc))
+
+
+def _matches(entry: dict[str, Any], filters: Optional[GacetaFilter]) -> bool:
+    """GacetaFilter semantics of the MongoDB and SQLite adapters, over one index entry."""
+    if filters is None:
+        return True
+    if filters.year is not None and entry.get("year") != filters.year:
+        return False
+    if filters.tipo and entry.get("tipo") != filters.tipo.upper():
+        return False
+    if filters.date_from is not None or filters.date_to is not None:
+        parts = (entry.get("year"), entry.get("month"), entry.get("day"))
+        if None in parts:
+            return False
+        if filters.date_from is not None and parts < (filters.date_from.year, filters.date_from.month, filters.date_from.day):
+            return False
+        if filters.date_to is not None and parts > (filters.date_to.year, filters.date_to.month, filters.date_to.day):
+            return False
+    if filters.id_min is not None and entry["id"] < filters.id_min:
+        return False
+    if filters.id_max is not None and entry["id"] > filters.id_max:
+        return False
+    return True
+
+
+class _MappedPages:
+    """Pages of one gaceta inside a mapped segment; each text is decoded only when iterated."""
+
+    __slots__ = ("_segment", "_pages")
+
+    def __init__(self, segment: mmap.mmap, pages: list[list]) -> None:
+        self._segment = segment
+        self._pages = pages
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def __iter__(self) -> Iterator[GacetaPage]:
+        view = memoryview(self._segment)
+        try:
+            for page_number, offset, length in self._pages:
+                # Decoded straight from the mapping: no intermediate bytes copy
+                yield GacetaPage(page_number=page_number, text=str(view[offset:offset + length], "utf-8"))
+        finally:
+            view.release()
+
+
+class SegmentGacetaRepository:
+    """Scans gacetas from the page store at `directory`; see the module docstring."""
+
+    def __init__(self, directory: Optional[str] = None, backing: Any = None) -> None:
+        self._directory = directory or PAGE_STORE_DIR
+        self._backing = backing
+        self._entries: list[dict[str, Any]] = []
+        self._index_size = -1
+        self._maps: dict[int, mmap.mmap] = {}
+
+    def _index(self) -> list[dict[str, Any]]:
+        """Index entries, re-read whenever the index file grew (appends since the last scan)."""
+        try:
+            size = os.path.getsize(os.path.join(self._directory, _INDEX))
+        except OSError:
+            size = 0
+        if size != self._index_size:
+            self._entries, _ = _read_index(self._directory)
+            self._index_size = size
+        return self._entries
+
+    def _segment(self, segment: int, end: int) -> mmap.mmap:
+        """Mapping of a segment that covers at least `end` bytes (remapped if it grew)."""
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            with open(_segment_path(self._directory, segment), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            # An older, shorter mapping is left to the garbage collector: pages still hold it
+            self._maps[segment] = mapped
+        return mapped
+
+    def _select(self, filters: Optional[GacetaFilter], id_range: Optional[IdRange] = None) -> Iterator[dict[str, Any]]:
+        for entry in self._index():
+            if id_range is not None and not id_range[0] <= entry["id"] <= id_range[1]:
+                continue
+            if _matches(entry, filters):
+                yield entry
+
+    def count(self, filters: Optional[GacetaFilter] = None) -> int:
+        return sum(1 for _ in self._select(filters))
+
+    def iter_gacetas(
+        self,
+        limit: Optional[int] = None,
+        id_range: Optional[IdRange] = None,
+        filters: Optional[GacetaFilter] = None,
+    ) -> Iterator[GacetaDocument]:
+        for index, entry in enumerate(self._select(filters, id_range)):
+            if limit is not None and index >= limit:
+                return
+            pages = entry["paginas"]
+            end = max((offset + length for _, offset, length in pages), default=0)
+            segment = self._segment(entry["segmento"], end) if end else b""
+            full_text = ""
+            if entry.get("completo"):
+                _, offset, length = pages[0]
+                full_text = str(memoryview(segment)[offset:offset + length], "utf-8")
+                pages = []
+            yield GacetaDocument(
+                filename=entry["filename"],
+                numero_gaceta=entry.get("numero_gaceta") or "",
+                fecha=entry.get("fecha") or "",
+                year=entry.get("year"),
+                pages=_MappedPages(segment, pages),
+                full_text=full_text,
+                tipo=entry.get("tipo") or "",
+            )
+
+    def partition(
+        self,
+        parts: int,
+        limit: Optional[int] = None,
+        filters: Optional[GacetaFilter] = None,
+    ) -> list[IdRange]:
+        ids = [entry["id"] for entry in self._select(filters)]
+        return split_ranges(ids[:limit] if limit is not None else ids, parts)
+
+    def last_gaceta_id(self) -> Any:
+        entries = self._index()
+        return entries[-1]["id"] if entries else None
+
+    def mining_watermark(self) -> Any:
+        """id of the last gaceta covered by a complete extraction over this store (None if never)."""
+        try:
+            with open(os.path.join(self._directory, _WATERMARK), "r", encoding="utf-8") as f:
+                return json.load(f).get("ultimo_id")
+        except (OSError, ValueError):
+            return None
+
+    def set_mining_watermark(self, last_id: Any) -> None:
+        path = os.path.join(self._directory, _WATERMARK)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"ultimo_id": last_id}, f)
+        os.replace(path + ".tmp", path)
+
+    # Writes go to the wrapped repository
+
+    def relationship_writer(self, batch_size: Optional[int] = None, flush_seconds: Optional[float] = None):
+        return self._require_backing().relationship_writer(batch_size, flush_seconds)
+
+    def save_relationship(self, *args, **kwargs):
+        return self._require_backing().save_relationship(*args, **kwargs)
+
+    def record_job_stats(self, job_id: str, stats: dict[str, Any]) -> None:
+        self._require_backing().record_job_stats(job_id, stats)
+
+    def gaceta_metadata(self) -> dict[str, dict[str, Any]]:
+        return self._require_backing().gaceta_metadata()
+
+    def _require_backing(self):
+        if self._backing is None:
+            raise RuntimeError("Page store opened without a backing repository: it only scans gacetas")
+        return self._backing
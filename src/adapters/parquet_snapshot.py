@@ -0,0 +1,271 @@
+"""
+Adapter: columnar (Parquet) snapshot of the extraction results, for offline analytics.
+Layout under the snapshot root, hive-partitioned by year so Arrow/pandas/DuckDB/Spark can
+prune partitions:
+
+    hits/year=2021/part-<stamp>.parquet     one row per cédula hit
+    gacetas/year=2021/part-<stamp>.parquet  one row per gaceta
+    _manifest.json                          gacetas (filenames) already in the snapshot
+
+Appends are incremental: a gaceta already listed in the manifest is never written again, so
+each run only adds new part files. Strings are dictionary-encoded and the cédula is split
+into its letter and an integer number (plus digit count, to restore leading zeros).
+Hits written from an extraction run (append_hits) carry their character offsets in the page
+text; hits taken from the read model (snapshot_from_mongo) have null offsets.
+pyarrow is only needed here and is not in requirements.txt: `pip install pyarrow`.
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from src.constants.config import MONGO_COLLECTION_NAME, MONGO_EXPORT_BATCH_SIZE, MONGO_READ_MODEL_COLLECTION
+from src.constants.search import SNAPSHOT_ROWS_PER_FILE
+from src.adapters.mongodb_export import parse_fecha
+from src.adapters.mongodb_jobs import mining_watermark
+from src.utils.hits import CedulaHits
+from src.utils.normalization import split_cedula
+
+_MANIFEST = "_manifest.json"
+_NO_YEAR = 0
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("pyarrow not installed. pip install pyarrow") from e
+    return pyarrow
+
+
+def hit_schema():
+    pa = _pyarrow()
+    text = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("cedula_letra", pa.dictionary(pa.int8(), pa.string())),
+        ("cedula_numero", pa.uint64()),
+        ("cedula_digitos", pa.uint8()),
+        ("nombre", text),
+        ("numero_gaceta", text),
+        ("filename", text),
+        ("fecha", pa.date32()),
+        ("tipo", pa.dictionary(pa.int8(), pa.string())),
+        ("pagina", pa.int32()),
+        ("inicio", pa.uint32()),
+        ("fin", pa.uint32()),
+        ("nombre_inicio", pa.uint32()),
+        ("nombre_fin", pa.uint32()),
+    ])
+
+
+def gaceta_schema():
+    pa = _pyarrow()
+    return pa.schema([
+        ("filename", pa.string()),
+        ("numero_gaceta", pa.string()),
+        ("fecha", pa.date32()),
+        ("tipo", pa.dictionary(pa.int8(), pa.string())),
+        ("paginas", pa.int32()),
+    ])
+
+
+def _year_of(meta: Optional[dict[str, Any]], fecha: Any) -> int:
+    if meta and meta.get("year"):
+        return int(meta["year"])
+    parsed = parse_fecha(fecha)
+    return parsed.year if parsed else _NO_YEAR
+
+
+class _PartitionedWriter:
+    """Buffers rows per year and writes a part file whenever a year reaches `rows_per_file`."""
+
+    def __init__(self, directory: Path, schema, rows_per_file: int) -> None:
+        self._directory = directory
+        self._schema = schema
+        self._rows_per_file = rows_per_file
+        self._buffers: dict[int, dict[str, list]] = {}
+        self.rows = 0
+        self.files: list[Path] = []
+
+    def add(self, year: int, row: dict[str, Any]) -> None:
+        buffer = self._buffers.get(year)
+        if buffer is None:
+            buffer = self._buffers[year] = {name: [] for name in self._schema.names}
+        for name, column in buffer.items():
+            column.append(row.get(name))
+        self.rows += 1
+        if len(buffer[self._schema.names[0]]) >= self._rows_per_file:
+            self._flush(year)
+
+    def close(self) -> None:
+        for year in list(self._buffers):
+            self._flush(year)
+
+    def _flush(self, year: int) -> None:
+        pa = _pyarrow()
+        buffer = self._buffers.pop(year)
+        table = pa.Table.from_pydict(buffer, schema=self._schema)
+        partition = self._directory / f"year={year}"
+        partition.mkdir(parents=True, exist_ok=True)
+        path = partition / f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        pa.parquet.write_table(table, path, compression="zstd", use_dictionary=True)
+        self.files.append(path)
+
+
+class ParquetSnapshot:
+    def __init__(self, root: str | os.PathLike, rows_per_file: int = SNAPSHOT_ROWS_PER_FILE) -> None:
+        self.root = Path(root)
+        self._rows_per_file = rows_per_file
+
+    def known_gacetas(self) -> set[str]:
+        try:
+            with open(self.root / _MANIFEST, encoding="utf-8") as f:
+                return set(json.load(f)["gacetas"])
+        except FileNotFoundError:
+            return set()
+
+    def clear(self) -> None:
+        """Drop the whole snapshot (hits, gacetas and manifest)."""
+        for name in ("hits", "gacetas"):
+            shutil.rmtree(self.root / name, ignore_errors=True)
+        (self.root / _MANIFEST).unlink(missing_ok=True)
+
+    def append(self, hit_rows: Iterable[tuple[int, dict[str, Any]]], gaceta_rows: Iterable[tuple[int, dict[str, Any]]]) -> tuple[int, int]:
+        """
+        Write (year, row) pairs as new part files and record their gacetas in the manifest.
+        The manifest is replaced last, so an interrupted append is simply redone next time
+        (at worst leaving orphan part files of gacetas it does not list).
+        """
+        hits = _PartitionedWriter(self.root / "hits", hit_schema(), self._rows_per_file)
+        gacetas = _PartitionedWriter(self.root / "gacetas", gaceta_schema(), self._rows_per_file)
+        written = set()
+        for year, row in gaceta_rows:
+            gacetas.add(year, row)
+            written.add(row["filename"])
+        for year, row in hit_rows:
+            hits.add(year, row)
+        hits.close()
+        gacetas.close()
+        if written:
+            self.root.mkdir(parents=True, exist_ok=True)
+            manifest = self.root / _MANIFEST
+            tmp = manifest.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"gacetas": sorted(self.known_gacetas() | written)}, f)
+            os.replace(tmp, manifest)
+        return hits.rows, gacetas.rows
+
+    def append_hits(self, results: CedulaHits, gacetas_meta: dict[str, dict[str, Any]]) -> tuple[int, int]:
+        """Hits of an extraction run (with offsets), for the gacetas not yet in the snapshot."""
+        known = self.known_gacetas()
+        scanned = {gaceta[0] for gaceta in results.gacetas}
+        new = {
+            filename: meta for filename, meta in gacetas_meta.items()
+            if filename in scanned and filename not in known
+        }
+        return self.append(_run_hit_rows(results, new), _gaceta_rows(new))
+
+
+def _gaceta_rows(gacetas_meta: dict[str, dict[str, Any]]) -> Iterator[tuple[int, dict[str, Any]]]:
+    for filename, meta in gacetas_meta.items():
+        yield _year_of(meta, meta.get("fecha")), {
+            "filename": filename,
+            "numero_gaceta": meta.get("numero_gaceta"),
+            "fecha": parse_fecha(meta.get("fecha")),
+            "tipo": meta.get("tipo") or None,
+            "paginas": meta.get("total_pages"),
+        }
+
+
+def _run_hit_rows(results: CedulaHits, new: dict[str, dict[str, Any]]) -> Iterator[tuple[int, dict[str, Any]]]:
+    for hit in results:
+        meta = new.get(hit.gaceta)
+        if meta is None:
+            continue
+        number = hit.number
+        span = hit.name_span
+        yield _year_of(meta, hit.fecha), {
+            "cedula_letra": hit.letter,
+            # OCR noise longer than a 64-bit integer keeps no number
+            "cedula_numero": int(number) if number.isdigit() and len(number) <= 19 else None,
+            "cedula_digitos": min(len(number), 255),
+            "nombre": hit.nombre,
+            "numero_gaceta": hit.numero_gaceta,
+            "filename": hit.gaceta,
+            "fecha": parse_fecha(hit.fecha),
+            "tipo": meta.get("tipo") or None,
+            "pagina": hit.page_number,
+            "inicio": hit.start,
+            "fin": hit.end,
+            "nombre_inicio": span[0] if span else None,
+            "nombre_fin": span[1] if span else None,
+        }
+
+
+def _read_model_hit_rows(personas: Iterable[dict[str, Any]], new: dict[str, dict[str, Any]]) -> Iterator[tuple[int, dict[str, Any]]]:
+    for persona in personas:
+        cedula = persona.get("cedula", "")
+        letra, numero = split_cedula(cedula)
+        # Stored cédulas are homologated ("V-0123456"): the digits keep their leading zeros
+        digitos = sum(c.isdigit() for c in cedula)
+        for ap in persona.get("apariciones", []):
+            meta = new.get(ap.get("filename"))
+            if meta is None:
+                continue
+            yield _year_of(meta, ap.get("fecha")), {
+                "cedula_letra": letra or None,
+                "cedula_numero": numero,
+                "cedula_digitos": min(digitos, 255) if numero is not None else None,
+                "nombre": persona.get("nombre"),
+                "numero_gaceta": ap.get("numero_gaceta"),
+                "filename": ap.get("filename"),
+                "fecha": parse_fecha(ap.get("fecha")),
+                "tipo": meta.get("tipo") or None,
+                "pagina": ap.get("pagina"),
+            }
+
+
+def gaceta_metadata(db, query: Optional[dict[str, Any]] = None) -> dict[str, dict[str, Any]]:
+    """filename -> numero_gaceta, fecha, year, tipo, total_pages of every OCR'd gaceta (no text)."""
+    projection = {"_id": 0, "filename": 1, "numero_gaceta": 1, "fecha": 1, "year": 1, "tipo": 1, "total_pages": 1}
+    return {
+        doc["filename"]: doc
+        for doc in db[MONGO_COLLECTION_NAME].find(query or {}, projection, batch_size=MONGO_EXPORT_BATCH_SIZE)
+        if doc.get("filename")
+    }
+
+
+def extracted_gaceta_metadata(db) -> dict[str, dict[str, Any]]:
+    """
+    gaceta_metadata of the gacetas an extraction already covered: those up to the mining
+    watermark (a complete run) plus those with relationships (e.g. from a filtered run).
+    A gaceta OCR'd but not extracted yet is left out, so it is not recorded with no hits.
+    """
+    with_hits = [filename for filename in db["gaceta"].distinct("filename") if filename]
+    conditions: list[dict[str, Any]] = [{"filename": {"$in": with_hits}}]
+    watermark = mining_watermark(db)
+    if watermark is not None:
+        conditions.append({"_id": {"$lte": watermark}})
+    return gaceta_metadata(db, {"$or": conditions})
+
+
+def snapshot_from_mongo(db, snapshot: ParquetSnapshot) -> tuple[int, int]:
+    """
+    Append every extracted gaceta not yet in the snapshot (see extracted_gaceta_metadata), with
+    its hits taken from the read model (one sequential scan, no $lookup). Returns (hits
+    written, gacetas written).
+    """
+    known = snapshot.known_gacetas()
+    new = {filename: meta for filename, meta in extracted_gaceta_metadata(db).items() if filename not in known}
+    if not new:
+        return 0, 0
+    projection = {"cedula": 1, "nombre": 1, "apariciones": 1}
+    cursor = db[MONGO_READ_MODEL_COLLECTION].find({}, projection, batch_size=MONGO_EXPORT_BATCH_SIZE)
+    try:
+        return snapshot.append(_read_model_hit_rows(cursor, new), _gaceta_rows(new))
+    finally:
+        cursor.close()
@@ -0,0 +1,65 @@
+"""
+Adapter: single pages of the gaceta PDFs, through poppler (the tools pdf2image already drives
+for the OCR): `pdfseparate` cuts one page out as a standalone PDF, and pdf2image renders one
+page to an image. Only the requested page is processed, never the whole document.
+"""
+import io
+import os
+import subprocess
+import tempfile
+from typing import Optional
+
+# Pillow format names of the preview formats
+IMAGE_FORMATS = {"png": "PNG", "webp": "WEBP"}
+# Rendering resolution before scaling to the requested width (enough for 2000 px previews)
+_RENDER_DPI = 150
+
+
+def page_count(pdf_path: str) -> int:
+    try:
+        from pdf2image import pdfinfo_from_path
+    except ImportError as e:
+        raise RuntimeError("pdf2image not installed. pip install pdf2image") from e
+    try:
+        return int(pdfinfo_from_path(pdf_path)["Pages"])
+    except Exception as e:
+        raise RuntimeError(f"Cannot read {os.path.basename(pdf_path)} (is poppler installed?): {e}") from e
+
+
+def extract_page_pdf(pdf_path: str, page: int) -> bytes:
+    """Page `page` (1-based) as a standalone PDF."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "page.pdf")
+        try:
+            subprocess.run(
+                ["pdfseparate", "-f", str(page), "-l", str(page), pdf_path, out],
+                check=True,
+                capture_output=True,
+                timeout=60,
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError("pdfseparate not found: install poppler-utils") from e
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"pdfseparate failed: {e.stderr.decode(errors='replace').strip()}") from e
+        except subprocess.TimeoutExpired as e:
+            raise RuntimeError(f"pdfseparate timed out after {e.timeout:g} s") from e
+        with open(out, "rb") as f:
+            return f.read()
+
+
+def render_page(pdf_path: str, page: int, width: int, fmt: str, quality: Optional[int] = 80) -> bytes:
+    """Page `page` (1-based) as a PNG/WebP image `width` pixels wide."""
+    try:
+        from pdf2image import convert_from_path
+    except ImportError as e:
+        raise RuntimeError("pdf2image not installed. pip install pdf2image") from e
+    try:
+        images = convert_from_path(pdf_path, dpi=_RENDER_DPI, first_page=page, last_page=page, size=(width, None))
+    except Exception as e:
+        raise RuntimeError(f"Cannot render page {page} of {os.path.basename(pdf_path)}: {e}") from e
+    if not images:
+        raise RuntimeError(f"Page {page} of {os.path.basename(pdf_path)} rendered nothing")
+    buffer = io.BytesIO()
+    options = {"quality": quality} if fmt == "webp" and quality else {"optimize": True}
+    images[0].save(buffer, format=IMAGE_FORMATS[fmt], **options)
+    return buffer.getvalue()
@@ -0,0 +1,494 @@
+"""
+Adapter: SQLite implementation of GacetaRepository, for single-node deployments (one file, no
+server). Selected with REPOSITORY_BACKEND=sqlite; `python -m src --migrate-sqlite` copies a
+MongoDB store into it (see sqlite_migration).
+Gacetas and their pages live in normalized tables (gacetas, paginas) and the page text has an
+FTS5 index (paginas_fts, accents folded; no stemming, unlike the MongoDB text index). The
+relationship tables mirror the MongoDB collections: persona, gaceta and persona_gaceta.
+The database runs in WAL mode, so readers (e.g. extraction workers) never wait for the writer,
+and every write goes through bulk transactions.
+"""
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from itertools import groupby
+from typing import Any, Iterable, Iterator, Optional
+
+from src.constants.config import SQLITE_BULK_SIZE, SQLITE_IMPORT_BATCH_SIZE, SQLITE_PATH, MONGO_BULK_FLUSH_SECONDS
+from src.ports.repository import GacetaDocument, GacetaFilter, GacetaPage, IdRange, split_ranges
+from src.utils.normalization import split_cedula
+
+UNKNOWN_NAME = "Desconocido"
+# page_number of search results taken from a gaceta's full_text (as in mongodb_pages)
+WHOLE_DOCUMENT_PAGE = 0
+# Rows fetched per step when scanning
+_SCAN_ARRAYSIZE = 256
+_WATERMARK_KEY = "mining_watermark"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gacetas (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE,
+    numero_gaceta TEXT NOT NULL DEFAULT '',
+    fecha TEXT NOT NULL DEFAULT '',
+    tipo TEXT NOT NULL DEFAULT '',
+    year INTEGER,
+    month INTEGER,
+    day INTEGER,
+    total_pages INTEGER,
+    file_path TEXT,
+    processed_at TEXT,
+    -- Only kept for gacetas without per-page text
+    full_text TEXT
+);
+CREATE INDEX IF NOT EXISTS gacetas_fecha ON gacetas (year, month, day);
+CREATE INDEX IF NOT EXISTS gacetas_tipo ON gacetas (tipo);
+
+CREATE TABLE IF NOT EXISTS paginas (
+    id INTEGER PRIMARY KEY,
+    gaceta_id INTEGER NOT NULL REFERENCES gacetas (id),
+    page_number INTEGER,
+    text TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS paginas_gaceta ON paginas (gaceta_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS paginas_fts USING fts5 (
+    text, content='paginas', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS paginas_ai AFTER INSERT ON paginas BEGIN
+    INSERT INTO paginas_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS paginas_ad AFTER DELETE ON paginas BEGIN
+    INSERT INTO paginas_fts (paginas_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+-- The full_text of a gaceta without pages is indexed too, under rowid -id (page WHOLE_DOCUMENT_PAGE)
+CREATE TRIGGER IF NOT EXISTS gacetas_ai AFTER INSERT ON gacetas WHEN new.full_text IS NOT NULL BEGIN
+    INSERT INTO paginas_fts (rowid, text) VALUES (-new.id, new.full_text);
+END;
+CREATE TRIGGER IF NOT EXISTS gacetas_au AFTER UPDATE OF full_text ON gacetas BEGIN
+    INSERT INTO paginas_fts (paginas_fts, rowid, text) SELECT 'delete', -old.id, old.full_text WHERE old.full_text IS NOT NULL;
+    INSERT INTO paginas_fts (rowid, text) SELECT -new.id, new.full_text WHERE new.full_text IS NOT NULL;
+END;
+
+CREATE TABLE IF NOT EXISTS persona (
+    id INTEGER PRIMARY KEY,
+    cedula TEXT NOT NULL UNIQUE,
+    nombre TEXT NOT NULL,
+    cedula_letra TEXT,
+    cedula_numero INTEGER
+);
+CREATE INDEX IF NOT EXISTS persona_cedula_numero ON persona (cedula_letra, cedula_numero);
+
+CREATE TABLE IF NOT EXISTS gaceta (
+    id INTEGER PRIMARY KEY,
+    numero_gaceta TEXT NOT NULL UNIQUE,
+    filename TEXT,
+    fecha TEXT
+);
+
+CREATE TABLE IF NOT EXISTS persona_gaceta (
+    id INTEGER PRIMARY KEY,
+    persona_id INTEGER NOT NULL REFERENCES persona (id),
+    gaceta_id INTEGER NOT NULL REFERENCES gaceta (id),
+    pagina INTEGER
+);
+-- A NULL pagina would make every row distinct: compare it as -1
+CREATE UNIQUE INDEX IF NOT EXISTS persona_gaceta_unique ON persona_gaceta (persona_id, gaceta_id, IFNULL(pagina, -1));
+CREATE INDEX IF NOT EXISTS persona_gaceta_gaceta ON persona_gaceta (gaceta_id);
+
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_GACETA_COLUMNS = (
+    "filename", "numero_gaceta", "fecha", "tipo", "year", "month", "day",
+    "total_pages", "file_path", "processed_at", "full_text",
+)
+_UPSERT_GACETA = (
+    f"INSERT INTO gacetas ({', '.join(_GACETA_COLUMNS)}) VALUES ({', '.join('?' * len(_GACETA_COLUMNS))}) "
+    "ON CONFLICT (filename) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in _GACETA_COLUMNS[1:])
+    + " RETURNING id"
+)
+# A real name replaces "Desconocido", never the other way round (as in MongoRelationshipWriter)
+_UPSERT_PERSONA = (
+    "INSERT INTO persona (cedula, nombre, cedula_letra, cedula_numero) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (cedula) DO UPDATE SET nombre = excluded.nombre "
+    f"WHERE persona.nombre = '{UNKNOWN_NAME}' AND excluded.nombre != '{UNKNOWN_NAME}'"
+)
+# filename / fecha are only filled in when missing
+_UPSERT_GACETA_META = (
+    "INSERT INTO gaceta (numero_gaceta, filename, fecha) VALUES (?, ?, ?) "
+    "ON CONFLICT (numero_gaceta) DO UPDATE SET "
+    "filename = IFNULL(gaceta.filename, excluded.filename), fecha = IFNULL(gaceta.fecha, excluded.fecha)"
+)
+_INSERT_RELATIONSHIP = (
+    "INSERT OR IGNORE INTO persona_gaceta (persona_id, gaceta_id, pagina) "
+    "SELECT persona.id, gaceta.id, ? FROM persona, gaceta WHERE persona.cedula = ? AND gaceta.numero_gaceta = ?"
+)
+
+
+def build_gaceta_where(filters: Optional[GacetaFilter] = None, id_range: Optional[IdRange] = None) -> tuple[str, list[Any]]:
+    """WHERE clause (with its parameters) over the gacetas table for a GacetaFilter and id slice."""
+    conditions: list[str] = []
+    params: list[Any] = []
+    if filters is not None:
+        if filters.year is not None:
+            conditions.append("year = ?")
+            params.append(filters.year)
+        if filters.tipo:
+            conditions.append("tipo = ?")
+            params.append(filters.tipo.upper())
+        # Row values compare lexicographically, like _date_bound in the MongoDB adapter
+        if filters.date_from is not None:
+            conditions.append("(year, month, day) >= (?, ?, ?)")
+            params.extend((filters.date_from.year, filters.date_from.month, filters.date_from.day))
+        if filters.date_to is not None:
+            conditions.append("(year, month, day) <= (?, ?, ?)")
+            params.extend((filters.date_to.year, filters.date_to.month, filters.date_to.day))
+        if filters.id_min is not None:
+            conditions.append("id >= ?")
+            params.append(filters.id_min)
+        if filters.id_max is not None:
+            conditions.append("id <= ?")
+            params.append(filters.id_max)
+    if id_range is not None:
+        conditions.append("id BETWEEN ? AND ?")
+        params.extend(id_range)
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+_SEARCH_TERM_RE = re.compile(r'(-?)"([^"]*)"|(-?)(\S+)')
+
+
+def build_fts_query(text: str) -> Optional[str]:
+    """
+    MongoDB $text syntax as an FTS5 query: "quoted phrases" are all required, plain words match
+    any of them (when there are no phrases) and -words exclude. None if nothing is searchable.
+    """
+    phrases, words, excluded = [], [], []
+    for m in _SEARCH_TERM_RE.finditer(text or ""):
+        negated, value = (m.group(1), m.group(2)) if m.group(2) is not None else (m.group(3), m.group(4))
+        value = value.replace('"', " ").strip()
+        if not value:
+            continue
+        quoted = f'"{value}"'
+        if negated:
+            excluded.append(quoted)
+        elif m.group(2) is not None:
+            phrases.append(quoted)
+        else:
+            words.append(quoted)
+    if phrases:
+        query = " AND ".join(phrases)
+    elif words:
+        query = " OR ".join(words)
+    else:
+        return None
+    if excluded:
+        query = f"({query})" + "".join(f" NOT {term}" for term in excluded)
+    return query
+
+
+def _gaceta_row(doc: dict[str, Any], has_pages: bool) -> tuple:
+    """Values of _GACETA_COLUMNS for one OCR gaceta document."""
+    processed_at = doc.get("processed_at")
+    return (
+        doc.get("filename"),
+        doc.get("numero_gaceta") or "",
+        doc.get("fecha") or "",
+        doc.get("tipo") or "",
+        doc.get("year"),
+        doc.get("month"),
+        doc.get("day"),
+        doc.get("total_pages"),
+        doc.get("file_path"),
+        None if processed_at is None else str(processed_at),
+        None if has_pages else doc.get("full_text"),
+    )
+
+
+class SqliteGacetaRepository:
+    """Reads gacetas and saves relationships in one SQLite file."""
+
+    def __init__(self, path: Optional[str] = None, batch_size: Optional[int] = None) -> None:
+        self._path = path or SQLITE_PATH
+        self._arraysize = batch_size or _SCAN_ARRAYSIZE
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _ensure_connected(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        try:
+            directory = os.path.dirname(os.path.abspath(self._path))
+            os.makedirs(directory, exist_ok=True)
+            # Autocommit: transactions are opened explicitly (see _transaction)
+            conn = sqlite3.connect(self._path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode = WAL")
+            # Durable at checkpoints only: a crash loses at most the last transactions, never the file
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise RuntimeError(f"Cannot open SQLite database {self._path}: {e}") from e
+        self._conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._ensure_connected()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def count(self, filters: Optional[GacetaFilter] = None) -> int:
+        conn = self._ensure_connected()
+        where, params = build_gaceta_where(filters)
+        return conn.execute(f"SELECT COUNT(*) FROM gacetas{where}", params).fetchone()[0]
+
+    def iter_gacetas(
+        self,
+        limit: Optional[int] = None,
+        id_range: Optional[IdRange] = None,
+        filters: Optional[GacetaFilter] = None,
+    ) -> Iterator[GacetaDocument]:
+        conn = self._ensure_connected()
+        where, params = build_gaceta_where(filters, id_range)
+        if limit is not None:
+            where += " ORDER BY id LIMIT ?"
+            params.append(limit)
+        # One ordered scan: each gaceta followed by its pages (full_text only when it has none)
+        cursor = conn.cursor()
+        cursor.arraysize = self._arraysize
+        cursor.execute(
+            "SELECT g.id, g.filename, g.numero_gaceta, g.fecha, g.year, g.tipo, p.page_number, p.text, "
+            "CASE WHEN p.id IS NULL THEN g.full_text END "
+            f"FROM (SELECT * FROM gacetas{where}) AS g LEFT JOIN paginas AS p ON p.gaceta_id = g.id "
+            "ORDER BY g.id, p.id",
+            params,
+        )
+        for _, rows in groupby(cursor, key=lambda row: row[0]):
+            rows = list(rows)
+            first = rows[0]
+            yield GacetaDocument(
+                filename=first[1],
+                numero_gaceta=first[2],
+                fecha=first[3],
+                year=first[4],
+                pages=[GacetaPage(page_number=row[6], text=row[7] or "") for row in rows if row[7] is not None],
+                full_text=first[8] or "",
+                tipo=first[5],
+            )
+
+    def partition(
+        self,
+        parts: int,
+        limit: Optional[int] = None,
+        filters: Optional[GacetaFilter] = None,
+    ) -> list[IdRange]:
+        conn = self._ensure_connected()
+        where, params = build_gaceta_where(filters)
+        sql = f"SELECT id FROM gacetas{where} ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return split_ranges([row[0] for row in conn.execute(sql, params)], parts)
+
+    def add_gacetas(self, docs: Iterable[dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """
+        Insert or replace OCR gaceta documents (the MongoDB `gacetas` layout, keyed by filename),
+        `batch_size` gacetas per transaction. Returns the number written.
+        """
+        batch_size = batch_size or SQLITE_IMPORT_BATCH_SIZE
+        written = 0
+        batch: list[dict[str, Any]] = []
+        for doc in docs:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                written += self._write_gacetas(batch)
+                batch = []
+        if batch:
+            written += self._write_gacetas(batch)
+        return written
+
+    def _write_gacetas(self, docs: list[dict[str, Any]]) -> int:
+        with self._transaction() as conn:
+            for doc in docs:
+                pages = doc.get("pages") or []
+                gaceta_id = conn.execute(_UPSERT_GACETA, _gaceta_row(doc, bool(pages))).fetchone()[0]
+                conn.execute("DELETE FROM paginas WHERE gaceta_id = ?", (gaceta_id,))
+                conn.executemany(
+                    "INSERT INTO paginas (gaceta_id, page_number, text) VALUES (?, ?, ?)",
+                    [(gaceta_id, page.get("page_number"), page.get("text") or "") for page in pages],
+                )
+        return len(docs)
+
+    def search_pages(
+        self,
+        text: str,
+        skip: int = 0,
+        limit: int = 15,
+        year: Optional[int] = None,
+        tipo: Optional[str] = None,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Pages matching `text` (MongoDB $text syntax), best first; same result as mongodb_pages.search_pages."""
+        conn = self._ensure_connected()
+        query = build_fts_query(text)
+        if query is None:
+            return [], 0
+        where = "WHERE paginas_fts MATCH ?"
+        params: list[Any] = [query]
+        if year is not None:
+            where += " AND g.year = ?"
+            params.append(year)
+        if tipo:
+            where += " AND g.tipo = ?"
+            params.append(tipo.upper())
+        joins = (
+            "FROM paginas_fts LEFT JOIN paginas AS p ON p.id = paginas_fts.rowid "
+            "JOIN gacetas AS g ON g.id = IFNULL(p.gaceta_id, -paginas_fts.rowid)"
+        )
+        rows = conn.execute(
+            "SELECT g.numero_gaceta, g.filename, g.fecha, g.tipo, g.year, "
+            f"IFNULL(p.page_number, {WHOLE_DOCUMENT_PAGE}), IFNULL(p.text, g.full_text), -bm25(paginas_fts) "
+            f"{joins} {where} ORDER BY bm25(paginas_fts), g.id DESC LIMIT ? OFFSET ?",
+            params + [limit, skip],
+        ).fetchall()
+        total = conn.execute(f"SELECT COUNT(*) {joins} {where}", params).fetchone()[0]
+        fields = ("numero_gaceta", "filename", "fecha", "tipo", "year", "page_number", "text", "score")
+        return [dict(zip(fields, row)) for row in rows], total
+
+    def relationship_writer(
+        self,
+        batch_size: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+    ) -> "SqliteRelationshipWriter":
+        """Batched writer for the persona / gaceta / persona_gaceta tables (see SqliteRelationshipWriter)."""
+        return SqliteRelationshipWriter(self._ensure_connected(), batch_size, flush_seconds)
+
+    def save_relationship(self, cedula: str, nombre: str, numero_gaceta: str, filename: str, fecha: str, pagina: Optional[int]):
+        """Saves one relationship in the persona, gaceta and persona_gaceta tables."""
+        with self.relationship_writer(batch_size=1) as writer:
+            writer.add(cedula, nombre, numero_gaceta, filename, fecha, pagina)
+
+    def last_gaceta_id(self) -> Any:
+        """id of the newest gaceta in scan order (None if the store is empty)."""
+        return self._ensure_connected().execute("SELECT MAX(id) FROM gacetas").fetchone()[0]
+
+    def gaceta_id(self, filename: str) -> Optional[int]:
+        row = self._ensure_connected().execute("SELECT id FROM gacetas WHERE filename = ?", (filename,)).fetchone()
+        return row[0] if row else None
+
+    def mining_watermark(self) -> Any:
+        """id of the last gaceta covered by a complete extraction run (None if never)."""
+        value = self._get_metadata(_WATERMARK_KEY)
+        return None if value is None else int(value)
+
+    def set_mining_watermark(self, last_id: Any) -> None:
+        self._set_metadata(_WATERMARK_KEY, str(last_id))
+
+    def record_job_stats(self, job_id: str, stats: dict[str, Any]) -> None:
+        """Counters of a run started as a mining job, kept as JSON under `job:<job_id>`."""
+        self._set_metadata(f"job:{job_id}", json.dumps(stats))
+
+    def gaceta_metadata(self) -> dict[str, dict[str, Any]]:
+        """filename -> numero_gaceta, fecha, year, tipo, total_pages of every gaceta (no text)."""
+        rows = self._ensure_connected().execute(
+            "SELECT filename, numero_gaceta, fecha, year, tipo, total_pages FROM gacetas"
+        )
+        return {
+            row[0]: {"numero_gaceta": row[1], "fecha": row[2], "year": row[3], "tipo": row[4], "total_pages": row[5]}
+            for row in rows
+        }
+
+    def _get_metadata(self, key: str) -> Optional[str]:
+        row = self._ensure_connected().execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_metadata(self, key: str, value: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO metadata (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+
+class SqliteRelationshipWriter:
+    """
+    Same interface as MongoRelationshipWriter: buffers hits and writes each batch (`batch_size`
+    hits, or whatever is pending after `flush_seconds`) in one transaction of upserts; relationships
+    already stored are ignored. `saved` counts the relationships inserted.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        batch_size: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+    ) -> None:
+        self._conn = conn
+        self._batch_size = batch_size or SQLITE_BULK_SIZE
+        self._flush_seconds = MONGO_BULK_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self._pending: list[tuple[str, str, str, str, str, Optional[int]]] = []
+        self._last_flush = time.monotonic()
+        self.saved = 0
+
+    def __enter__(self) -> "SqliteRelationshipWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def add(self, cedula: str, nombre: str, numero_gaceta: str, filename: str, fecha: str, pagina: Optional[int]) -> bool:
+        """Queue one hit (same arguments as save_relationship). Returns True if a flush happened."""
+        self._pending.append((cedula, nombre, numero_gaceta, filename, fecha, pagina))
+        if len(self._pending) >= self._batch_size or time.monotonic() - self._last_flush >= self._flush_seconds:
+            self.flush()
+            return True
+        return False
+
+    def close(self) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        pending = self._pending
+        if not pending:
+            return
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                _UPSERT_PERSONA,
+                ((cedula, nombre, *split_cedula(cedula)) for cedula, nombre, *_ in pending),
+            )
+            conn.executemany(
+                _UPSERT_GACETA_META,
+                ((numero, filename, fecha) for _, _, numero, filename, fecha, _ in pending),
+            )
+            # Rows actually inserted: relationships already stored are ignored
+            inserted = conn.executemany(
+                _INSERT_RELATIONSHIP,
+                ((pagina, cedula, numero) for cedula, _, numero, _, _, pagina in pending),
+            ).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        # Committed: a failed batch stays pending and is written by the next flush
+        self._pending = []
+        self.saved += inserted
@@ -0,0 +1,79 @@
+"""
+Adapter: copy a MongoDB store into a SQLite one (see sqlite.SqliteGacetaRepository).
+OCR gacetas are copied in _id order, so the SQLite scan order matches MongoDB's; then every
+persona_gaceta relationship, with its persona and gaceta, through the SQLite relationship
+writer. Idempotent: gacetas are replaced by filename and relationships already copied are
+ignored, so it can be run again to bring in what was added since.
+The mining watermark is carried over (as the SQLite id of the same gaceta), so incremental
+extraction runs on SQLite continue where the MongoDB ones stopped.
+"""
+from typing import Any, Callable, Iterator, Optional
+
+from src.constants.config import MONGO_BATCH_SIZE, MONGO_COLLECTION_NAME, MONGO_EXPORT_BATCH_SIZE
+from src.adapters.mongodb_jobs import mining_watermark
+from src.adapters.sqlite import SqliteGacetaRepository
+
+_GACETA_FIELDS = {
+    "_id": 1, "filename": 1, "numero_gaceta": 1, "fecha": 1, "tipo": 1, "year": 1, "month": 1, "day": 1,
+    "total_pages": 1, "file_path": 1, "processed_at": 1, "pages.page_number": 1, "pages.text": 1, "full_text": 1,
+}
+
+
+def _iter_gacetas(db, seen: Callable[[dict[str, Any]], None]) -> Iterator[dict[str, Any]]:
+    cursor = db[MONGO_COLLECTION_NAME].find({}, _GACETA_FIELDS).sort("_id", 1).batch_size(MONGO_BATCH_SIZE)
+    for doc in cursor:
+        seen(doc)
+        yield doc
+
+
+def _iter_relationships(db) -> Iterator[tuple[str, str, str, Optional[str], Optional[str], Optional[int]]]:
+    """(cedula, nombre, numero_gaceta, filename, fecha, pagina) of every persona_gaceta document."""
+    gacetas = {
+        doc["_id"]: (doc.get("numero_gaceta"), doc.get("filename"), doc.get("fecha"))
+        for doc in db["gaceta"].find({}, {"numero_gaceta": 1, "filename": 1, "fecha": 1})
+    }
+    cursor = db["persona_gaceta"].find({}, {"_id": 0, "persona_id": 1, "gaceta_id": 1, "pagina": 1}).sort(
+        "_id", 1
+    ).batch_size(MONGO_EXPORT_BATCH_SIZE)
+    chunk: list[dict[str, Any]] = []
+
+    def resolve(chunk):
+        ids = list({rel["persona_id"] for rel in chunk})
+        personas = {
+            doc["_id"]: (doc["cedula"], doc.get("nombre") or "")
+            for doc in db["persona"].find({"_id": {"$in": ids}}, {"cedula": 1, "nombre": 1})
+        }
+        for rel in chunk:
+            persona, gaceta = personas.get(rel["persona_id"]), gacetas.get(rel["gaceta_id"])
+            # Dangling references (deleted persona or gaceta) have nothing to copy
+            if persona is None or gaceta is None or not gaceta[0]:
+                continue
+            yield (*persona, *gaceta, rel.get("pagina"))
+
+    for rel in cursor:
+        chunk.append(rel)
+        if len(chunk) >= MONGO_EXPORT_BATCH_SIZE:
+            yield from resolve(chunk)
+            chunk = []
+    if chunk:
+        yield from resolve(chunk)
+
+
+def migrate_from_mongo(db, target: SqliteGacetaRepository) -> tuple[int, int]:
+    """Copy gacetas and relationships of the MongoDB database `db`; returns (gacetas, relationships)."""
+    watermark = mining_watermark(db)
+    watermark_filename: list[str] = []
+
+    def seen(doc):
+        if watermark is not None and doc["_id"] == watermark:
+            watermark_filename.append(doc.get("filename"))
+
+    gacetas = target.add_gacetas(_iter_gacetas(db, seen))
+    with target.relationship_writer() as writer:
+        for relationship in _iter_relationships(db):
+            writer.add(*relationship)
+    if watermark_filename:
+        last_id = target.gaceta_id(watermark_filename[0])
+        if last_id is not None:
+            target.set_mining_watermark(last_id)
+    return gacetas, writer.saved
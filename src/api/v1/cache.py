@@ -0,0 +1,105 @@
+"""
+Caché de respuestas para los endpoints de búsqueda (/api/search, /api/v1/personas).
+La clave son los parámetros normalizados (ordenados, sin espacios ni vacíos) más la versión
+de los datos (data_version, que suben la extracción y /api/clear), así que una respuesta en
+caché nunca queda desactualizada: al cambiar los datos simplemente deja de usarse.
+Cada respuesta lleva ETag; un If-None-Match con el mismo valor recibe 304 sin cuerpo.
+Backend según RESPONSE_CACHE_BACKEND: "memory" (LRU del proceso), "mongo" (además una
+colección compartida por todos los workers) u "off".
+"""
+import functools
+import hashlib
+import threading
+import time
+
+from flask import Response, make_response, request
+
+from src.constants.config import (
+    RESPONSE_CACHE_BACKEND,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_TTL_SECONDS,
+    RESPONSE_CACHE_VERSION_SECONDS,
+)
+from src.adapters.mongodb_read_model import data_version
+from src.adapters.mongodb_response_cache import MongoResponseCache
+from src.utils.response_cache import CachedResponse, ResponseCache
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_TTL_SECONDS)
+_versions: dict = {}
+_versions_lock = threading.Lock()
+
+def _current_version(db):
+    """Versión de los datos, consultada a MongoDB como máximo cada RESPONSE_CACHE_VERSION_SECONDS."""
+    now = time.monotonic()
+    with _versions_lock:
+        cached = _versions.get(db.name)
+        if cached is not None and now - cached[1] < RESPONSE_CACHE_VERSION_SECONDS:
+            return cached[0]
+    version = data_version(db)
+    with _versions_lock:
+        _versions[db.name] = (version, now)
+    return version
+
+def invalidate():
+    """Tras cambiar los datos desde este proceso (ej. /api/clear): no esperar a releer la versión."""
+    with _versions_lock:
+        _versions.clear()
+    response_cache.clear()
+
+def _normalized_args() -> tuple:
+    return tuple(sorted(
+        (name, value.strip())
+        for name, values in request.args.lists()
+        for value in values
+        if value.strip()
+    ))
+
+def _lookup(db, key):
+    cached = response_cache.get(key)
+    if cached is None and RESPONSE_CACHE_BACKEND == "mongo":
+        cached = MongoResponseCache(db, RESPONSE_CACHE_TTL_SECONDS).get(key)
+        if cached is not None:
+            response_cache.put(key, cached)
+    return cached
+
+def _store(db, key, cached: CachedResponse):
+    response_cache.put(key, cached)
+    if RESPONSE_CACHE_BACKEND == "mongo":
+        MongoResponseCache(db, RESPONSE_CACHE_TTL_SECONDS).put(key, cached)
+
+def _respond(cached: CachedResponse, status: str) -> Response:
+    response = Response(cached.body, mimetype=cached.mimetype)
+    response.set_etag(cached.etag)
+    # El cliente puede guardar la respuesta, pero debe revalidarla (barato: 304)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Cache"] = status
+    return response.make_conditional(request)
+
+def cached_search(db_getter, bypass=()):
+    """
+    Decorador para vistas GET que devuelven JSON. `db_getter` obtiene la base (para la versión
+    de los datos); los parámetros de `bypass` (ej. conteo exacto), si vienen, saltan la caché.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if RESPONSE_CACHE_BACKEND == "off" or any(request.args.get(name, "").strip() for name in bypass):
+                return view(*args, **kwargs)
+            db = db_getter()
+            version = _current_version(db)
+            key = (request.path, str(version), _normalized_args())
+            cached = _lookup(db, key)
+            status = "HIT"
+            if cached is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                etag = f"{version}-{hashlib.blake2b(body, digest_size=10).hexdigest()}"
+                cached = CachedResponse(body=body, mimetype=response.mimetype, etag=etag)
+                _store(db, key, cached)
+                status = "MISS"
+            return _respond(cached, status)
+        return wrapper
+    return decorator
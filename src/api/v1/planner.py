@@ -0,0 +1,131 @@
+"""
+Planificador de las búsquedas de personas (/api/search y /api/v1/personas).
+Ambos endpoints describen la consulta con plan_search() y ejecutan el SearchPlan resultante
+con api_service.query_personas_mongo: un solo camino sobre el modelo de lectura.
+El plan elige el acceso más barato según lo que se busca:
+- una cédula completa ("V-12345678") es una igualdad sobre (cedula_letra, cedula_numero),
+  un solo acceso al índice; solo si no encuentra nada se busca como inicio de cédula;
+- el inicio de una cédula son rangos enteros sobre cedula_numero, un nombre pasa por el
+  índice de nombres (o nombre_tokens) y un término mixto ("maria 1234") combina ambos;
+- el total no se cuenta si el cliente no lo pide o si la propia página ya lo revela, y
+  limit 0 (solo el total) no lee documentos.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.api.v1.utils import (
+    CEDULA_EXACTA,
+    CEDULA_PREFIJO,
+    build_exact_cedula_condition,
+    build_search_conditions,
+    build_ui_search_conditions,
+    classify_term,
+    keyset_condition,
+)
+
+# Tipos de plan, además de las clases de término de classify_term
+FILTRO, LISTADO = "filtro", "listado"
+_SORTS = {
+    "newest": [("_id", -1)],
+    "apariciones": [("total_apariciones", -1), ("_id", -1)],
+}
+
+
+@dataclass
+class SearchPlan:
+    kind: str
+    # Condición de la búsqueda (sin el cursor): es también la que se cuenta
+    filter: Dict[str, Any]
+    sort: str
+    page: int
+    limit: int
+    after: Optional[str] = None
+    # Condición "después del cursor" (ver keyset_condition)
+    keyset: Optional[Dict[str, Any]] = None
+    # Si el cliente quiere el total (se devuelve igual cuando sale gratis de la página)
+    count: bool = True
+    # Condición a usar, en todas las páginas, si la cédula completa no existe
+    fallback: Optional[Dict[str, Any]] = None
+    # Parámetros de los que salen filter y fallback (sin página, orden ni cursor): clave del total en caché
+    count_key: Tuple[Tuple[str, str], ...] = ()
+
+    @property
+    def skip(self) -> int:
+        return 0 if self.after else (self.page - 1) * self.limit
+
+    @property
+    def sort_keys(self) -> List[Tuple[str, int]]:
+        return _SORTS.get(self.sort, _SORTS["newest"])
+
+    def find_filter(self, base: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        base = self.filter if base is None else base
+        if self.keyset is None:
+            return base
+        return {"$and": [base, self.keyset]} if base else self.keyset
+
+
+def _as_filter(conditions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if not conditions:
+        return {}
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def _kind(query: str, cedula: str, nombre: str, letter: str, range_filter: str) -> str:
+    if query:
+        return classify_term(query)
+    if cedula:
+        return CEDULA_EXACTA if build_exact_cedula_condition(cedula) else CEDULA_PREFIJO
+    if nombre:
+        return classify_term(nombre)
+    return FILTRO if letter or range_filter else LISTADO
+
+
+def plan_search(
+    query: str = "",
+    cedula: str = "",
+    nombre: str = "",
+    letter: str = "",
+    range_filter: str = "",
+    page: int = 1,
+    limit: int = 15,
+    sort: str = "newest",
+    after: Optional[str] = None,
+    count: bool = True,
+    name_index=None,
+) -> SearchPlan:
+    """
+    `query` es el término libre (cédula, nombre o ambos), `cedula` y `nombre` los campos de
+    la API v1, `letter` y `range_filter` los filtros de la interfaz web.
+    InvalidCursor si `after` no es un cursor válido para `sort`.
+    """
+    params = {"query": query, "cedula": cedula, "nombre": nombre}
+    count_key = tuple(
+        (key, value)
+        for key, value in (*params.items(), ("letter", letter), ("range_filter", range_filter))
+        if value
+    )
+    filters = build_ui_search_conditions("", letter, range_filter)
+    terms = {key: build_search_conditions({key: value}, name_index) for key, value in params.items() if value}
+    exact = {key: build_exact_cedula_condition(params[key]) for key in ("query", "cedula") if params[key]}
+    exact = {key: condition for key, condition in exact.items() if condition is not None}
+
+    conditions = [
+        condition
+        for key, term_conditions in terms.items()
+        for condition in ([exact[key]] if key in exact else term_conditions)
+    ] + filters
+    # Sin cédula exacta, la búsqueda de siempre: cada cédula como inicio de cédula
+    fallback = _as_filter([c for term_conditions in terms.values() for c in term_conditions] + filters) if exact else None
+
+    return SearchPlan(
+        kind=_kind(query, cedula, nombre, letter, range_filter),
+        filter=_as_filter(conditions),
+        sort=sort,
+        page=page,
+        limit=limit,
+        after=after,
+        keyset=keyset_condition(sort, after) if after else None,
+        count=count,
+        fallback=fallback,
+        count_key=count_key,
+    )
@@ -1,13 +1,38 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 
-from src.api.v1.schemas import parse_search_request, format_paginated_response
-from src.services.api_service import query_personas_mongo
-from src.api.v1.utils import build_search_conditions
+from src.api.v1.schemas import (
+    parse_search_request,
+    format_paginated_response,
+    parse_text_search_request,
+    format_paginas_response,
+    parse_export_request,
+    parse_batch_request,
+    format_batch_item,
+    format_batch_response,
+    format_existence_response,
+)
+from src.services.api_service import (
+    query_personas_mongo,
+    query_paginas_mongo,
+    next_cursor,
+    normalize_batch_cedulas,
+    iter_personas_batch,
+)
+from src.constants.search import PERSONAS_BATCH_MAX
+from src.utils.stream_export import iter_ndjson
+from src.services.export_service import EXPORT_FORMATS, export_chunks, export_filename, export_mimetype
+from src.adapters.mongodb_export import ExportFilter, iter_export_personas
+from src.api.v1.planner import plan_search
+from src.utils.cursors import InvalidCursor
 from src.api.v1.database import get_db
+from src.adapters.mongodb_name_index import get_name_index
+from src.adapters.mongodb_cedula_index import get_cedula_index
+from src.api.v1.cache import cached_search
 
 api_v1_bp = Blueprint('api_v1', __name__, url_prefix='/api/v1')
 
 @api_v1_bp.route('/personas', methods=['GET'])
+@cached_search(lambda: get_db(), bypass=("conteo_exacto",))
 def buscar_personas():
     """
     Endpoint para integraciones externas. Permite buscar personas registradas
@@ -18,37 +43,206 @@ def buscar_personas():
     - `cedula` (str, opcional): Búsqueda por documento de identidad. 
                        Formato esperado: Incluir la letra y el guión, ej. "V-12345678" o "E-12345678".
                        La búsqueda se hace por coincidencia exacta de inicio (empieza con). No case-sensitive y sin acentos.
+                       Una cédula completa (letra y 7 dígitos o más) se busca tal cual; si no está registrada,
+                       se buscan las que empiezan así.
     - `nombre` (str, opcional): Búsqueda por nombre o apellido. 
                        Comportamiento: "Case-insensitive" y sin acentos. Buscar `perez` equivale a `Pérez` o `PEREZ`
-                       Busca coincidencias parciales.
-    - `q`      (str, opcional): Término genérico. Busca coincidencias (case-insensitive y sin acentos) tanto en nombres como en cédulas simultáneamente.
+                       Cada palabra buscada puede estar en cualquier parte del nombre (`ejandra` encuentra `ALEJANDRA`) y,
+                       si no hay coincidencias exactas, se toleran errores de tipeo (`gonzales` encuentra `GONZÁLEZ`).
+                       Un nombre muy común (coincide con demasiadas personas) se busca por inicio de palabra.
+    - `q`      (str, opcional): Término genérico. Si parece una cédula ("V-1234", "1234") se busca como cédula;
+                       si no, como nombre (mismas reglas que `nombre`). Mezclado ("maria 1234"), cada parte
+                       filtra su campo.
     - `page`   (int, opcional): Número de la página para la paginación (default: 1).
-    - `limit`  (int, opcional): Límite de resultados por página. Mínimo 1, Máximo 100 (default: 15).
+    - `after`  (str, opcional): Valor de `paginacion.cursor_siguiente` de la respuesta anterior.
+                       Pide la página siguiente sin recorrer las anteriores (recomendado; ignora `page`).
+    - `limit`  (int, opcional): Límite de resultados por página. Máximo 100 (default: 15).
+                       `0` devuelve solo el total, sin leer personas.
+    - `conteo` (bool, opcional): `false` omite `total_registros` (null) cuando hay que contarlo;
+                       las páginas siguientes con `after` no lo necesitan.
+    - `conteo_exacto` (bool, opcional): `true` recalcula `total_registros` en vez de usar el
+                       conteo guardado (que se renueva solo cuando cambian los datos).
 
     Retorna:
     Un JSON con `estado`, los `datos` (con todas las apariciones en las gacetas) y la metadata de `paginacion`.
+    Incluye `ETag`: repetir la consulta con `If-None-Match` devuelve 304 si los datos no cambiaron.
     """
     # 1. Parsear y normalizar parámetros de entrada
     params = parse_search_request(request.args)
     
-    # 2. Construir condiciones de búsqueda tolerantes a acentos
-    and_conditions = build_search_conditions(params)
-
-    # 3. Consultar base de datos
+    # 2. Planificar la consulta (cédula exacta, inicio de cédula, nombre o mixta) y ejecutarla
     db = get_db()
-    data, total = query_personas_mongo(
-        db=db, 
-        match_conditions=and_conditions, 
-        page=params["page"], 
-        limit=params["limit"]
-    )
+    try:
+        plan = plan_search(
+            query=params["query"],
+            cedula=params["cedula"],
+            nombre=params["nombre"],
+            page=params["page"],
+            limit=params["limit"],
+            after=params["after"] or None,
+            count=params["conteo"],
+            name_index=get_name_index(db),
+        )
+        data, total = query_personas_mongo(db, plan, exact_count=params["conteo_exacto"])
+    except InvalidCursor:
+        return jsonify({"estado": "error", "mensaje": "El parámetro `after` no es válido."}), 400
     
-    # 4. Formatear y retornar respuesta estandarizada
+    # 3. Formatear y retornar respuesta estandarizada
     response = format_paginated_response(
         data=data,
         total=total,
         page=params["page"],
-        limit=params["limit"]
+        limit=params["limit"],
+        next_cursor=next_cursor(data, "newest", params["limit"])
     )
     
     return jsonify(response)
+
+
+@api_v1_bp.route('/personas/batch', methods=['POST'])
+def buscar_personas_lote():
+    """
+    Consulta de muchas cédulas en una sola llamada (en lugar de una llamada a
+    /api/v1/personas por cédula).
+
+    ---
+    Cuerpo (JSON): `{"cedulas": ["V-12345678", "e12.345.678", "12345678", ...]}` (o solo la lista).
+    Máximo 10000 cédulas. Se normalizan al formato "L-dígitos"; sin letra se acepta cualquiera.
+    Parámetros (Query params):
+    - `stream` (bool, opcional): `true` responde NDJSON (una línea por cédula, en el orden
+                       recibido, con `cedula`, `encontrada` y `personas`) a medida que se resuelve;
+                       recomendado para lotes grandes. Las inválidas llegan con `error`.
+
+    Retorna:
+    Un JSON con `resultados` (por cédula, la lista de personas con el mismo formato que
+    /api/v1/personas; vacía si no está registrada), `no_encontradas` e `invalidas`.
+    """
+    try:
+        params = parse_batch_request(request.get_json(silent=True), request.args)
+    except ValueError:
+        return jsonify({"estado": "error", "mensaje": "El cuerpo debe ser un JSON con la lista `cedulas`."}), 400
+    if len(params["cedulas"]) > PERSONAS_BATCH_MAX:
+        return jsonify({"estado": "error", "mensaje": f"Máximo {PERSONAS_BATCH_MAX} cédulas por lote."}), 413
+
+    cedulas, invalidas = normalize_batch_cedulas(params["cedulas"])
+    resultados = iter_personas_batch(get_db(), cedulas)
+
+    if params["stream"]:
+        def lineas():
+            for clave, personas in resultados:
+                yield format_batch_item(clave, personas)
+            for valor in invalidas:
+                yield {"cedula": valor, "error": "cédula inválida"}
+        return Response(stream_with_context(iter_ndjson(lineas(), chunk_rows=100)), mimetype="application/x-ndjson")
+
+    return jsonify(format_batch_response(resultados, invalidas))
+
+
+@api_v1_bp.route('/personas/existe', methods=['GET', 'POST'])
+def existe_cedula():
+    """
+    ¿La cédula aparece en alguna gaceta, y cuántas veces? Responde desde un índice en memoria
+    (sin consultar MongoDB), pensado para verificar muchas cédulas por segundo.
+
+    ---
+    GET: `cedula` (str, requerido): una o varias cédulas separadas por comas (o el parámetro repetido).
+    POST: cuerpo JSON `{"cedulas": [...]}` (o solo la lista), máximo 10000 cédulas.
+    Se normalizan al formato "L-dígitos"; sin letra se acepta cualquiera.
+    El índice se actualiza al terminar cada extracción (y, si los datos cambian por otra vía,
+    a los pocos minutos).
+
+    Retorna:
+    Un JSON con `resultados` (por cédula, el número de menciones; 0 si no está registrada),
+    `no_encontradas` e `invalidas`.
+    """
+    if request.method == 'POST':
+        try:
+            valores = parse_batch_request(request.get_json(silent=True), request.args)["cedulas"]
+        except ValueError:
+            return jsonify({"estado": "error", "mensaje": "El cuerpo debe ser un JSON con la lista `cedulas`."}), 400
+    else:
+        valores = [v for valor in request.args.getlist("cedula") for v in valor.split(",") if v.strip()]
+        if not valores:
+            return jsonify({"estado": "error", "mensaje": "Falta el parámetro `cedula`."}), 400
+    if len(valores) > PERSONAS_BATCH_MAX:
+        return jsonify({"estado": "error", "mensaje": f"Máximo {PERSONAS_BATCH_MAX} cédulas por lote."}), 413
+
+    cedulas, invalidas = normalize_batch_cedulas(valores)
+    try:
+        indice = get_cedula_index(get_db()).get()
+    except RuntimeError as e:
+        return jsonify({"estado": "error", "mensaje": f"Índice de cédulas no disponible: {e}"}), 503
+    apariciones = indice.counts([(letra, numero, len(digitos)) for _, letra, numero, digitos in cedulas])
+    return jsonify(format_existence_response(cedulas, apariciones, invalidas))
+
+
+@api_v1_bp.route('/paginas', methods=['GET'])
+def buscar_paginas():
+    """
+    Búsqueda de texto completo en las páginas OCR de las Gacetas (nombres de empresas,
+    números de decreto, RIF, cualquier texto), ordenada por relevancia.
+
+    ---
+    Parámetros (Query params):
+    - `q`      (str, requerido): Texto a buscar. Sin acentos ni mayúsculas, y con raíces en
+                       español (`designados` encuentra `designada`). Admite frases entre comillas
+                       (`"empresa mixta"`) y excluir palabras con `-` (`decreto -resolución`).
+    - `anio`   (int, opcional): Solo gacetas de ese año.
+    - `tipo`   (str, opcional): Solo gacetas de ese tipo (ej. `ORDINARIA`, `EXTRAORDINARIA`).
+    - `page`   (int, opcional): Número de la página de resultados (default: 1).
+    - `limit`  (int, opcional): Resultados por página. Mínimo 1, Máximo 50 (default: 10).
+
+    Retorna:
+    Un JSON con `estado`, los `datos` (gaceta, página, enlace al PDF, relevancia y `fragmentos`
+    con los términos resaltados entre <mark></mark>) y la metadata de `paginacion`.
+    """
+    params = parse_text_search_request(request.args)
+    if not params["query"]:
+        return jsonify({"estado": "error", "mensaje": "El parámetro `q` es requerido."}), 400
+
+    db = get_db()
+    data, total = query_paginas_mongo(db, params)
+
+    return jsonify(format_paginas_response(
+        data=data,
+        total=total,
+        page=params["page"],
+        limit=params["limit"]
+    ))
+
+
+@api_v1_bp.route('/exportar', methods=['GET'])
+def exportar_personas():
+    """
+    Exportación completa (o filtrada) de personas y sus apariciones en una sola respuesta,
+    en lugar de recorrer /api/v1/personas página por página. El archivo se genera y envía
+    por bloques mientras se lee la base, así que no tiene límite de tamaño.
+
+    ---
+    Parámetros (Query params):
+    - `formato` (str, opcional): `csv` (default; una fila por aparición, UTF-8 con BOM para Excel)
+                       o `ndjson` (una persona por línea, con los campos de /api/v1/personas y
+                       `fecha_iso` en cada mención).
+    - `letra`  (str, opcional): Solo cédulas de esa letra (V, E, J, G, B).
+    - `anio`   (int, opcional): Solo apariciones de ese año.
+    - `desde` / `hasta` (YYYY-MM-DD, opcionales): Solo apariciones en ese rango de fechas (inclusive).
+    - `gzip`   (bool, opcional): `true` comprime el archivo (`.csv.gz` / `.ndjson.gz`).
+
+    Con filtros de fecha, cada persona incluye solo las apariciones dentro del rango.
+    Parámetros inválidos devuelven 400.
+    """
+    try:
+        params = parse_export_request(request.args)
+    except ValueError:
+        return jsonify({"estado": "error", "mensaje": "Parámetros inválidos: `anio` es un número, `desde`/`hasta` usan YYYY-MM-DD y `letra` es una sola letra."}), 400
+    if params["formato"] not in EXPORT_FORMATS:
+        return jsonify({"estado": "error", "mensaje": "El parámetro `formato` debe ser `csv` o `ndjson`."}), 400
+
+    filters = ExportFilter(letra=params["letra"], year=params["anio"], date_from=params["desde"], date_to=params["hasta"])
+    personas = iter_export_personas(get_db(), filters)
+    chunks = export_chunks(personas, params["formato"], params["gzip"])
+    return Response(
+        stream_with_context(chunks),
+        mimetype=export_mimetype(params["formato"], params["gzip"]),
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(params["formato"], params["gzip"])}"'}
+    )
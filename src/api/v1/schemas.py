@@ -2,6 +2,9 @@
 Data transfer objects and serialization for the API V1.
 Modifica este archivo para cambiar los campos exactos que recibe y envía la API.
 """
+from datetime import date
+from typing import Optional
+
 
 def parse_search_request(args: dict) -> dict:
     """
@@ -12,10 +15,69 @@ def parse_search_request(args: dict) -> dict:
         "query": args.get("q", "").strip(),
         "cedula": args.get("cedula", "").strip(),
         "nombre": args.get("nombre", "").strip(),
-        "limit": max(1, min(100, int(args.get("limit", 15)))), # Limit max to 100
+        "limit": max(0, min(100, int(args.get("limit", 15)))), # Limit max to 100 (0 = solo el total)
+        "page": max(1, int(args.get("page", 1))),
+        "after": args.get("after", "").strip(),
+        "conteo": args.get("conteo", "").strip().lower() not in ("0", "false", "no"),
+        "conteo_exacto": args.get("conteo_exacto", "").strip().lower() in ("1", "true", "si", "sí")
+    }
+
+def parse_text_search_request(args: dict) -> dict:
+    """
+    Parámetros de la búsqueda de texto completo (/api/v1/paginas).
+    `anio` inválido se ignora, igual que un `limit` fuera de rango se recorta.
+    """
+    anio = args.get("anio", "").strip()
+    return {
+        "query": args.get("q", "").strip(),
+        "anio": int(anio) if anio.isdigit() else None,
+        "tipo": args.get("tipo", "").strip(),
+        "limit": max(1, min(50, int(args.get("limit", 10)))), # Limit max to 50
         "page": max(1, int(args.get("page", 1)))
     }
 
+def parse_export_request(args: dict) -> dict:
+    """
+    Parámetros de /api/v1/exportar. A diferencia de la búsqueda, un valor inválido no se
+    ignora (ValueError): una exportación filtrada por error no debe parecer completa.
+    """
+    anio = args.get("anio", "").strip()
+    desde = args.get("desde", "").strip()
+    hasta = args.get("hasta", "").strip()
+    letra = args.get("letra", "").strip().upper()
+    if letra and (len(letra) != 1 or not letra.isalpha()):
+        raise ValueError("letra")
+    return {
+        "formato": args.get("formato", "csv").strip().lower() or "csv",
+        "letra": letra or None,
+        "anio": int(anio) if anio else None,
+        "desde": date.fromisoformat(desde) if desde else None,
+        "hasta": date.fromisoformat(hasta) if hasta else None,
+        "gzip": args.get("gzip", "").strip().lower() in ("1", "true", "si", "sí")
+    }
+
+def parse_batch_request(payload, args: dict) -> dict:
+    """
+    Cuerpo de POST /api/v1/personas/batch: {"cedulas": [...]} o directamente la lista.
+    ValueError si no es una lista de cédulas.
+    """
+    cedulas = payload.get("cedulas") if isinstance(payload, dict) else payload
+    if not isinstance(cedulas, list):
+        raise ValueError("cedulas")
+    return {
+        "cedulas": cedulas,
+        "stream": args.get("stream", "").strip().lower() in ("1", "true", "si", "sí")
+    }
+
+def enlace_pagina(filename, pagina):
+    """
+    Solo esa página de la gaceta como PDF (decenas de KB en vez del documento completo);
+    con `?formato=webp&ancho=600` se obtiene una imagen. None si no se conoce la página.
+    """
+    if not filename or not pagina:
+        return None
+    return f"/pdf/{filename}/pagina/{pagina}"
+
 def format_aparicion(ap: dict) -> dict:
     """
     Mapeo de campos de cada aparición individual de una persona.
@@ -24,7 +86,8 @@ def format_aparicion(ap: dict) -> dict:
         "numero_gaceta": ap.get("numero_gaceta"),
         "fecha_publicacion": ap.get("fecha"),
         "numero_pagina": ap.get("pagina"),
-        "archivo_pdf": ap.get("filename")
+        "archivo_pdf": ap.get("filename"),
+        "enlace_pagina": enlace_pagina(ap.get("filename"), ap.get("pagina"))
     }
 
 def format_persona_response(persona_doc: dict) -> dict:
@@ -42,9 +105,11 @@ def format_persona_response(persona_doc: dict) -> dict:
         "menciones_gaceta": [format_aparicion(ap) for ap in apariciones if ap.get("numero_gaceta")]
     }
 
-def format_paginated_response(data: list, total: int, page: int, limit: int) -> dict:
+def format_paginated_response(data: list, total: Optional[int], page: int, limit: int, next_cursor: str = None) -> dict:
     """
     Formato de respuesta paginada estandarizada.
+    `cursor_siguiente` se pasa como `after` para pedir la página siguiente (null en la última).
+    `total_registros` y `total_paginas` son null si no se pidió el conteo.
     """
     return {
         "estado": "exito",
@@ -53,6 +118,75 @@ def format_paginated_response(data: list, total: int, page: int, limit: int) ->
             "total_registros": total,
             "pagina_actual": page,
             "limite_por_pagina": limit,
-            "total_paginas": (total + limit - 1) // limit if limit > 0 else 0
+            "total_paginas": None if total is None else (total + limit - 1) // limit if limit > 0 else 0,
+            "cursor_siguiente": next_cursor
         }
     }
+
+def format_pagina_response(page_doc: dict) -> dict:
+    """
+    Mapeo de cada página encontrada por la búsqueda de texto completo.
+    `numero_pagina` es null cuando la gaceta no tiene páginas separadas.
+    """
+    filename = page_doc.get("filename")
+    pagina = page_doc.get("page_number") or None
+    enlace = f"/pdf/{filename}" if filename else None
+    if enlace and pagina:
+        enlace += f"#page={pagina}"
+    return {
+        "numero_gaceta": page_doc.get("numero_gaceta"),
+        "fecha_publicacion": page_doc.get("fecha"),
+        "tipo": page_doc.get("tipo"),
+        "numero_pagina": pagina,
+        "archivo_pdf": filename,
+        "enlace_pdf": enlace,
+        "enlace_pagina": enlace_pagina(filename, pagina),
+        "relevancia": round(float(page_doc.get("score", 0)), 4),
+        "fragmentos": page_doc.get("fragmentos", [])
+    }
+
+def format_paginas_response(data: list, total: int, page: int, limit: int) -> dict:
+    """
+    Igual que format_paginated_response, para los resultados de páginas.
+    """
+    response = format_paginated_response([], total, page, limit)
+    response["datos"] = [format_pagina_response(doc) for doc in data]
+    return response
+
+def format_batch_item(clave: str, personas: list) -> dict:
+    """Línea NDJSON del lote en modo stream: una por cédula solicitada."""
+    return {
+        "cedula": clave,
+        "encontrada": bool(personas),
+        "personas": [format_persona_response(doc) for doc in personas]
+    }
+
+def format_batch_response(resultados, invalidas: list) -> dict:
+    """
+    Respuesta del lote: `resultados` por cédula normalizada ("V-12345678"; lista vacía si no
+    está registrada), y las cédulas que no se pudieron leer en `invalidas`.
+    """
+    datos = {clave: [format_persona_response(doc) for doc in personas] for clave, personas in resultados}
+    return {
+        "estado": "exito",
+        "total_solicitadas": len(datos),
+        "total_encontradas": sum(1 for personas in datos.values() if personas),
+        "resultados": datos,
+        "no_encontradas": [clave for clave, personas in datos.items() if not personas],
+        "invalidas": invalidas
+    }
+
+def format_existence_response(cedulas: list, apariciones: list, invalidas: list) -> dict:
+    """
+    Respuesta de /api/v1/personas/existe: `resultados` da, por cédula normalizada, cuántas
+    veces aparece en las gacetas (0 si no está registrada).
+    """
+    resultados = {clave: menciones for (clave, *_), menciones in zip(cedulas, apariciones)}
+    return {
+        "estado": "exito",
+        "total_solicitadas": len(resultados),
+        "total_encontradas": sum(1 for menciones in resultados.values() if menciones),
+        "resultados": resultados,
+        "no_encontradas": [clave for clave, menciones in resultados.items() if not menciones],
+        "invalidas": invalidas
+    }
@@ -1,6 +1,10 @@
 import unicodedata
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from src.constants.search import EXACT_CEDULA_MIN_DIGITS, NAME_INDEX_MAX_IDS
+from src.utils.cursors import decode_cursor
+from src.utils.normalization import name_tokens, number_prefix_ranges, split_cedula
 
 def build_accent_insensitive_regex(term: str) -> str:
     """Prepara un patrón de búsqueda que ignora acentos al convertirse en Regex."""
@@ -18,25 +22,164 @@ def build_accent_insensitive_regex(term: str) -> str:
     term = term.replace('u', '[uúUÚ]').replace('U', '[uúUÚ]')
     return term
 
-def build_search_conditions(params: dict) -> List[Dict[str, Any]]:
-    """Construye las condiciones $match para MongoDB tolerantes a acentos."""
+# Letra sola ("V", "v-"): filtra por tipo de documento
+_LETTER_ONLY_RE = re.compile(r"^\s*([A-Za-z])\s*[-.\s]*$")
+# Algo que parece una cédula: letra opcional y al menos un dígito
+_CEDULA_LIKE_RE = re.compile(r"^\s*[A-Za-z]?\s*[-.\s]*\d[\d.,\s]*$")
+# Una cédula completa: con letra y al menos EXACT_CEDULA_MIN_DIGITS dígitos ("V-12.345.678")
+_FULL_CEDULA_RE = re.compile(r"^\s*[A-Za-z]\s*[-.\s]*(\d[\d.]*)\s*$")
+# Una palabra de un término mixto que parece cédula ("V-1234", "1234")
+_CEDULA_WORD_RE = re.compile(r"^[A-Za-z]?[-.]?\d[\d.,]*$")
+
+def _compact_cedula(term: str) -> str:
+    """ "V - 12 345.678" -> "V12345678": una cédula sin los espacios ni separadores con que se escribió."""
+    return re.sub(r"[\s.,-]", "", term)
+
+# Clases de término libre (ver classify_term)
+CEDULA_EXACTA, CEDULA_PREFIJO, NOMBRE, MIXTA = "cedula_exacta", "cedula_prefijo", "nombre", "mixta"
+
+def classify_term(term: str) -> str:
+    """
+    Tipo de un término libre: una cédula completa ("V-12345678", se busca por igualdad), el
+    inicio de una cédula ("V-1234", "1234"), un nombre, o una mezcla ("maria 1234").
+    """
+    if _CEDULA_LIKE_RE.match(term):
+        full = _FULL_CEDULA_RE.match(_compact_cedula(term))
+        if full and len(full.group(1).replace(".", "")) >= EXACT_CEDULA_MIN_DIGITS:
+            return CEDULA_EXACTA
+        return CEDULA_PREFIJO
+    words = term.split()
+    if any(_CEDULA_WORD_RE.match(word) for word in words) and not all(_CEDULA_WORD_RE.match(word) for word in words):
+        return MIXTA
+    return NOMBRE
+
+def build_exact_cedula_condition(term: str) -> Optional[Dict[str, Any]]:
+    """
+    Igualdad sobre (cedula_letra, cedula_numero) si `term` es una cédula completa: un solo acceso
+    al índice. Además compara la cédula normalizada (letra y dígitos tal como se escribieron),
+    porque el número entero no distingue ceros a la izquierda ("V-012345678" no es "V-12345678").
+    """
+    if classify_term(term) != CEDULA_EXACTA:
+        return None
+    letter, number = split_cedula(_compact_cedula(term))
+    if letter is None or number is None:
+        return None
+    digits = re.sub(r"\D", "", term)
+    return {"cedula_letra": letter, "cedula_numero": number, "cedula": f"{letter}-{digits}"}
+
+def _written_digits_regex(digits: str) -> str:
+    """ "0123" -> cédula escrita que empieza por esos dígitos, con o sin letra y separadores."""
+    return r"^[A-Za-z]?[-.\s]*" + r"[.,]?".join(digits)
+
+def build_cedula_condition(term: str) -> Optional[Dict[str, Any]]:
+    """
+    Cédula que empieza por `term` ("V-1234", "1234", "v"), sobre los campos derivados
+    cedula_letra (igualdad) y cedula_numero (rangos numéricos): consultas indexadas.
+    cedula_numero no conserva los ceros a la izquierda: con "0123" los rangos acotan la
+    consulta y la cédula escrita decide ("V-0123456" sí, "V-1234567" no).
+    """
+    letter_only = _LETTER_ONLY_RE.match(term)
+    if letter_only:
+        return {"cedula_letra": letter_only.group(1).upper()}
+    letter, number = split_cedula(_compact_cedula(term))
+    if number is None:
+        return None
+    digits = re.sub(r"\D", "", term)
+    ranges = [{"cedula_numero": {"$gte": low, "$lt": high}} for low, high in number_prefix_ranges(digits)]
+    condition: Dict[str, Any] = ranges[0] if len(ranges) == 1 else {"$or": ranges}
+    parts = [condition]
+    if digits.startswith("0"):
+        parts.append({"cedula": {"$regex": _written_digits_regex(digits)}})
+    if letter:
+        parts.insert(0, {"cedula_letra": letter})
+    return parts[0] if len(parts) == 1 else {"$and": parts}
+
+def build_name_condition(term: str, name_index=None) -> Optional[Dict[str, Any]]:
+    """
+    Con `name_index` (índice de trigramas, ver mongodb_name_index): cada palabra de `term`
+    puede aparecer en cualquier parte del nombre y, si no hay coincidencias exactas, con una
+    o dos letras de diferencia ("gonzales" encuentra "GONZÁLEZ"); se filtra por _id.
+    Sin índice (o si no se pudo cargar), con palabras de menos de 3 letras, o si coinciden más
+    de NAME_INDEX_MAX_IDS personas (nombres comunes como "jose"): cada palabra debe ser el
+    inicio de alguna palabra del nombre, sin importar mayúsculas ni acentos ("mari per"
+    encuentra "MARÍA PÉREZ"). Usa el índice de nombre_tokens.
+    """
+    if name_index is not None:
+        try:
+            ids = name_index.search(term)
+        except RuntimeError:
+            ids = None
+        if ids is not None and len(ids) <= NAME_INDEX_MAX_IDS:
+            return {"_id": {"$in": ids}}
+    conditions = [{"nombre_tokens": {"$regex": f"^{re.escape(token)}"}} for token in name_tokens(term)]
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+def build_query_condition(term: str, name_index=None) -> Optional[Dict[str, Any]]:
+    """
+    Término libre: si parece una cédula se busca como cédula (por su inicio), si no como
+    nombre. En un término mixto ("maria 1234") cada parte filtra su campo.
+    """
+    kind = classify_term(term)
+    if kind in (CEDULA_EXACTA, CEDULA_PREFIJO):
+        return build_cedula_condition(term)
+    if kind == MIXTA:
+        words = term.split()
+        parts = [build_cedula_condition(word) for word in words if _CEDULA_WORD_RE.match(word)]
+        parts.append(build_name_condition(" ".join(w for w in words if not _CEDULA_WORD_RE.match(w)), name_index))
+        return None if any(part is None for part in parts) else {"$and": parts}
+    return build_name_condition(term, name_index)
+
+def _no_match() -> Dict[str, Any]:
+    # Un término que no produce claves de búsqueda no debe devolver todas las personas
+    return {"_id": {"$in": []}}
+
+def build_search_conditions(params: dict, name_index=None) -> List[Dict[str, Any]]:
+    """Construye las condiciones $match para MongoDB tolerantes a acentos (campos derivados indexados)."""
     and_conditions = []
-    
+
     if params.get("query"):
-        q_regex = build_accent_insensitive_regex(params["query"])
-        and_conditions.append({
-            "$or": [
-                {"cedula": {"$regex": q_regex, "$options": "i"}},
-                {"nombre": {"$regex": q_regex, "$options": "i"}}
-            ]
-        })
-        
+        and_conditions.append(build_query_condition(params["query"], name_index) or _no_match())
+
     if params.get("cedula"):
-        c_regex = build_accent_insensitive_regex(params["cedula"])
-        and_conditions.append({"cedula": {"$regex": f"^{c_regex}", "$options": "i"}})
-        
+        and_conditions.append(build_cedula_condition(params["cedula"]) or _no_match())
+
     if params.get("nombre"):
-        n_regex = build_accent_insensitive_regex(params["nombre"])
-        and_conditions.append({"nombre": {"$regex": n_regex, "$options": "i"}})
+        and_conditions.append(build_name_condition(params["nombre"], name_index) or _no_match())
 
     return and_conditions
+
+# Filtros de rango de la interfaz web (/api/search): millones del número de cédula
+_UI_RANGES = {
+    "0-10": {"$lt": 10_000_000},
+    "10-20": {"$gte": 10_000_000, "$lt": 20_000_000},
+    "20-30": {"$gte": 20_000_000, "$lt": 30_000_000},
+    "30+": {"$gte": 30_000_000},
+}
+
+def build_ui_search_conditions(query: str, letter: str, range_filter: str, name_index=None) -> List[Dict[str, Any]]:
+    """Construye las condiciones $match de /api/search (buscador, letra y rango de la interfaz web)."""
+    and_conditions = []
+
+    if query:
+        and_conditions.append(build_query_condition(query, name_index) or _no_match())
+
+    if letter:
+        and_conditions.append({"cedula_letra": letter.upper()})
+
+    if range_filter in _UI_RANGES:
+        and_conditions.append({"cedula_numero": _UI_RANGES[range_filter]})
+
+    return and_conditions
+
+def keyset_condition(sort: str, after: str) -> Dict[str, Any]:
+    """Condición "después del cursor" en el orden de la consulta (InvalidCursor si el cursor no es válido)."""
+    position = decode_cursor(after, "apariciones" if sort == "apariciones" else "newest")
+    if sort == "apariciones":
+        total = position["total_apariciones"]
+        return {"$or": [
+            {"total_apariciones": {"$lt": total}},
+            {"total_apariciones": total, "_id": {"$lt": position["_id"]}},
+        ]}
+    return {"_id": {"$lt": position["_id"]}}
@@ -1,17 +1,29 @@
 """
-CLI entry: parse args, connect repository, run search services, print and save results to MongoDB.
+CLI entry: parse args, connect repository, run search services, print and save results to
+MongoDB (or to SQLite with --backend sqlite / REPOSITORY_BACKEND=sqlite).
 Run with: python -m src   or   python src/cli.py (from project root).
 """
 import sys
 import argparse
-import json
-import os
+from dataclasses import replace
+from datetime import date
+from functools import partial
 
 from dotenv import load_dotenv
 load_dotenv()
 
+from src.constants.config import PAGE_STORE_DIR, PAGE_STORE_SCAN, PROGRESS_FILE, REPOSITORY_BACKEND, SQLITE_PATH
 from src.adapters.mongodb import MongoGacetaRepository
-from src.services.search_service import search_cedulas
+from src.adapters.page_store import PageStoreWriter, SegmentGacetaRepository, gaceta_record
+from src.adapters.sqlite import SqliteGacetaRepository
+from src.adapters.sqlite_migration import migrate_from_mongo
+from src.adapters.mongodb_client import get_database
+from src.adapters.mongodb_export import ExportFilter
+from src.adapters.parquet_snapshot import ParquetSnapshot
+from src.ports.repository import GacetaFilter
+from src.services.search_service import search_cedulas, search_cedulas_parallel
+from src.services.export_service import EXPORT_FORMATS, export_chunks
+from src.utils.progress import ProgressReporter
 
 
 def main() -> int:
@@ -19,80 +31,297 @@ def main() -> int:
         description="Search gacetas for Venezuelan cédulas and store them in MongoDB."
     )
     parser.add_argument("--limit", type=int, default=None, help="Limit number of gacetas to scan (for testing)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for extraction (default: 1, serial)")
+    parser.add_argument("--year", type=int, default=None, help="Only scan gacetas from this year")
+    parser.add_argument("--desde", type=date.fromisoformat, default=None, help="Only gacetas published on/after this date (YYYY-MM-DD)")
+    parser.add_argument("--hasta", type=date.fromisoformat, default=None, help="Only gacetas published on/before this date (YYYY-MM-DD)")
+    parser.add_argument("--tipo", default=None, help="Only gacetas of this type (e.g. ORDINARIA, EXTRAORDINARIA)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Gacetas fetched per MongoDB round trip")
+    parser.add_argument("--rebuild-read-model", action="store_true", help="Regenerate the persona read model used by the search endpoints and exit")
+    parser.add_argument("--rebuild-page-index", action="store_true", help="Add every gaceta's OCR pages to the full-text search index and exit")
+    parser.add_argument("--ensure-indexes", action="store_true", help="Create the required MongoDB indexes and exit")
+    parser.add_argument("--verify-indexes", action="store_true", help="Explain every API query on a seeded scratch database; fail on COLLSCAN")
+    parser.add_argument("--export", metavar="PATH", default=None, help="Stream every persona and appearance to PATH and exit (gzip if PATH ends in .gz); honors --year/--desde/--hasta/--letra")
+    parser.add_argument("--export-format", choices=EXPORT_FORMATS, default=None, help="Export format (default: ndjson for .ndjson/.jsonl paths, csv otherwise)")
+    parser.add_argument("--letra", default=None, help="Export only cédulas with this letter (V, E, J, G, B)")
+    parser.add_argument("--snapshot", metavar="DIR", default=None, help="Append the gacetas not yet in the Parquet snapshot at DIR (hits from the read model) and exit; needs pyarrow")
+    parser.add_argument("--snapshot-rebuild", action="store_true", help="With --snapshot: drop the existing snapshot first")
+    parser.add_argument("--snapshot-hits", metavar="DIR", default=None, help="Also append this extraction run's hits, with their text offsets, to the Parquet snapshot at DIR")
+    parser.add_argument("--incremental", action="store_true", help="Only scan gacetas added since the last complete run (the whole archive if there was none)")
+    parser.add_argument("--backend", choices=("mongo", "sqlite"), default=REPOSITORY_BACKEND, help="Store to scan and save into (default: REPOSITORY_BACKEND, mongo). sqlite is CLI-only: the web app searches MongoDB")
+    parser.add_argument("--sqlite-path", default=SQLITE_PATH, help="SQLite database file of the sqlite backend (default: SQLITE_PATH)")
+    parser.add_argument("--migrate-sqlite", metavar="PATH", nargs="?", const=SQLITE_PATH, default=None, help="Copy the MongoDB gacetas and relationships into the SQLite database at PATH (default: SQLITE_PATH) and exit")
+    parser.add_argument("--page-store", metavar="DIR", nargs="?", const=PAGE_STORE_DIR, default=PAGE_STORE_DIR if PAGE_STORE_SCAN else None, help="Scan page text from the memory-mapped page store at DIR (default: PAGE_STORE_DIR) instead of the backend; hits are still saved to the backend")
+    parser.add_argument("--build-page-store", metavar="DIR", nargs="?", const=PAGE_STORE_DIR, default=None, help="Append the backend's gacetas missing from the page store at DIR (default: PAGE_STORE_DIR) and exit")
+    parser.add_argument("--job-id", default=None, help=argparse.SUPPRESS)
     args = parser.parse_args()
 
+    filters = GacetaFilter(year=args.year, date_from=args.desde, date_to=args.hasta, tipo=args.tipo)
+    if filters.is_empty():
+        filters = None
+    sqlite_backend = args.backend == "sqlite" and not args.migrate_sqlite
+    if sqlite_backend:
+        repository_factory = partial(SqliteGacetaRepository, args.sqlite_path, batch_size=args.batch_size)
+    else:
+        repository_factory = partial(MongoGacetaRepository, batch_size=args.batch_size)
+
     try:
-        repository = MongoGacetaRepository()
+        repository = repository_factory()
         total_gacetas = repository.count()
+        matching = repository.count(filters) if filters else total_gacetas
     except RuntimeError as e:
         print(f"⚠️  {e}", file=sys.stderr)
-        print("Configura MONGO_URI en .env", file=sys.stderr)
+        print("Revisa SQLITE_PATH" if sqlite_backend else "Configura MONGO_URI en .env", file=sys.stderr)
+        return 1
+
+    if args.migrate_sqlite:
+        target = SqliteGacetaRepository(args.migrate_sqlite)
+        try:
+            gacetas, relaciones = migrate_from_mongo(get_database(), target)
+        except Exception as e:
+            print(f"⚠️ Error migrando a SQLite: {e}", file=sys.stderr)
+            return 1
+        finally:
+            target.close()
+        print(f"Migradas a {args.migrate_sqlite}: {gacetas} gacetas y {relaciones} relaciones.")
+        return 0
+
+    mongo_only = {
+        "--ensure-indexes": args.ensure_indexes,
+        "--verify-indexes": args.verify_indexes,
+        "--rebuild-read-model": args.rebuild_read_model,
+        "--rebuild-page-index": args.rebuild_page_index,
+        "--export": args.export,
+        "--snapshot": args.snapshot,
+    }
+    if sqlite_backend and any(mongo_only.values()):
+        opciones = ", ".join(name for name, value in mongo_only.items() if value)
+        print(f"⚠️  {opciones}: solo disponible con el backend mongo.", file=sys.stderr)
+        return 1
+
+    if args.ensure_indexes or args.verify_indexes:
+        try:
+            if args.ensure_indexes:
+                for warning in repository.ensure_indexes():
+                    print(f"⚠️  {warning}", file=sys.stderr)
+                print("Índices verificados/creados.")
+            if args.verify_indexes:
+                failures = repository.verify_indexes()
+                for failure in failures:
+                    print(f"❌ {failure}", file=sys.stderr)
+                if failures:
+                    return 1
+                print("✅ Ninguna consulta de la API recorre colecciones completas (COLLSCAN).")
+        except Exception as e:
+            print(f"⚠️ Error gestionando índices: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    if args.rebuild_read_model:
+        try:
+            personas = repository.rebuild_read_model()
+        except Exception as e:
+            print(f"⚠️ Error regenerando el modelo de lectura: {e}", file=sys.stderr)
+            return 1
+        print(f"Modelo de lectura regenerado: {personas} personas.")
+        return 0
+
+    if args.rebuild_page_index:
+        try:
+            paginas = repository.rebuild_page_index()
+        except Exception as e:
+            print(f"⚠️ Error indexando las páginas: {e}", file=sys.stderr)
+            return 1
+        print(f"Índice de texto completo actualizado: {paginas} páginas.")
+        return 0
+
+    if args.export:
+        path = args.export
+        comprimir = path.endswith(".gz")
+        base = path[:-3] if comprimir else path
+        formato = args.export_format or ("ndjson" if base.endswith((".ndjson", ".jsonl")) else "csv")
+        export_filter = ExportFilter(letra=args.letra, year=args.year, date_from=args.desde, date_to=args.hasta)
+        exported = 0
+
+        def counted(personas):
+            nonlocal exported
+            for persona in personas:
+                exported += 1
+                yield persona
+
+        try:
+            with open(path, "wb") as f:
+                for chunk in export_chunks(counted(repository.iter_export_personas(export_filter)), formato, comprimir):
+                    f.write(chunk)
+        except Exception as e:
+            print(f"⚠️ Error exportando: {e}", file=sys.stderr)
+            return 1
+        print(f"Exportadas {exported} personas ({formato}{', gzip' if comprimir else ''}) a {path}.")
+        return 0
+
+    if args.snapshot:
+        snapshot = ParquetSnapshot(args.snapshot)
+        try:
+            if args.snapshot_rebuild:
+                snapshot.clear()
+            hits_written, gacetas_written = repository.write_snapshot(snapshot)
+        except Exception as e:
+            print(f"⚠️ Error escribiendo el snapshot: {e}", file=sys.stderr)
+            return 1
+        print(f"Snapshot en {args.snapshot}: {gacetas_written} gacetas nuevas, {hits_written} cédulas.")
+        return 0
+
+    if args.build_page_store:
+        try:
+            writer = PageStoreWriter(args.build_page_store)
+            added = writer.add_many(
+                gaceta_record(doc) for doc in repository.iter_gacetas(filters=filters) if doc.filename not in writer
+            )
+        except Exception as e:
+            print(f"⚠️ Error escribiendo el almacén de páginas: {e}", file=sys.stderr)
+            return 1
+        print(f"Almacén de páginas en {args.build_page_store}: {added} gacetas nuevas.")
+        return 0
+
+    store_behind = False
+    if args.page_store:
+        # Scans (and ids, watermark) come from the store; relationships go to the backend
+        backend_matching = matching
+        repository = SegmentGacetaRepository(args.page_store, backing=repository)
+        repository_factory = partial(SegmentGacetaRepository, args.page_store)
+        total_gacetas = repository.count()
+        matching = repository.count(filters) if filters else total_gacetas
+        print(f"Leyendo el texto de las páginas desde {args.page_store}.")
+        # A store that is unbuilt or behind the backend would cover only part of the archive
+        store_behind = matching < backend_matching
+        if store_behind:
+            print(
+                f"⚠️ El almacén de páginas tiene {matching} de {backend_matching} gacetas: se extraen solo "
+                f"esas y no se actualiza la marca. Complétalo con --build-page-store {args.page_store}",
+                file=sys.stderr,
+            )
+
+    # A run over the whole archive (no filters or limit) covers every gaceta present now, up
+    # to scan_until; it becomes the watermark incremental runs start from. Gacetas inserted
+    # while scanning wait for the next run.
+    covers_archive = filters is None and not args.limit and not store_behind
+    try:
+        scan_until = repository.last_gaceta_id()
+        watermark = repository.mining_watermark() if args.incremental else None
+    except Exception as e:
+        print(f"⚠️ Error leyendo la marca de la última extracción: {e}", file=sys.stderr)
         return 1
+    if scan_until is not None:
+        bounds = {"id_max": scan_until}
+        if watermark is not None:
+            # Inclusive bound: the last gaceta of the previous run is scanned again, which is
+            # harmless (relationships are upserts)
+            bounds["id_min"] = watermark
+            print("Extracción incremental: solo gacetas nuevas desde la última extracción completa.")
+        filters = replace(filters or GacetaFilter(), **bounds)
+        matching = repository.count(filters)
 
-    to_scan = min(args.limit, total_gacetas) if args.limit else total_gacetas
+    to_scan = min(args.limit, matching) if args.limit else matching
     print(f"Alcance: {to_scan} gacetas (de {total_gacetas} registradas).\n")
 
-    progress_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "progress.json")
-    
+    progress = ProgressReporter(PROGRESS_FILE)
+
     def update_progress(phase, current_val, max_val, filename=""):
-        try:
-            pct = 0
-            if max_val > 0:
-                if phase == "search":
-                    pct = int((current_val / max_val) * 75)
-                    msg = f"Escaneando gacetas ({pct}%): {filename}"
-                else:
-                    pct = 75 + int((current_val / max_val) * 25)
-                    msg = f"Guardando cédulas ({pct}%): {filename}"
+        pct = 0
+        if max_val > 0:
+            if phase == "search":
+                pct = int((current_val / max_val) * 75)
+                msg = f"Escaneando gacetas ({pct}%): {filename}"
             else:
-                pct = 100
-                msg = "Completado"
-                
-            data = {"percentage": pct, "message": msg, "status": "processing"}
-            if pct == 100 and phase == "done":
-                data["status"] = "idle"
-            
-            with open(progress_file, "w", encoding="utf-8") as f:
-                json.dump(data, f)
-        except:
-             pass
-
-    print("Buscando cédulas y nombres, y guardando en MongoDB...")
+                pct = 75 + int((current_val / max_val) * 25)
+                msg = f"Guardando cédulas ({pct}%): {filename}"
+        else:
+            pct = 100
+            msg = "Completado"
+
+        data = {"percentage": pct, "message": msg, "status": "processing"}
+        if pct == 100 and phase == "done":
+            data["status"] = "idle"
+        # Throttled: written when the percentage moves or every PROGRESS_MIN_INTERVAL_SECONDS
+        progress.update(data, force=(phase == "done"))
+
+    print(f"Buscando cédulas y nombres, y guardando en {'SQLite' if sqlite_backend else 'MongoDB'}...")
     def search_cb(index, filename):
         update_progress("search", index, to_scan, filename)
 
-    cedulas = search_cedulas(repository, limit_gacetas=args.limit, progress_callback=search_cb)
+    if args.workers > 1:
+        print(f"Extracción paralela con {args.workers} procesos.")
+        cedulas = search_cedulas_parallel(
+            repository,
+            repository_factory,
+            workers=args.workers,
+            limit_gacetas=args.limit,
+            progress_callback=search_cb,
+            filters=filters,
+        )
+    else:
+        cedulas = search_cedulas(repository, limit_gacetas=args.limit, progress_callback=search_cb, filters=filters)
     
     current_hits = len(cedulas)
-    saved_count = 0
+    save_errors = 0
+    if args.snapshot_hits:
+        try:
+            hits_written, gacetas_written = ParquetSnapshot(args.snapshot_hits).append_hits(cedulas, repository.gaceta_metadata())
+            print(f"Snapshot en {args.snapshot_hits}: {gacetas_written} gacetas nuevas, {hits_written} cédulas.")
+        except Exception as e:
+            print(f"⚠️ Error escribiendo el snapshot: {e}", file=sys.stderr)
+
+    try:
+        writer = repository.relationship_writer()
+    except Exception as e:
+        print(f"⚠️ No se pudo preparar el guardado en BD: {e}", file=sys.stderr)
+        return 1
+
     for i, r in enumerate(cedulas):
         if i < 20:
-            print(f"  [{i+1}] Gaceta {r['numero_gaceta']} p.{r.get('page_number')} | {r['cedula']} -> Nombre: {r.get('nombre')}")
+            print(f"  [{i+1}] Gaceta {r.numero_gaceta} p.{r.page_number} | {r.cedula} -> Nombre: {r.nombre}")
         elif i == 20:
             print(f"  ... y {len(cedulas) - 20} más.")
-            
+
         try:
-            repository.save_relationship(
-                cedula=r["cedula"],
-                nombre=r.get("nombre", "Desconocido"),
-                numero_gaceta=r["numero_gaceta"],
-                filename=r["gaceta"],
-                fecha=r.get("fecha", "Desconocida"),
-                pagina=r.get("page_number")
+            flushed = writer.add(
+                cedula=r.cedula,
+                nombre=r.nombre,
+                numero_gaceta=r.numero_gaceta,
+                filename=r.gaceta,
+                fecha=r.fecha,
+                pagina=r.page_number
             )
-            saved_count += 1
-            if current_hits > 0:
-                update_progress("save", saved_count, current_hits, r["cedula"])
+            if flushed and current_hits > 0:
+                update_progress("save", i + 1, current_hits, r.cedula)
         except Exception as e:
-            print(f"⚠️ Error guardando en BD para cédula {r['cedula']}: {e}", file=sys.stderr)
+            save_errors += 1
+            print(f"⚠️ Error guardando en BD el lote que termina en la cédula {r.cedula}: {e}", file=sys.stderr)
+    try:
+        writer.close()
+    except Exception as e:
+        save_errors += 1
+        print(f"⚠️ Error guardando en BD el último lote: {e}", file=sys.stderr)
+    saved_count = writer.saved
+
+    try:
+        if covers_archive and scan_until is not None and not save_errors:
+            repository.set_mining_watermark(scan_until)
+        if args.job_id:
+            repository.record_job_stats(args.job_id, {"gacetas": to_scan, "cedulas": len(cedulas), "relaciones": saved_count})
+    except Exception as e:
+        print(f"⚠️ Error registrando la extracción: {e}", file=sys.stderr)
 
     # --- Resumen final ---
     print("\n" + "=" * 60)
     print("RESUMEN FINAL")
     print("=" * 60)
     print(f"Número total de cédulas encontradas: {len(cedulas)}")
-    print(f"Relaciones guardadas en MongoDB: {saved_count}")
-    print("Colecciones actualizadas: 'persona', 'gaceta', 'persona_gaceta'.")
+    print(f"Relaciones guardadas en {'SQLite' if sqlite_backend else 'MongoDB'}: {saved_count}")
+    if sqlite_backend:
+        print(f"Tablas actualizadas en {args.sqlite_path}: 'persona', 'gaceta', 'persona_gaceta'.")
+    else:
+        print("Colecciones actualizadas: 'persona', 'gaceta', 'persona_gaceta' y el modelo de lectura de personas.")
     print("=" * 60)
     
     update_progress("done", 1, 1, "")
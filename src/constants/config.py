@@ -4,5 +4,115 @@ Configuration from environment (MongoDB). Easy to change per environment.
 import os
 
 MONGO_URI = os.getenv("MONGO_URI")
+# Used by the web app when MONGO_URI is not set
+MONGO_DEFAULT_URI = "mongodb://localhost:27017/"
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "gacetas_db")
 MONGO_COLLECTION_NAME = os.getenv("MONGO_COLLECTION_NAME", "gacetas")
+# Denormalized persona documents (embedded appearances) read by the search endpoints
+MONGO_READ_MODEL_COLLECTION = os.getenv("MONGO_READ_MODEL_COLLECTION", "persona_apariciones")
+# One document per OCR'd page, with a text index (full-text search over the gacetas)
+MONGO_PAGES_COLLECTION = os.getenv("MONGO_PAGES_COLLECTION", "gaceta_paginas")
+# Stemming / stop words of that text index (a MongoDB text search language)
+MONGO_TEXT_LANGUAGE = os.getenv("MONGO_TEXT_LANGUAGE", "spanish")
+# Small bookkeeping documents (read model layout version, ...)
+MONGO_METADATA_COLLECTION = os.getenv("MONGO_METADATA_COLLECTION", "metadata")
+# Mining (extraction) job history; the running job doubles as a lease (see mongodb_jobs)
+MONGO_JOBS_COLLECTION = os.getenv("MONGO_JOBS_COLLECTION", "mining_jobs")
+
+# Where the CLI reads gacetas and saves relationships: "mongo", or "sqlite" for a single-node
+# store in one file (src/adapters/sqlite.py; fill it with `--migrate-sqlite`), and
+# that file's path, hits per write transaction and gacetas per transaction when importing.
+# SQLite is CLI-only: the web app searches MongoDB, so its mining jobs always use "mongo"
+REPOSITORY_BACKEND = os.getenv("REPOSITORY_BACKEND", "mongo")
+SQLITE_PATH = os.getenv(
+    "SQLITE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "gacetas.sqlite3"),
+)
+SQLITE_BULK_SIZE = int(os.getenv("SQLITE_BULK_SIZE", "5000"))
+SQLITE_IMPORT_BATCH_SIZE = int(os.getenv("SQLITE_IMPORT_BATCH_SIZE", "200"))
+
+# Append-only page-text store read through mmap (src/adapters/page_store.py): directory,
+# bytes per segment file, and whether extraction scans it instead of the repository ("1"; the
+# CLI --page-store does the same for one run). ocr_processor appends every new gaceta to it
+PAGE_STORE_DIR = os.getenv(
+    "PAGE_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "paginas"),
+)
+PAGE_STORE_SEGMENT_BYTES = int(os.getenv("PAGE_STORE_SEGMENT_BYTES", str(256 * 1024 * 1024)))
+PAGE_STORE_SCAN = os.getenv("PAGE_STORE_SCAN", "0") == "1"
+
+# Shared client (src/adapters/mongodb_client.py): connection pool bounds, timeouts (ms, empty =
+# driver default) and wire compression (comma-separated: zlib, snappy, zstd)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = os.getenv("MONGO_CONNECT_TIMEOUT_MS", "")
+MONGO_SOCKET_TIMEOUT_MS = os.getenv("MONGO_SOCKET_TIMEOUT_MS", "")
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+MONGO_APP_NAME = os.getenv("MONGO_APP_NAME", "gacetas-scrapper")
+
+# Gacetas fetched per cursor round trip when scanning (documents carry the full OCR text)
+MONGO_BATCH_SIZE = int(os.getenv("MONGO_BATCH_SIZE", "8"))
+
+# Bulk export: personas fetched per cursor round trip (read-model documents are small)
+MONGO_EXPORT_BATCH_SIZE = int(os.getenv("MONGO_EXPORT_BATCH_SIZE", "1000"))
+
+# Relationship writer (persona / gaceta / persona_gaceta): hits per bulk flush, and max seconds between flushes
+MONGO_BULK_SIZE = int(os.getenv("MONGO_BULK_SIZE", "1000"))
+MONGO_BULK_FLUSH_SECONDS = float(os.getenv("MONGO_BULK_FLUSH_SECONDS", "5"))
+
+# Search API response cache: "memory" (per process), "mongo" (memory + a collection shared by
+# all workers) or "off". Entries are keyed by the data version, so they never go stale; the
+# TTL and size bounds only limit memory
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "600"))
+# How long a process trusts the data version it last read before asking MongoDB again
+RESPONSE_CACHE_VERSION_SECONDS = float(os.getenv("RESPONSE_CACHE_VERSION_SECONDS", "1"))
+MONGO_RESPONSE_CACHE_COLLECTION = os.getenv("MONGO_RESPONSE_CACHE_COLLECTION", "response_cache")
+
+# Mining jobs started from the web app (src/services/mining_jobs.py): extraction processes
+# per job (the CLI --workers; half the CPUs by default, leaving the rest to the API), seconds
+# between heartbeats, and seconds without one after which a running job is considered dead
+MINING_WORKERS = int(os.getenv("MINING_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+MINING_HEARTBEAT_SECONDS = float(os.getenv("MINING_HEARTBEAT_SECONDS", "5"))
+MINING_JOB_LEASE_SECONDS = float(os.getenv("MINING_JOB_LEASE_SECONDS", "120"))
+
+# Extraction progress shared by the CLI and the web app (src/utils/progress.py): the file,
+# the least seconds / percentage points between writes, and how the SSE stream
+# (/api/progress/stream) checks it and for how long one connection stays open (the browser
+# reconnects on its own)
+PROGRESS_FILE = os.getenv(
+    "PROGRESS_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "progress.json"),
+)
+PROGRESS_MIN_INTERVAL_SECONDS = float(os.getenv("PROGRESS_MIN_INTERVAL_SECONDS", "1"))
+PROGRESS_MIN_DELTA = int(os.getenv("PROGRESS_MIN_DELTA", "1"))
+PROGRESS_STREAM_POLL_SECONDS = float(os.getenv("PROGRESS_STREAM_POLL_SECONDS", "0.5"))
+PROGRESS_STREAM_MAX_SECONDS = float(os.getenv("PROGRESS_STREAM_MAX_SECONDS", "300"))
+
+# Gaceta PDFs (written by the scraper, read by ocr_processor and served by the web app) and
+# how long browsers may cache them: a published gaceta never changes
+DOWNLOADS_DIR = os.getenv(
+    "DOWNLOADS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "downloads"),
+)
+PDF_CACHE_MAX_AGE_SECONDS = int(os.getenv("PDF_CACHE_MAX_AGE_SECONDS", str(30 * 24 * 3600)))
+# Single pages cut out of the PDFs (one-page PDFs and PNG/WebP previews), generated on demand
+# and kept in a disk cache bounded to PAGE_CACHE_MAX_BYTES (least recently used go first)
+PAGE_CACHE_DIR = os.getenv(
+    "PAGE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "cache", "paginas"),
+)
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Cédula existence index (/api/v1/personas/existe, src/adapters/mongodb_cedula_index.py):
+# snapshot directory shared by the web workers (memory-mapped), seconds between data version
+# checks, and least seconds between rebuilds while the data keeps changing (mining)
+CEDULA_INDEX_DIR = os.getenv(
+    "CEDULA_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "cache", "cedulas"),
+)
+CEDULA_INDEX_CHECK_SECONDS = float(os.getenv("CEDULA_INDEX_CHECK_SECONDS", "5"))
+CEDULA_INDEX_REBUILD_SECONDS = float(os.getenv("CEDULA_INDEX_REBUILD_SECONDS", "300"))
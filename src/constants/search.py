@@ -12,3 +12,41 @@ SNIPPET_LEN_CEDULA = 150
 
 # Length of context stored in CSV for verification (fuller snippet to read the page)
 CSV_CONTEXT_VERIFICATION_CHARS = 800
+
+# Streaming exports (CSV / NDJSON): rows encoded per chunk sent to the client or file
+EXPORT_CHUNK_ROWS = 500
+
+# Parquet snapshot: most rows per part file (one year partition may span several files)
+SNAPSHOT_ROWS_PER_FILE = 250_000
+
+# Parallel extraction: id ranges handed out per worker process (more ranges = better balance)
+PARTITIONS_PER_WORKER = 4
+
+# Windows scanned around each cédula: keyword check (relevance) and name extraction
+KEYWORD_WINDOW_CHARS = 150
+NAME_WINDOW_CHARS = 120
+
+# Full-text page search: characters per highlighted fragment and fragments per page
+TEXT_SNIPPET_CHARS = 240
+TEXT_SNIPPETS_PER_PAGE = 2
+
+# Trigram name index (substring / typo-tolerant name search): the most persona ids a name
+# search may use; a broader term is searched by word prefix (nombre_tokens) instead. Bounds the
+# $in list sent to MongoDB
+NAME_INDEX_MAX_IDS = 2000
+
+# Search planner: a search term with a letter and at least this many digits ("V12345678") is a
+# whole cédula, looked up by equality (shorter ones are cédula prefixes)
+EXACT_CEDULA_MIN_DIGITS = 7
+
+# Batch cédula lookup (POST /api/v1/personas/batch): most cédulas per request, and cédulas
+# resolved per $in query
+PERSONAS_BATCH_MAX = 10000
+PERSONAS_BATCH_QUERY_CHUNK = 1000
+
+# Page previews (/pdf/<file>/pagina/<n>): default width, bounds, and the step widths are
+# rounded up to (so arbitrary sizes do not multiply the cached renders)
+PREVIEW_DEFAULT_WIDTH = 800
+PREVIEW_MIN_WIDTH = 100
+PREVIEW_MAX_WIDTH = 2000
+PREVIEW_WIDTH_STEP = 100
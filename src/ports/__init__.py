@@ -1,3 +1,3 @@
-from src.ports.repository import GacetaRepository, GacetaDocument, GacetaPage
+from src.ports.repository import GacetaRepository, GacetaDocument, GacetaPage, GacetaFilter, IdRange
 
-__all__ = ["GacetaRepository", "GacetaDocument", "GacetaPage"]
+__all__ = ["GacetaRepository", "GacetaDocument", "GacetaPage", "GacetaFilter", "IdRange"]
@@ -2,33 +2,95 @@
 Port: abstraction for reading gacetas (all documents, all pages).
 Implementations (adapters) can use MongoDB, files, etc.
 """
-from typing import Protocol, Iterator, Optional
+from datetime import date
+from typing import Any, Protocol, Iterable, Iterator, Optional
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class GacetaPage:
     page_number: Optional[int]
     text: str
 
 
-@dataclass
+@dataclass(slots=True)
 class GacetaDocument:
     filename: str
     numero_gaceta: str
     fecha: str
     year: Optional[int]
-    pages: list[GacetaPage]
+    # May be a lazy iterable (adapters decode page text on demand); iterate it once.
+    pages: Iterable[GacetaPage]
+    # Only filled for gacetas without per-page text; adapters may skip it otherwise.
     full_text: str
+    tipo: str = ""
+
+
+# Inclusive (first_id, last_id) bounds of a contiguous slice of the store, in scan order.
+IdRange = tuple[Any, Any]
+
+
+@dataclass(frozen=True, slots=True)
+class GacetaFilter:
+    """
+    Which gacetas to read; every field is optional and they combine with AND.
+    Dates are inclusive and compare the gaceta's publication date (year/month/day).
+    """
+    year: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    tipo: Optional[str] = None
+    id_min: Any = None
+    id_max: Any = None
+
+    def is_empty(self) -> bool:
+        return all(getattr(self, name) is None for name in self.__slots__)
+
+
+def split_ranges(ids: list[Any], parts: int) -> list[IdRange]:
+    """Split ids (in scan order) into at most `parts` contiguous, near-equal id ranges."""
+    if not ids:
+        return []
+    parts = max(1, min(parts, len(ids)))
+    size, extra = divmod(len(ids), parts)
+    ranges: list[IdRange] = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((ids[start], ids[end - 1]))
+        start = end
+    return ranges
 
 
 class GacetaRepository(Protocol):
     """Provides access to all registered gacetas and their pages."""
 
-    def iter_gacetas(self, limit: Optional[int] = None) -> Iterator[GacetaDocument]:
-        """Yield every gaceta (all pages). If limit is set, yield at most that many gacetas."""
+    def iter_gacetas(
+        self,
+        limit: Optional[int] = None,
+        id_range: Optional[IdRange] = None,
+        filters: Optional[GacetaFilter] = None,
+    ) -> Iterator[GacetaDocument]:
+        """
+        Yield every gaceta (all pages) in a stable order. If limit is set, yield at most that many gacetas.
+        If filters is set, yield only matching gacetas. If id_range is set, yield only the gacetas
+        inside that slice (see partition).
+        """
+        ...
+
+    def count(self, filters: Optional[GacetaFilter] = None) -> int:
+        """Number of gacetas in the store (matching filters, if given)."""
         ...
 
-    def count(self) -> int:
-        """Total number of gacetas in the store."""
+    def partition(
+        self,
+        parts: int,
+        limit: Optional[int] = None,
+        filters: Optional[GacetaFilter] = None,
+    ) -> list[IdRange]:
+        """
+        Split the first `limit` gacetas matching filters (all if None) into at most `parts` contiguous
+        id ranges. Concatenating iter_gacetas(id_range=r, filters=filters) over the ranges, in order,
+        equals iter_gacetas(limit=limit, filters=filters).
+        """
         ...
@@ -1,3 +1,3 @@
-from src.services.search_service import search_cedulas
+from src.services.search_service import search_cedulas, search_cedulas_parallel
 
-__all__ = ["search_cedulas"]
+__all__ = ["search_cedulas", "search_cedulas_parallel"]
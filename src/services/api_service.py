@@ -1,83 +1,150 @@
-from typing import List, Dict, Any, Tuple
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Hashable, Iterator, Optional, Tuple
 
-def query_personas_mongo(db, match_conditions: List[Dict[str, Any]], page: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+from src.constants.config import MONGO_READ_MODEL_COLLECTION
+from src.constants.search import PERSONAS_BATCH_QUERY_CHUNK
+from src.adapters.mongodb_read_model import data_version
+from src.utils.cursors import encode_cursor
+from src.adapters.mongodb_pages import search_pages
+from src.utils.snippets import build_snippets
+from src.utils.normalization import cedula_digits, split_cedula
+
+# Totales por (base, versión de los datos, parámetros): solo se recalculan cuando cambian los datos
+_COUNT_CACHE_SIZE = 512
+_count_cache: "OrderedDict[Tuple[str, int, Hashable], int]" = OrderedDict()
+_count_lock = threading.Lock()
+# Lo que format_persona_response necesita, más las claves para agrupar el lote
+_BATCH_PROJECTION = {"cedula": 1, "nombre": 1, "total_apariciones": 1, "apariciones": 1, "cedula_letra": 1, "cedula_numero": 1}
+
+def count_personas(db, query: Dict[str, Any], params: Hashable, exact: bool = False) -> int:
+    """
+    Total de personas para `query`. Sin filtro es el conteo estimado de la colección; con
+    filtro se cuenta una vez por versión de los datos (ver bump_data_version) y se reutiliza.
+    `params` identifica la consulta en la caché: los parámetros normalizados de los que sale,
+    no la consulta en sí (puede llevar miles de _id del índice de nombres).
+    exact=True cuenta siempre (y actualiza la caché).
+    """
+    collection = db[MONGO_READ_MODEL_COLLECTION]
+    if not query and not exact:
+        return collection.estimated_document_count()
+    key = (db.name, data_version(db), params)
+    if not exact:
+        with _count_lock:
+            if key in _count_cache:
+                _count_cache.move_to_end(key)
+                return _count_cache[key]
+    total = collection.count_documents(query)
+    with _count_lock:
+        _count_cache[key] = total
+        _count_cache.move_to_end(key)
+        while len(_count_cache) > _COUNT_CACHE_SIZE:
+            _count_cache.popitem(last=False)
+    return total
+
+def query_personas_mongo(db, plan, exact_count: bool = False) -> Tuple[List[Dict[str, Any]], Optional[int]]:
     """
-    Lógica de base de datos extraída de la ruta para mantener el código limpio.
-    Busca las personas de acuerdo a las condiciones recibidas con paginación.
-    Retorna (resultados, total).
+    Ejecuta un SearchPlan (ver src/api/v1/planner.py) sobre el modelo de lectura (una persona
+    por documento, con sus apariciones y total_apariciones ya calculados): cada página es un
+    find indexado. Con cursor (`after`) la página empieza justo después y cuesta lo mismo que
+    la primera; sin cursor se usa `page` con skip.
+    Si el plan busca una cédula completa que no existe, se usa su alternativa (inicio de cédula).
+    Retorna (resultados, total). El total sale de la propia página cuando esta no se llenó;
+    si no, de count_personas(), o es None si el plan no lo pide.
     """
-    skip = (page - 1) * limit
-    
-    pipeline = []
-    if match_conditions:
-        if len(match_conditions) == 1:
-            pipeline.append({"$match": match_conditions[0]})
-        else:
-            pipeline.append({"$match": {"$and": match_conditions}})
-            
-    facet_data = [
-        {"$sort": {"_id": -1}},
-        {"$skip": skip},
-        {"$limit": limit},
-        {"$lookup": {
-            "from": "persona_gaceta",
-            "localField": "_id",
-            "foreignField": "persona_id",
-            "as": "relationships"
-        }},
-        {"$unwind": {"path": "$relationships", "preserveNullAndEmptyArrays": True}},
-        {"$lookup": {
-            "from": "gaceta",
-            "localField": "relationships.gaceta_id",
-            "foreignField": "_id",
-            "as": "gaceta_info"
-        }},
-        {"$unwind": {"path": "$gaceta_info", "preserveNullAndEmptyArrays": True}},
-        {"$sort": {"gaceta_info.numero_gaceta": -1}},
-        {"$group": {
-            "_id": "$_id",
-            "cedula": {"$first": "$cedula"},
-            "nombre": {"$first": "$nombre"},
-            "apariciones": {
-                "$push": {
-                    "numero_gaceta": "$gaceta_info.numero_gaceta",
-                    "filename": "$gaceta_info.filename",
-                    "fecha": "$gaceta_info.fecha",
-                    "pagina": "$relationships.pagina"
-                }
-            }
-        }},
-        {"$project": {
-            "_id": 1,
-            "cedula": 1,
-            "nombre": 1,
-            "apariciones": {
-                "$filter": {
-                    "input": "$apariciones",
-                    "as": "ap",
-                    "cond": {"$ne": ["$$ap.numero_gaceta", None]}
-                }
-            }
-        }},
-        {"$addFields": {
-            "total_apariciones": {"$size": "$apariciones"}
-        }},
-        {"$sort": {"cedula": -1}}
-    ]
+    collection = db[MONGO_READ_MODEL_COLLECTION]
+    query = plan.filter
 
-    pipeline.append({
-        "$facet": {
-            "metadata": [{"$count": "total"}],
-            "data": facet_data
-        }
-    })
+    data = _find_page(collection, plan, query) if plan.limit > 0 else []
+    if plan.fallback is not None and not data:
+        # Primera página vacía: la cédula no existe. En otra página, se comprueba (un acceso al índice)
+        first_page = plan.limit > 0 and plan.skip == 0 and not plan.after
+        if first_page or collection.find_one(query, {"_id": 1}) is None:
+            query = plan.fallback
+            data = _find_page(collection, plan, query) if plan.limit > 0 else []
+    if plan.sort != "apariciones":
+        # Dentro de la página se mantiene el orden por cédula de siempre
+        data.sort(key=lambda doc: doc.get("cedula") or "", reverse=True)
 
-    result = list(db.persona.aggregate(pipeline))
-    if result and result[0]['metadata']:
-        total = result[0]['metadata'][0]['total']
-        data = result[0]['data']
+    if not plan.after and 0 < plan.limit and len(data) < plan.limit and (data or plan.skip == 0):
+        total: Optional[int] = plan.skip + len(data)
+    elif plan.count or exact_count:
+        params = (plan.count_key, query is plan.fallback)
+        total = count_personas(db, query, params, exact=exact_count)
     else:
-        total = 0
-        data = []
-        
+        total = None
     return data, total
+
+def _find_page(collection, plan, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    cursor = collection.find(plan.find_filter(query)).sort(plan.sort_keys)
+    if plan.skip:
+        cursor = cursor.skip(plan.skip)
+    return list(cursor.limit(plan.limit))
+
+def next_cursor(data: List[Dict[str, Any]], sort: str, limit: int) -> Optional[str]:
+    """Cursor de la página siguiente (None si esta página no se llenó, es decir, fue la última)."""
+    if len(data) < limit or not data:
+        return None
+    if sort == "apariciones":
+        last = min(data, key=lambda doc: (doc.get("total_apariciones", 0), doc["_id"]))
+        return encode_cursor("apariciones", last)
+    return encode_cursor("newest", min(data, key=lambda doc: doc["_id"]))
+
+def normalize_batch_cedulas(values: List[Any]) -> Tuple[List[Tuple[str, Optional[str], int, str]], List[Any]]:
+    """
+    Cédulas de un lote a (clave, letra, número, dígitos), sin repetidas y en el orden recibido.
+    La clave es el formato homologado "L-dígitos" con los dígitos tal como se escribieron
+    ("V-012345678" no es "V-12345678"), o solo los dígitos si no trae letra, y entonces vale
+    cualquier letra. Retorna (cédulas, inválidas).
+    """
+    cedulas, invalidas, vistas = [], [], set()
+    for value in values:
+        letra, numero = split_cedula(value) if isinstance(value, str) else (None, None)
+        if numero is None:
+            invalidas.append(value)
+            continue
+        digitos = cedula_digits(value)
+        clave = f"{letra}-{digitos}" if letra else digitos
+        if clave not in vistas:
+            vistas.add(clave)
+            cedulas.append((clave, letra, numero, digitos))
+    return cedulas, invalidas
+
+def iter_personas_batch(
+    db, cedulas: List[Tuple[str, Optional[str], int, str]], chunk_size: int = PERSONAS_BATCH_QUERY_CHUNK
+) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    (clave, personas) por cada cédula de normalize_batch_cedulas, en el mismo orden.
+    Cada bloque de `chunk_size` cédulas se resuelve con una sola consulta $in sobre el índice
+    de cedula_numero del modelo de lectura, que ya trae las apariciones de cada persona; el
+    número no conserva los ceros a la izquierda, así que cada clave se queda con las personas
+    cuya cédula guardada tiene los mismos dígitos. Sin letra puede haber varias personas.
+    """
+    collection = db[MONGO_READ_MODEL_COLLECTION]
+    for start in range(0, len(cedulas), chunk_size):
+        chunk = cedulas[start:start + chunk_size]
+        por_numero: Dict[int, List[Dict[str, Any]]] = {}
+        query = {"cedula_numero": {"$in": sorted({numero for _, _, numero, _ in chunk})}}
+        for doc in collection.find(query, _BATCH_PROJECTION):
+            por_numero.setdefault(doc["cedula_numero"], []).append(doc)
+        for clave, letra, numero, digitos in chunk:
+            personas = [
+                doc for doc in por_numero.get(numero, [])
+                if (letra is None or doc.get("cedula_letra") == letra) and cedula_digits(doc.get("cedula")) == digitos
+            ]
+            personas.sort(key=lambda doc: doc.get("cedula") or "")
+            yield clave, personas
+
+def query_paginas_mongo(db, params: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Búsqueda de texto completo sobre las páginas OCR (índice de texto de MongoDB: sin acentos,
+    con raíces en español), ordenada por relevancia. A cada página le agrega `fragmentos`:
+    trozos del texto con los términos buscados resaltados. Retorna (resultados, total).
+    """
+    skip = (params["page"] - 1) * params["limit"]
+    docs, total = search_pages(
+        db, params["query"], skip=skip, limit=params["limit"], year=params.get("anio"), tipo=params.get("tipo")
+    )
+    for doc in docs:
+        doc["fragmentos"] = build_snippets(doc.pop("text", ""), params["query"])
+    return docs, total
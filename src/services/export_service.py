@@ -0,0 +1,40 @@
+"""
+Exportación masiva de personas y sus apariciones, en CSV (una fila por aparición, columnas
+de CSV_COLUMNS) o NDJSON (una persona por línea, mismo formato que /api/v1/personas).
+Todo son generadores de bytes: la API los envía tal cual y la CLI los escribe en un archivo.
+"""
+from typing import Any, Dict, Iterable, Iterator
+
+from src.adapters.mongodb_export import parse_fecha
+from src.utils.csv_export import build_persona_rows, iter_csv
+from src.utils.stream_export import gzip_chunks, iter_ndjson
+
+EXPORT_FORMATS = ("csv", "ndjson")
+_MIMETYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+def export_mimetype(formato: str, comprimir: bool = False) -> str:
+    return "application/gzip" if comprimir else _MIMETYPES[formato]
+
+def export_filename(formato: str, comprimir: bool = False) -> str:
+    return f"personas.{formato}" + (".gz" if comprimir else "")
+
+def format_persona_export(persona: Dict[str, Any]) -> Dict[str, Any]:
+    """Registro NDJSON: el de la API más la fecha en ISO 8601 (YYYY-MM-DD) de cada mención."""
+    # Import diferido: src.api.v1 importa este módulo (rutas)
+    from src.api.v1.schemas import format_persona_response
+
+    record = format_persona_response(persona)
+    for mencion in record["menciones_gaceta"]:
+        fecha = parse_fecha(mencion["fecha_publicacion"])
+        mencion["fecha_iso"] = fecha.isoformat() if fecha else None
+    return record
+
+def export_chunks(personas: Iterable[Dict[str, Any]], formato: str, comprimir: bool = False) -> Iterator[bytes]:
+    """Bytes de la exportación, bloque a bloque (ValueError si el formato no existe)."""
+    if formato not in EXPORT_FORMATS:
+        raise ValueError(f"formato no soportado: {formato}")
+    if formato == "csv":
+        chunks = iter_csv(build_persona_rows(personas))
+    else:
+        chunks = iter_ndjson(format_persona_export(persona) for persona in personas)
+    return gzip_chunks(chunks) if comprimir else chunks
@@ -0,0 +1,152 @@
+"""
+Mining (extraction) jobs started from the web app.
+Each job runs the CLI (`python -m src.cli`) in its own process group, supervised by a thread
+of a bounded pool. Single-flight: the job record is a lease in MongoDB (see mongodb_jobs),
+so while one job is queued or running, starting another one from any web worker attaches to
+it instead. Cancellation is a flag on the record; the supervisor that owns the process sees
+it on its next heartbeat and terminates the whole group. Finished jobs keep their duration,
+counters and throughput as history.
+Modes: "incremental" scans only gacetas added since the last complete run; "completo" scans
+the whole archive again.
+Jobs always use the MongoDB backend, whatever REPOSITORY_BACKEND says: the web app searches
+the MongoDB read model and reads job stats and the watermark from MongoDB (SQLite is CLI-only).
+"""
+import os
+import signal
+import subprocess
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.constants.config import MINING_HEARTBEAT_SECONDS, MINING_JOB_LEASE_SECONDS, MINING_WORKERS
+from src.adapters.mongodb_jobs import CANCELLED, COMPLETED, FAILED, MongoJobStore
+
+MINING_MODES = ("incremental", "completo")
+# Seconds a cancelled job gets to exit after SIGTERM before it is killed
+_TERMINATE_GRACE_SECONDS = 10
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def mining_command(job_id: str, modo: str, workers: int) -> list[str]:
+    command = [sys.executable, "-m", "src.cli", "--backend", "mongo", "--job-id", job_id, "--workers", str(workers)]
+    if modo == "incremental":
+        command.append("--incremental")
+    return command
+
+
+def _duration(job: dict[str, Any]) -> Optional[float]:
+    inicio, fin = job.get("inicio"), job.get("fin")
+    if inicio is None or fin is None:
+        return None
+    return round((fin - inicio).total_seconds(), 1)
+
+
+class MiningJobManager:
+    def __init__(
+        self,
+        db_getter: Callable[[], Any],
+        max_jobs: int = 1,
+        workers: int = MINING_WORKERS,
+        on_start: Optional[Callable[[dict[str, Any]], None]] = None,
+        on_finish: Optional[Callable[[dict[str, Any]], None]] = None,
+    ) -> None:
+        self._db_getter = db_getter
+        self._workers = workers
+        # Called with each new job before its process starts, and with its final record
+        # (e.g. to reset progress.json)
+        self._on_start = on_start
+        self._on_finish = on_finish
+        # Supervisor threads are only started on the first submit (after any fork)
+        self._executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="mining")
+
+    def _store(self) -> MongoJobStore:
+        return MongoJobStore(self._db_getter())
+
+    def start(self, modo: str = "incremental") -> tuple[dict[str, Any], bool]:
+        """Start a job, or attach to the active one. Returns (job, True if it was already running)."""
+        if modo not in MINING_MODES:
+            raise ValueError(f"unknown mining mode: {modo}")
+        job, created = self._store().claim({"_id": uuid.uuid4().hex, "modo": modo}, MINING_JOB_LEASE_SECONDS)
+        if created:
+            if self._on_start is not None:
+                self._on_start(job)
+            self._executor.submit(self._supervise, job["_id"], modo)
+        return job, not created
+
+    def cancel(self, job_id: str) -> Optional[dict[str, Any]]:
+        """Request cancellation; None if the job does not exist or is no longer active."""
+        return self._store().request_cancel(job_id)
+
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        return self._store().get(job_id)
+
+    def history(self, limit: int = 20) -> list[dict[str, Any]]:
+        return self._store().history(limit)
+
+    def _supervise(self, job_id: str, modo: str) -> None:
+        store = self._store()
+        try:
+            process = subprocess.Popen(
+                mining_command(job_id, modo, self._workers),
+                cwd=_PROJECT_ROOT,
+                # Own process group: cancelling also stops the extraction worker processes
+                start_new_session=(os.name == "posix"),
+            )
+        except Exception as e:
+            store.finish(job_id, {"estado": FAILED, "mensaje": f"No se pudo iniciar la extracción: {e}"})
+            self._finished(store, job_id)
+            return
+
+        store.mark_running(job_id, process.pid)
+        cancelled = False
+        while True:
+            try:
+                returncode = process.wait(timeout=MINING_HEARTBEAT_SECONDS)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            try:
+                job = store.heartbeat(job_id)
+            except Exception:
+                # MongoDB unreachable for a moment: keep the job running, retry next beat
+                continue
+            if job is not None and job.get("cancelar") and not cancelled:
+                cancelled = True
+                _terminate(process)
+
+        if cancelled:
+            fields = {"estado": CANCELLED, "mensaje": "Cancelada por el usuario."}
+        elif returncode == 0:
+            fields = {"estado": COMPLETED, "mensaje": "Extracción completada."}
+        else:
+            fields = {"estado": FAILED, "mensaje": f"La extracción terminó con código {returncode}."}
+        fields["codigo_salida"] = returncode
+        store.finish(job_id, fields)
+        self._finished(store, job_id)
+
+    def _finished(self, store: MongoJobStore, job_id: str) -> None:
+        job = store.get(job_id) or {}
+        duracion = _duration(job)
+        stats: dict[str, Any] = {"duracion_s": duracion}
+        if duracion and job.get("gacetas") is not None:
+            stats["gacetas_por_segundo"] = round(job["gacetas"] / duracion, 2)
+        store.update(job_id, stats)
+        if self._on_finish is not None:
+            self._on_finish({**job, **stats})
+
+
+def _terminate(process: subprocess.Popen) -> None:
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGTERM)
+        else:
+            process.terminate()
+        process.wait(timeout=_TERMINATE_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
@@ -0,0 +1,56 @@
+"""
+Single gaceta pages for the web app: a standalone one-page PDF or a PNG/WebP preview,
+generated on first request and then served from the page cache (src/utils/disk_cache.py).
+Cached files are keyed by the PDF's size and mtime too, so a replaced PDF gets new pages.
+"""
+import functools
+import os
+from pathlib import Path
+from typing import Optional
+
+from src.constants.config import PAGE_CACHE_DIR, PAGE_CACHE_MAX_BYTES
+from src.constants.search import PREVIEW_DEFAULT_WIDTH, PREVIEW_MAX_WIDTH, PREVIEW_MIN_WIDTH, PREVIEW_WIDTH_STEP
+from src.adapters.pdf_pages import IMAGE_FORMATS, extract_page_pdf, page_count, render_page
+from src.utils.disk_cache import DiskCache
+
+PAGE_FORMATS = ("pdf", *IMAGE_FORMATS)
+MIMETYPES = {"pdf": "application/pdf", "png": "image/png", "webp": "image/webp"}
+
+page_cache = DiskCache(PAGE_CACHE_DIR, PAGE_CACHE_MAX_BYTES)
+
+
+def preview_width(requested: Optional[int]) -> int:
+    """Clamp to the allowed range and round up to PREVIEW_WIDTH_STEP."""
+    width = min(max(requested or PREVIEW_DEFAULT_WIDTH, PREVIEW_MIN_WIDTH), PREVIEW_MAX_WIDTH)
+    return -(-width // PREVIEW_WIDTH_STEP) * PREVIEW_WIDTH_STEP
+
+
+@functools.lru_cache(maxsize=1024)
+def _page_count(pdf_path: str, version: tuple[int, int]) -> int:
+    return page_count(pdf_path)
+
+
+def _version(pdf_path: str) -> tuple[int, int]:
+    stat = os.stat(pdf_path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def page_file(pdf_path: str, page: int, fmt: str, width: Optional[int] = None) -> Optional[Path]:
+    """
+    Cached file with page `page` (1-based) of `pdf_path` in `fmt` ("pdf", "png", "webp");
+    None if the document has no such page. RuntimeError if poppler/pdf2image fail.
+    """
+    version = _version(pdf_path)
+    if not 1 <= page <= _page_count(pdf_path, version):
+        return None
+    size = "" if fmt == "pdf" else f"-w{preview_width(width)}"
+    key = f"{os.path.basename(pdf_path)}:{version[0]}:{version[1]}:p{page}{size}"
+    suffix = f".{fmt}"
+    cached = page_cache.get(key, suffix)
+    if cached is not None:
+        return cached
+    if fmt == "pdf":
+        data = extract_page_pdf(pdf_path, page)
+    else:
+        data = render_page(pdf_path, page, preview_width(width), fmt)
+    return page_cache.put(key, suffix, data)
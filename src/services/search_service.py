@@ -2,73 +2,96 @@
 Application services: search all gacetas (via port) for cédulas.
 Uses GacetaRepository (port) and text matchers (utils). Easy to change repository or patterns.
 """
-from typing import Optional, Any, List
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, Callable
 
-from src.ports.repository import GacetaRepository
-from src.utils.text_matchers import find_cedulas_with_context
-from src.constants.search import SNIPPET_LEN_CEDULA
+from src.ports.repository import GacetaRepository, GacetaDocument, GacetaFilter, IdRange
+from src.utils.text_matchers import scan_cedulas
+from src.utils.hits import CedulaHits
+from src.constants.search import PARTITIONS_PER_WORKER
+
+
+def scan_document(doc: GacetaDocument, hits: CedulaHits) -> None:
+    """Append the hits of one gaceta to `hits`, page by page (or full_text when it has no pages)."""
+    gaceta_index = hits.add_gaceta(doc.filename, doc.numero_gaceta, doc.fecha, doc.year)
+    # Prefer per-page scan so we can report page_number (pages may be lazy: iterate once)
+    has_pages = False
+    for page in doc.pages:
+        has_pages = True
+        hits.add_page(gaceta_index, page.page_number, page.text, scan_cedulas(page.text))
+    if not has_pages and doc.full_text:
+        hits.add_page(gaceta_index, None, doc.full_text, scan_cedulas(doc.full_text))
 
 
 def search_cedulas(
     repository: GacetaRepository,
     limit_gacetas: Optional[int] = None,
     progress_callback: Optional[callable] = None,
-) -> List[dict[str, Any]]:
+    keep_text: bool = False,
+    filters: Optional[GacetaFilter] = None,
+) -> CedulaHits:
     """
-    Iterate all gacetas from the repository; for each gaceta, scan all pages.
-    Return list of hits with gaceta metadata, page number, and context.
+    Iterate all gacetas from the repository (only those matching filters, if given); for each
+    gaceta, scan all pages. Return the hits with gaceta metadata, page number and offsets.
+    Pass keep_text=True when context/snippets will be read (e.g. CSV export).
     """
-    results: List[dict[str, Any]] = []
-    for index, doc in enumerate(repository.iter_gacetas(limit=limit_gacetas)):
+    results = CedulaHits(keep_text=keep_text)
+    for index, doc in enumerate(repository.iter_gacetas(limit=limit_gacetas, filters=filters)):
         if progress_callback:
             progress_callback(index, doc.filename)
-        # Prefer per-page scan so we can report page_number
-        for page in doc.pages:
-            hits = find_cedulas_with_context(page.text)
-            for h in hits:
-                snippet = (
-                    h["context_before"][-SNIPPET_LEN_CEDULA:]
-                    + " ["
-                    + h["cedula"]
-                    + "] "
-                    + h["context_after"][:SNIPPET_LEN_CEDULA]
-                ).strip()
-                results.append({
-                    "gaceta": doc.filename,
-                    "numero_gaceta": doc.numero_gaceta,
-                    "fecha": doc.fecha,
-                    "year": doc.year,
-                    "page_number": page.page_number,
-                    "cedula": h["cedula"],
-                    "letter": h["letter"],
-                    "number": h["number"],
-                    "nombre": h["name"],
-                    "context_before": h["context_before"],
-                    "context_after": h["context_after"],
-                    "snippet": snippet,
-                })
-        if not doc.pages and doc.full_text:
-            hits = find_cedulas_with_context(doc.full_text)
-            for h in hits:
-                snippet = (
-                    h["context_before"][-SNIPPET_LEN_CEDULA:]
-                    + " ["
-                    + h["cedula"]
-                    + "] "
-                    + h["context_after"][:SNIPPET_LEN_CEDULA]
-                ).strip()
-                results.append({
-                    "gaceta": doc.filename,
-                    "numero_gaceta": doc.numero_gaceta,
-                    "fecha": doc.fecha,
-                    "year": doc.year,
-                    "page_number": None,
-                    "cedula": h["cedula"],
-                    "letter": h["letter"],
-                    "number": h["number"],
-                    "nombre": h["name"],
-                    "context_before": h["context_before"],
-                    "context_after": h["context_after"],
-                    "snippet": snippet,
-                })
+        scan_document(doc, results)
+    return results
+
+
+def _scan_partition(
+    repository_factory: Callable[[], GacetaRepository],
+    id_range: IdRange,
+    keep_text: bool,
+    filters: Optional[GacetaFilter],
+) -> tuple[int, str, CedulaHits]:
+    """Worker: open a private repository/cursor over one id range and extract locally."""
+    repository = repository_factory()
+    scanned = 0
+    last_filename = ""
+    results = CedulaHits(keep_text=keep_text)
+    for doc in repository.iter_gacetas(id_range=id_range, filters=filters):
+        scanned += 1
+        last_filename = doc.filename
+        scan_document(doc, results)
+    return scanned, last_filename, results
+
+
+def search_cedulas_parallel(
+    repository: GacetaRepository,
+    repository_factory: Callable[[], GacetaRepository],
+    workers: int,
+    limit_gacetas: Optional[int] = None,
+    progress_callback: Optional[callable] = None,
+    keep_text: bool = False,
+    filters: Optional[GacetaFilter] = None,
+) -> CedulaHits:
+    """
+    Same result as search_cedulas, computed by `workers` processes.
+    The store is split into contiguous id ranges (several per worker so slow ranges do not
+    leave cores idle); each worker builds its own repository with repository_factory, which
+    must be picklable (e.g. the adapter class). Ranges are merged back in scan order.
+    """
+    ranges = repository.partition(workers * PARTITIONS_PER_WORKER, limit=limit_gacetas, filters=filters)
+    partial_results: list[Optional[CedulaHits]] = [None] * len(ranges)
+    scanned = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        future_to_index = {
+            executor.submit(_scan_partition, repository_factory, id_range, keep_text, filters): i
+            for i, id_range in enumerate(ranges)
+        }
+        for future in as_completed(future_to_index):
+            count, last_filename, hits = future.result()
+            partial_results[future_to_index[future]] = hits
+            scanned += count
+            if progress_callback:
+                progress_callback(scanned, last_filename)
+
+    results = CedulaHits(keep_text=keep_text)
+    for hits in partial_results:
+        results.extend(hits)
     return results
@@ -1,3 +1,3 @@
-from src.utils.text_matchers import find_cedulas_with_context
+from src.utils.text_matchers import find_cedulas_with_context, scan_cedulas
 
-__all__ = ["find_cedulas_with_context"]
+__all__ = ["find_cedulas_with_context", "scan_cedulas"]
@@ -0,0 +1,195 @@
+"""
+Compact set of cédulas for membership checks ("is this cédula in any gaceta, how many times?").
+Per letter it keeps a sorted NumPy array of cédula keys and an aligned array of appearance
+counts; a lookup is a binary search (np.searchsorted), vectorized over a whole batch. One
+million cédulas take about 8 MB. A key is the number together with how many digits were
+written (see _key): leading zeros make another cédula ("V-012345678" is not "V-12345678").
+A set can be saved to a directory (one .npy pair per letter, under a versioned subdirectory
+named by manifest.json) and loaded memory-mapped, so every web worker shares the same pages
+through the OS page cache instead of holding its own copy.
+"""
+import json
+import os
+import shutil
+import tempfile
+from array import array
+from collections import defaultdict
+from typing import Any, Iterable, Optional
+
+_MANIFEST = "manifest.json"
+# Layout of the saved keys; snapshots of another layout are ignored (and rebuilt)
+_FORMAT = 2
+# Written digit counts take the low bits of a key; longer numbers are not cédulas
+_DIGIT_BITS = 5
+_MAX_KEY_NUMBER = (1 << (64 - _DIGIT_BITS)) - 1
+# Snapshot subdirectories kept besides the current one (workers may still map them)
+_KEEP_PREVIOUS = 1
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise RuntimeError("numpy not installed. pip install numpy") from e
+    return np
+
+
+def _key(number: int, digits: int) -> Optional[int]:
+    """Sorted key of a cédula number written with `digits` digits; None if it does not fit."""
+    if number > _MAX_KEY_NUMBER or not 0 < digits < (1 << _DIGIT_BITS):
+        return None
+    return (number << _DIGIT_BITS) | digits
+
+
+class CedulaSet:
+    def __init__(self, arrays: dict[str, tuple[Any, Any]], version: Any = None) -> None:
+        # letter -> (sorted unique keys, appearance counts)
+        self._arrays = arrays
+        self.version = version
+
+    @classmethod
+    def build(cls, rows: Iterable[tuple[str, int, int, int]], version: Any = None) -> "CedulaSet":
+        """
+        From (letter, number, digits written, appearances) rows in any order; repeated cédulas
+        add up.
+        """
+        np = _numpy()
+        numbers: dict[str, array] = defaultdict(lambda: array("Q"))
+        counts: dict[str, array] = defaultdict(lambda: array("L"))
+        for letter, number, digits, count in rows:
+            key = _key(number, digits or 0) if letter is not None and number is not None else None
+            if key is None:
+                continue
+            numbers[letter].append(key)
+            counts[letter].append(count or 0)
+
+        arrays = {}
+        for letter in numbers:
+            keys = np.frombuffer(numbers[letter], dtype=np.uint64)
+            values = np.frombuffer(counts[letter], dtype=np.dtype(f"u{counts[letter].itemsize}")).astype(np.uint32)
+            order = np.argsort(keys, kind="stable")
+            keys, values = keys[order], values[order]
+            unique, starts = np.unique(keys, return_index=True)
+            values = np.add.reduceat(values, starts).astype(np.uint32)
+            if unique[-1] <= np.iinfo(np.uint32).max:
+                unique = unique.astype(np.uint32)
+            arrays[letter] = (unique, values)
+        return cls(arrays, version)
+
+    def __len__(self) -> int:
+        return sum(int(keys.size) for keys, _ in self._arrays.values())
+
+    @property
+    def nbytes(self) -> int:
+        return sum(int(keys.nbytes + values.nbytes) for keys, values in self._arrays.values())
+
+    def count(self, letter: Optional[str], number: int, digits: int) -> int:
+        """
+        Appearances of one cédula written with `digits` digits (0 = not registered); no
+        letter = any letter.
+        """
+        np = _numpy()
+        key = _key(number, digits)
+        if key is None:
+            return 0
+        total = 0
+        for candidate in ([letter] if letter else self._arrays):
+            keys, values = self._arrays.get(candidate, (None, None))
+            if keys is None or key > np.iinfo(keys.dtype).max:
+                continue
+            # Same dtype as the array: searching with another one would convert the whole array
+            position = int(keys.searchsorted(keys.dtype.type(key)))
+            if position < keys.size and keys[position] == key:
+                total += int(values[position])
+        return total
+
+    def counts(self, cedulas: list[tuple[Optional[str], int, int]]) -> list[int]:
+        """Appearances of each (letter, number, digits), in order; one vectorized search per letter."""
+        np = _numpy()
+        by_letter: dict[Optional[str], list[int]] = defaultdict(list)
+        wanted: list[Optional[int]] = []
+        for position, (letter, number, digits) in enumerate(cedulas):
+            wanted.append(_key(number, digits))
+            if wanted[-1] is not None:
+                by_letter[letter].append(position)
+
+        result = [0] * len(cedulas)
+        for letter, positions in by_letter.items():
+            query = np.fromiter((wanted[p] for p in positions), dtype=np.uint64, count=len(positions))
+            found = np.zeros(len(positions), dtype=np.uint64)
+            for candidate in ([letter] if letter else sorted(self._arrays)):
+                if candidate not in self._arrays:
+                    continue
+                keys, values = self._arrays[candidate]
+                if not keys.size:
+                    continue
+                fits = query <= np.iinfo(keys.dtype).max
+                needles = np.where(fits, query, 0).astype(keys.dtype)
+                index = np.minimum(keys.searchsorted(needles), keys.size - 1)
+                found += np.where(fits & (keys[index] == needles), values[index], 0).astype(np.uint64)
+            for position, value in zip(positions, found.tolist()):
+                result[position] = value
+        return result
+
+    def save(self, directory: str) -> str:
+        """Write a new snapshot under `directory` and point the manifest at it; returns its path."""
+        np = _numpy()
+        os.makedirs(directory, exist_ok=True)
+        target = tempfile.mkdtemp(prefix="v", dir=directory)
+        for letter, (keys, values) in self._arrays.items():
+            np.save(os.path.join(target, f"{letter}.numeros.npy"), keys)
+            np.save(os.path.join(target, f"{letter}.apariciones.npy"), values)
+        manifest = {
+            "formato": _FORMAT,
+            "directorio": os.path.basename(target),
+            "version": self.version,
+            "letras": sorted(self._arrays),
+        }
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(directory, _MANIFEST))
+        _remove_old_snapshots(directory, keep=os.path.basename(target))
+        return target
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> Optional["CedulaSet"]:
+        """The current snapshot in `directory` (memory-mapped by default); None if there is none."""
+        np = _numpy()
+        try:
+            with open(os.path.join(directory, _MANIFEST), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("formato") != _FORMAT:
+                return None
+            base = os.path.join(directory, manifest["directorio"])
+            arrays = {
+                letter: (
+                    np.load(os.path.join(base, f"{letter}.numeros.npy"), mmap_mode="r" if mmap else None),
+                    np.load(os.path.join(base, f"{letter}.apariciones.npy"), mmap_mode="r" if mmap else None),
+                )
+                for letter in manifest["letras"]
+            }
+        except (OSError, ValueError, KeyError):
+            # Missing, or replaced by another process while reading: the caller rebuilds
+            return None
+        return cls(arrays, manifest.get("version"))
+
+    @staticmethod
+    def snapshot_version(directory: str) -> Any:
+        try:
+            with open(os.path.join(directory, _MANIFEST), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest.get("version") if manifest.get("formato") == _FORMAT else None
+
+
+def _remove_old_snapshots(directory: str, keep: str) -> None:
+    # Newest first; on POSIX a removed file stays readable by processes that mapped it
+    snapshots = sorted(
+        (entry for entry in os.scandir(directory) if entry.is_dir() and entry.name != keep),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in snapshots[_KEEP_PREVIOUS:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
@@ -1,13 +1,17 @@
 """
 Build CSV rows from cédula results with strategic columns.
 Columns: Nombres, Apellidos, Cédula, Número Gaceta, Fecha, Página, Contexto
+Rows can also be built lazily from read-model personas and encoded chunk by chunk
+(iter_csv), so exports of the whole dataset never hold it in memory.
 """
 import csv
+import io
 from pathlib import Path
-from typing import Any, List
+from typing import Any, Iterable, Iterator, List
 
 from src.utils.name_extractor import extract_nombres_apellidos
-from src.constants.search import CSV_CONTEXT_VERIFICATION_CHARS
+from src.utils.hits import CedulaHit
+from src.constants.search import CSV_CONTEXT_VERIFICATION_CHARS, EXPORT_CHUNK_ROWS
 
 CSV_COLUMNS = [
     "Nombres",
@@ -33,38 +37,84 @@ def _build_context_snippet(context_before: str, middle: str, context_after: str,
     return f"{before} {middle} {after}".strip()
 
 
-def build_csv_rows(cedulas: List[dict[str, Any]]) -> List[dict[str, str]]:
+def build_csv_rows(cedulas: Iterable[CedulaHit]) -> List[dict[str, str]]:
     """
     Build one row per cédula hit. Each row includes Página and Contexto for verification.
+    Hits must come from a search run with keep_text=True (context is read from the page text).
     """
     rows: List[dict[str, str]] = []
     ctx_len = CSV_CONTEXT_VERIFICATION_CHARS
 
     for r in cedulas:
-        nombres, apellidos = extract_nombres_apellidos(
-            r.get("context_before", ""),
-            r.get("context_after", ""),
-        )
+        context_before = r.context_before
+        context_after = r.context_after
+        nombres, apellidos = extract_nombres_apellidos(context_before, context_after)
         contexto = _build_context_snippet(
-            r.get("context_before", ""),
-            f"[{r.get('cedula', '')}]",
-            r.get("context_after", ""),
+            context_before,
+            f"[{r.cedula}]",
+            context_after,
             ctx_len,
         )
         rows.append({
             "Nombres": nombres,
             "Apellidos": apellidos,
-            "Cédula": r.get("cedula", ""),
-            "Número Gaceta": r.get("numero_gaceta", ""),
-            "Fecha": r.get("fecha", ""),
-            "Página": _format_page(r.get("page_number")),
+            "Cédula": r.cedula,
+            "Número Gaceta": r.numero_gaceta,
+            "Fecha": r.fecha,
+            "Página": _format_page(r.page_number),
             "Contexto": contexto,
         })
 
     return rows
 
 
-def write_csv(filepath: Path, rows: List[dict[str, str]]) -> None:
+def split_nombre(nombre: str) -> tuple[str, str]:
+    """Nombres / Apellidos of a stored name, with the same word rules as the extraction."""
+    nombres, apellidos = extract_nombres_apellidos(nombre or "", "")
+    if not nombres:
+        # Not a clean 2-5 word name (e.g. NOMBRE DESCONOCIDO): keep it whole
+        return (nombre or "", "")
+    return (nombres, apellidos)
+
+
+def build_persona_rows(personas: Iterable[dict[str, Any]]) -> Iterator[dict[str, str]]:
+    """
+    One row per appearance of each read-model persona, generated lazily.
+    Contexto is empty: the page text is not part of the read model.
+    """
+    for persona in personas:
+        nombres, apellidos = split_nombre(persona.get("nombre", ""))
+        for ap in persona.get("apariciones", []):
+            yield {
+                "Nombres": nombres,
+                "Apellidos": apellidos,
+                "Cédula": persona.get("cedula", ""),
+                "Número Gaceta": ap.get("numero_gaceta") or "",
+                "Fecha": ap.get("fecha") or "",
+                "Página": _format_page(ap.get("pagina")),
+                "Contexto": "",
+            }
+
+
+def iter_csv(rows: Iterable[dict[str, str]], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """UTF-8 CSV (with BOM, like write_csv) in chunks of `chunk_rows` rows; the header comes first."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    buffer.write("\ufeff")
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode("utf-8")
+
+
+def write_csv(filepath: Path, rows: Iterable[dict[str, str]]) -> None:
     """Write rows to CSV with UTF-8 and Excel-friendly BOM for Spanish."""
     with open(filepath, "w", encoding="utf-8-sig", newline="") as f:
         writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
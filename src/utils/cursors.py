@@ -0,0 +1,58 @@
+"""
+Opaque keyset pagination tokens: the sort key and _id of the last result of a page, so the
+next page is read with an indexed range (_id < last) instead of skipping the previous ones.
+"""
+import base64
+import json
+from typing import Any
+
+
+class InvalidCursor(ValueError):
+    """A pagination token that is malformed or was made for another sort."""
+
+
+def _encode_id(value: Any) -> dict[str, Any]:
+    from bson import ObjectId
+
+    if isinstance(value, ObjectId):
+        return {"oid": str(value)}
+    return {"v": value}
+
+
+def _decode_id(data: dict[str, Any]) -> Any:
+    from bson import ObjectId
+    from bson.errors import InvalidId
+
+    if "oid" in data:
+        try:
+            return ObjectId(data["oid"])
+        except (InvalidId, TypeError) as e:
+            raise InvalidCursor("invalid cursor") from e
+    if "v" in data:
+        return data["v"]
+    raise InvalidCursor("invalid cursor")
+
+
+def encode_cursor(sort: str, doc: dict[str, Any]) -> str:
+    payload = {"s": sort, "id": _encode_id(doc["_id"])}
+    if sort == "apariciones":
+        payload["t"] = doc.get("total_apariciones", 0)
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort: str) -> dict[str, Any]:
+    """{"_id": ..., "total_apariciones": ...}; InvalidCursor if malformed or made for another sort."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("invalid cursor") from e
+    if not isinstance(payload, dict) or payload.get("s") != sort or not isinstance(payload.get("id"), dict):
+        raise InvalidCursor("invalid cursor")
+    position = {"_id": _decode_id(payload["id"])}
+    if sort == "apariciones":
+        if not isinstance(payload.get("t"), int):
+            raise InvalidCursor("invalid cursor")
+        position["total_apariciones"] = payload["t"]
+    return position
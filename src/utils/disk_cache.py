@@ -0,0 +1,84 @@
+"""
+Size-bounded on-disk cache of generated files (e.g. page previews). Entries are files named
+by a hash of their key; a hit refreshes the file's mtime, and when the directory grows past
+`max_bytes` the least recently used files are deleted until it is back under 90% of it.
+Writes go through a temp file and a rename, so concurrent readers (threads or processes)
+never see a partial file.
+"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+# Bytes written between directory scans for eviction
+_EVICT_EVERY_BYTES = 8 * 1024 * 1024
+
+
+class DiskCache:
+    def __init__(self, directory: str | os.PathLike, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._written = 0
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str, suffix: str) -> Path:
+        return self.directory / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}{suffix}"
+
+    def get(self, key: str, suffix: str) -> Optional[Path]:
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, suffix: str, data: bytes) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key, suffix)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._written += len(data)
+            scan = self._written >= _EVICT_EVERY_BYTES or len(data) >= self.max_bytes // 10
+            if scan:
+                self._written = 0
+        if scan:
+            self.evict()
+        return path
+
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def evict(self) -> int:
+        """Delete least recently used files until under 90% of max_bytes; returns how many."""
+        files = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return 0
+        target = self.max_bytes * 9 // 10
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def _entries(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                return [entry for entry in entries if entry.is_file() and not entry.name.endswith(".tmp")]
+        except FileNotFoundError:
+            return []
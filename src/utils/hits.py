@@ -0,0 +1,249 @@
+"""
+Compact storage for extraction hits.
+One row per hit in parallel typed arrays (gaceta index, page, offsets, cédula as an integer,
+name span); gaceta metadata is stored once per gaceta and names are interned. Context and
+snippets are only materialized from the page text when something asks for them.
+"""
+from array import array
+from typing import Any, Iterable, Iterator, Optional
+
+from src.constants.search import CEDULA_CONTEXT_CHARS, SNIPPET_LEN_CEDULA
+from src.utils.text_matchers import name_at
+
+# Page number stored for hits found in full_text (gacetas without per-page text)
+_NO_PAGE = -1
+_NO_NAME = -1
+# Longest digit string that always fits an unsigned 64-bit column
+_MAX_PACKED_DIGITS = 19
+
+
+class CedulaHit:
+    """Lightweight view of one row of a CedulaHits table."""
+
+    __slots__ = ("_hits", "_i")
+
+    def __init__(self, hits: "CedulaHits", index: int) -> None:
+        self._hits = hits
+        self._i = index
+
+    # --- gaceta metadata ---
+    @property
+    def gaceta_index(self) -> int:
+        return self._hits._gaceta[self._i]
+
+    @property
+    def gaceta(self) -> str:
+        return self._hits.gacetas[self.gaceta_index][0]
+
+    @property
+    def numero_gaceta(self) -> str:
+        return self._hits.gacetas[self.gaceta_index][1]
+
+    @property
+    def fecha(self) -> str:
+        return self._hits.gacetas[self.gaceta_index][2]
+
+    @property
+    def year(self) -> Optional[int]:
+        return self._hits.gacetas[self.gaceta_index][3]
+
+    # --- hit ---
+    @property
+    def page_number(self) -> Optional[int]:
+        page = self._hits._page[self._i]
+        return None if page == _NO_PAGE else page
+
+    @property
+    def start(self) -> int:
+        return self._hits._start[self._i]
+
+    @property
+    def end(self) -> int:
+        return self._hits._end[self._i]
+
+    @property
+    def letter(self) -> str:
+        return chr(self._hits._letter[self._i])
+
+    @property
+    def number(self) -> str:
+        """Digits exactly as found (leading zeros kept)."""
+        return self._hits._digits_of(self._i)
+
+    @property
+    def cedula(self) -> str:
+        """Homologated format: "L-12345678"."""
+        return f"{self.letter}-{self.number}"
+
+    @property
+    def nombre(self) -> str:
+        name_id = self._hits._name_id[self._i]
+        return "Desconocido" if name_id == _NO_NAME else self._hits.names[name_id]
+
+    @property
+    def name_span(self) -> Optional[tuple[int, int]]:
+        start = self._hits._name_start[self._i]
+        return None if start == _NO_NAME else (start, self._hits._name_end[self._i])
+
+    # --- materialized on demand from the page text ---
+    @property
+    def context_before(self) -> str:
+        text = self._hits.page_text(self.gaceta_index, self.page_number)
+        return text[max(0, self.start - CEDULA_CONTEXT_CHARS):self.start].strip()
+
+    @property
+    def context_after(self) -> str:
+        text = self._hits.page_text(self.gaceta_index, self.page_number)
+        return text[self.end:self.end + CEDULA_CONTEXT_CHARS].strip()
+
+    @property
+    def snippet(self) -> str:
+        return (
+            self.context_before[-SNIPPET_LEN_CEDULA:]
+            + " ["
+            + self.cedula
+            + "] "
+            + self.context_after[:SNIPPET_LEN_CEDULA]
+        ).strip()
+
+    def as_dict(self, with_context: bool = True) -> dict[str, Any]:
+        """The dict shape search_cedulas used to return for every hit."""
+        data = {
+            "gaceta": self.gaceta,
+            "numero_gaceta": self.numero_gaceta,
+            "fecha": self.fecha,
+            "year": self.year,
+            "page_number": self.page_number,
+            "cedula": self.cedula,
+            "letter": self.letter,
+            "number": self.number,
+            "nombre": self.nombre,
+        }
+        if with_context:
+            data["context_before"] = self.context_before
+            data["context_after"] = self.context_after
+            data["snippet"] = self.snippet
+        return data
+
+
+class CedulaHits:
+    """
+    Array-backed table of hits, in extraction order.
+    With keep_text=True the text of every page that has hits is kept (once per page)
+    so context/snippets can be materialized later; otherwise only offsets are kept.
+    """
+
+    def __init__(self, keep_text: bool = False) -> None:
+        self.keep_text = keep_text
+        # (filename, numero_gaceta, fecha, year) per gaceta
+        self.gacetas: list[tuple[str, str, str, Optional[int]]] = []
+        self.names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+        self._texts: dict[tuple[int, int], str] = {}
+        self._gaceta = array("I")
+        self._page = array("i")
+        self._start = array("I")
+        self._end = array("I")
+        self._letter = array("B")
+        self._number = array("Q")
+        self._ndigits = array("H")
+        self._name_id = array("i")
+        self._name_start = array("i")
+        self._name_end = array("i")
+        # Digit strings that do not round-trip through the integer column (OCR noise), by row
+        self._long_numbers: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._start)
+
+    def __getitem__(self, index: int) -> CedulaHit:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("hit index out of range")
+        return CedulaHit(self, index)
+
+    def __iter__(self) -> Iterator[CedulaHit]:
+        for i in range(len(self)):
+            yield CedulaHit(self, i)
+
+    def add_gaceta(self, filename: str, numero_gaceta: str, fecha: str, year: Optional[int]) -> int:
+        self.gacetas.append((filename, numero_gaceta, fecha, year))
+        return len(self.gacetas) - 1
+
+    def add_page(
+        self,
+        gaceta_index: int,
+        page_number: Optional[int],
+        text: str,
+        hits: Iterable[tuple[int, int, str, str, Optional[tuple[int, int]]]],
+    ) -> None:
+        """Append the hits of one page, as yielded by text_matchers.scan_cedulas."""
+        page = _NO_PAGE if page_number is None else page_number
+        added = False
+        for start, end, letter, digits, span in hits:
+            row = len(self._start)
+            self._gaceta.append(gaceta_index)
+            self._page.append(page)
+            self._start.append(start)
+            self._end.append(end)
+            self._letter.append(ord(letter))
+            if len(digits) > _MAX_PACKED_DIGITS or not digits.isascii():
+                self._long_numbers[row] = digits
+                self._number.append(0)
+            else:
+                self._number.append(int(digits))
+            self._ndigits.append(min(len(digits), 0xFFFF))
+            if span is None:
+                self._name_id.append(_NO_NAME)
+                self._name_start.append(_NO_NAME)
+                self._name_end.append(_NO_NAME)
+            else:
+                self._name_id.append(self._intern(name_at(text, span)))
+                self._name_start.append(span[0])
+                self._name_end.append(span[1])
+            added = True
+        if added and self.keep_text:
+            self._texts[(gaceta_index, page)] = text
+
+    def extend(self, other: "CedulaHits") -> None:
+        """Append all hits of another table (e.g. one produced by a worker process)."""
+        offset = len(self.gacetas)
+        base = len(self)
+        self.gacetas.extend(other.gacetas)
+        self._gaceta.extend(array("I", (g + offset for g in other._gaceta)))
+        self._page.extend(other._page)
+        self._start.extend(other._start)
+        self._end.extend(other._end)
+        self._letter.extend(other._letter)
+        self._number.extend(other._number)
+        self._ndigits.extend(other._ndigits)
+        remap = [self._intern(name) for name in other.names]
+        self._name_id.extend(array("i", (_NO_NAME if n == _NO_NAME else remap[n] for n in other._name_id)))
+        self._name_start.extend(other._name_start)
+        self._name_end.extend(other._name_end)
+        for row, digits in other._long_numbers.items():
+            self._long_numbers[base + row] = digits
+        if self.keep_text:
+            for (g, page), text in other._texts.items():
+                self._texts[(g + offset, page)] = text
+
+    def page_text(self, gaceta_index: int, page_number: Optional[int]) -> str:
+        page = _NO_PAGE if page_number is None else page_number
+        try:
+            return self._texts[(gaceta_index, page)]
+        except KeyError:
+            raise RuntimeError("Page text not kept; extract with keep_text=True to read contexts") from None
+
+    def _intern(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def _digits_of(self, row: int) -> str:
+        long_digits = self._long_numbers.get(row)
+        if long_digits is not None:
+            return long_digits
+        return str(self._number[row]).zfill(self._ndigits[row])
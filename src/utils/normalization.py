@@ -0,0 +1,76 @@
+"""
+Derived search keys for personas, computed at write time so the search endpoints can use
+indexed equality / range / prefix queries instead of regexes:
+cedula_letra ("V"), cedula_numero (12345678 as an integer), nombre_normalizado (lowercase,
+accents folded) and nombre_tokens (its words).
+"""
+import re
+import unicodedata
+from typing import Any, Optional
+
+# Letter, optional separators, digits with optional thousands separators
+_CEDULA_RE = re.compile(r"^\s*([A-Za-z])?\s*[-.\s]*\s*(\d[\d.,]*)\s*$")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Longest number stored as an integer (MongoDB integers are signed 64-bit)
+_MAX_NUMBER_DIGITS = 18
+# Cédula/RIF numbers are never longer than this; bounds the prefix expansion below
+CEDULA_MAX_DIGITS = 10
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents/diacritics ("Pérez Núñez" -> "perez nunez")."""
+    decomposed = unicodedata.normalize("NFD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def name_tokens(nombre: str) -> list[str]:
+    return _TOKEN_RE.findall(fold(nombre))
+
+
+def split_cedula(cedula: str) -> tuple[Optional[str], Optional[int]]:
+    """ "V-12.345.678" -> ("V", 12345678). Parts that cannot be read are None."""
+    m = _CEDULA_RE.match(cedula or "")
+    if not m:
+        return None, None
+    letter = m.group(1).upper() if m.group(1) else None
+    digits = re.sub(r"\D", "", m.group(2))
+    if not digits or len(digits.lstrip("0")) > _MAX_NUMBER_DIGITS:
+        return letter, None
+    return letter, int(digits)
+
+
+def cedula_digits(cedula: str) -> str:
+    """ "V-01.234.567" -> "01234567": the digits as written (a leading zero makes another cédula)."""
+    return re.sub(r"\D", "", cedula or "")
+
+
+def persona_search_fields(cedula: str, nombre: str) -> dict[str, Any]:
+    """Fields stored next to cedula/nombre in persona documents (and the read model)."""
+    letter, number = split_cedula(cedula)
+    return {
+        "cedula_letra": letter,
+        "cedula_numero": number,
+        **name_search_fields(nombre),
+    }
+
+
+def name_search_fields(nombre: str) -> dict[str, Any]:
+    return {"nombre_normalizado": fold(nombre).strip(), "nombre_tokens": name_tokens(nombre)}
+
+
+def number_prefix_ranges(prefix: str, max_digits: int = CEDULA_MAX_DIGITS) -> list[tuple[int, int]]:
+    """
+    Integer ranges [low, high) holding every number whose decimal form starts with `prefix`:
+    "123" -> [123, 124), [1230, 1240), [12300, 12400), ... up to max_digits digits.
+    Leading zeros are not part of the number, but they count towards the digits written:
+    "0123" -> [123, 124), ... up to max_digits - 1 digits. The ranges also hold numbers written
+    without the zero ("1234567"); the caller tells them apart on the written cédula.
+    """
+    significant = prefix.lstrip("0")
+    if not significant:
+        return [(0, 10 ** max(0, max_digits - len(prefix)))]
+    base = int(significant)
+    return [
+        (base * 10 ** extra, (base + 1) * 10 ** extra)
+        for extra in range(max(0, max_digits - len(prefix)) + 1)
+    ]
@@ -0,0 +1,108 @@
+"""
+Progress of the running extraction, shared by the CLI (writer) and the web app (readers)
+through one small JSON file. Writes are atomic (temp file + rename), so a reader never sees
+half a document, and ProgressReporter throttles them: it only writes when the percentage
+moved by `min_delta` points or `min_interval` seconds went by, instead of once per gaceta
+scanned and per batch saved. Readers detect changes with a stat() call, without parsing it.
+"""
+import json
+import os
+import time
+from typing import Any, Iterator, Optional
+
+from src.constants.config import (
+    PROGRESS_MIN_DELTA,
+    PROGRESS_MIN_INTERVAL_SECONDS,
+    PROGRESS_STREAM_MAX_SECONDS,
+    PROGRESS_STREAM_POLL_SECONDS,
+)
+
+IDLE = {"percentage": 0, "message": "No hay tarea en progreso", "status": "idle"}
+_UNREADABLE = {"percentage": 0, "message": "Leyendo estado...", "status": "processing"}
+# Comment line sent on an idle stream so proxies do not close it
+_KEEPALIVE_SECONDS = 15
+
+
+def write_progress(path: str, data: dict[str, Any]) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def read_progress(path: str) -> dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return dict(IDLE)
+    except (OSError, ValueError):
+        return dict(_UNREADABLE)
+
+
+def progress_version(path: str) -> Optional[tuple[int, int, int]]:
+    """Changes whenever the file is rewritten (None if there is no file)."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    # Every rename brings a new inode, even within the filesystem's mtime granularity
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class ProgressReporter:
+    def __init__(
+        self,
+        path: str,
+        min_interval: float = PROGRESS_MIN_INTERVAL_SECONDS,
+        min_delta: int = PROGRESS_MIN_DELTA,
+    ) -> None:
+        self.path = path
+        self._min_interval = min_interval
+        self._min_delta = min_delta
+        self._last_pct: Optional[int] = None
+        self._last_write = float("-inf")
+        self.writes = 0
+
+    def update(self, data: dict[str, Any], force: bool = False) -> bool:
+        """Write `data` unless throttled; returns whether it was written. Never raises on I/O."""
+        now = time.monotonic()
+        pct = data.get("percentage", 0)
+        moved = self._last_pct is None or abs(pct - self._last_pct) >= self._min_delta
+        if not (force or moved or now - self._last_write >= self._min_interval):
+            return False
+        try:
+            write_progress(self.path, data)
+        except OSError:
+            return False
+        self._last_pct = pct
+        self._last_write = now
+        self.writes += 1
+        return True
+
+
+def iter_progress_events(
+    path: str,
+    poll_seconds: float = PROGRESS_STREAM_POLL_SECONDS,
+    max_seconds: float = PROGRESS_STREAM_MAX_SECONDS,
+) -> Iterator[str]:
+    """
+    Server-Sent Events: the current progress right away, then every change of the file,
+    for up to `max_seconds` (EventSource reconnects by itself, honoring `retry`).
+    """
+    yield "retry: 2000\n\n"
+    started = last_sent = time.monotonic()
+    version: Any = object()
+    while True:
+        current = progress_version(path)
+        now = time.monotonic()
+        if current != version:
+            version = current
+            last_sent = now
+            yield f"data: {json.dumps(read_progress(path), ensure_ascii=False)}\n\n"
+        elif now - last_sent >= _KEEPALIVE_SECONDS:
+            last_sent = now
+            yield ": keepalive\n\n"
+        if now - started >= max_seconds:
+            return
+        time.sleep(poll_seconds)
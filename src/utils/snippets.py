@@ -0,0 +1,124 @@
+"""
+Highlighted fragments for full-text page search results.
+MongoDB's text index ranks pages but does not say where the terms are, so the matching
+words are located again here: accent-folded, case-insensitive, and with a light Spanish
+stemming so "designados" also highlights "designado" / "designada".
+"""
+import html
+import re
+
+from src.constants.search import TEXT_SNIPPET_CHARS, TEXT_SNIPPETS_PER_PAGE
+from src.utils.normalization import fold
+
+# Same-length folding for the common case (offsets in the folded text are offsets in the original)
+_ACCENTS = str.maketrans("áéíóúüñàèìòùâêîôûäëïö", "aeiouunaeiouaeiouaeio")
+# Quoted phrases, or single words; a leading "-" negates (MongoDB $text syntax)
+_QUERY_TERM_RE = re.compile(r'(-?)"([^"]*)"|(-?)(\S+)')
+_WORD_RE = re.compile(r"\w+")
+_PLURAL_SUFFIXES = ("es", "s")
+_GENDER_SUFFIXES = ("a", "o")
+
+
+def _fold_same_length(text: str) -> str:
+    folded = text.lower().translate(_ACCENTS)
+    if len(folded) == len(text):
+        return folded
+    return "".join(fold(ch)[:1] or ch for ch in text)
+
+
+def _strip(word: str, suffixes: tuple[str, ...]) -> str:
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[: -len(suffix)]
+    return word
+
+
+def _stem(word: str) -> str:
+    """ "designados" / "designada" -> "designad"; short words are kept whole."""
+    return _strip(_strip(word, _PLURAL_SUFFIXES), _GENDER_SUFFIXES)
+
+
+def query_terms(query: str) -> list[str]:
+    """Folded, stemmed words of a $text query (negated words and phrases are left out)."""
+    terms = []
+    for m in _QUERY_TERM_RE.finditer(query or ""):
+        negated, text = (m.group(1), m.group(2)) if m.group(2) is not None else (m.group(3), m.group(4))
+        if negated:
+            continue
+        for word in _WORD_RE.findall(fold(text)):
+            stem = _stem(word)
+            if stem not in terms:
+                terms.append(stem)
+    return terms
+
+
+def _expand(text: str, start: int, end: int) -> tuple[int, int]:
+    """Move the window bounds out to the nearest whitespace so words are not cut."""
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    while end < len(text) and not text[end].isspace():
+        end += 1
+    return start, end
+
+
+def _render(text: str, start: int, end: int, spans: list[tuple[int, int]]) -> str:
+    parts = ["…" if start > 0 else ""]
+    cursor = start
+    for span_start, span_end in spans:
+        if span_start < cursor or span_end > end:
+            continue
+        parts.append(html.escape(text[cursor:span_start]))
+        parts.append(f"<mark>{html.escape(text[span_start:span_end])}</mark>")
+        cursor = span_end
+    parts.append(html.escape(text[cursor:end]))
+    parts.append("…" if end < len(text) else "")
+    return re.sub(r"\s+", " ", "".join(parts)).strip()
+
+
+def build_snippets(
+    text: str,
+    query: str,
+    size: int = TEXT_SNIPPET_CHARS,
+    max_snippets: int = TEXT_SNIPPETS_PER_PAGE,
+) -> list[str]:
+    """
+    Up to `max_snippets` fragments of `text` (HTML-escaped) with the query words wrapped in
+    <mark>. Fragments are picked where the most distinct query words appear together.
+    Without any visible match (stemming differences) the start of the page is returned.
+    """
+    text = text or ""
+    terms = query_terms(query)
+    folded = _fold_same_length(text)
+    spans = []
+    if terms:
+        pattern = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*")
+        spans = [(m.start(), m.end(), _stem(m.group())) for m in pattern.finditer(folded)]
+    if not spans:
+        _, end = _expand(text, 0, min(size, len(text)))
+        return [_render(text, 0, end, [])] if text.strip() else []
+
+    candidates = []
+    for i, (span_start, _, _) in enumerate(spans):
+        window_start = max(0, span_start - size // 3)
+        window_end = window_start + size
+        words = []
+        for _, span_end, word in spans[i:]:
+            if span_end > window_end:
+                break
+            words.append(word)
+        candidates.append((len(set(words)), len(words), -window_start, window_start, window_end))
+    candidates.sort(reverse=True)
+
+    chosen: list[tuple[int, int]] = []
+    for *_, window_start, window_end in candidates:
+        if len(chosen) >= max_snippets:
+            break
+        if any(window_start < end and start < window_end for start, end in chosen):
+            continue
+        chosen.append((window_start, window_end))
+    marks = [(start, end) for start, end, _ in spans]
+    snippets = []
+    for window_start, window_end in sorted(chosen):
+        start, end = _expand(text, window_start, min(window_end, len(text)))
+        snippets.append(_render(text, start, end, marks))
+    return snippets
@@ -0,0 +1,30 @@
+"""
+Chunked encoders for streaming exports: NDJSON (one JSON document per line) and gzip over
+any byte-chunk stream. Both are generators, so memory stays bounded by one chunk.
+"""
+import json
+import zlib
+from typing import Any, Iterable, Iterator
+
+from src.constants.search import EXPORT_CHUNK_ROWS
+
+
+def iter_ndjson(records: Iterable[Any], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    lines: list[str] = []
+    for record in records:
+        lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str))
+        if len(lines) >= chunk_rows:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """A single gzip member (wbits=31 writes the gzip header and trailer)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
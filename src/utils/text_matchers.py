@@ -3,10 +3,14 @@ Text matching utilities: find Venezuelan cédulas in a string,
 returning each match with surrounding context, and extracting nearby names.
 """
 import re
-from typing import Any
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Any, Iterator, Optional
 
 from src.constants.search import (
     CEDULA_CONTEXT_CHARS,
+    KEYWORD_WINDOW_CHARS,
+    NAME_WINDOW_CHARS,
 )
 
 
@@ -24,17 +28,42 @@ _NAME_RE = re.compile(
     r"\b(?:[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+|[A-ZÁÉÍÓÚÑ]{2,})\s+(?:(?:[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+|[A-ZÁÉÍÓÚÑ]{2,}|de|del|la|las|los|y|DE|DEL|LA|LAS|LOS|Y)\s+){0,4}(?:[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+|[A-ZÁÉÍÓÚÑ]{2,})\b"
 )
 
-# Regex to require at least one relevant keyword near the cedula
-_KEYWORDS_RE = re.compile(
-    r"\b(ciudadano|ciudadana|ciudadanos|ciudadanas|empresa|empresas|junta directiva|titular|titulares|representante|representantes|c\.?i\.?|rif|cédula|cedula|identidad|identificado|identificada|identifican|inscrita|inscrito|apoderado|apoderada|venezolano|venezolana|mayor de edad|presidente|presidenta|director|directora|socio|socia|accionista|domiciliado|domiciliada|registro mercantil|pasaporte|portador|portadora)\b",
-    re.IGNORECASE
+# Keywords of which at least one must appear near the cedula
+_KEYWORDS = (
+    r"ciudadano|ciudadana|ciudadanos|ciudadanas|empresa|empresas|junta directiva|titular|titulares|representante|representantes|c\.?i\.?|rif|cédula|cedula|identidad|identificado|identificada|identifican|inscrita|inscrito|apoderado|apoderada|venezolano|venezolana|mayor de edad|presidente|presidenta|director|directora|socio|socia|accionista|domiciliado|domiciliada|registro mercantil|pasaporte|portador|portadora"
 )
 
+# Regex to require at least one relevant keyword near the cedula
+_KEYWORDS_RE = re.compile(r"\b(" + _KEYWORDS + r")\b", re.IGNORECASE)
+
 # Words to ignore when extracting names, to avoid matching legal boilerplate like "Cédula de Identidad"
-_BLACKLIST_RE = re.compile(
-    r"(?i)\b(c[eé]dula|identidad|rep[uú]blica|bolivariana|venezuela|ministerio|poder|popular|gaceta|oficial|art[ií]culo|ciudadano|ciudadana|titular|resoluci[oó]n|nacional|director|directora|presidente|presidenta|coordinador|coordinadora|despacho|providencia|registro|mercantil|civil|tomo|folio|protocolo|n[°*o]?|"
-    r"salud|integral|comunitaria|asic|hospital|cl[ií]nica|ambulatorio|ambulatoria|red|direcci[oó]n|estadal|estado|corporaci[oó]n|fundaci[oó]n|misi[oó]n|barrio|adentro|instituto|centro|regional|municipal|servicio|social|desarrollo|[aá]rea)\b"
+_BLACKLIST = (
+    r"c[eé]dula|identidad|rep[uú]blica|bolivariana|venezuela|ministerio|poder|popular|gaceta|oficial|art[ií]culo|ciudadano|ciudadana|titular|resoluci[oó]n|nacional|director|directora|presidente|presidenta|coordinador|coordinadora|despacho|providencia|registro|mercantil|civil|tomo|folio|protocolo|n[°*o]?|"
+    r"salud|integral|comunitaria|asic|hospital|cl[ií]nica|ambulatorio|ambulatoria|red|direcci[oó]n|estadal|estado|corporaci[oó]n|fundaci[oó]n|misi[oó]n|barrio|adentro|instituto|centro|regional|municipal|servicio|social|desarrollo|[aá]rea"
 )
+_BLACKLIST_RE = re.compile(r"(?i)\b(" + _BLACKLIST + r")\b")
+
+# Cheap page-level gate: any keyword that could show up in a context window, including ones
+# completed by a window edge cutting through a word ("titularidad" -> "titular").
+_KEYWORDS_EDGE_RE = re.compile(
+    r"\b(?:" + _KEYWORDS + r")|(?:" + _KEYWORDS + r")\b",
+    re.IGNORECASE
+)
+
+# Case-sensitive twins of the patterns above, run over text.lower(): same spans, several
+# times faster than IGNORECASE. Only valid when lowercasing keeps every offset and folds
+# like IGNORECASE does, which fails for exactly these characters.
+_FOLD_UNSAFE_RE = re.compile("[İıſ]")
+_KEYWORDS_LOWER_RE = re.compile(r"\b(" + _KEYWORDS + r")\b")
+_BLACKLIST_LOWER_RE = re.compile(r"\b(" + _BLACKLIST + r")\b")
+_KEYWORDS_EDGE_LOWER_RE = re.compile(r"\b(?:" + _KEYWORDS + r")|(?:" + _KEYWORDS + r")\b")
+
+# Upper bounds (plus one char of lookahead) for a single keyword / blacklist match.
+_KEYWORD_SPAN_MAX = 20
+_BLACKLIST_SPAN_MAX = 16
+
+# Characters a _NAME_RE match can start with.
+_NAME_START_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZÁÉÍÓÚÑ")
 
 def extract_name(ctx_before: str, ctx_after: str) -> str | None:
     # Clean the context from known non-name capitalized words
@@ -59,58 +88,259 @@ def has_valid_context(ctx_before: str, ctx_after: str) -> bool:
     combined_context = f"{ctx_before} {ctx_after}"
     return bool(_KEYWORDS_RE.search(combined_context))
 
-def find_cedulas_with_context(text: str) -> list[dict[str, Any]]:
+def _is_word(ch: str) -> bool:
+    """Same notion of a word character as the regex `\b` (unicode alnum or underscore)."""
+    return ch.isalnum() or ch == "_"
+
+
+class _CleanedText:
     """
-    Find all Venezuelan cédula-like patterns in text with surrounding context.
-    Returns list of dicts: cedula, letter, number, start, end, context_before, context_after, and name.
+    `_BLACKLIST_RE.sub(" ", text)` plus the blacklist spans, so positions can be mapped
+    between the original text and the cleaned one (each removed word becomes one space).
     """
-    results = []
+
+    __slots__ = ("clean", "starts", "ends", "clean_starts", "removed")
+
+    def __init__(self, text: str, matches: Optional[Iterator[re.Match]] = None) -> None:
+        if matches is None:
+            matches = _BLACKLIST_RE.finditer(text)
+        spans = [m.span() for m in matches]
+        self.starts = [start for start, _ in spans]
+        self.ends = [end for _, end in spans]
+        # removed[i]: characters dropped by the first i spans
+        self.removed = list(accumulate((end - start - 1 for start, end in spans), initial=0))
+        self.clean_starts = [start - removed for (start, _), removed in zip(spans, self.removed)]
+        self.clean = " ".join(
+            text[prev_end:start] for prev_end, start in zip([0] + self.ends, self.starts + [len(text)])
+        )
+
+    def to_original(self, pos: int) -> int:
+        """Original offset of a cleaned offset that does not fall on a replacement space."""
+        return pos + self.removed[bisect_left(self.clean_starts, pos)]
+
+    def to_clean(self, pos: int) -> int:
+        """Cleaned offset of an original offset that is not inside a blacklist span."""
+        return pos - self.removed[bisect_right(self.ends, pos)]
+
+    def crosses(self, pos: int) -> bool:
+        """True if a blacklist span strictly contains the boundary `pos`."""
+        i = bisect_left(self.starts, pos)
+        return i > 0 and self.ends[i - 1] > pos
+
+    def ends_at(self, pos: int) -> bool:
+        i = bisect_left(self.ends, pos)
+        return i < len(self.ends) and self.ends[i] == pos
+
+
+def _window_name_span(text: str, start: int, end: int, last: bool) -> Optional[tuple[int, int]]:
+    """Name span (original offsets) found by extract_name's rules in text[start:end] alone."""
+    cleaned = _CleanedText(text[start:end])
+    matches = list(_NAME_RE.finditer(cleaned.clean))
+    if not matches:
+        return None
+    m = matches[-1] if last else matches[0]
+    return (start + cleaned.to_original(m.start()), start + cleaned.to_original(m.end()))
+
+
+# Returned by the index lookups when a window edge may change the result; the caller then
+# falls back to scanning that window on its own.
+_UNRESOLVED = object()
+
+
+class PageScanner:
+    """
+    Single pass over a page that records keyword spans, blacklist spans and name spans as
+    sorted offset arrays, so the checks done around each cédula become bisect lookups
+    instead of re-scanning overlapping 150/120-character windows.
+
+    Results are identical to running has_valid_context / extract_name on the windows:
+    a match found on the whole page is also a match inside any window that contains it,
+    and the few cases where a window edge cuts through a word (and could create or hide
+    a match) are detected and resolved by scanning that window directly.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        if _FOLD_UNSAFE_RE.search(text):
+            self._folded = text
+            self._keywords_re, self._blacklist_re, self._edge_re = (
+                _KEYWORDS_RE, _BLACKLIST_RE, _KEYWORDS_EDGE_RE
+            )
+        else:
+            self._folded = text.lower()
+            self._keywords_re, self._blacklist_re, self._edge_re = (
+                _KEYWORDS_LOWER_RE, _BLACKLIST_LOWER_RE, _KEYWORDS_EDGE_LOWER_RE
+            )
+        spans = [m.span() for m in self._keywords_re.finditer(self._folded)]
+        self._kw_starts = [start for start, _ in spans]
+        self._kw_ends = [end for _, end in spans]
+        # Blacklist and name spans are only needed once a cédula passes the keyword check.
+        self._cleaned: Optional[_CleanedText] = None
+        self._name_starts: list[int] = []
+        self._name_ends: list[int] = []
+
+    @property
+    def has_keywords(self) -> bool:
+        """False when no context window on this page can contain a keyword."""
+        return bool(self._kw_starts) or bool(self._edge_re.search(self._folded))
+
+    def has_keyword_context(self, start: int, end: int) -> bool:
+        """has_valid_context() for the 150-char windows around text[start:end]."""
+        text = self.text
+        n = len(text)
+        lo = max(0, start - KEYWORD_WINDOW_CHARS)
+        hi = min(n, end + KEYWORD_WINDOW_CHARS)
+        starts, ends = self._kw_starts, self._kw_ends
+        i = bisect_left(starts, lo)
+        if i < len(starts) and ends[i] <= start:
+            return True
+        i = bisect_left(starts, end)
+        if i < len(starts) and ends[i] <= hi:
+            return True
+        # A window starting mid-word may begin with a keyword ("xtitular" -> "titular")
+        if lo > 0 and _is_word(text[lo - 1]) and _is_word(text[lo]):
+            if _KEYWORDS_RE.match(text[lo:min(start, lo + _KEYWORD_SPAN_MAX)]):
+                return True
+        # ...and one ending mid-word may end with one ("titularidad" -> "titular")
+        if hi < n and _is_word(text[hi - 1]) and _is_word(text[hi]):
+            if _KEYWORDS_RE.search(text, max(end, hi - _KEYWORD_SPAN_MAX), hi):
+                return True
+        return False
+
+    def name_span(self, start: int, end: int) -> Optional[tuple[int, int]]:
+        """
+        Span of the name extract_name() picks for the cédula at text[start:end]: the last
+        name in the 120 chars before it, else the first one in the 120 chars after it.
+        The name itself is _BLACKLIST_RE.sub(" ", text[span]).
+        """
+        if self._cleaned is None:
+            self._index_names()
+        text = self.text
+        lo = max(0, start - NAME_WINDOW_CHARS)
+        span = self._name_before(lo, start)
+        if span is _UNRESOLVED:
+            span = _window_name_span(text, lo, start, last=True)
+        if span is not None:
+            return span
+        hi = min(len(text), end + NAME_WINDOW_CHARS)
+        span = self._name_after(end, hi)
+        if span is _UNRESOLVED:
+            span = _window_name_span(text, end, hi, last=False)
+        return span
+
+    def _index_names(self) -> None:
+        self._cleaned = cleaned = _CleanedText(self.text, self._blacklist_re.finditer(self._folded))
+        to_original = cleaned.to_original
+        spans = [m.span() for m in _NAME_RE.finditer(cleaned.clean)]
+        self._name_starts = [to_original(start) for start, _ in spans]
+        self._name_ends = [to_original(end) for _, end in spans]
+
+    def _name_before(self, lo: int, hi: int):
+        text = self.text
+        cleaned = self._cleaned
+        if lo > 0 and _is_word(text[lo - 1]) and _is_word(text[lo]):
+            # The window starts with a word fragment that could itself be a name or a
+            # blacklisted word; anything else in the fragment cannot start a match.
+            if text[lo] in _NAME_START_CHARS:
+                return _UNRESOLVED
+            if _BLACKLIST_RE.match(text[lo:min(hi, lo + _BLACKLIST_SPAN_MAX)]):
+                return _UNRESOLVED
+        # "n°" right before the cédula is only cleaned as "n" inside the window
+        if cleaned.ends_at(hi):
+            return _UNRESOLVED
+        starts, ends = self._name_starts, self._name_ends
+        first = bisect_left(starts, lo)
+        if first > 0 and ends[first - 1] > lo:
+            # A name straddling the window start would be re-matched differently
+            return _UNRESOLVED
+        last = bisect_right(ends, hi) - 1
+        if last >= first:
+            return (starts[last], ends[last])
+        return None
+
+    def _name_after(self, lo: int, hi: int):
+        text = self.text
+        cleaned = self._cleaned
+        cut = hi < len(text) and _is_word(text[hi - 1]) and _is_word(text[hi])
+        if not cut and (cleaned.crosses(hi) or cleaned.ends_at(hi)):
+            return _UNRESOLVED
+        starts, ends = self._name_starts, self._name_ends
+        i = bisect_left(starts, lo)
+        span = None
+        if i < len(starts) and starts[i] < hi:
+            if ends[i] > hi:
+                return _UNRESOLVED
+            span = (starts[i], ends[i])
+        if cut:
+            # The window ends with a word fragment, which can become (part of) a name.
+            # Only safe if something other than letters/spaces separates it from our name.
+            if span is None:
+                return _UNRESOLVED
+            frag = hi - 1
+            while frag > lo and _is_word(text[frag - 1]):
+                frag -= 1
+            gap = cleaned.clean[cleaned.to_clean(span[1]):cleaned.to_clean(frag)]
+            if all(ch.isspace() or ch.isalpha() for ch in gap):
+                return _UNRESOLVED
+        return span
+
+
+def name_at(text: str, span: tuple[int, int]) -> str:
+    """Materialize a name span returned by scan_cedulas / PageScanner.name_span."""
+    return _BLACKLIST_RE.sub(" ", text[span[0]:span[1]])
+
+
+def scan_cedulas(text: str) -> Iterator[tuple[int, int, str, str, Optional[tuple[int, int]]]]:
+    """
+    Offsets-only version of find_cedulas_with_context: yields
+    (start, end, letter, digits, name_span) per hit, without copying any context.
+    """
+    scanner = None
     for m in _CEDULA_RE.finditer(text):
         start, end = m.start(), m.end()
-        
-        raw_ced = m.group(0).strip()
-        raw_letter = m.group(1).upper()
-        raw_number = m.group(2)
-        
-        # Clean letter: retain only the primary character (V, J, E, G, P)
-        clean_letter = re.sub(r"[^VJEGP]", "", raw_letter)
-        
+
+        # Retain only the primary letter (V, J, E, G, P); the rest of group 1 are separators
+        clean_letter = m.group(1)[0].upper()
+
         # Clean number: retain only digits
-        digits_only = re.sub(r"[^\d]", "", raw_number)
-        
+        digits_only = m.group(2).replace(".", "").replace(",", "")
+
         # A valid Venezuelan Cedula or RIF should rarely have fewer than 4 digits.
         # This filters out false positives like "N* 6", "N2", "N. 003".
         if len(digits_only) < 4:
             continue
-            
-        # Homologated cedula format: "L-12345678"
-        std_cedula = f"{clean_letter}-{digits_only}"
-            
+
+        if scanner is None:
+            scanner = PageScanner(text)
+            # Pages without any keyword cannot produce a hit
+            if not scanner.has_keywords:
+                return
+
         # Keyword context check to filter out things like "N. 41.648" inside generic sentences
-        keyword_ctx_before = text[max(0, start - 150) : start]
-        keyword_ctx_after = text[end : end + 150]
-        if not has_valid_context(keyword_ctx_before, keyword_ctx_after):
+        if not scanner.has_keyword_context(start, end):
             continue
 
-        # Grab a smaller context for names to avoid overlapping with other sentences
-        ctx_before = text[max(0, start - 120) : start]
-        ctx_after = text[end : end + 120]
-        
-        name = extract_name(ctx_before, ctx_after)
-        
-        # also capture full context for snippets
-        full_ctx_before = text[max(0, start - CEDULA_CONTEXT_CHARS) : start]
-        full_ctx_after = text[end : end + CEDULA_CONTEXT_CHARS]
-        
+        yield start, end, clean_letter, digits_only, scanner.name_span(start, end)
+
+
+def find_cedulas_with_context(text: str) -> list[dict[str, Any]]:
+    """
+    Find all Venezuelan cédula-like patterns in text with surrounding context.
+    Returns list of dicts: cedula, letter, number, start, end, context_before, context_after, and name.
+    """
+    results = []
+    for start, end, letter, digits, span in scan_cedulas(text):
         results.append({
-            "cedula": std_cedula,
-            "cedula_original": raw_ced,
-            "letter": clean_letter,
-            "number": digits_only,
-            "name": name if name else "Desconocido",
+            # Homologated cedula format: "L-12345678"
+            "cedula": f"{letter}-{digits}",
+            "cedula_original": text[start:end].strip(),
+            "letter": letter,
+            "number": digits,
+            "name": name_at(text, span) if span else "Desconocido",
             "start": start,
             "end": end,
-            "context_before": full_ctx_before.strip(),
-            "context_after": full_ctx_after.strip(),
+            # also capture full context for snippets
+            "context_before": text[max(0, start - CEDULA_CONTEXT_CHARS) : start].strip(),
+            "context_after": text[end : end + CEDULA_CONTEXT_CHARS].strip(),
         })
     return results
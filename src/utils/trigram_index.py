@@ -0,0 +1,164 @@
+"""
+In-memory trigram index over accent-folded names, for substring and typo-tolerant search.
+Each name gets an ordinal; every trigram (3 consecutive characters) maps to an array of the
+ordinals containing it, in insertion order. A query word is looked up through its rarest
+trigram and the candidates are verified against the stored name, so a lookup costs the
+length of one posting list, not the number of names. Words with typos are found by counting
+shared trigrams (q-gram lemma) and verifying with an edit distance.
+"""
+from array import array
+from collections import Counter
+from typing import Any, Hashable, Iterable, Optional
+
+from src.utils.normalization import fold, name_tokens
+
+TRIGRAM = 3
+
+
+def normalize_name(nombre: str) -> str:
+    return " ".join(fold(nombre).split())
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + TRIGRAM] for i in range(len(text) - TRIGRAM + 1)}
+
+
+def max_edits(word: str) -> int:
+    """Typos tolerated in a query word: none for short words (too many false positives)."""
+    if len(word) >= 9:
+        return 2
+    if len(word) >= 6:
+        return 1
+    return 0
+
+
+def substring_distance(pattern: str, text: str, limit: int) -> int:
+    """
+    Smallest edit distance between `pattern` and any substring of `text` (Sellers' algorithm).
+    Stops early once it is <= limit.
+    """
+    column = list(range(len(pattern) + 1))
+    best = column[-1]
+    for ch in text:
+        previous_diagonal, column[0] = column[0], 0
+        for i in range(1, len(column)):
+            cost = 0 if pattern[i - 1] == ch else 1
+            value = min(previous_diagonal + cost, column[i] + 1, column[i - 1] + 1)
+            previous_diagonal, column[i] = column[i], value
+        if column[-1] < best:
+            best = column[-1]
+            if best <= limit:
+                break
+    return best
+
+
+class TrigramIndex:
+    """Names keyed by any hashable id (e.g. a persona _id). Not thread-safe: callers lock."""
+
+    def __init__(self) -> None:
+        self._keys: list[Hashable] = []
+        self._names: list[str] = []
+        self._ordinals: dict[Hashable, int] = {}
+        # 1 = replaced by a newer ordinal (renamed) or removed
+        self._deleted = bytearray()
+        self._postings: dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def add(self, key: Hashable, nombre: str) -> None:
+        """Index (or re-index, if the name changed) one name."""
+        name = normalize_name(nombre)
+        ordinal = self._ordinals.get(key)
+        if ordinal is not None:
+            if self._names[ordinal] == name:
+                return
+            self._deleted[ordinal] = 1
+        ordinal = len(self._keys)
+        self._keys.append(key)
+        self._names.append(name)
+        self._deleted.append(0)
+        self._ordinals[key] = ordinal
+        for gram in trigrams(name):
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = array("I")
+            posting.append(ordinal)
+
+    def add_many(self, items: Iterable[tuple[Hashable, str]]) -> None:
+        for key, nombre in items:
+            self.add(key, nombre)
+
+    def discard(self, key: Hashable) -> None:
+        ordinal = self._ordinals.pop(key, None)
+        if ordinal is not None:
+            self._deleted[ordinal] = 1
+
+    def search(self, term: str, fuzzy: bool = True) -> Optional[list[Any]]:
+        """
+        Keys whose name contains every word of `term` (accent/case-insensitive). With no exact
+        match and `fuzzy`, words of 6+ letters may differ by 1 typo (9+ letters: 2) from part of
+        one word of the name.
+        Returns None when no word is long enough to use the index (< 3 characters).
+        """
+        words = list(dict.fromkeys(name_tokens(term)))
+        if not any(len(word) >= TRIGRAM for word in words):
+            return None
+        ordinals = self._match(words, fuzzy=False)
+        if not ordinals and fuzzy and any(max_edits(word) for word in words):
+            ordinals = self._match(words, fuzzy=True)
+        return [self._keys[ordinal] for ordinal in sorted(ordinals)]
+
+    def _match(self, words: list[str], fuzzy: bool) -> set[int]:
+        indexed = sorted((word for word in words if len(word) >= TRIGRAM), key=len, reverse=True)
+        short = [word for word in words if len(word) < TRIGRAM]
+        result: Optional[set[int]] = None
+        for word in indexed:
+            found = self._word(word, max_edits(word) if fuzzy else 0, within=result)
+            result = found if result is None else result & found
+            if not result:
+                return set()
+        names = self._names
+        return {o for o in result if all(word in names[o] for word in short)}
+
+    def _word(self, word: str, edits: int, within: Optional[set[int]]) -> set[int]:
+        names, deleted = self._names, self._deleted
+        grams = trigrams(word)
+        if edits == 0:
+            if within is not None:
+                candidates: Iterable[int] = within
+            else:
+                postings = [self._postings.get(gram) for gram in grams]
+                if any(posting is None for posting in postings):
+                    return set()
+                candidates = min(postings, key=len)
+            return {o for o in candidates if not deleted[o] and word in names[o]}
+
+        # q-gram lemma: each edit destroys at most 3 of the word's trigrams
+        needed = len(grams) - TRIGRAM * edits
+        if needed < 1:
+            return set()
+        counts: Counter = Counter()
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                counts.update(posting)
+        # Names share most of their words (common surnames): verify each distinct word once
+        close: dict[str, bool] = {}
+
+        def is_close(name: str) -> bool:
+            for token in name.split():
+                ok = close.get(token)
+                if ok is None:
+                    ok = close[token] = substring_distance(word, token, edits) <= edits
+                if ok:
+                    return True
+            return False
+
+        return {
+            o for o, count in counts.items()
+            if count >= needed
+            and not deleted[o]
+            and (within is None or o in within)
+            and is_close(names[o])
+        }
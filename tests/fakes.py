@@ -0,0 +1,107 @@
+"""
+In-memory stand-ins for the parts of pymongo the tests use: a query matcher, cursors,
+collections, the metadata document with the data version, and a database.
+"""
+import re
+
+
+def matches(condition, doc):
+    """Evalúa una condición de MongoDB sobre un documento (el subconjunto que generan los builders)."""
+    if "$and" in condition:
+        return all(matches(part, doc) for part in condition["$and"])
+    if "$or" in condition:
+        return any(matches(part, doc) for part in condition["$or"])
+    for field, expected in condition.items():
+        value = doc.get(field)
+        if not isinstance(expected, dict):
+            if value != expected:
+                return False
+        elif "$regex" in expected:
+            values = value if isinstance(value, list) else [value]
+            if not any(re.search(expected["$regex"], v) for v in values):
+                return False
+        elif "$exists" in expected:
+            if (field in doc) != expected["$exists"]:
+                return False
+        else:
+            if "$in" in expected and value not in expected["$in"]:
+                return False
+            if value is None and any(op in expected for op in ("$gt", "$gte", "$lt", "$lte")):
+                return False
+            if "$gt" in expected and value <= expected["$gt"]:
+                return False
+            if "$gte" in expected and value < expected["$gte"]:
+                return False
+            if "$lt" in expected and value >= expected["$lt"]:
+                return False
+            if "$lte" in expected and value > expected["$lte"]:
+                return False
+    return True
+
+
+class Cursor(list):
+    def sort(self, key, direction=1):
+        # pymongo accepts sort("field", direction) or sort([(field, direction), ...])
+        keys = [(key, direction)] if isinstance(key, str) else key
+        docs = list(self)
+        for field, order in reversed(keys):
+            docs.sort(key=lambda doc: doc[field], reverse=order < 0)
+        return Cursor(docs)
+
+    def skip(self, n):
+        return Cursor(self[n:])
+
+    def limit(self, n):
+        return Cursor(self[:n] if n else self)
+
+    def batch_size(self, size):
+        return self
+
+    def close(self):
+        pass
+
+
+class Collection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        # Queries received by find/find_one, and count_documents calls
+        self.finds = []
+        self.counts = 0
+
+    def find(self, query=None, projection=None, **options):
+        self.finds.append(query)
+        return Cursor(doc for doc in self.docs if matches(query or {}, doc))
+
+    def find_one(self, query=None, projection=None):
+        self.finds.append(query)
+        return next((doc for doc in self.docs if matches(query or {}, doc)), None)
+
+    def count_documents(self, query):
+        self.counts += 1
+        return sum(1 for doc in self.docs if matches(query, doc))
+
+    def estimated_document_count(self):
+        return len(self.docs)
+
+    def distinct(self, field):
+        return sorted({doc[field] for doc in self.docs if doc.get(field)})
+
+
+class Metadata:
+    """The metadata collection as the caches see it: only the data version."""
+
+    def __init__(self, version=1):
+        self.version = version
+
+    def find_one(self, query, projection=None):
+        return {"data_version": self.version}
+
+
+class FakeDB(dict):
+    """Collections by name, plus the `name` and `client` the per-database caches key on."""
+
+    client = "stub"
+
+    def __init__(self, name="test", **collections):
+        super().__init__(**collections)
+        self.name = name
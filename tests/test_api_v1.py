@@ -1,7 +1,7 @@
 import sys
 import os
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 # Add the root directory to path so we can import app
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -60,5 +60,108 @@ class TestApiV1(unittest.TestCase):
         self.assertEqual(persona["total_menciones"], 1)
         self.assertEqual(persona["menciones_gaceta"][0]["numero_gaceta"], "12345")
 
+    @patch('src.api.v1.routes.query_paginas_mongo')
+    @patch('src.api.v1.routes.get_db')
+    def test_buscar_paginas_endpoint(self, mock_get_db, mock_query):
+        """Prueba la búsqueda de texto completo: enlace al PDF en la página y fragmentos."""
+        mock_query.return_value = ([
+            {
+                "numero_gaceta": "41648",
+                "fecha": "12/03/2019",
+                "tipo": "ORDINARIA",
+                "year": 2019,
+                "page_number": 3,
+                "filename": "41648-2019-03-12-ORDINARIA.pdf",
+                "score": 1.75,
+                "fragmentos": ["…el <mark>Decreto</mark> N° 3.781…"]
+            }
+        ], 1)
+
+        response = self.client.get('/api/v1/paginas?q=decreto&anio=2019')
+        self.assertEqual(response.status_code, 200)
+        params = mock_query.call_args[0][1]
+        self.assertEqual((params["query"], params["anio"]), ("decreto", 2019))
+
+        pagina = response.get_json()["datos"][0]
+        self.assertEqual(pagina["numero_pagina"], 3)
+        self.assertEqual(pagina["enlace_pdf"], "/pdf/41648-2019-03-12-ORDINARIA.pdf#page=3")
+        self.assertEqual(pagina["fragmentos"], ["…el <mark>Decreto</mark> N° 3.781…"])
+
+        self.assertEqual(self.client.get('/api/v1/paginas?q=').status_code, 400)
+
+    @patch('src.api.v1.routes.get_db')
+    def test_buscar_personas_lote(self, mock_get_db):
+        """Prueba el lote: cédulas normalizadas, una consulta $in por bloque y resultados por cédula."""
+        docs = [
+            {"_id": 1, "cedula": "V-12345678", "nombre": "JUAN PEREZ", "cedula_letra": "V", "cedula_numero": 12345678,
+             "total_apariciones": 1, "apariciones": [{"numero_gaceta": "41900", "fecha": "02/06/2020", "pagina": 2, "filename": "g.pdf"}]},
+            {"_id": 2, "cedula": "E-12345678", "nombre": "ANA RUIZ", "cedula_letra": "E", "cedula_numero": 12345678,
+             "total_apariciones": 0, "apariciones": []},
+        ]
+        queries = []
+
+        class Coll:
+            def find(self, query, projection):
+                queries.append(query)
+                return [doc for doc in docs if doc["cedula_numero"] in query["cedula_numero"]["$in"]]
+
+        mock_get_db.return_value = {"persona_apariciones": Coll()}
+        body = {"cedulas": ["v-12.345.678", "V12345678", "12345678", "J-999", "no es cédula"]}
+        data = self.client.post('/api/v1/personas/batch', json=body).get_json()
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(set(data["resultados"]), {"V-12345678", "12345678", "J-999"})
+        self.assertEqual([p["nombre_completo"] for p in data["resultados"]["V-12345678"]], ["JUAN PEREZ"])
+        self.assertEqual(len(data["resultados"]["12345678"]), 2)
+        self.assertEqual((data["no_encontradas"], data["invalidas"]), (["J-999"], ["no es cédula"]))
+
+        response = self.client.post('/api/v1/personas/batch?stream=true', json=body["cedulas"])
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(self.client.post('/api/v1/personas/batch', json={"cedula": "V-1"}).status_code, 400)
+
+    @patch('src.api.v1.routes.get_db')
+    def test_buscar_personas_lote_ceros_a_la_izquierda(self, mock_get_db):
+        """Prueba que V-012345678 y V-12345678 son cédulas distintas en el lote."""
+        docs = [
+            {"_id": 1, "cedula": "V-012345678", "nombre": "LUIS ROJAS", "cedula_letra": "V", "cedula_numero": 12345678,
+             "total_apariciones": 5, "apariciones": []},
+            {"_id": 2, "cedula": "V-12345678", "nombre": "JUAN PEREZ", "cedula_letra": "V", "cedula_numero": 12345678,
+             "total_apariciones": 1, "apariciones": []},
+        ]
+
+        class Coll:
+            def find(self, query, projection):
+                return [doc for doc in docs if doc["cedula_numero"] in query["cedula_numero"]["$in"]]
+
+        mock_get_db.return_value = {"persona_apariciones": Coll()}
+        body = {"cedulas": ["V-012345678", "V-12345678", "012345678"]}
+        resultados = self.client.post('/api/v1/personas/batch', json=body).get_json()["resultados"]
+
+        self.assertEqual(set(resultados), {"V-012345678", "V-12345678", "012345678"})
+        self.assertEqual([p["nombre_completo"] for p in resultados["V-012345678"]], ["LUIS ROJAS"])
+        self.assertEqual([p["nombre_completo"] for p in resultados["V-12345678"]], ["JUAN PEREZ"])
+        self.assertEqual([p["nombre_completo"] for p in resultados["012345678"]], ["LUIS ROJAS"])
+
+    @patch('app.get_cedula_index')
+    @patch('app.invalidate_response_cache')
+    @patch('app.bump_data_version')
+    @patch('app.mining_jobs')
+    @patch('app.get_db')
+    def test_mine_after_clear_is_complete(self, mock_get_db, mock_jobs, *_):
+        """Prueba que vaciar la base borra la marca de agua y que una extracción incremental sobre la base vacía es completa."""
+        db = MagicMock()
+        mock_get_db.return_value = db
+        self.assertEqual(self.client.post('/api/clear').status_code, 200)
+        db.__getitem__.return_value.delete_one.assert_called_once_with({"_id": "mining"})
+
+        mock_jobs.start.side_effect = lambda modo: ({"_id": "j1", "modo": modo}, False)
+        db.__getitem__.return_value.find_one.return_value = None
+        self.assertEqual(self.client.post('/api/mine').get_json()["modo"], "completo")
+        db.__getitem__.return_value.find_one.return_value = {"_id": "V-1"}
+        self.assertEqual(self.client.post('/api/mine').get_json()["modo"], "incremental")
+        self.assertEqual(self.client.post('/api/mine', json={"modo": "completo"}).get_json()["modo"], "completo")
+
 if __name__ == '__main__':
     unittest.main()
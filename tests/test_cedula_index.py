@@ -0,0 +1,118 @@
+import sys
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from app import app
+from src.adapters.mongodb_cedula_index import MongoCedulaIndex
+from src.utils.cedula_set import CedulaSet
+from tests.fakes import Cursor, FakeDB, Metadata
+
+ROWS = [("V", 12345678, 8, 3), ("V", 1234567, 7, 1), ("E", 81234567, 8, 2), ("V", 12345678, 8, 1), ("J", 5_000_000_000, 10, 4)]
+
+
+class _ReadModel:
+    def __init__(self, rows):
+        self.rows = rows
+        self.scans = 0
+        # Scans block until it is set (a slow rebuild)
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def find(self, query, projection=None):
+        self.gate.wait()
+        self.scans += 1
+        docs = [
+            {"cedula": f"{l}-{n:0{d}d}", "cedula_letra": l, "cedula_numero": n, "total_apariciones": c}
+            for l, n, d, c in self.rows
+        ]
+
+        return Cursor(docs)
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestCedulaIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_counts(self):
+        cedulas = CedulaSet.build(ROWS, version=1)
+        self.assertEqual(len(cedulas), 4)
+        self.assertEqual(cedulas.count("V", 12345678, 8), 4)
+        self.assertEqual(cedulas.count("E", 12345678, 8), 0)
+        # Without a letter any letter matches
+        self.assertEqual(cedulas.counts([(None, 81234567, 8), ("J", 5_000_000_000, 10), ("V", 7, 1), ("G", 1, 1)]), [2, 4, 0, 0])
+
+    def test_leading_zeros_are_another_cedula(self):
+        cedulas = CedulaSet.build([("V", 12345678, 9, 5), ("V", 12345678, 8, 1)])
+        self.assertEqual(len(cedulas), 2)
+        self.assertEqual(cedulas.counts([("V", 12345678, 9), ("V", 12345678, 8), (None, 12345678, 10)]), [5, 1, 0])
+
+    def test_snapshot_is_memory_mapped(self):
+        CedulaSet.build(ROWS, version=1).save(self._tmp.name)
+        CedulaSet.build(ROWS[:1], version=2).save(self._tmp.name)
+        CedulaSet.build(ROWS[:2], version=3).save(self._tmp.name)
+        loaded = CedulaSet.load(self._tmp.name)
+        self.assertEqual(loaded.version, 3)
+        self.assertEqual(loaded.counts([("V", 1234567, 7), ("E", 81234567, 8)]), [1, 0])
+        # The current snapshot and the previous one are kept
+        self.assertEqual(len([e for e in os.scandir(self._tmp.name) if e.is_dir()]), 2)
+        self.assertIsNone(CedulaSet.load(os.path.join(self._tmp.name, "missing")))
+
+    def test_workers_share_the_snapshot(self):
+        db = FakeDB("test_cedula_index", persona_apariciones=_ReadModel(ROWS), metadata=Metadata())
+        first = MongoCedulaIndex(db, self._tmp.name)
+        self.assertEqual(first.get().count("V", 1234567, 7), 1)
+        self.assertEqual(db["persona_apariciones"].scans, 1)
+        # Another worker loads the snapshot of the same data version instead of scanning
+        second = MongoCedulaIndex(db, self._tmp.name)
+        self.assertEqual(second.get().count("E", 81234567, 8), 2)
+        self.assertEqual(db["persona_apariciones"].scans, 1)
+        # A finished mining run refreshes it in the background; requests keep the old set
+        db["persona_apariciones"].rows = ROWS + [("V", 999, 3, 1)]
+        db["metadata"].version = 2
+        db["persona_apariciones"].gate.clear()
+        first.refresh()
+        self.assertEqual(first.get().count("V", 999, 3), 0)
+        db["persona_apariciones"].gate.set()
+        self.assertTrue(first._built.wait(5))
+        self.assertEqual(first.get().count("V", 999, 3), 1)
+        self.assertEqual(CedulaSet.snapshot_version(self._tmp.name), 2)
+
+    @patch('src.api.v1.routes.get_cedula_index')
+    @patch('src.api.v1.routes.get_db')
+    def test_existence_endpoint(self, mock_get_db, mock_get_index):
+        mock_get_index.return_value.get.return_value = CedulaSet.build(ROWS)
+        client = app.test_client()
+
+        response = client.get('/api/v1/personas/existe?cedula=V-12.345.678,e81234567&cedula=V-1')
+        body = response.get_json()
+        self.assertEqual(body["resultados"], {"V-12345678": 4, "E-81234567": 2, "V-1": 0})
+        self.assertEqual(body["no_encontradas"], ["V-1"])
+
+        response = client.post('/api/v1/personas/existe', json={"cedulas": ["1234567", "xyz"]})
+        body = response.get_json()
+        self.assertEqual(body["resultados"], {"1234567": 1})
+        self.assertEqual(body["invalidas"], ["xyz"])
+        self.assertEqual(client.get('/api/v1/personas/existe').status_code, 400)
+
+        # V-012345678 is another person, not one more mention of V-12345678
+        mock_get_index.return_value.get.return_value = CedulaSet.build([("V", 12345678, 9, 5), ("V", 12345678, 8, 1)])
+        body = client.get('/api/v1/personas/existe?cedula=V-012345678,V-12.345.678').get_json()
+        self.assertEqual(body["resultados"], {"V-012345678": 5, "V-12345678": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
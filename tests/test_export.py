@@ -0,0 +1,90 @@
+import sys
+import os
+import csv
+import gzip
+import io
+import json
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+from src.adapters.mongodb_export import ExportFilter, build_export_query, filter_persona, parse_fecha
+from src.services.export_service import export_chunks
+from src.utils.csv_export import CSV_COLUMNS, build_persona_rows, iter_csv
+
+PERSONAS = [
+    {
+        "_id": "p1",
+        "cedula": "V-12345678",
+        "nombre": "JUAN CARLOS PEREZ",
+        "total_apariciones": 2,
+        "apariciones": [
+            {"numero_gaceta": "42100", "fecha": "15/03/2021", "pagina": 3, "filename": "g42100.pdf"},
+            {"numero_gaceta": "41900", "fecha": "02/06/2020", "pagina": None, "filename": "g41900.pdf"},
+        ],
+    },
+    {
+        "_id": "p2",
+        "cedula": "E-81234567",
+        "nombre": "NOMBRE DESCONOCIDO 1",
+        "total_apariciones": 1,
+        "apariciones": [
+            {"numero_gaceta": "41800", "fecha": "10/01/2020", "pagina": 7, "filename": "g41800.pdf"},
+        ],
+    },
+]
+
+
+class TestExport(unittest.TestCase):
+    def test_csv_rows_one_per_appearance(self):
+        raw = b"".join(iter_csv(build_persona_rows(PERSONAS), chunk_rows=1))
+        rows = list(csv.DictReader(io.StringIO(raw.decode("utf-8-sig"))))
+        self.assertEqual(list(rows[0].keys()), CSV_COLUMNS)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual((rows[0]["Nombres"], rows[0]["Apellidos"]), ("JUAN", "CARLOS PEREZ"))
+        self.assertEqual(rows[1]["Página"], "")
+        self.assertEqual(rows[2]["Nombres"], "NOMBRE DESCONOCIDO 1")
+
+    def test_ndjson_gzip_with_iso_dates(self):
+        raw = gzip.decompress(b"".join(export_chunks(iter(PERSONAS), "ndjson", comprimir=True)))
+        records = [json.loads(line) for line in raw.decode("utf-8").splitlines()]
+        self.assertEqual([r["documento_identidad"] for r in records], ["V-12345678", "E-81234567"])
+        self.assertEqual(records[0]["menciones_gaceta"][0]["fecha_iso"], "2021-03-15")
+
+    def test_date_filters_trim_appearances(self):
+        self.assertEqual(parse_fecha("02/06/2020"), date(2020, 6, 2))
+        self.assertIsNone(parse_fecha("2020-06-02"))
+        only_2020 = ExportFilter(year=2020)
+        persona = filter_persona(PERSONAS[0], only_2020)
+        self.assertEqual([ap["numero_gaceta"] for ap in persona["apariciones"]], ["41900"])
+        self.assertEqual(persona["total_apariciones"], 1)
+        self.assertIsNone(filter_persona(PERSONAS[1], ExportFilter(date_from=date(2020, 2, 1))))
+        self.assertIs(filter_persona(PERSONAS[1], ExportFilter(letra="E")), PERSONAS[1])
+
+    def test_export_query(self):
+        self.assertEqual(build_export_query(ExportFilter()), {})
+        query = build_export_query(ExportFilter(letra="v", date_from=date(2019, 5, 1), date_to=date(2020, 1, 1)))
+        self.assertEqual(query, {"$and": [
+            {"cedula_letra": "V"},
+            {"apariciones.fecha": {"$regex": "/(2019|2020)$"}},
+        ]})
+
+    @patch('src.api.v1.routes.iter_export_personas')
+    @patch('src.api.v1.routes.get_db')
+    def test_exportar_endpoint(self, mock_get_db, mock_iter):
+        mock_iter.return_value = iter(PERSONAS)
+        client = app.test_client()
+        response = client.get('/api/v1/exportar?formato=csv&anio=2020')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('personas.csv', response.headers["Content-Disposition"])
+        self.assertEqual(mock_iter.call_args[0][1], ExportFilter(year=2020))
+        self.assertEqual(len(response.get_data().decode("utf-8-sig").strip().splitlines()), 4)
+        self.assertEqual(client.get('/api/v1/exportar?formato=xml').status_code, 400)
+        self.assertEqual(client.get('/api/v1/exportar?desde=01-01-2020').status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import sys
+import os
+import json
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.bench_extraction import THRESHOLDS, evaluate, load_golden
+from benchmarks.synthetic import generate_corpus
+
+
+class TestExtractionBenchmark(unittest.TestCase):
+    def test_synthetic_corpus_is_reproducible(self):
+        first = generate_corpus(5, seed=3)
+        second = generate_corpus(5, seed=3)
+        self.assertEqual([p.text for p in first], [p.text for p in second])
+        self.assertEqual([p.hits for p in first], [p.hits for p in second])
+        self.assertTrue(any(p.hits for p in first))
+
+    def test_golden_corpus_meets_quality_floors(self):
+        with open(THRESHOLDS, "r", encoding="utf-8") as f:
+            floors = json.load(f)["golden"]
+        quality = evaluate(load_golden())
+        for metric, floor in floors.items():
+            self.assertGreaterEqual(quality[metric], floor, metric)
+
+
+if __name__ == '__main__':
+    unittest.main()
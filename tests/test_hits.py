@@ -0,0 +1,99 @@
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.hits import CedulaHits
+from src.utils.text_matchers import scan_cedulas
+
+PAGE_1 = "Se designa a MARÍA PÉREZ, titular de la cédula V-12.345.678 y a JUAN NÚÑEZ, C.I. E-0.123.456"
+PAGE_2 = "Ratifica a MARÍA PÉREZ, cédula V-12.345.678"
+FULL_TEXT = "Se nombra a JUAN NÚÑEZ, C.I. E-0.123.456 y al RIF J-12345678901234567890123"
+_cedula, _rif = scan_cedulas(FULL_TEXT)
+# The RIF as a hit without a name
+FULL_TEXT_HITS = [_cedula, (*_rif[:4], None)]
+
+
+def _rows(hits):
+    return [(hit.gaceta, hit.page_number, hit.cedula, hit.nombre) for hit in hits]
+
+
+def _table(keep_text=False):
+    hits = CedulaHits(keep_text=keep_text)
+    first = hits.add_gaceta("gaceta_1.pdf", "40001", "01/03/2021", 2021)
+    hits.add_page(first, 1, PAGE_1, scan_cedulas(PAGE_1))
+    hits.add_page(first, 2, "Sin cédulas", scan_cedulas("Sin cédulas"))
+    hits.add_page(first, 3, PAGE_2, scan_cedulas(PAGE_2))
+    second = hits.add_gaceta("gaceta_2.pdf", "40002", "15/03/2021", 2021)
+    hits.add_page(second, None, FULL_TEXT, FULL_TEXT_HITS)
+    return hits
+
+
+class TestCedulaHits(unittest.TestCase):
+    def test_extraction_order(self):
+        hits = _table()
+        self.assertEqual(_rows(hits), [
+            ("gaceta_1.pdf", 1, "V-12345678", "MARÍA PÉREZ"),
+            ("gaceta_1.pdf", 1, "E-0123456", "JUAN NÚÑEZ"),
+            ("gaceta_1.pdf", 3, "V-12345678", "MARÍA PÉREZ"),
+            ("gaceta_2.pdf", None, "E-0123456", "JUAN NÚÑEZ"),
+            ("gaceta_2.pdf", None, "J-12345678901234567890123", "Desconocido"),
+        ])
+        # Within a page, in text order
+        self.assertLess(hits[0].start, hits[1].start)
+        self.assertEqual(hits[-1].numero_gaceta, "40002")
+        with self.assertRaises(IndexError):
+            hits[len(hits)]
+
+    def test_numbers_round_trip(self):
+        hits = _table()
+        # Leading zeros and digit strings too long for the integer column are kept as found
+        self.assertEqual(hits[1].number, "0123456")
+        self.assertEqual(hits[4].number, "12345678901234567890123")
+        self.assertEqual(hits[0].as_dict(with_context=False)["number"], "12345678")
+
+    def test_names_and_gacetas_stored_once(self):
+        hits = _table()
+        # Repeated hits are rows of their own; their names and gaceta metadata are not copied
+        self.assertEqual(len(hits), 5)
+        self.assertEqual(hits.names, ["MARÍA PÉREZ", "JUAN NÚÑEZ"])
+        self.assertEqual(len(hits.gacetas), 2)
+        # A page without hits keeps no text, even with keep_text
+        kept = _table(keep_text=True)
+        self.assertEqual(sorted(kept._texts), [(0, 1), (0, 3), (1, -1)])
+
+    def test_extend_merges_in_order(self):
+        merged = _table(keep_text=True)
+        other = CedulaHits(keep_text=True)
+        gaceta = other.add_gaceta("gaceta_3.pdf", "40003", "30/03/2021", 2021)
+        text = "Designa a PEDRO GÓMEZ, C.I. V-7.654.321, y ratifica a JUAN NÚÑEZ, C.I. E-0.123.456"
+        other.add_page(gaceta, 1, text, scan_cedulas(text))
+        other.add_page(gaceta, 2, FULL_TEXT, FULL_TEXT_HITS)
+
+        merged.extend(other)
+        self.assertEqual(len(merged), 9)
+        self.assertEqual(_rows(merged)[:5], _rows(_table()))
+        self.assertEqual(_rows(merged)[5:], [
+            ("gaceta_3.pdf", 1, "V-7654321", "PEDRO GÓMEZ"),
+            ("gaceta_3.pdf", 1, "E-0123456", "JUAN NÚÑEZ"),
+            ("gaceta_3.pdf", 2, "E-0123456", "JUAN NÚÑEZ"),
+            ("gaceta_3.pdf", 2, "J-12345678901234567890123", "Desconocido"),
+        ])
+        # Names are re-interned (no duplicates) and gaceta indexes shifted
+        self.assertEqual(merged.names, ["MARÍA PÉREZ", "JUAN NÚÑEZ", "PEDRO GÓMEZ"])
+        self.assertEqual([hit.gaceta_index for hit in merged][5:], [2, 2, 2, 2])
+        # Long numbers and page texts follow their rows
+        self.assertEqual(merged[8].number, "12345678901234567890123")
+        self.assertIn("ratifica a JUAN NÚÑEZ", merged[5].context_after)
+        self.assertIn("[V-7654321]", merged[5].snippet)
+
+    def test_context_needs_keep_text(self):
+        hits = _table()
+        with self.assertRaises(RuntimeError):
+            hits[0].context_before
+        self.assertIn("MARÍA PÉREZ", _table(keep_text=True)[0].context_before)
+
+
+if __name__ == '__main__':
+    unittest.main()
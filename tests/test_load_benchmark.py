@@ -0,0 +1,69 @@
+import sys
+import os
+import random
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.dataset import DatasetConfig, appearance_counts, generate_gacetas, generate_hits, generate_personas
+from benchmarks.load_test import SHAPES, Sample, percentile, run
+
+
+class TestSyntheticDataset(unittest.TestCase):
+    def test_personas_are_reproducible_and_distinct(self):
+        first = list(generate_personas(random.Random(1), 2000))
+        second = list(generate_personas(random.Random(1), 2000))
+        self.assertEqual(first, second)
+        self.assertEqual(len({cedula for cedula, _ in first}), 2000)
+        letters = [cedula[0] for cedula, _ in first]
+        self.assertGreater(letters.count("V"), letters.count("E"))
+        self.assertTrue({"V", "E", "J"} <= set(letters))
+
+    def test_appearance_counts_follow_the_requested_mean(self):
+        counts = appearance_counts(random.Random(0), 20000, 10.0, 500)
+        self.assertAlmostEqual(sum(counts) / len(counts), 10.0, delta=1.0)
+        self.assertLessEqual(max(counts), 500)
+        # Heavy tail: most personas appear once
+        self.assertGreater(counts.count(1), len(counts) // 3)
+
+    def test_hits_point_to_existing_gaceta_pages(self):
+        config = DatasetConfig(gacetas=30, seed=2)
+        rng = random.Random(config.seed)
+        docs = list(generate_gacetas(rng, config))
+        self.assertEqual(len({doc["numero_gaceta"] for doc in docs}), 30)
+        self.assertTrue(all(doc["filename"].startswith(doc["numero_gaceta"] + "-") for doc in docs))
+        gacetas = [(d["numero_gaceta"], d["filename"], d["fecha"], d["total_pages"]) for d in docs]
+        pages = {numero: total for numero, _, _, total in gacetas}
+        hits = list(generate_hits(rng, generate_personas(rng, 50), [3] * 50, gacetas))
+        self.assertEqual(len(hits), 150)
+        for _, _, numero, _, _, pagina in hits:
+            self.assertTrue(1 <= pagina <= pages[numero])
+
+
+class TestLoadTest(unittest.TestCase):
+    def test_percentile_is_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile(values, 100), 100.0)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_run_reports_every_shape(self):
+        calls = []
+
+        def send(method, path, params, body):
+            calls.append((method, path, params))
+            return (500 if path == "/api/v1/paginas" else 200), {"X-Cache": "MISS"}, {}
+
+        sample = Sample(cedulas=["V-12345678", "E-81234567"], tokens=["GONZALEZ", "MARIA"])
+        results = run(send, SHAPES, sample, concurrency=4, requests=400, seed=1)
+        self.assertEqual(len(calls), 400)
+        self.assertEqual(results["total"]["requests"], 400)
+        self.assertEqual(set(results["shapes"]), set(SHAPES))
+        self.assertEqual(results["shapes"]["v1_paginas"]["errors"], results["shapes"]["v1_paginas"]["requests"])
+        self.assertEqual(results["shapes"]["search_vacia"]["errors"], 0)
+        self.assertLessEqual(results["total"]["p50_ms"], results["total"]["p99_ms"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+import os
+import threading
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services import mining_jobs
+from src.services.mining_jobs import MiningJobManager, mining_command
+
+
+class _MemoryStore:
+    """MongoJobStore semantics (one active job, cancel flag) over a dict."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def claim(self, job, lease_seconds):
+        with self.lock:
+            for existing in self.jobs.values():
+                if existing.get("activo"):
+                    return existing, False
+            job = {**job, "estado": "en_cola", "activo": True, "cancelar": False, "creado": datetime.now(timezone.utc)}
+            self.jobs[job["_id"]] = job
+            return job, True
+
+    def mark_running(self, job_id, pid):
+        self.update(job_id, {"estado": "ejecutando", "pid": pid, "inicio": datetime.now(timezone.utc)})
+
+    def heartbeat(self, job_id):
+        job = self.jobs.get(job_id)
+        return dict(job) if job and job.get("activo") else None
+
+    def update(self, job_id, fields):
+        self.jobs[job_id].update(fields)
+
+    def finish(self, job_id, fields):
+        self.jobs[job_id].update(fields, fin=datetime.now(timezone.utc))
+        self.jobs[job_id].pop("activo", None)
+
+    def request_cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if not job or not job.get("activo"):
+            return None
+        job["cancelar"] = True
+        return dict(job)
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def history(self, limit=20):
+        return list(self.jobs.values())[-limit:]
+
+
+class TestMiningJobs(unittest.TestCase):
+    def test_command_modes(self):
+        self.assertIn("--incremental", mining_command("abc", "incremental", 2))
+        self.assertNotIn("--incremental", mining_command("abc", "completo", 2))
+        self.assertEqual(mining_command("abc", "completo", 2)[-2:], ["--workers", "2"])
+
+    def test_command_uses_mongo_backend(self):
+        # The web app only reads MongoDB: REPOSITORY_BACKEND=sqlite must not reach web jobs
+        command = mining_command("abc", "incremental", 2)
+        self.assertEqual(command[command.index("--backend") + 1], "mongo")
+
+    @patch.object(mining_jobs, "MINING_HEARTBEAT_SECONDS", 0.05)
+    def test_single_flight_and_cancel(self):
+        store = _MemoryStore()
+        finished = threading.Event()
+        manager = MiningJobManager(lambda: None, on_finish=lambda job: finished.set())
+        manager._store = lambda: store
+        sleeper = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+        with patch.object(mining_jobs, "mining_command", lambda *args: sleeper):
+            job, attached = manager.start("completo")
+            self.assertFalse(attached)
+            second, attached = manager.start("incremental")
+            self.assertTrue(attached)
+            self.assertEqual(second["_id"], job["_id"])
+
+            self.assertIsNotNone(manager.cancel(job["_id"]))
+            self.assertTrue(finished.wait(15))
+
+        final = store.get(job["_id"])
+        self.assertEqual(final["estado"], "cancelado")
+        self.assertNotIn("activo", final)
+        self.assertIsNotNone(final["duracion_s"])
+        self.assertIsNone(manager.cancel(job["_id"]))
+        with self.assertRaises(ValueError):
+            manager.start("parcial")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.adapters import mongodb_client
+
+
+class TestSharedClient(unittest.TestCase):
+    def tearDown(self):
+        mongodb_client.close_clients()
+
+    def test_same_client_per_uri(self):
+        # MongoClient connects lazily: no server needed
+        first = mongodb_client.get_client("mongodb://localhost:27017/")
+        self.assertIs(first, mongodb_client.get_client("mongodb://localhost:27017/"))
+        self.assertIsNot(first, mongodb_client.get_client("mongodb://127.0.0.1:27017/"))
+        self.assertIs(mongodb_client.get_database("x", "mongodb://localhost:27017/").client, first)
+
+    def test_new_client_after_fork(self):
+        first = mongodb_client.get_client("mongodb://localhost:27017/")
+        mongodb_client._pid = -1
+        self.assertIsNot(first, mongodb_client.get_client("mongodb://localhost:27017/"))
+        self.assertEqual(mongodb_client._pid, os.getpid())
+
+    def test_close_clients(self):
+        first = mongodb_client.get_client("mongodb://localhost:27017/")
+        mongodb_client.close_clients()
+        self.assertIsNot(first, mongodb_client.get_client("mongodb://localhost:27017/"))
+
+    def test_inherited_clients_are_not_closed(self):
+        client = mongodb_client.get_client("mongodb://localhost:27017/")
+        closed = []
+        client.close = lambda: closed.append(client)
+        # As in a forked child that never used the client: forgotten, not closed
+        mongodb_client._pid = -1
+        mongodb_client.close_clients()
+        self.assertEqual((closed, mongodb_client._clients), ([], {}))
+        mongodb_client._pid = os.getpid()
+        del client.close
+        client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.adapters.mongodb_indexes import REQUIRED_INDEXES, plan_has_collscan, query_shapes
+
+
+def _leading_fields(collection):
+    specs = [spec for spec in REQUIRED_INDEXES if spec.collection == collection]
+    fields = {"_id"} | {spec.keys[0][0] for spec in specs}
+    if any(direction == "text" for spec in specs for _, direction in spec.keys):
+        fields.add("$text")
+    return fields
+
+
+def _can_use_index(query, fields):
+    """Mismo criterio que el planificador: un $or necesita índice en cada rama, un $and en alguna."""
+    if "$or" in query:
+        return all(_can_use_index(branch, fields) for branch in query["$or"])
+    if "$and" in query:
+        return any(_can_use_index(part, fields) for part in query["$and"])
+    return any(field in fields for field in query)
+
+
+class TestMongoIndexes(unittest.TestCase):
+    def test_plan_has_collscan(self):
+        ixscan = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "cedula_1"}}
+        self.assertFalse(plan_has_collscan(ixscan))
+        self.assertTrue(plan_has_collscan({"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}))
+        self.assertTrue(plan_has_collscan({"stage": "OR", "inputStages": [ixscan, {"stage": "COLLSCAN"}]}))
+        # Formato del motor SBE
+        self.assertTrue(plan_has_collscan({"queryPlan": {"stage": "COLLSCAN"}, "slotBasedPlan": {}}))
+
+    def test_every_query_shape_has_an_index(self):
+        for shape in query_shapes():
+            fields = _leading_fields(shape.collection)
+            if shape.filter:
+                ok = _can_use_index(shape.filter, fields)
+            else:
+                ok = bool(shape.sort) and shape.sort[0][0] in fields
+            self.assertTrue(ok, shape.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
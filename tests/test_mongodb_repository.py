@@ -0,0 +1,111 @@
+import sys
+import os
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import bson
+from bson.raw_bson import RawBSONDocument
+
+from src.adapters.mongodb import MongoGacetaRepository, _LazyPages, build_gaceta_query
+from src.ports.repository import GacetaFilter, GacetaPage
+from tests.fakes import matches
+
+# (year, month, day) around the bounds used below; one gaceta without a date
+GACETAS = [
+    {"_id": i, "tipo": tipo, "year": year, "month": month, "day": day}
+    for i, (tipo, year, month, day) in enumerate([
+        ("ORDINARIA", 2020, 12, 31),
+        ("ORDINARIA", 2021, 3, 14),
+        ("EXTRAORDINARIA", 2021, 3, 15),
+        ("ORDINARIA", 2021, 4, 1),
+        ("EXTRAORDINARIA", 2021, 6, 30),
+        ("ORDINARIA", 2021, 7, 1),
+        ("ORDINARIA", 2022, 1, 1),
+        ("ORDINARIA", None, None, None),
+    ], 1)
+]
+
+
+def _ids(query):
+    return [doc["_id"] for doc in GACETAS if matches(query, doc)]
+
+
+class TestBuildGacetaQuery(unittest.TestCase):
+    def test_no_filter(self):
+        self.assertEqual(build_gaceta_query(), {})
+        self.assertEqual(build_gaceta_query(GacetaFilter()), {})
+
+    def test_year_and_tipo(self):
+        self.assertEqual(build_gaceta_query(GacetaFilter(year=2021)), {"year": 2021})
+        # tipo is stored upper-case
+        self.assertEqual(build_gaceta_query(GacetaFilter(tipo="extraordinaria")), {"tipo": "EXTRAORDINARIA"})
+        self.assertEqual(_ids(build_gaceta_query(GacetaFilter(year=2021, tipo="ordinaria"))), [2, 4, 6])
+
+    def test_date_bounds_are_inclusive(self):
+        query = build_gaceta_query(GacetaFilter(date_from=date(2021, 3, 15)))
+        # The plain year range comes first, so an index on year narrows the scan
+        self.assertEqual(query["$and"][0], {"year": {"$gte": 2021}})
+        self.assertEqual(_ids(query), [3, 4, 5, 6, 7])
+        self.assertEqual(_ids(build_gaceta_query(GacetaFilter(date_to=date(2021, 6, 30)))), [1, 2, 3, 4, 5])
+        self.assertEqual(_ids(build_gaceta_query(GacetaFilter(date_from=date(2021, 3, 15), date_to=date(2021, 7, 1)))), [3, 4, 5, 6])
+        self.assertEqual(_ids(build_gaceta_query(GacetaFilter(date_from=date(2021, 3, 15), date_to=date(2021, 3, 15)))), [3])
+
+    def test_id_bounds(self):
+        self.assertEqual(build_gaceta_query(GacetaFilter(id_min=3)), {"_id": {"$gte": 3}})
+        self.assertEqual(build_gaceta_query(GacetaFilter(id_max=5)), {"_id": {"$lte": 5}})
+        self.assertEqual(build_gaceta_query(GacetaFilter(id_min=3, id_max=5)), {"_id": {"$gte": 3, "$lte": 5}})
+        # A partition slice combines with the filter's own bounds
+        query = build_gaceta_query(GacetaFilter(tipo="ordinaria", id_min=2), id_range=(1, 6))
+        self.assertEqual(query, {"$and": [{"tipo": "ORDINARIA"}, {"_id": {"$gte": 2}}, {"_id": {"$gte": 1, "$lte": 6}}]})
+        self.assertEqual(_ids(query), [2, 4, 6])
+        self.assertEqual(build_gaceta_query(id_range=(4, 4)), {"_id": {"$gte": 4, "$lte": 4}})
+
+
+class _Page(dict):
+    """A stored page that records when its text is read."""
+
+    decoded = []
+
+    def get(self, key, default=None):
+        if key == "text":
+            _Page.decoded.append(self["page_number"])
+        return super().get(key, default)
+
+
+class TestLazyPages(unittest.TestCase):
+    def test_pages_decoded_on_iteration(self):
+        _Page.decoded = []
+        pages = _LazyPages([_Page(page_number=n, text=f"página {n}") for n in (1, 2, 3)])
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(_Page.decoded, [])
+        iterator = iter(pages)
+        self.assertEqual(next(iterator), GacetaPage(page_number=1, text="página 1"))
+        # One page at a time
+        self.assertEqual(_Page.decoded, [1])
+        self.assertEqual([page.page_number for page in iterator], [2, 3])
+        self.assertEqual(_Page.decoded, [1, 2, 3])
+        # Iterable again (a repository document may be scanned more than once)
+        self.assertEqual(len(list(pages)), 3)
+
+    def test_raw_bson_pages(self):
+        raw = RawBSONDocument(bson.encode({"pages": [{"page_number": 1, "text": "V-12.345.678"}, {"page_number": 2}]}))
+        pages = _LazyPages(raw["pages"])
+        self.assertEqual(list(pages), [GacetaPage(page_number=1, text="V-12.345.678"), GacetaPage(page_number=2, text="")])
+        self.assertEqual(list(_LazyPages([])), [])
+
+
+class TestSaveRelationship(unittest.TestCase):
+    @patch.object(MongoGacetaRepository, "relationship_writer")
+    def test_goes_through_the_writer(self, mock_writer):
+        # The writer keeps the read model, the data version and the dedup in step
+        MongoGacetaRepository(uri="mongodb://test").save_relationship("V-1234567", "JUAN", "41900", "g.pdf", "02/06/2020", 3)
+        mock_writer.assert_called_once_with(batch_size=1)
+        writer = mock_writer.return_value.__enter__.return_value
+        writer.add.assert_called_once_with("V-1234567", "JUAN", "41900", "g.pdf", "02/06/2020", 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import sys
+import os
+import unittest
+from itertools import count
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymongo.errors import AutoReconnect
+
+from src.constants.config import MONGO_METADATA_COLLECTION, MONGO_READ_MODEL_COLLECTION
+from src.adapters.mongodb_writer import MongoRelationshipWriter, UNKNOWN_NAME
+from tests.fakes import FakeDB, matches
+
+
+class _BulkResult:
+    def __init__(self, upserted_ids):
+        self.upserted_ids = upserted_ids
+
+
+class _Collection:
+    """The part of a pymongo collection the writer uses: unordered UpdateOne bulk writes."""
+
+    _ids = count(1)
+
+    def __init__(self):
+        self.docs = []
+        self.bulk_writes = 0
+        # Bulk writes that raise before applying anything, as a dropped connection would
+        self.failures = 0
+
+    def create_index(self, keys, **options):
+        pass
+
+    def find(self, query, projection=None):
+        return [doc for doc in self.docs if matches(query, doc)]
+
+    def find_one(self, query, projection=None):
+        return next(iter(self.find(query)), None)
+
+    def update_one(self, query, update, upsert=False):
+        self._update(query, update, upsert)
+
+    def bulk_write(self, ops, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            raise AutoReconnect("connection lost")
+        self.bulk_writes += 1
+        upserted = {}
+        for index, op in enumerate(ops):
+            new_id = self._update(op._filter, op._doc, op._upsert)
+            if new_id is not None:
+                upserted[index] = new_id
+        return _BulkResult(upserted)
+
+    def _update(self, query, update, upsert):
+        doc = self.find_one(query)
+        new_id = None
+        if doc is None:
+            if not upsert:
+                return None
+            doc = {key: value for key, value in query.items() if not isinstance(value, dict)}
+            doc.setdefault("_id", next(self._ids))
+            doc.update(update.get("$setOnInsert", {}))
+            self.docs.append(doc)
+            new_id = doc["_id"]
+        doc.update(update.get("$set", {}))
+        for field, value in update.get("$push", {}).items():
+            doc.setdefault(field, []).extend(value["$each"])
+        for field, value in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + value
+        return new_id
+
+
+class _Db(FakeDB):
+    # Collections are created on first use, as in MongoDB
+    def __missing__(self, name):
+        collection = self[name] = _Collection()
+        return collection
+
+
+class TestMongoRelationshipWriter(unittest.TestCase):
+    def setUp(self):
+        self.db = _Db()
+
+    def _add(self, writer, cedula, nombre=UNKNOWN_NAME, numero="40001", pagina=1):
+        return writer.add(cedula, nombre, numero, f"gaceta_{numero}.pdf", "01/03/2021", pagina)
+
+    def test_batches_flush_on_threshold(self):
+        writer = MongoRelationshipWriter(self.db, batch_size=3, flush_seconds=3600)
+        self.assertFalse(self._add(writer, "V-1"))
+        self.assertFalse(self._add(writer, "V-2"))
+        self.assertEqual(self.db["persona_gaceta"].docs, [])
+        # The third hit reaches batch_size: one bulk write per collection for the batch
+        self.assertTrue(self._add(writer, "V-1", "ANA DÍAZ"))
+        self.assertEqual(self.db["persona"].bulk_writes, 1)
+        self.assertEqual(writer.saved, 3)
+        self.assertEqual(len(self.db["persona_gaceta"].docs), 2)
+        self.assertEqual(self.db["persona"].find_one({"cedula": "V-1"})["nombre"], "ANA DÍAZ")
+
+        self.assertFalse(self._add(writer, "V-3", numero="40002", pagina=None))
+        writer.close()
+        self.assertEqual(writer.saved, 4)
+        self.assertEqual(len(self.db["gaceta"].docs), 2)
+        read_model = {doc["cedula"]: doc for doc in self.db[MONGO_READ_MODEL_COLLECTION].docs}
+        self.assertEqual(read_model["V-1"]["nombre"], "ANA DÍAZ")
+        self.assertEqual(read_model["V-3"]["total_apariciones"], 1)
+        self.assertEqual(self.db[MONGO_METADATA_COLLECTION].find_one({"_id": "read_model"})["data_version"], 2)
+
+    def test_failed_batch_is_kept(self):
+        writer = MongoRelationshipWriter(self.db, batch_size=2, flush_seconds=3600)
+        self._add(writer, "V-1")
+        self.db["persona_gaceta"].failures = 1
+        with self.assertRaises(AutoReconnect):
+            self._add(writer, "V-2", "LUIS RUIZ")
+        self.assertEqual((writer.saved, self.db["persona_gaceta"].docs), (0, []))
+
+        # The next flush writes the failed batch too, without duplicating what was stored
+        writer.close()
+        self.assertEqual(writer.saved, 2)
+        self.assertEqual(len(self.db["persona"].docs), 2)
+        self.assertEqual(len(self.db["persona_gaceta"].docs), 2)
+        read_model = {doc["cedula"]: doc for doc in self.db[MONGO_READ_MODEL_COLLECTION].docs}
+        self.assertEqual((read_model["V-2"]["nombre"], read_model["V-2"]["total_apariciones"]), ("LUIS RUIZ", 1))
+
+    def test_failed_read_model_update_is_retried(self):
+        writer = MongoRelationshipWriter(self.db, batch_size=1, flush_seconds=3600)
+        self.db[MONGO_READ_MODEL_COLLECTION].failures = 1
+        with self.assertRaises(AutoReconnect):
+            self._add(writer, "V-1")
+        # The relationship is stored; only its read-model update waits
+        self.assertEqual((writer.saved, len(self.db["persona_gaceta"].docs)), (1, 1))
+        writer.close()
+        self.assertEqual(self.db[MONGO_READ_MODEL_COLLECTION].find_one({"cedula": "V-1"})["total_apariciones"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
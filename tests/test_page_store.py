@@ -0,0 +1,96 @@
+import sys
+import os
+import tempfile
+import unittest
+from datetime import date
+from functools import partial
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.adapters.page_store import PageStoreWriter, SegmentGacetaRepository, gaceta_record
+from src.adapters.sqlite import SqliteGacetaRepository
+from src.ports.repository import GacetaFilter
+from src.services.search_service import search_cedulas, search_cedulas_parallel
+from tests.test_sqlite_repository import GACETAS, _gaceta
+
+
+class TestPageStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self._tmp.name, "paginas")
+        # Tiny segments: every gaceta rolls over to a new one
+        self.writer = PageStoreWriter(self.directory, segment_bytes=64)
+        self.assertEqual(self.writer.add_many(GACETAS), 3)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_scan_matches_the_source(self):
+        repo = SegmentGacetaRepository(self.directory)
+        docs = list(repo.iter_gacetas())
+        self.assertEqual([doc.filename for doc in docs], ["gaceta_1.pdf", "gaceta_2.pdf", "gaceta_3.pdf"])
+        self.assertEqual([(p.page_number, p.text) for p in docs[0].pages], [
+            (1, "Se designa a MARÍA PÉREZ, titular de la cédula V-12.345.678"),
+            (2, "Resolución"),
+        ])
+        self.assertEqual((len(docs[2].pages), docs[2].full_text), (0, "Se designa a JUAN NÚÑEZ, C.I. V-7.654.321"))
+        self.assertEqual(len(os.listdir(os.path.join(self.directory, "segments"))), 3)
+
+        self.assertEqual(repo.count(GacetaFilter(tipo="extraordinaria")), 1)
+        self.assertEqual(repo.count(GacetaFilter(date_from=date(2021, 3, 15), id_max=2)), 1)
+        hits = search_cedulas(repo)
+        self.assertEqual(sorted(hit.cedula for hit in hits), ["V-12345678", "V-7654321"])
+        parallel = search_cedulas_parallel(repo, partial(SegmentGacetaRepository, self.directory), workers=1)
+        self.assertEqual(sorted(hit.cedula for hit in parallel), ["V-12345678", "V-7654321"])
+
+    def test_append_only(self):
+        repo = SegmentGacetaRepository(self.directory)
+        self.assertEqual(repo.last_gaceta_id(), 3)
+        # Stored gacetas are never written again; new ones are seen by open readers
+        self.assertFalse(self.writer.add(_gaceta(1, 1, pages=["otro texto"])))
+        self.assertTrue(PageStoreWriter(self.directory).add(_gaceta(4, 31, pages=["V-1.234.567"])))
+        self.assertEqual(repo.last_gaceta_id(), 4)
+        self.assertEqual([p.text for p in list(repo.iter_gacetas(id_range=(4, 4)))[0].pages], ["V-1.234.567"])
+        # A torn index line (crash while appending) is ignored
+        with open(os.path.join(self.directory, "index.jsonl"), "a", encoding="utf-8") as f:
+            f.write('{"id": 5, "filena')
+        self.assertEqual(SegmentGacetaRepository(self.directory).count(), 4)
+
+        # The next append drops the torn line instead of writing after it
+        self.assertTrue(self.writer.add(_gaceta(5, 31, pages=["Aviso"])))
+        self.assertEqual([entry.filename for entry in SegmentGacetaRepository(self.directory).iter_gacetas(id_range=(4, 5))],
+                         ["gaceta_4.pdf", "gaceta_5.pdf"])
+
+        repo.set_mining_watermark(4)
+        self.assertEqual(repo.mining_watermark(), 4)
+        with self.assertRaises(RuntimeError):
+            repo.relationship_writer()
+
+    def test_writers_share_the_index(self):
+        # Two writers open at once (e.g. OCR and --build-page-store): each sees the other's
+        # appends under the lock, so ids stay unique and filenames are stored once
+        other = PageStoreWriter(self.directory)
+        self.assertTrue(self.writer.add(_gaceta(4, 31, pages=["uno"])))
+        self.assertFalse(other.add(_gaceta(4, 31, pages=["uno"])))
+        self.assertTrue(other.add(_gaceta(5, 31, pages=["dos"])))
+        self.assertTrue(self.writer.add(_gaceta(6, 31, pages=["tres"])))
+        docs = list(SegmentGacetaRepository(self.directory).iter_gacetas(id_range=(4, 6)))
+        self.assertEqual([(doc.filename, [p.text for p in doc.pages]) for doc in docs],
+                         [("gaceta_4.pdf", ["uno"]), ("gaceta_5.pdf", ["dos"]), ("gaceta_6.pdf", ["tres"])])
+
+    def test_build_from_repository(self):
+        source = SqliteGacetaRepository(os.path.join(self._tmp.name, "gacetas.sqlite3"))
+        source.add_gacetas(GACETAS)
+        directory = os.path.join(self._tmp.name, "copia")
+        writer = PageStoreWriter(directory)
+        self.assertEqual(writer.add_many(gaceta_record(doc) for doc in source.iter_gacetas()), 3)
+        repo = SegmentGacetaRepository(directory, backing=source)
+        self.assertEqual(repo.count(GacetaFilter(date_to=date(2021, 3, 1))), 1)
+        with repo.relationship_writer() as relationships:
+            relationships.add("V-7654321", "JUAN NÚÑEZ", "40003", "gaceta_3.pdf", "30/03/2021", None)
+        self.assertEqual(relationships.saved, 1)
+        source.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bson import ObjectId
+
+from src.services import api_service
+from src.api.v1.utils import keyset_condition
+from src.services.api_service import count_personas, next_cursor
+from src.utils.cursors import InvalidCursor, decode_cursor, encode_cursor
+from tests.fakes import Collection, FakeDB, Metadata
+
+
+class TestPagination(unittest.TestCase):
+    def test_cursor_round_trip(self):
+        oid = ObjectId()
+        token = encode_cursor("apariciones", {"_id": oid, "total_apariciones": 7})
+        self.assertEqual(decode_cursor(token, "apariciones"), {"_id": oid, "total_apariciones": 7})
+        # Un cursor solo vale para el orden con que se creó
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(token, "newest")
+        with self.assertRaises(InvalidCursor):
+            decode_cursor("no-es-un-cursor", "newest")
+
+    def test_keyset_condition(self):
+        oid = ObjectId()
+        self.assertEqual(keyset_condition("newest", encode_cursor("newest", {"_id": oid})), {"_id": {"$lt": oid}})
+        condition = keyset_condition("apariciones", encode_cursor("apariciones", {"_id": oid, "total_apariciones": 3}))
+        self.assertEqual(condition["$or"][1], {"total_apariciones": 3, "_id": {"$lt": oid}})
+
+    def test_next_cursor_uses_last_in_sort_order(self):
+        ids = [ObjectId() for _ in range(3)]
+        # La página "newest" se reordena por cédula: el cursor debe usar el _id menor
+        page = [{"_id": ids[1], "cedula": "V-3"}, {"_id": ids[0], "cedula": "V-2"}, {"_id": ids[2], "cedula": "V-1"}]
+        self.assertEqual(decode_cursor(next_cursor(page, "newest", 3), "newest")["_id"], ids[0])
+        self.assertIsNone(next_cursor(page, "newest", 15))
+
+    def test_count_cached_per_data_version(self):
+        api_service._count_cache.clear()
+        personas = [{"cedula_letra": "V"}] * 42 + [{"cedula_letra": "E"}] * 8
+        db = FakeDB("test_pagination", persona_apariciones=Collection(personas), metadata=Metadata())
+        query = {"cedula_letra": "V"}
+        params = (("letter", "V"),)
+        self.assertEqual(count_personas(db, query, params), 42)
+        self.assertEqual(count_personas(db, query, params), 42)
+        self.assertEqual(db["persona_apariciones"].counts, 1)
+        count_personas(db, query, params, exact=True)
+        self.assertEqual(db["persona_apariciones"].counts, 2)
+        db["metadata"].version += 1
+        count_personas(db, query, params)
+        self.assertEqual(db["persona_apariciones"].counts, 3)
+        self.assertEqual(count_personas(db, {}, ()), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
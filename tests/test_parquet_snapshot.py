@@ -0,0 +1,88 @@
+import sys
+import os
+import tempfile
+import unittest
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.hits import CedulaHits
+from tests.fakes import Collection
+
+try:
+    import pyarrow.dataset as ds
+except ImportError:
+    ds = None
+
+if ds is not None:
+    from src.adapters.parquet_snapshot import ParquetSnapshot, _gaceta_rows, _read_model_hit_rows, snapshot_from_mongo
+
+TEXT = "Se designa a JUAN PEREZ, titular de la cédula V-01234567, como director."
+META = {
+    "g1.pdf": {"numero_gaceta": "41900", "fecha": "02/06/2020", "year": 2020, "tipo": "ORDINARIA", "total_pages": 3},
+    "g2.pdf": {"numero_gaceta": "42100", "fecha": "15/03/2021", "year": 2021, "tipo": "EXTRAORDINARIA", "total_pages": 1},
+}
+
+
+def _run_hits():
+    hits = CedulaHits()
+    start = TEXT.index("V-")
+    g = hits.add_gaceta("g1.pdf", "41900", "02/06/2020", 2020)
+    hits.add_page(g, 2, TEXT, [(start, start + 10, "V", "01234567", (13, 23))])
+    return hits
+
+
+@unittest.skipIf(ds is None, "pyarrow not installed")
+class TestParquetSnapshot(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.snapshot = ParquetSnapshot(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _table(self, name):
+        return ds.dataset(os.path.join(self._tmp.name, name), format="parquet", partitioning="hive").to_table()
+
+    def test_run_hits_keep_offsets_and_typed_columns(self):
+        self.assertEqual(self.snapshot.append_hits(_run_hits(), META), (1, 1))
+        row = self._table("hits").to_pylist()[0]
+        self.assertEqual((row["cedula_letra"], row["cedula_numero"], row["cedula_digitos"]), ("V", 1234567, 8))
+        self.assertEqual((row["fecha"], row["year"], row["tipo"], row["pagina"]), (date(2020, 6, 2), 2020, "ORDINARIA", 2))
+        self.assertEqual(TEXT[row["inicio"]:row["fin"]], "V-01234567")
+        self.assertEqual(TEXT[row["nombre_inicio"]:row["nombre_fin"]], "JUAN PEREZ")
+        self.assertEqual(str(self._table("hits").schema.field("nombre").type), "dictionary<values=string, indices=int32, ordered=0>")
+
+    def test_incremental_append_skips_known_gacetas(self):
+        self.snapshot.append_hits(_run_hits(), META)
+        personas = [{"cedula": "V-01234567", "nombre": "JUAN PEREZ", "apariciones": [
+            {"numero_gaceta": "41900", "fecha": "02/06/2020", "pagina": 2, "filename": "g1.pdf"},
+            {"numero_gaceta": "42100", "fecha": "15/03/2021", "pagina": 1, "filename": "g2.pdf"},
+        ]}]
+        new = {f: m for f, m in META.items() if f not in self.snapshot.known_gacetas()}
+        self.assertEqual(self.snapshot.append(_read_model_hit_rows(personas, new), _gaceta_rows(new)), (1, 1))
+        self.assertEqual(self.snapshot.known_gacetas(), {"g1.pdf", "g2.pdf"})
+        hits = self._table("hits").sort_by("year").to_pylist()
+        self.assertEqual([(h["year"], h["inicio"]) for h in hits], [(2020, TEXT.index("V-")), (2021, None)])
+        self.assertEqual(sorted(self._table("gacetas").column("paginas").to_pylist()), [1, 3])
+
+    def test_only_extracted_gacetas_enter_the_manifest(self):
+        gacetas = [{"_id": i, "filename": f, **meta} for i, (f, meta) in enumerate(META.items(), 1)]
+        gacetas.append({"_id": 3, "filename": "g3.pdf", "numero_gaceta": "42200", "fecha": "01/04/2021", "year": 2021})
+        db = {
+            "gacetas": Collection(gacetas),
+            # g2 had hits in a filtered run; g1 is covered by a complete run; g3 was only OCR'd
+            "gaceta": Collection([{"numero_gaceta": "42100", "filename": "g2.pdf"}]),
+            "metadata": Collection([{"_id": "mining", "ultimo_id": 1}]),
+            "persona_apariciones": Collection([]),
+        }
+        self.assertEqual(snapshot_from_mongo(db, self.snapshot), (0, 2))
+        self.assertEqual(self.snapshot.known_gacetas(), {"g1.pdf", "g2.pdf"})
+        # Once extracted, g3 is added by the next run
+        db["metadata"].docs[0]["ultimo_id"] = 3
+        self.assertEqual(snapshot_from_mongo(db, self.snapshot), (0, 1))
+        self.assertIn("g3.pdf", self.snapshot.known_gacetas())
+
+
+if __name__ == "__main__":
+    unittest.main()
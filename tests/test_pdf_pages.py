@@ -0,0 +1,83 @@
+import sys
+import os
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app as app_module
+from src.adapters.pdf_pages import extract_page_pdf
+from src.services.pdf_service import preview_width
+from src.utils.disk_cache import DiskCache
+
+
+class TestDiskCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = DiskCache(tmp, max_bytes=2500)
+            cache.put("a", ".png", b"x" * 1000)
+            time.sleep(0.01)
+            cache.put("b", ".png", b"x" * 1000)
+            time.sleep(0.01)
+            # Reading "a" makes "b" the least recently used: the third entry evicts it
+            self.assertIsNotNone(cache.get("a", ".png"))
+            time.sleep(0.01)
+            cache.put("c", ".png", b"x" * 1000)
+            self.assertIsNotNone(cache.get("a", ".png"))
+            self.assertIsNone(cache.get("b", ".png"))
+            self.assertIsNotNone(cache.get("c", ".png"))
+            self.assertLessEqual(cache.size(), 2500)
+
+    def test_preview_width_is_bounded_and_stepped(self):
+        self.assertEqual(preview_width(None), 800)
+        self.assertEqual(preview_width(640), 700)
+        self.assertEqual(preview_width(5), 100)
+        self.assertEqual(preview_width(10 ** 6), 2000)
+
+    def test_slow_page_extraction_is_a_runtime_error(self):
+        # The route answers RuntimeError with 503
+        with patch("subprocess.run", side_effect=subprocess.TimeoutExpired("pdfseparate", 60)):
+            with self.assertRaises(RuntimeError):
+                extract_page_pdf("41648.pdf", 1)
+
+
+class TestPdfRoutes(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        with open(os.path.join(self._tmp.name, "41648.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4 " + bytes(range(256)) * 40)
+        patcher = patch.object(app_module, "DOWNLOADS_DIR", self._tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+        self.client = app_module.app.test_client()
+
+    def test_pdf_supports_ranges_and_long_caching(self):
+        response = self.client.get('/pdf/41648.pdf', headers={"Range": "bytes=0-99"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(len(response.data), 100)
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        etag = response.headers["ETag"]
+        self.assertEqual(self.client.get('/pdf/41648.pdf', headers={"If-None-Match": etag}).status_code, 304)
+
+    def test_single_page(self):
+        self.assertEqual(self.client.get('/pdf/otro.pdf/pagina/1').status_code, 404)
+        self.assertEqual(self.client.get('/pdf/41648.pdf/pagina/1?formato=gif').status_code, 400)
+        page = os.path.join(self._tmp.name, "page.webp")
+        with open(page, "wb") as f:
+            f.write(b"RIFF....WEBP")
+        with patch.object(app_module, "page_file", return_value=page) as mock_page:
+            response = self.client.get('/pdf/41648.pdf/pagina/3?formato=webp&ancho=640')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, "image/webp")
+            self.assertEqual(mock_page.call_args[0][1:], (3, "webp", 640))
+            response.close()
+        with patch.object(app_module, "page_file", return_value=None):
+            self.assertEqual(self.client.get('/pdf/41648.pdf/pagina/99').status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.progress import ProgressReporter, iter_progress_events, read_progress
+
+
+class TestProgress(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "progress.json")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_reporter_throttles_writes(self):
+        reporter = ProgressReporter(self.path, min_interval=3600, min_delta=5)
+        for i in range(1000):
+            reporter.update({"percentage": i * 75 // 1000, "message": f"gaceta {i}", "status": "processing"})
+        # One write per 5 points of 0..74, not one per call
+        self.assertEqual(reporter.writes, 15)
+        self.assertTrue(reporter.update({"percentage": 100, "message": "Completado", "status": "idle"}, force=True))
+        self.assertEqual(read_progress(self.path)["status"], "idle")
+        self.assertEqual(os.listdir(self._tmp.name), ["progress.json"])
+
+    def test_read_missing_or_broken_file(self):
+        self.assertEqual(read_progress(self.path)["status"], "idle")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"percentage": 4')
+        self.assertEqual(read_progress(self.path)["message"], "Leyendo estado...")
+
+    def test_event_stream_sends_changes(self):
+        ProgressReporter(self.path).update({"percentage": 10, "message": "a", "status": "processing"})
+        events = iter_progress_events(self.path, poll_seconds=0, max_seconds=0)
+        self.assertEqual(next(events), "retry: 2000\n\n")
+        first = next(events)
+        self.assertEqual(json.loads(first[len("data: "):])["percentage"], 10)
+        self.assertEqual(list(events), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
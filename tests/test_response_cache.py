@@ -0,0 +1,66 @@
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+from src.api.v1 import cache
+from src.utils.response_cache import CachedResponse, ResponseCache
+from tests.fakes import FakeDB, Metadata
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        cache.invalidate()
+
+    def test_lru_bounds(self):
+        lru = ResponseCache(max_entries=2, max_bytes=10, ttl_seconds=60)
+        for key in ("a", "b", "c"):
+            lru.put(key, CachedResponse(b"1234", "application/json", key))
+        self.assertIsNone(lru.get("a"))
+        self.assertEqual(lru.get("c").etag, "c")
+        # Por tamaño: 4 + 8 > 10 expulsa la más antigua
+        lru.put("d", CachedResponse(b"12345678", "application/json", "d"))
+        self.assertEqual(len(lru), 1)
+        self.assertIsNone(ResponseCache(2, 10, ttl_seconds=0).get("x"))
+
+    @patch('src.api.v1.routes.query_personas_mongo')
+    @patch('src.api.v1.routes.get_db')
+    def test_etag_and_version(self, mock_get_db, mock_query):
+        """La segunda consulta igual sale de caché; con If-None-Match, 304; otra versión de datos, se recalcula."""
+        db = FakeDB("test_response_cache", metadata=Metadata(), persona_apariciones=None)
+        mock_get_db.return_value = db
+        mock_query.return_value = ([], 0)
+
+        first = self.client.get('/api/v1/personas?cedula=V-1&limit=10')
+        self.assertEqual(first.headers["X-Cache"], "MISS")
+        etag = first.headers["ETag"]
+        # Mismos parámetros en otro orden y con espacios: misma clave
+        second = self.client.get('/api/v1/personas?limit=10&cedula=%20V-1&nombre=')
+        self.assertEqual(second.headers["X-Cache"], "HIT")
+        self.assertEqual(second.get_data(), first.get_data())
+        self.assertEqual(mock_query.call_count, 1)
+
+        not_modified = self.client.get('/api/v1/personas?cedula=V-1&limit=10', headers={"If-None-Match": etag})
+        self.assertEqual(not_modified.status_code, 304)
+
+        # Solo con el cambio de versión (sin invalidate()): la clave cambia y es un fallo de caché
+        db["metadata"].version += 1
+        with patch('src.api.v1.cache.RESPONSE_CACHE_VERSION_SECONDS', 0):
+            third = self.client.get('/api/v1/personas?cedula=V-1&limit=10', headers={"If-None-Match": etag})
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(third.headers["X-Cache"], "MISS")
+        self.assertNotEqual(third.headers["ETag"], etag)
+        self.assertEqual(mock_query.call_count, 2)
+
+        self.client.get('/api/v1/personas?cedula=V-1&conteo_exacto=true')
+        self.client.get('/api/v1/personas?cedula=V-1&conteo_exacto=true')
+        self.assertEqual(mock_query.call_count, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.v1.utils import CEDULA_EXACTA, build_exact_cedula_condition, build_search_conditions, build_ui_search_conditions, classify_term
+from src.utils.normalization import number_prefix_ranges, persona_search_fields, split_cedula
+from tests.fakes import matches
+
+
+class TestSearchConditions(unittest.TestCase):
+    def setUp(self):
+        people = [
+            ("V-12.345.678", "MARÍA JOSÉ PÉREZ"),
+            ("V-1234567", "Juan Núñez"),
+            ("E-81234567", "PEDRO PERALTA"),
+            ("V-30111222", "ANA MARÍA"),
+        ]
+        self.docs = [
+            {"cedula": cedula, "nombre": nombre, **persona_search_fields(cedula, nombre)}
+            for cedula, nombre in people
+        ]
+
+    def _search(self, conditions):
+        return [doc["cedula"] for doc in self.docs if all(matches(c, doc) for c in conditions)]
+
+    def test_search_fields(self):
+        self.assertEqual(split_cedula("V-12.345.678"), ("V", 12345678))
+        self.assertEqual(split_cedula("e 81234567"), ("E", 81234567))
+        self.assertEqual(split_cedula("sin numero"), (None, None))
+        fields = persona_search_fields("V-1234567", "Juan Núñez")
+        self.assertEqual(fields["nombre_normalizado"], "juan nunez")
+        self.assertEqual(fields["nombre_tokens"], ["juan", "nunez"])
+        self.assertEqual(number_prefix_ranges("12", max_digits=4), [(12, 13), (120, 130), (1200, 1300)])
+        self.assertEqual(number_prefix_ranges("0123", max_digits=6), [(123, 124), (1230, 1240), (12300, 12400)])
+        self.assertEqual(number_prefix_ranges("00", max_digits=6), [(0, 10000)])
+
+    def test_cedula_prefix_with_leading_zero(self):
+        self.docs.append({"cedula": "V-0123456", "nombre": "LUIS ROJAS", **persona_search_fields("V-0123456", "LUIS ROJAS")})
+        # El cero se escribió: "0123" no es el inicio de "V-1234567"
+        self.assertEqual(self._search(build_search_conditions({"query": "0123"})), ["V-0123456"])
+        self.assertEqual(self._search(build_search_conditions({"cedula": "V-0123"})), ["V-0123456"])
+        self.assertEqual(self._search(build_search_conditions({"cedula": "E-0123"})), [])
+
+    def test_cedula_prefix(self):
+        self.assertEqual(self._search(build_search_conditions({"cedula": "V-1234"})), ["V-12.345.678", "V-1234567"])
+        self.assertEqual(self._search(build_search_conditions({"query": "1234"})), ["V-12.345.678", "V-1234567"])
+        self.assertEqual(self._search(build_search_conditions({"cedula": "e"})), ["E-81234567"])
+
+    def test_cedula_with_spaces(self):
+        # Escrita con espacios o separadores de miles: la misma cédula, no un término sin resultados
+        self.assertEqual(self._search(build_search_conditions({"query": "12 345 678"})), ["V-12.345.678"])
+        self.assertEqual(self._search(build_search_conditions({"cedula": "V - 1 234"})), ["V-12.345.678", "V-1234567"])
+        self.assertEqual(self._search(build_search_conditions({"query": "e 81,234,567"})), ["E-81234567"])
+        self.assertEqual(classify_term("V 12 345 678"), CEDULA_EXACTA)
+        self.assertEqual(build_exact_cedula_condition("V 12 345 678")["cedula"], "V-12345678")
+
+    def test_name_tokens_ignore_accents(self):
+        self.assertEqual(self._search(build_search_conditions({"nombre": "maria"})), ["V-12.345.678", "V-30111222"])
+        self.assertEqual(self._search(build_search_conditions({"query": "pér"})), ["V-12.345.678", "E-81234567"])
+        self.assertEqual(self._search(build_search_conditions({"nombre": "NUÑEZ juan"})), ["V-1234567"])
+        # Sin claves de búsqueda no debe devolver a todos
+        self.assertEqual(self._search(build_search_conditions({"nombre": "--"})), [])
+
+    def test_ui_filters(self):
+        self.assertEqual(self._search(build_ui_search_conditions("", "V", "0-10")), ["V-1234567"])
+        self.assertEqual(self._search(build_ui_search_conditions("", "v", "30+")), ["V-30111222"])
+        self.assertEqual(self._search(build_ui_search_conditions("maria", "", "10-20")), ["V-12.345.678"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.v1.planner import LISTADO, plan_search
+from src.api.v1.utils import CEDULA_EXACTA, CEDULA_PREFIJO, MIXTA, NOMBRE, classify_term
+from src.services.api_service import query_personas_mongo
+from src.utils.normalization import persona_search_fields
+from tests.fakes import Collection, FakeDB
+
+
+class TestSearchPlanner(unittest.TestCase):
+    def setUp(self):
+        people = [
+            ("V-12345678", "MARÍA JOSÉ PÉREZ"),
+            ("V-123456789", "JUAN PÉREZ"),
+            ("V-1234567", "ANA NÚÑEZ"),
+            ("E-81234567", "PEDRO PERALTA"),
+            ("E-81234568", "LUISA PERALTA"),
+        ]
+        self.db = FakeDB("test_search_planner", metadata=Collection(), persona_apariciones=Collection([
+            {"_id": i, "cedula": cedula, "nombre": nombre, "total_apariciones": i, **persona_search_fields(cedula, nombre)}
+            for i, (cedula, nombre) in enumerate(people, 1)
+        ]))
+        self.collection = self.db["persona_apariciones"]
+
+    def test_classify_term(self):
+        self.assertEqual(classify_term("V-12.345.678"), CEDULA_EXACTA)
+        self.assertEqual(classify_term("v12345678"), CEDULA_EXACTA)
+        self.assertEqual(classify_term("12345678"), CEDULA_PREFIJO)
+        self.assertEqual(classify_term("V-1234"), CEDULA_PREFIJO)
+        self.assertEqual(classify_term("maria perez"), NOMBRE)
+        self.assertEqual(classify_term("perez 1234"), MIXTA)
+
+    def test_full_cedula_is_one_equality(self):
+        plan = plan_search(query="V-12.345.678")
+        self.assertEqual(plan.kind, CEDULA_EXACTA)
+        self.assertEqual(plan.filter, {"cedula_letra": "V", "cedula_numero": 12345678, "cedula": "V-12345678"})
+        data, total = query_personas_mongo(self.db, plan)
+        self.assertEqual([doc["cedula"] for doc in data], ["V-12345678"])
+        # One find, and the short page gives the total without counting
+        self.assertEqual(len(self.collection.finds), 1)
+        self.assertEqual((total, self.collection.counts), (1, 0))
+
+    def test_missing_full_cedula_falls_back_to_prefix(self):
+        # Registered: only that persona, not the longer cédulas starting the same way
+        data, _ = query_personas_mongo(self.db, plan_search(cedula="V-1234567"))
+        self.assertEqual([doc["cedula"] for doc in data], ["V-1234567"])
+        # Not registered: the cédulas that start like it, on every page
+        plan = plan_search(cedula="E-8123456", limit=1, page=2)
+        self.assertEqual(plan.filter, {"cedula_letra": "E", "cedula_numero": 8123456, "cedula": "E-8123456"})
+        data, total = query_personas_mongo(self.db, plan)
+        self.assertEqual([doc["cedula"] for doc in data], ["E-81234567"])
+        self.assertEqual(total, 2)
+
+    def test_exact_cedula_keeps_leading_zeros(self):
+        self.collection.docs.append({"_id": 6, "cedula": "V-012345678", "nombre": "OTRA PERSONA", "total_apariciones": 1,
+                                     **persona_search_fields("V-012345678", "OTRA PERSONA")})
+        # Same integer, different cédulas: each query finds only its own
+        data, _ = query_personas_mongo(self.db, plan_search(cedula="V-012.345.678"))
+        self.assertEqual([doc["cedula"] for doc in data], ["V-012345678"])
+        data, _ = query_personas_mongo(self.db, plan_search(cedula="V-12.345.678"))
+        self.assertEqual([doc["cedula"] for doc in data], ["V-12345678"])
+
+    def test_mixed_term_filters_both_fields(self):
+        data, _ = query_personas_mongo(self.db, plan_search(query="perez 1234"))
+        self.assertEqual(sorted(doc["cedula"] for doc in data), ["V-12345678", "V-123456789"])
+
+    def test_count_only_and_no_count(self):
+        plan = plan_search(limit=0)
+        self.assertEqual(plan.kind, LISTADO)
+        data, total = query_personas_mongo(self.db, plan)
+        self.assertEqual((data, total), ([], 5))
+        self.assertEqual(self.collection.finds, [])
+        data, total = query_personas_mongo(self.db, plan_search(query="perez", limit=1, count=False))
+        self.assertEqual(len(data), 1)
+        self.assertIsNone(total)
+        self.assertEqual(self.collection.counts, 0)
+
+    def test_count_key_is_the_search_parameters(self):
+        # Same search on another page, order or cursor: same cached total
+        plan = plan_search(query="perez", letter="V", page=1)
+        self.assertEqual(plan.count_key, (("query", "perez"), ("letter", "V")))
+        self.assertEqual(plan_search(query="perez", letter="V", page=3, sort="apariciones").count_key, plan.count_key)
+        self.assertNotEqual(plan_search(query="perez").count_key, plan.count_key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+import os
+import tempfile
+import unittest
+from functools import partial
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.adapters.sqlite import SqliteGacetaRepository
+from src.ports.repository import GacetaFilter, split_ranges
+from src.services.search_service import search_cedulas, search_cedulas_parallel
+from tests.test_sqlite_repository import _gaceta
+
+# Gacetas 1..11; some without pages, some without hits, one cédula repeated across gacetas
+GACETAS = [
+    _gaceta(
+        n,
+        n,
+        tipo="EXTRAORDINARIA" if n % 3 == 0 else "ORDINARIA",
+        pages=None if n % 4 == 0 else [f"Se designa a PERSONA NÚMERO {n}, cédula V-{1000000 + n}", "Sin cédulas", f"C.I. E-8.000.00{n % 10}"],
+        full_text=f"Se nombra a OTRA PERSONA, C.I. V-{2000000 + n}" if n % 4 == 0 else "",
+    )
+    for n in range(1, 12)
+]
+
+
+def _rows(hits):
+    return [(hit.gaceta, hit.page_number, hit.cedula, hit.nombre, hit.start) for hit in hits]
+
+
+class TestPartitions(unittest.TestCase):
+    def test_split_ranges_boundaries(self):
+        ids = list(range(1, 11))
+        # Near-equal sizes, the first ranges take the remainder
+        self.assertEqual(split_ranges(ids, 3), [(1, 4), (5, 7), (8, 10)])
+        self.assertEqual(split_ranges(ids, 1), [(1, 10)])
+        # Never more ranges than ids, never fewer than one
+        self.assertEqual(split_ranges(ids, 20), [(i, i) for i in ids])
+        self.assertEqual(split_ranges(ids, 0), [(1, 10)])
+        self.assertEqual(split_ranges([], 4), [])
+        # Ids need not be contiguous: bounds are ids present in the scan
+        self.assertEqual(split_ranges([2, 3, 5, 8, 13], 2), [(2, 5), (8, 13)])
+
+
+class TestParallelSearch(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "gacetas.sqlite3")
+        self.repo = SqliteGacetaRepository(self.path)
+        self.repo.add_gacetas(GACETAS)
+        self.factory = partial(SqliteGacetaRepository, self.path)
+
+    def tearDown(self):
+        self.repo.close()
+        self._tmp.cleanup()
+
+    def test_partitions_cover_each_gaceta_once(self):
+        all_ids = [self.repo.gaceta_id(doc["filename"]) for doc in GACETAS]
+        for parts in (1, 2, 4, 11, 50):
+            ranges = self.repo.partition(parts)
+            scanned = [doc.filename for r in ranges for doc in self.repo.iter_gacetas(id_range=r)]
+            self.assertEqual(scanned, [doc["filename"] for doc in GACETAS], parts)
+            # Contiguous and disjoint
+            self.assertEqual(ranges[0][0], all_ids[0])
+            self.assertEqual(ranges[-1][1], all_ids[-1])
+            for (_, end), (start, _) in zip(ranges, ranges[1:]):
+                self.assertLess(end, start)
+        # With a limit the last range ends at the limit-th gaceta
+        self.assertEqual(self.repo.partition(2, limit=5)[-1][1], all_ids[4])
+
+    def test_parallel_equals_serial(self):
+        serial = search_cedulas(self.repo)
+        self.assertGreater(len(serial), 11)
+        for workers in (1, 2, 3):
+            parallel = search_cedulas_parallel(self.repo, self.factory, workers=workers)
+            self.assertEqual(_rows(parallel), _rows(serial), workers)
+            self.assertEqual(parallel.gacetas, serial.gacetas)
+
+    def test_parallel_equals_serial_with_limit_and_filters(self):
+        filters = GacetaFilter(tipo="ordinaria")
+        serial = search_cedulas(self.repo, limit_gacetas=5, filters=filters, keep_text=True)
+        parallel = search_cedulas_parallel(self.repo, self.factory, workers=2, limit_gacetas=5, filters=filters, keep_text=True)
+        self.assertEqual(_rows(parallel), _rows(serial))
+        self.assertEqual(len(parallel.gacetas), 5)
+        self.assertEqual([hit.snippet for hit in parallel], [hit.snippet for hit in serial])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.adapters.mongodb_pages import WHOLE_DOCUMENT_PAGE, page_documents
+from src.utils.snippets import build_snippets, query_terms
+
+_PAGE = (
+    "REPÚBLICA BOLIVARIANA DE VENEZUELA\n"
+    "DECRETO N° 3.781\n"
+    "Se designa a la ciudadana MARÍA PÉREZ como Presidenta de la empresa <Alimentos del Sur> S.A.\n"
+    + "Dado en Caracas, a los doce días del mes de marzo. " * 12
+    + "Los designados deberán prestar caución ante la Contraloría."
+)
+
+
+class TestSnippets(unittest.TestCase):
+    def test_query_terms(self):
+        # Sin acentos, raíz aproximada, sin palabras excluidas
+        self.assertEqual(query_terms('Designados "empresa mixta" -caracas'), ["designad", "empres", "mixt"])
+
+    def test_marks_accent_insensitive_and_stemmed(self):
+        snippets = build_snippets(_PAGE, "presidenta perez")
+        self.assertEqual(len(snippets), 1)
+        self.assertIn("<mark>PÉREZ</mark>", snippets[0])
+        self.assertIn("<mark>Presidenta</mark>", snippets[0])
+        # El texto OCR se escapa antes de marcar
+        self.assertIn("&lt;Alimentos del Sur&gt;", snippets[0])
+
+    def test_separate_fragments(self):
+        snippets = build_snippets(_PAGE, "decretos designada")
+        self.assertEqual(len(snippets), 2)
+        self.assertIn("<mark>DECRETO</mark>", snippets[0])
+        self.assertIn("<mark>designados</mark>", snippets[1])
+        self.assertTrue(snippets[1].startswith("…"))
+
+    def test_no_visible_match(self):
+        self.assertEqual(build_snippets(_PAGE, "zzz", size=40), ["REPÚBLICA BOLIVARIANA DE VENEZUELA DECRETO…"])
+        self.assertEqual(build_snippets("", "decreto"), [])
+
+    def test_page_documents(self):
+        gaceta = {"_id": 7, "numero_gaceta": "41648", "filename": "f.pdf", "pages": [
+            {"page_number": 1, "text": "uno"}, {"page_number": 2, "text": "dos"}]}
+        self.assertEqual([(d["gaceta_id"], d["page_number"], d["text"]) for d in page_documents(gaceta)],
+                         [(7, 1, "uno"), (7, 2, "dos")])
+        legacy = {"_id": 8, "full_text": "todo el texto"}
+        self.assertEqual(page_documents(legacy)[0]["page_number"], WHOLE_DOCUMENT_PAGE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.adapters.sqlite import SqliteGacetaRepository, build_fts_query
+from src.adapters.sqlite_migration import migrate_from_mongo
+from src.ports.repository import GacetaFilter
+from src.services.search_service import search_cedulas
+from tests.fakes import Collection
+
+
+def _gaceta(n, day, tipo="ORDINARIA", pages=None, full_text=""):
+    return {
+        "_id": n,
+        "filename": f"gaceta_{n}.pdf",
+        "numero_gaceta": str(40000 + n),
+        "fecha": f"{day:02d}/03/2021",
+        "tipo": tipo,
+        "year": 2021,
+        "month": 3,
+        "day": day,
+        "total_pages": len(pages or []),
+        "pages": [{"page_number": i, "text": text} for i, text in enumerate(pages or [], 1)],
+        "full_text": full_text,
+    }
+
+
+GACETAS = [
+    _gaceta(1, 1, pages=["Se designa a MARÍA PÉREZ, titular de la cédula V-12.345.678", "Resolución"]),
+    _gaceta(2, 15, tipo="EXTRAORDINARIA", pages=["Decreto sobre la administración pública"]),
+    _gaceta(3, 30, full_text="Se designa a JUAN NÚÑEZ, C.I. V-7.654.321"),
+]
+
+
+class TestSqliteRepository(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo = SqliteGacetaRepository(os.path.join(self._tmp.name, "gacetas.sqlite3"))
+        self.repo.add_gacetas(GACETAS, batch_size=2)
+
+    def tearDown(self):
+        self.repo.close()
+        self._tmp.cleanup()
+
+    def test_scan_and_filters(self):
+        docs = list(self.repo.iter_gacetas())
+        self.assertEqual([doc.filename for doc in docs], ["gaceta_1.pdf", "gaceta_2.pdf", "gaceta_3.pdf"])
+        self.assertEqual([page.page_number for page in docs[0].pages], [1, 2])
+        # full_text only for the gaceta without pages
+        self.assertEqual((docs[0].full_text, docs[2].pages), ("", []))
+        self.assertIn("V-7.654.321", docs[2].full_text)
+
+        self.assertEqual(self.repo.count(GacetaFilter(tipo="extraordinaria")), 1)
+        self.assertEqual(self.repo.count(GacetaFilter(date_from=date(2021, 3, 15), date_to=date(2021, 3, 30))), 2)
+        ranges = self.repo.partition(2)
+        self.assertEqual(len(ranges), 2)
+        scanned = [doc.filename for r in ranges for doc in self.repo.iter_gacetas(id_range=r)]
+        self.assertEqual(scanned, [doc.filename for doc in docs])
+        self.assertEqual(len(list(self.repo.iter_gacetas(limit=1))), 1)
+
+        # Importing again replaces the gaceta (same id, new pages)
+        self.repo.add_gacetas([_gaceta(1, 1, pages=["Texto corregido"])])
+        self.assertEqual(self.repo.count(), 3)
+        self.assertEqual([p.text for p in next(self.repo.iter_gacetas(limit=1)).pages], ["Texto corregido"])
+
+        hits = search_cedulas(self.repo)
+        self.assertEqual(sorted(hit.cedula for hit in hits), ["V-7654321"])
+
+    def test_relationship_writer(self):
+        with self.repo.relationship_writer(batch_size=2) as writer:
+            writer.add("V-12345678", "Desconocido", "40001", "gaceta_1.pdf", "01/03/2021", 1)
+            writer.add("V-12345678", "MARÍA PÉREZ", "40001", "gaceta_1.pdf", "01/03/2021", 1)
+            writer.add("V-12345678", "Desconocido", "40002", "gaceta_2.pdf", "15/03/2021", None)
+            writer.add("V-12345678", "Desconocido", "40002", "gaceta_2.pdf", "15/03/2021", None)
+        # Only inserted relationships count, not hits already stored
+        self.assertEqual(writer.saved, 2)
+        conn = self.repo._ensure_connected()
+        self.assertEqual(conn.execute("SELECT nombre, cedula_letra, cedula_numero FROM persona").fetchall(), [("MARÍA PÉREZ", "V", 12345678)])
+        # Repeated hits (also without a page) are stored once
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM persona_gaceta").fetchone()[0], 2)
+
+        self.repo.set_mining_watermark(2)
+        self.assertEqual(self.repo.mining_watermark(), 2)
+
+    def test_failed_batch_is_kept(self):
+        conn = self.repo._ensure_connected()
+
+        class _FailingCommit:
+            """The repository's connection, with one COMMIT failing as a locked database would."""
+            failures = 1
+
+            def __getattr__(self, name):
+                return getattr(conn, name)
+
+            def execute(self, sql, *args):
+                if sql == "COMMIT" and self.failures:
+                    self.failures -= 1
+                    raise sqlite3.OperationalError("database is locked")
+                return conn.execute(sql, *args)
+
+        writer = self.repo.relationship_writer(batch_size=2)
+        writer._conn = _FailingCommit()
+        writer.add("V-12345678", "MARÍA PÉREZ", "40001", "gaceta_1.pdf", "01/03/2021", 1)
+        with self.assertRaises(sqlite3.OperationalError):
+            writer.add("V-7654321", "JUAN NÚÑEZ", "40003", "gaceta_3.pdf", "30/03/2021", None)
+        self.assertEqual(writer.saved, 0)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM persona_gaceta").fetchone()[0], 0)
+        # Rolled back and still pending: the next flush writes it
+        writer.close()
+        self.assertEqual(writer.saved, 2)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM persona_gaceta").fetchone()[0], 2)
+
+    def test_full_text_search(self):
+        self.assertEqual(build_fts_query('"la cédula" -decreto'), '("la cédula") NOT "decreto"')
+        docs, total = self.repo.search_pages("maria perez")
+        self.assertEqual((total, docs[0]["filename"], docs[0]["page_number"]), (1, "gaceta_1.pdf", 1))
+        # Words match any of them; -words exclude
+        _, total = self.repo.search_pages("designa decreto")
+        self.assertEqual(total, 3)
+        _, total = self.repo.search_pages("designa decreto -juan")
+        self.assertEqual(total, 2)
+        docs, total = self.repo.search_pages("administracion", tipo="extraordinaria")
+        self.assertEqual((total, docs[0]["numero_gaceta"]), (1, "40002"))
+        self.assertEqual(self.repo.search_pages('"')[1], 0)
+        # Gacetas without pages are found by their full_text
+        docs, _ = self.repo.search_pages("nunez")
+        self.assertEqual((docs[0]["filename"], docs[0]["page_number"]), ("gaceta_3.pdf", 0))
+        self.repo.add_gacetas([_gaceta(3, 30, pages=["Otro texto"])])
+        self.assertEqual(self.repo.search_pages("nunez")[1], 0)
+
+    def test_migration_from_mongo(self):
+        db = {
+            "gacetas": Collection(GACETAS),
+            "gaceta": Collection([{"_id": 10, "numero_gaceta": "40003", "filename": "gaceta_3.pdf", "fecha": "30/03/2021"}]),
+            "persona": Collection([{"_id": 20, "cedula": "V-7654321", "nombre": "JUAN NÚÑEZ"}]),
+            "persona_gaceta": Collection([
+                {"_id": 30, "persona_id": 20, "gaceta_id": 10, "pagina": None},
+                {"_id": 31, "persona_id": 21, "gaceta_id": 10, "pagina": 1},
+            ]),
+            "metadata": Collection([{"_id": "mining", "ultimo_id": 2}]),
+        }
+        target = SqliteGacetaRepository(os.path.join(self._tmp.name, "migrada.sqlite3"))
+        self.assertEqual(migrate_from_mongo(db, target), (3, 1))
+        self.assertEqual(target.count(), 3)
+        self.assertEqual(target.mining_watermark(), target.gaceta_id("gaceta_2.pdf"))
+        # Running it again copies nothing twice
+        migrate_from_mongo(db, target)
+        conn = target._ensure_connected()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM persona_gaceta").fetchone()[0], 1)
+        target.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
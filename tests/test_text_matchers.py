@@ -0,0 +1,80 @@
+import sys
+import os
+import random
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.constants.search import CEDULA_CONTEXT_CHARS
+from src.utils.text_matchers import (
+    _CEDULA_RE,
+    extract_name,
+    find_cedulas_with_context,
+    has_valid_context,
+)
+
+# Tokens chosen to hit the window edge cases: keywords glued to other words, blacklisted
+# words next to names, "n°" right before a cédula, names in caps and in title case.
+_TOKENS = (
+    "el la de del los y ciudadano ciudadana ciudadanos titular titularidad ciudad cinco rifa rif "
+    "C.I. c.i cédula cedula identidad N° n* no JUAN PEREZ MARIA GONZALEZ José Luis García Pérez "
+    "DE LA CRUZ República Bolivariana Registro Mercantil junta directiva mayor de edad presidenta "
+    "empresa accionista socia civil civilizacion Garcia2 xtitular domiciliado ſalud İDENTIDAD "
+    ", . ; - ( ) \n 12 345 V-12345678 V-1.234.567 E 8123456 J-12345678-9 P 1234 v.1234 V12 e-987654 °"
+).split(" ")
+
+
+def _random_page(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(5, 400)):
+        parts.append(rng.choice(_TOKENS))
+        parts.append(rng.choice([" ", " ", "  ", "\n", ", ", ""]))
+    return "".join(parts)
+
+
+def _reference_find(text: str) -> list:
+    """The original window-by-window implementation, kept here as the oracle."""
+    results = []
+    for m in _CEDULA_RE.finditer(text):
+        start, end = m.start(), m.end()
+        letter = "".join(c for c in m.group(1).upper() if c in "VJEGP")
+        digits = "".join(c for c in m.group(2) if c.isdigit())
+        if len(digits) < 4:
+            continue
+        if not has_valid_context(text[max(0, start - 150):start], text[end:end + 150]):
+            continue
+        name = extract_name(text[max(0, start - 120):start], text[end:end + 120])
+        results.append({
+            "cedula": f"{letter}-{digits}",
+            "cedula_original": m.group(0).strip(),
+            "letter": letter,
+            "number": digits,
+            "name": name if name else "Desconocido",
+            "start": start,
+            "end": end,
+            "context_before": text[max(0, start - CEDULA_CONTEXT_CHARS):start].strip(),
+            "context_after": text[end:end + CEDULA_CONTEXT_CHARS].strip(),
+        })
+    return results
+
+
+class TestTextMatchers(unittest.TestCase):
+    def test_find_cedulas_extracts_name_and_number(self):
+        text = "Se designa al ciudadano JUAN PEREZ, titular de la cédula de identidad N° V-12.345.678."
+        hits = find_cedulas_with_context(text)
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0]["cedula"], "V-12345678")
+        self.assertEqual(hits[0]["name"], "JUAN PEREZ")
+
+    def test_page_without_keywords_has_no_hits(self):
+        self.assertEqual(find_cedulas_with_context("Gaceta número V-12345678 del mes."), [])
+
+    def test_page_scanner_matches_window_implementation(self):
+        """El escaneo por página debe dar exactamente el mismo resultado que las ventanas."""
+        for seed in range(400):
+            text = _random_page(random.Random(seed))
+            self.assertEqual(find_cedulas_with_context(text), _reference_find(text), f"seed={seed}")
+
+
+if __name__ == '__main__':
+    unittest.main()
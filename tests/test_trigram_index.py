@@ -0,0 +1,103 @@
+import sys
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.adapters.mongodb_name_index import MongoNameIndex
+from src.api.v1.utils import build_search_conditions
+from src.utils.trigram_index import TrigramIndex, substring_distance
+from tests.fakes import Cursor, FakeDB, Metadata
+
+
+class TestTrigramIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TrigramIndex()
+        self.index.add_many([
+            (1, "MARÍA ALEJANDRA GONZÁLEZ"),
+            (2, "JOSÉ GONZALO PÉREZ"),
+            (3, "Ana Rodríguez"),
+            (4, "Desconocido"),
+        ])
+
+    def test_substring(self):
+        self.assertEqual(self.index.search("ejandra"), [1])
+        self.assertEqual(self.index.search("gonza"), [1, 2])
+        self.assertEqual(self.index.search("GONZÁLEZ pe"), [])
+        self.assertEqual(self.index.search("gonza pe"), [2])
+
+    def test_typos(self):
+        self.assertEqual(self.index.search("gonzales"), [1])
+        self.assertEqual(self.index.search("rodrigues ana"), [3])
+        self.assertEqual(self.index.search("gonzales", fuzzy=False), [])
+        # Palabras cortas no toleran errores
+        self.assertEqual(self.index.search("pares"), [])
+
+    def test_short_terms_are_not_indexed(self):
+        self.assertIsNone(self.index.search("an"))
+        self.assertIsNone(self.index.search(""))
+
+    def test_rename(self):
+        self.index.add(4, "Luis Gonzaga")
+        self.assertEqual(self.index.search("desconocido"), [])
+        self.assertEqual(self.index.search("gonza"), [1, 2, 4])
+        self.index.discard(2)
+        self.assertEqual(self.index.search("gonza"), [1, 4])
+        self.assertEqual(len(self.index), 3)
+
+    def test_substring_distance(self):
+        self.assertEqual(substring_distance("perez", "jose perez", 0), 0)
+        self.assertEqual(substring_distance("gonzales", "gonzalez", 1), 1)
+        self.assertEqual(substring_distance("abc", "", 1), 3)
+
+    def test_search_conditions_use_index(self):
+        conditions = build_search_conditions({"nombre": "ejandra"}, self.index)
+        self.assertEqual(conditions, [{"_id": {"$in": [1]}}])
+        # Muy corto para trigramas: prefijo de palabra indexado
+        conditions = build_search_conditions({"nombre": "an"}, self.index)
+        self.assertEqual(conditions, [{"nombre_tokens": {"$regex": "^an"}}])
+
+    @patch('src.api.v1.utils.NAME_INDEX_MAX_IDS', 1)
+    def test_broad_terms_use_word_prefixes(self):
+        # Too many ids for an $in: common names are still searched, by word prefix
+        self.assertEqual(build_search_conditions({"nombre": "gonza"}, self.index), [{"nombre_tokens": {"$regex": "^gonza"}}])
+        self.assertEqual(build_search_conditions({"nombre": "ejandra"}, self.index), [{"_id": {"$in": [1]}}])
+
+    def test_unavailable_index_uses_word_prefixes(self):
+        class _Failed:
+            def search(self, term):
+                raise RuntimeError("Name index not available")
+
+        self.assertEqual(build_search_conditions({"nombre": "perez"}, _Failed()), [{"nombre_tokens": {"$regex": "^perez"}}])
+
+
+class _ReadModel:
+    def __init__(self, docs, gate):
+        self.docs = docs
+        self.gate = gate
+
+    def find(self, query, projection=None):
+        self.gate.wait()
+
+        return Cursor(self.docs)
+
+    def estimated_document_count(self):
+        return len(self.docs)
+
+
+class TestMongoNameIndex(unittest.TestCase):
+    def test_loads_in_the_background(self):
+        gate = threading.Event()
+        db = FakeDB("test_name_index", persona_apariciones=_ReadModel([{"_id": 1, "nombre": "MARÍA GONZÁLEZ"}], gate), metadata=Metadata())
+        index = MongoNameIndex(db)
+        # warm() returns right away; the scan runs in its own thread
+        index.warm()
+        self.assertFalse(index._loaded.is_set())
+        gate.set()
+        self.assertEqual(index.search("gonza"), [1])
+
+
+if __name__ == '__main__':
+    unittest.main()